@@ -1,3 +1,62 @@
-from django.test import TestCase
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from chatbot import audio_cache, audio_service
+
+
+class SpeakTextViewTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.settings_override = override_settings(AUDIO_CACHE={'DIR': directory})
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        self.spoken = []
+        service = audio_service.AudioService(backends={audio_service.DEFAULT_VOICE: self.synthesize})
+        audio_service.set_service(service)
+        self.addCleanup(audio_service.set_service, None)
+        self.addCleanup(service.shutdown)
+
+    def synthesize(self, text, lang):
+        self.spoken.append((text, lang))
+        return b'ID3 fake mp3'
+
+    def speak(self, **headers):
+        query = {'text': "Please type your answer.", 'lang': 'hi-IN'}
+        return self.client.get(reverse('onboarding_speak'), query, headers=headers)
+
+    def test_synthesizes_once_then_serves_the_cache(self):
+        first = self.speak()
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(b''.join(first.streaming_content), b'ID3 fake mp3')
+        self.assertEqual(first['Content-Disposition'], 'inline; filename="speech.mp3"')
+        self.assertEqual(self.speak().status_code, 200)
+        self.assertEqual(self.spoken, [("Please type your answer.", 'hi')])
+
+    def test_file_evicted_after_its_lookup_is_synthesized_again(self):
+        self.speak()
+        lookup = audio_cache.lookup
+
+        def evicted_after_lookup(key):
+            path = lookup(key)
+            if path is not None:
+                path.unlink()  # as if evict_if_needed ran in another request meanwhile
+            return path
+
+        audio_cache.lookup = evicted_after_lookup
+        self.addCleanup(setattr, audio_cache, 'lookup', lookup)
+        response = self.speak()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'ID3 fake mp3')
+        self.assertEqual(len(self.spoken), 2)
+
+    def test_browser_cache_revalidation(self):
+        etag = self.speak()['ETag']
+        self.assertEqual(self.speak(if_none_match=etag).status_code, 304)
+
+    def test_text_is_required(self):
+        self.assertEqual(self.client.get(reverse('onboarding_speak')).status_code, 400)
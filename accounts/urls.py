@@ -10,5 +10,5 @@ urlpatterns = [
     path('agents/', views.agent_list, name='agent_list'),
     
     # Only one API needed now
-    path('api/speak/', views.speak_text_view, name='speak_text'),
+    path('api/speak/', views.speak_text_view, name='onboarding_speak'),
 ]
\ No newline at end of file
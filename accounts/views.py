@@ -3,8 +3,6 @@ import json
 from urllib import request
 import speech_recognition as sr
 from pydub import AudioSegment
-from gtts import gTTS
-from io import BytesIO
 from django.db.models import Count, Sum
 from django.shortcuts import render, redirect
 from django.contrib.auth import login, logout, authenticate
@@ -22,6 +20,7 @@ from claims import admin
 from .forms import UserRegistrationForm, OnboardingForm
 from .models import Profile, Agent
 from insurance.models import Policy
+from chatbot import audio_service
 
 def agent_list(request):
     # Base Query
@@ -132,6 +131,37 @@ def logout_view(request):
 # ==========================================
 # ... (keep existing imports) ...
 
+# Multilingual Questions with Images and Validation Rules
+# (fixed text: their audio is pre-rendered by `manage.py prerender_audio`)
+ONBOARDING_QUESTIONS = [
+    {
+        'field': 'phone_number',
+        'icon': 'phone',
+        'image': 'https://cdn-icons-png.flaticon.com/512/3616/3616215.png',
+        'regex': '^[0-9]{10}$', # Validates 10 digit number
+        'questions': {
+            'en-IN': "Please tell me your 10-digit mobile number.",
+            'hi-IN': "कृपया अपना 10 अंकों का मोबाइल नंबर बताएं।",
+            'mr-IN': "कृपया तुमचा 10 अंकी मोबाईल नंबर सांगा."
+        },
+        'error_msg': {'en-IN': "That doesn't look like a 10-digit number.", 'hi-IN': "यह 10 अंकों का नंबर नहीं लग रहा है।"}
+    },
+    {
+        'field': 'city',
+        'icon': 'map-pin',
+        'image': 'https://cdn-icons-png.flaticon.com/512/1149/1149576.png',
+        'regex': '.{3,}', # At least 3 characters
+        'questions': {
+            'en-IN': "In which city do you currently live?",
+            'hi-IN': "आप अभी किस शहर में रहते हैं?",
+            'mr-IN': "तुम्ही सध्या कोणत्या शहरात राहता?"
+        },
+        'error_msg': {'en-IN': "Please tell me a valid city name.", 'hi-IN': "कृपया शहर का सही नाम बताएं।"}
+    },
+    # Add more questions following this same structure...
+]
+
+
 @login_required
 def onboarding_view(request):
     profile, created = Profile.objects.get_or_create(user=request.user)
@@ -141,39 +171,10 @@ def onboarding_view(request):
         if form.is_valid():
             form.save()
             return redirect('dashboard')
-    
-    # Multilingual Questions with Images and Validation Rules
-    questions_data = [
-        {
-            'field': 'phone_number',
-            'icon': 'phone',
-            'image': 'https://cdn-icons-png.flaticon.com/512/3616/3616215.png',
-            'regex': '^[0-9]{10}$', # Validates 10 digit number
-            'questions': {
-                'en-IN': "Please tell me your 10-digit mobile number.",
-                'hi-IN': "कृपया अपना 10 अंकों का मोबाइल नंबर बताएं।",
-                'mr-IN': "कृपया तुमचा 10 अंकी मोबाईल नंबर सांगा."
-            },
-            'error_msg': {'en-IN': "That doesn't look like a 10-digit number.", 'hi-IN': "यह 10 अंकों का नंबर नहीं लग रहा है।"}
-        },
-        {
-            'field': 'city',
-            'icon': 'map-pin',
-            'image': 'https://cdn-icons-png.flaticon.com/512/1149/1149576.png',
-            'regex': '.{3,}', # At least 3 characters
-            'questions': {
-                'en-IN': "In which city do you currently live?",
-                'hi-IN': "आप अभी किस शहर में रहते हैं?",
-                'mr-IN': "तुम्ही सध्या कोणत्या शहरात राहता?"
-            },
-            'error_msg': {'en-IN': "Please tell me a valid city name.", 'hi-IN': "कृपया शहर का सही नाम बताएं।"}
-        },
-        # Add more questions following this same structure...
-    ]
 
     return render(request, 'accounts/onboarding.html', {
         'form': OnboardingForm(instance=profile),
-        'questions_json': json.dumps(questions_data)
+        'questions_json': json.dumps(ONBOARDING_QUESTIONS)
     })
 # ==========================================
 # 5. DASHBOARD (The Gatekeeper)
@@ -218,33 +219,27 @@ def dashboard_view(request):
 # ==========================================
 # AUDIO API: SPEAK ONLY (TTS)
 # ==========================================
-def speak_text_view(request):
+# Spoken by onboarding.js after a second failed answer (keep in sync)
+TYPE_MANUALLY = {
+    'en-IN': "Please type your answer.",
+    'hi-IN': "कृपया टाइप करें।",
+}
+
+async def speak_text_view(request):
     """
-    Generates MP3 audio from text using gTTS.
+    Generates MP3 audio from text using gTTS (on the audio service's pool), cached on disk.
     """
     text = request.GET.get('text', '')
-    lang = request.GET.get('lang', 'en-IN')
-    
-    # Map full lang code to gTTS code
-    lang_map = {
-        'en-IN': 'en',
-        'hi-IN': 'hi',
-        'mr-IN': 'mr'
-    }
-    lang_code = lang_map.get(lang, 'en')
+    # Map full lang code to gTTS code (hi-IN -> hi)
+    lang_code = audio_service.normalize_lang(request.GET.get('lang', 'en-IN'))
 
     if not text:
         return JsonResponse({'error': 'No text provided'}, status=400)
 
     try:
-        tts = gTTS(text=text, lang=lang_code, slow=False)
-        audio_data = BytesIO()
-        tts.write_to_fp(audio_data)
-        audio_data.seek(0)
-        
-        response = HttpResponse(audio_data, content_type='audio/mpeg')
-        response['Content-Disposition'] = 'inline; filename="speech.mp3"'
-        return response
+        return await audio_service.aspeech_response(request, text, lang_code, filename="speech.mp3")
+    except audio_service.Overloaded:
+        return audio_service.overloaded_response()
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 # import json
@@ -0,0 +1,25 @@
+from django.contrib import admin
+
+from .models import ChatMessage, ChatSession
+
+
+class ChatMessageInline(admin.TabularInline):
+    model = ChatMessage
+    fields = ('created_at', 'role', 'intent', 'text', 'latency_ms')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+
+@admin.register(ChatSession)
+class ChatSessionAdmin(admin.ModelAdmin):
+    list_display = ('key', 'language', 'started_at')
+    list_filter = ('language',)
+    inlines = [ChatMessageInline]
+
+
+@admin.register(ChatMessage)
+class ChatMessageAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'role', 'intent', 'language', 'latency_ms', 'text')
+    list_filter = ('role', 'intent', 'language')
+    search_fields = ('text',)
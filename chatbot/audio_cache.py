@@ -0,0 +1,294 @@
+"""
+Shared on-disk cache of synthesized speech.
+
+Files are content-addressed: the name is a hash of the normalized text,
+the language and the voice (engine, its settings and any pre-processing
+such as translation), so the same sentence is synthesized once and then
+served from disk by every view. Files live under AUDIO_CACHE['DIR'] (inside
+MEDIA_ROOT by default). Synthesis itself (backends, the worker pool,
+coalescing of identical requests) is in audio_service.
+
+The total size is bounded: a file's mtime is bumped on every hit, and when
+the cache grows past MAX_BYTES the least recently used files are deleted
+until it is back under LOW_WATERMARK of the budget. Files listed in the
+manifest written by `manage.py prerender_audio` (the fixed voice prompts)
+are pinned and never evicted.
+
+`file_response` serves a cached file with a strong ETag (the hash),
+Cache-Control, conditional GET (304) and single byte-range requests (206),
+which browsers use to seek in <audio>. A file evicted after it was looked
+up is a cache miss (None), not an error.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import unicodedata
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+
+from insurance_bot import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VOICE = 'gtts'
+CONTENT_TYPE = 'audio/mpeg'
+LOW_WATERMARK = 0.9
+BLOCK_SIZE = 64 * 1024
+MANIFEST_NAME = 'manifest.json'
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+_lock = threading.Lock()
+_size = None  # running estimate of the cache size in bytes, per process
+_pinned = (None, frozenset())  # (manifest mtime, keys)
+
+
+def _config():
+    config = getattr(settings, 'AUDIO_CACHE', {})
+    return {
+        'DIR': Path(config.get('DIR', Path(settings.MEDIA_ROOT) / 'tts_cache')),
+        'MAX_BYTES': config.get('MAX_BYTES', 512 * 1024 * 1024),
+        'MAX_AGE': config.get('MAX_AGE', 7 * 24 * 60 * 60),
+    }
+
+
+def normalize_text(text):
+    """Text as spoken: NFC, whitespace collapsed. Case and punctuation matter to TTS."""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def audio_key(text, lang, voice=DEFAULT_VOICE):
+    raw = '\x00'.join((voice, lang, normalize_text(text)))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def path_for(key):
+    return _config()['DIR'] / key[:2] / f"{key}.mp3"
+
+
+# ==========================================
+# 1. LOOKUP & STORE
+# ==========================================
+def lookup(key):
+    """Path of the cached file (marked as recently used), or None."""
+    path = path_for(key)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def store(key, audio):
+    """Writes `audio` atomically under `key` and evicts if over budget."""
+    global _size
+    path = path_for(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(audio)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    with _lock:
+        if _size is not None:
+            _size += len(audio)
+    evict_if_needed()
+    return path
+
+
+# ==========================================
+# 2. MANIFEST (pre-rendered prompts)
+# ==========================================
+def manifest_path():
+    return _config()['DIR'] / MANIFEST_NAME
+
+
+def load_manifest():
+    """{key: {text, lang, voice, source, bytes}} of the pre-rendered prompts."""
+    try:
+        with open(manifest_path(), encoding='utf-8') as f:
+            return json.load(f).get('entries', {})
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        logger.error("Ignoring unreadable audio manifest: %s", e)
+        return {}
+
+
+def save_manifest(entries):
+    path = manifest_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'entries': entries}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def pinned_keys():
+    """Keys in the manifest, re-read only when the manifest file changes."""
+    global _pinned
+    try:
+        mtime = manifest_path().stat().st_mtime
+    except FileNotFoundError:
+        return frozenset()
+    if _pinned[0] != mtime:
+        _pinned = (mtime, frozenset(load_manifest()))
+    return _pinned[1]
+
+
+# ==========================================
+# 3. EVICTION
+# ==========================================
+def _scan():
+    root = _config()['DIR']
+    if not root.exists():
+        return []
+    entries = []
+    for entry in root.glob('*/*.mp3'):
+        try:
+            st = entry.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime, st.st_size, entry))
+    return entries
+
+
+def evict_if_needed():
+    global _size
+    max_bytes = _config()['MAX_BYTES']
+    with _lock:
+        if _size is None:
+            _size = sum(size for _, size, _ in _scan())
+        if _size <= max_bytes:
+            return 0
+        # Rescan: other processes share the directory
+        entries = sorted(_scan())
+        total = sum(size for _, size, _ in entries)
+        target = max_bytes * LOW_WATERMARK
+        pinned = pinned_keys()
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            if path.stem in pinned:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        _size = total
+    metrics.incr('tts.cache.evicted', removed)
+    logger.info("Audio cache evicted %d files, %d bytes left", removed, total)
+    return removed
+
+
+def stats():
+    hits = metrics.get_counter('tts.cache.hit')
+    misses = metrics.get_counter('tts.cache.miss')
+    total = hits + misses
+    entries = _scan()
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 3) if total else 0.0,
+        'files': len(entries),
+        'bytes': sum(size for _, size, _ in entries),
+    }
+
+
+# ==========================================
+# 4. HTTP
+# ==========================================
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return etag in [tag.strip().removeprefix('W/') for tag in header.split(',')]
+
+
+def _if_range_matches(request, etag):
+    # If-Range with a different validator means "send the whole new file"
+    if_range = request.headers.get('If-Range')
+    return not if_range or if_range.strip() == etag
+
+
+def _parse_range(header, size):
+    """(start, end) inclusive for a single satisfiable byte range, None to ignore, or False."""
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None  # multiple or malformed ranges: serve the whole file
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    elif last:
+        start, end = max(0, size - int(last)), size - 1  # suffix range: the last N bytes
+    else:
+        return None
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def file_response(request, path, filename=None):
+    """
+    Serves a cached audio file with ETag, Cache-Control and Range support;
+    None if the file is gone (evicted since its lookup).
+    """
+    etag = f'"{Path(path).stem}"'
+    cache_control = f"public, max-age={_config()['MAX_AGE']}"
+    if _etag_matches(request.headers.get('If-None-Match'), etag):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        response['Cache-Control'] = cache_control
+        return response
+
+    # Opened once: an open file stays readable even if eviction unlinks it now
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        metrics.incr('tts.cache.evicted_before_open')
+        return None
+    size = os.fstat(f.fileno()).st_size
+    byte_range = None
+    if 'Range' in request.headers and _if_range_matches(request, etag):
+        byte_range = _parse_range(request.headers['Range'], size)
+
+    if byte_range is False:
+        f.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    elif byte_range:
+        start, end = byte_range
+        with f:
+            f.seek(start)
+            body = f.read(end - start + 1)
+        response = HttpResponse(body, status=206, content_type=CONTENT_TYPE)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        metrics.incr('tts.http.range')
+    else:
+        response = FileResponse(f, content_type=CONTENT_TYPE)
+        response.block_size = BLOCK_SIZE
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control
+    if filename:
+        response['Content-Disposition'] = f'inline; filename="{filename}"'
+    return response
@@ -0,0 +1,233 @@
+"""
+Text-to-speech for every view (chat, onboarding, product descriptions).
+
+Views ask the process-wide `AudioService` for the cached file of a text:
+
+- a cache hit is served straight from `audio_cache`;
+- concurrent requests for the same text, language and voice share one
+  in-flight synthesis (single-flight), so 50 users opening the same product
+  page cause one gTTS call;
+- synthesis runs on a bounded thread pool, and once MAX_QUEUE distinct
+  syntheses are in flight new ones raise `Overloaded` (a 503 with
+  Retry-After) instead of piling up behind gTTS.
+
+Voices name a backend ('gtts' by default); each backend's latency is
+recorded as `tts.synthesize_ms.<voice>`. Translation happens before TTS,
+in insurance.translation.
+"""
+import asyncio
+import logging
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+from gtts import gTTS
+
+from insurance_bot import metrics
+
+from . import audio_cache
+from .constants import LANGUAGES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VOICE = audio_cache.DEFAULT_VOICE
+SUPPORTED_LANGUAGES = frozenset(LANGUAGES)
+RETRY_AFTER_S = 2
+MIN_CHUNK_CHARS = 40  # shorter sentences are merged with the next one
+
+_TAGS_RE = re.compile(r'<[^>]*>')
+_MARKDOWN_RE = re.compile(r'[*#_]')
+# Sentence ends: Latin punctuation and the Devanagari danda, followed by space
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?।॥])\s+|\n+')
+
+
+class Overloaded(Exception):
+    """Too many syntheses in flight; the caller should answer 503."""
+
+
+def normalize_lang(code, default='en'):
+    """'hi-IN', 'hi_in', 'HI' -> 'hi'; unsupported codes -> `default`."""
+    lang = (code or '').strip().replace('_', '-').split('-')[0].lower()
+    return lang if lang in SUPPORTED_LANGUAGES else default
+
+
+def spoken_text(text):
+    """What the chat page speaks for a reply: no HTML tags, no markdown marks (as in chat.js)."""
+    return _MARKDOWN_RE.sub('', _TAGS_RE.sub('', text))
+
+
+def clean_for_speech(text):
+    # Remove Markdown symbols that sound weird
+    return text.replace('*', '').replace('#', '').replace('-', '')
+
+
+# ==========================================
+# 1. BACKENDS
+# ==========================================
+def synthesize_gtts(text, lang):
+    # gTTS into a memory buffer instead of disk
+    tts = gTTS(text=text, lang=lang, slow=False)
+    audio = BytesIO()
+    tts.write_to_fp(audio)
+    return audio.getvalue()
+
+
+DEFAULT_BACKENDS = {
+    DEFAULT_VOICE: synthesize_gtts,
+}
+
+
+# ==========================================
+# 2. SERVICE
+# ==========================================
+class AudioService:
+    def __init__(self, backends=None, workers=4, max_queue=64):
+        self.backends = {**DEFAULT_BACKENDS, **(backends or {})}
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tts')
+        self._inflight = {}  # audio key -> Future of the cached path
+        self._lock = threading.Lock()
+
+    def submit(self, text, lang, voice=DEFAULT_VOICE):
+        """Future of the cached file's path; joins an identical synthesis already running."""
+        key = audio_cache.audio_key(text, lang, voice)
+        path = audio_cache.lookup(key)
+        if path is not None:
+            return _cached(path)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                metrics.incr('tts.coalesced')
+                return future
+            path = audio_cache.lookup(key)  # finished between the lookup and the lock?
+            if path is not None:
+                return _cached(path)
+            if len(self._inflight) >= self.max_queue:
+                metrics.incr('tts.shed')
+                raise Overloaded(f"{len(self._inflight)} syntheses in flight")
+            metrics.incr('tts.cache.miss')
+            metrics.observe('tts.queue_depth', len(self._inflight))
+            future = self._pool.submit(self._synthesize, key, text, lang, voice)
+            self._inflight[key] = future
+        # Outside the lock: the callback runs right away if the future is already done
+        future.add_done_callback(lambda _: self._release(key))
+        return future
+
+    def _synthesize(self, key, text, lang, voice):
+        try:
+            with metrics.timer(f'tts.synthesize_ms.{voice}'):
+                audio = self.backends[voice](text, lang)
+        except Exception:
+            metrics.incr(f'tts.failed.{voice}')
+            raise
+        return audio_cache.store(key, audio)
+
+    def _release(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def get(self, text, lang, voice=DEFAULT_VOICE):
+        return self.submit(text, lang, voice).result()
+
+    async def aget(self, text, lang, voice=DEFAULT_VOICE):
+        # Shielded: a client going away must not cancel a synthesis other requests share
+        return await asyncio.shield(asyncio.wrap_future(self.submit(text, lang, voice)))
+
+    async def astream(self, text, lang, voice=DEFAULT_VOICE):
+        """
+        Yields the MP3 bytes of each sentence of `text` in order. All
+        sentences are queued at once (first sentence first) and each is
+        cached on its own; syntheses left behind by a disconnect still
+        finish and warm the cache. A sentence evicted before it is read is
+        synthesized again.
+        """
+        chunks = split_sentences(text)
+        futures = [self.submit(chunk, lang, voice) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            path = await asyncio.shield(asyncio.wrap_future(future))
+            try:
+                audio = path.read_bytes()
+            except FileNotFoundError:
+                metrics.incr('tts.cache.evicted_before_open')
+                audio = (await self.aget(chunk, lang, voice)).read_bytes()
+            yield audio
+
+    @property
+    def inflight(self):
+        return len(self._inflight)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _cached(path):
+    metrics.incr('tts.cache.hit')
+    future = Future()
+    future.set_result(path)
+    return future
+
+
+def split_sentences(text, min_chars=MIN_CHUNK_CHARS):
+    """Sentence-sized chunks of `text`; fragments ("Rs.", "Yes!") ride along with the next one."""
+    chunks, current = [], ''
+    for sentence in _SENTENCE_END_RE.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        current = f"{current} {sentence}" if current else sentence
+        if len(current) >= min_chars:
+            chunks.append(current)
+            current = ''
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def overloaded_response():
+    response = HttpResponse(status=503)
+    response['Retry-After'] = str(RETRY_AFTER_S)
+    return response
+
+
+async def aspeech_response(request, text, lang, filename=None):
+    """
+    The cached speech for `text` as an HTTP response. A file evicted between
+    its lookup and the response is synthesized again (once).
+    """
+    for _ in range(2):
+        response = audio_cache.file_response(request, await get_service().aget(text, lang), filename)
+        if response is not None:
+            return response
+    raise FileNotFoundError(f"Speech for {audio_cache.audio_key(text, lang)} evicted twice")
+
+
+# ==========================================
+# 3. PROCESS-WIDE SERVICE
+# ==========================================
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service():
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                config = getattr(settings, 'AUDIO_SERVICE', {})
+                _service = AudioService(
+                    backends={voice: import_string(path) for voice, path in config.get('BACKENDS', {}).items()},
+                    workers=config.get('WORKERS', 4),
+                    max_queue=config.get('MAX_QUEUE', 64),
+                )
+    return _service
+
+
+def set_service(service):
+    """Swaps the process-wide service (used by benchmarks and tests)."""
+    global _service
+    with _service_lock:
+        _service = service
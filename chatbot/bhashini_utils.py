@@ -1,53 +1,193 @@
+import threading
+import time
+
 import requests
-import json
-import base64
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from insurance_bot import metrics
+
+ULCA_CONFIG_URL = "https://meity-auth.ulcacontrib.org/ulca/apis/v0/model/getModelsPipeline"
+
 
 class BhashiniHandler:
-    def __init__(self, user_id, api_key):
+    """
+    ASR, translation and TTS through the Bhashini (ULCA) pipeline.
+
+    Tasks can be chained (ASR -> translation, translation -> TTS) and run
+    on several inputs in a single inference request.
+
+    Every pipeline needs a compute config (callback URL, inference key,
+    serviceIds) from ULCA. Configs are cached per chain of
+    (task, source, target) for `config_ttl` seconds and fetched again early if the inference
+    endpoint answers 401/403 (key rotated), so a call is normally one round
+    trip instead of two. Both endpoints are reached over one pooled
+    keep-alive session, with timeouts.
+    """
+
+    def __init__(self, user_id, api_key, config_ttl=3600, timeout=(3.05, 20), pool_size=10,
+                 base_url=ULCA_CONFIG_URL):
         self.user_id = user_id
         self.api_key = api_key
         # Pipeline ID for ASR, Translation, and TTS
         self.pipeline_id = "64392f96daac500b55c543cd"
-        self.base_url = "https://meity-auth.ulcacontrib.org/ulca/apis/v0/model/getModelsPipeline"
+        self.base_url = base_url
+        self.config_ttl = config_ttl
+        self.timeout = timeout  # (connect, read) seconds
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._configs = {}  # ((task, source, target), ...) -> (expires_at, (url, auth, service_ids))
+        self._lock = threading.Lock()
 
-    def _get_compute_config(self, task_type, source_lang, target_lang=None):
-        """Retrieves dynamic callback URL and auth key for the specific task."""
-        task_config = {"taskType": task_type, "config": {"language": {"sourceLanguage": source_lang}}}
-        if target_lang:
-            task_config["config"]["language"]["targetLanguage"] = target_lang
+    def _get_compute_config(self, tasks, refresh=False):
+        """
+        Callback URL, auth key and one serviceId per task, from the cache
+        when fresh. `tasks` is a tuple of (task_type, source, target) run as
+        one chained pipeline.
+        """
+        if not refresh:
+            with self._lock:
+                cached = self._configs.get(tasks)
+            if cached and cached[0] > time.monotonic():
+                metrics.incr('bhashini.config.hit')
+                return cached[1]
+        metrics.incr('bhashini.config.refresh' if refresh else 'bhashini.config.miss')
 
         payload = {
-            "pipelineTasks": [task_config],
+            "pipelineTasks": [_task(task_type, source, target) for task_type, source, target in tasks],
             "pipelineRequestConfig": {"pipelineId": self.pipeline_id}
         }
         headers = {"userID": self.user_id, "ulcaApiKey": self.api_key}
-        
-        response = requests.post(self.base_url, json=payload, headers=headers)
+
+        with metrics.timer('bhashini.config_ms'):
+            response = self.session.post(self.base_url, json=payload, headers=headers, timeout=self.timeout)
         response.raise_for_status()
         data = response.json()
 
-        return (
+        config = (
             data["pipelineInferenceAPIEndPoint"]["callbackUrl"],
             data["pipelineInferenceAPIEndPoint"]["inferenceApiKey"]["value"],
-            data["pipelineResponseConfig"][0]["config"][0]["serviceId"]
+            [task["config"][0]["serviceId"] for task in data["pipelineResponseConfig"]],
         )
+        with self._lock:
+            self._configs[tasks] = (time.monotonic() + self.config_ttl, config)
+        return config
 
+    def run_pipeline(self, tasks, inputs):
+        """
+        Runs chained tasks, e.g. (("asr", "hi", None), ("translation", "hi", "en")),
+        on all `inputs` in one inference request and returns `pipelineResponse`
+        (one entry per task). Retries once with a fresh config on 401/403.
+        """
+        tasks = tuple(tasks)
+        name = '+'.join(task_type for task_type, _, _ in tasks)
+        for refresh in (False, True):
+            url, auth, service_ids = self._get_compute_config(tasks, refresh=refresh)
+            payload = {
+                "pipelineTasks": [
+                    _task(task_type, source, target, service_id)
+                    for (task_type, source, target), service_id in zip(tasks, service_ids)
+                ],
+                "input": inputs,
+            }
+            with metrics.timer(f'bhashini.{name}_ms'):
+                res = self.session.post(url, json=payload, headers={"Authorization": auth}, timeout=self.timeout)
+            if res.status_code not in (401, 403):
+                break
+        res.raise_for_status()
+        metrics.incr('bhashini.requests')
+        return res.json()["pipelineResponse"]
+
+    def invalidate(self):
+        with self._lock:
+            self._configs.clear()
+
+    # ==========================================
+    # SINGLE TASKS
+    # ==========================================
     def speech_to_text(self, audio_base64, lang_code):
         """Converts user audio (base64) to text."""
-        url, auth, service_id = self._get_compute_config("asr", lang_code)
-        payload = {
-            "pipelineTasks": [{"taskType": "asr", "config": {"language": {"sourceLanguage": lang_code}, "serviceId": service_id, "audioFormat": "wav"}}],
-            "input": [{"audioContent": audio_base64}]
-        }
-        res = requests.post(url, json=payload, headers={"Authorization": auth})
-        return res.json()["pipelineResponse"][0]["output"][0]["source"]
+        response = self.run_pipeline([("asr", lang_code, None)], [{"audioContent": audio_base64}])
+        return response[0]["output"][0]["source"]
 
     def text_to_speech(self, text, lang_code):
         """Converts Gemini's response to local language audio."""
-        url, auth, service_id = self._get_compute_config("tts", lang_code)
-        payload = {
-            "pipelineTasks": [{"taskType": "tts", "config": {"language": {"sourceLanguage": lang_code}, "serviceId": service_id}}],
-            "input": [{"source": text}]
-        }
-        res = requests.post(url, json=payload, headers={"Authorization": auth})
-        return res.json()["pipelineResponse"][0]["audio"][0]["audioContent"]
\ No newline at end of file
+        return self.text_to_speech_many([text], lang_code)[0]
+
+    def text_to_speech_many(self, texts, lang_code):
+        """Base64 audio for each of `texts` (e.g. the sentences of a reply), in one request."""
+        response = self.run_pipeline([("tts", lang_code, None)], [{"source": text} for text in texts])
+        return [audio["audioContent"] for audio in response[0]["audio"]]
+
+    def translate(self, texts, source_lang, target_lang):
+        response = self.run_pipeline([("translation", source_lang, target_lang)], [{"source": t} for t in texts])
+        return [output["target"] for output in response[0]["output"]]
+
+    # ==========================================
+    # CHAINED TASKS (one round trip)
+    # ==========================================
+    def speech_to_text_translated(self, audio_base64, lang_code, target_lang='en'):
+        """(transcript in `lang_code`, its translation into `target_lang`) from one request."""
+        response = self.run_pipeline(
+            [("asr", lang_code, None), ("translation", lang_code, target_lang)],
+            [{"audioContent": audio_base64}],
+        )
+        return response[0]["output"][0]["source"], response[1]["output"][0]["target"]
+
+    def translate_and_speak(self, texts, source_lang, target_lang):
+        """(translations, base64 audio of each translation) of `texts` from one request."""
+        response = self.run_pipeline(
+            [("translation", source_lang, target_lang), ("tts", target_lang, None)],
+            [{"source": text} for text in texts],
+        )
+        translations = [output["target"] for output in response[0]["output"]]
+        return translations, [audio["audioContent"] for audio in response[1]["audio"]]
+
+    def close(self):
+        self.session.close()
+
+
+def _task(task_type, source_lang, target_lang=None, service_id=None):
+    """One entry of `pipelineTasks`; the serviceId is only known after the config call."""
+    language = {"sourceLanguage": source_lang}
+    if target_lang:
+        language["targetLanguage"] = target_lang
+    config = {"language": language}
+    if service_id:
+        config["serviceId"] = service_id
+    if task_type == "asr":
+        config["audioFormat"] = "wav"
+    return {"taskType": task_type, "config": config}
+
+
+# ==========================================
+# PROCESS-WIDE HANDLER
+# ==========================================
+_handler = None
+_handler_lock = threading.Lock()
+
+
+def get_handler():
+    """The shared handler, or None when BHASHINI credentials are not configured."""
+    global _handler
+    if _handler is None:
+        config = getattr(settings, 'BHASHINI', {})
+        if not (config.get('USER_ID') and config.get('API_KEY')):
+            return None
+        with _handler_lock:
+            if _handler is None:
+                _handler = BhashiniHandler(
+                    config['USER_ID'], config['API_KEY'],
+                    config_ttl=config.get('CONFIG_TTL', 3600),
+                    base_url=config.get('CONFIG_URL', ULCA_CONFIG_URL),
+                )
+    return _handler
+
+
+def set_handler(handler):
+    """Swaps the process-wide handler (used by benchmarks and tests)."""
+    global _handler
+    with _handler_lock:
+        _handler = handler
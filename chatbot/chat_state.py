@@ -0,0 +1,338 @@
+"""
+Per-visitor chat state: survey step, survey answers and chat language.
+
+Each visitor has a random id kept in its own cookie (memory and
+transcripts are keyed by it). The state itself is a short, versioned JSON
+array, kept where CHAT_STATE['STORE'] says:
+
+- 'cookie' (default): in a signed cookie, so no server-side store is
+  written at all and every worker and serverless instance reads the same
+  state;
+- 'cache': in the CHAT_STATE['CACHE'] alias under the visitor id. Only
+  with a shared cache (Redis, set by REDIS_URL); a LocMemCache here gives
+  each worker its own copy, so surveys break across workers;
+- 'session': in the Django session (a database row per visitor).
+
+    [1, step, "language", ["occupation", "age", ...], turns]
+
+`turns` (messages since the survey started) is only written during a
+survey, so states saved before it was added still decode.
+
+State is loaded once per request and written back only if its encoding
+changed. A visitor in the default state has nothing stored at all.
+"""
+import json
+import re
+import secrets
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.backends.base import VALID_KEY_CHARS
+from django.core import signing
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.crypto import get_random_string
+
+from insurance_bot import metrics
+
+CACHE_ALIAS = 'chat_state'
+COOKIE_NAME = 'bimasakhi_chat'
+STATE_COOKIE = 'bimasakhi_state'
+SESSION_KEY = '_chat_state'
+VERSION = 1
+SURVEY_FIELDS = ("occupation", "age", "income", "vehicle")
+DEFAULT_LANGUAGE = 'en'
+
+_KEY_RE = re.compile(r'^[A-Za-z0-9_-]{16,64}$')
+_SALT = 'chatbot.chat_state'
+
+
+class ChatState:
+    def __init__(self, key=None, step=-1, answers=None, language=DEFAULT_LANGUAGE, turns=0):
+        self.key = key
+        self.step = step
+        self.answers = dict(answers or {})
+        self.language = language
+        self.turns = turns
+        self._saved = self.encode()
+
+    def encode(self):
+        values = [self.answers.get(field) for field in SURVEY_FIELDS]
+        while values and values[-1] is None:
+            values.pop()
+        encoded = [VERSION, self.step, self.language, values]
+        if self.turns:
+            encoded.append(self.turns)
+        return json.dumps(encoded, ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def decode(cls, key, raw):
+        """State from its encoding, or None for unreadable or unknown versions."""
+        try:
+            version, step, language, values, *rest = json.loads(raw)
+        except (TypeError, ValueError):
+            return None
+        if version != VERSION:
+            return None
+        answers = {field: value for field, value in zip(SURVEY_FIELDS, values) if value is not None}
+        return cls(key, step, answers, language, rest[0] if rest else 0)
+
+    @property
+    def changed(self):
+        return self.encode() != self._saved
+
+    def start_survey(self):
+        self.step = 0
+        self.answers = {}
+        self.turns = 1  # the message that asked for a plan
+
+    def reset_survey(self):
+        self.step = -1
+        self.turns = 0
+
+
+def _config():
+    config = {
+        'STORE': 'cookie',
+        'CACHE': CACHE_ALIAS,
+    }
+    config.update(getattr(settings, 'CHAT_STATE', {}))
+    return config
+
+
+def _store():
+    return _config()['STORE']
+
+
+def _cache():
+    return caches[_config()['CACHE']]
+
+
+def _cache_key(key):
+    return f"chatstate:{key}"
+
+
+def _cookie_key(request):
+    key = request.COOKIES.get(COOKIE_NAME, '')
+    return key if _KEY_RE.match(key) else None
+
+
+def _max_age():
+    return _cache().default_timeout if _store() == 'cache' else settings.SESSION_COOKIE_AGE
+
+
+def _decode_or_new(key, raw):
+    state = ChatState.decode(key, raw) if raw is not None else None
+    # A known id without stored state is a visitor still in the default state
+    return state or ChatState(key)
+
+
+def _set_cookie(response, state):
+    response.set_cookie(
+        COOKIE_NAME, state.key,
+        max_age=_max_age(),
+        httponly=True,
+        samesite='Lax',
+        secure=settings.SESSION_COOKIE_SECURE,
+    )
+
+
+def _read_state_cookie(request):
+    value = request.COOKIES.get(STATE_COOKIE)
+    if value is None:
+        return None
+    try:
+        return signing.loads(value, salt=_SALT, max_age=settings.SESSION_COOKIE_AGE)
+    except signing.BadSignature:
+        return None
+
+
+def _set_state_cookie(response, encoded):
+    # Not HttpOnly: over the WebSocket chat.js stores the value itself ("state" events)
+    response.set_cookie(
+        STATE_COOKIE, signing.dumps(encoded, salt=_SALT),
+        max_age=settings.SESSION_COOKIE_AGE,
+        samesite='Lax',
+        secure=settings.SESSION_COOKIE_SECURE,
+    )
+
+
+# ==========================================
+# 1. SYNC API
+# ==========================================
+def load(request):
+    """The request's chat state (read from its store once per request)."""
+    state = getattr(request, '_chat_state', None)
+    if state is None:
+        key = _cookie_key(request)
+        store = _store()
+        if key is None:
+            raw = None
+        elif store == 'cookie':
+            raw = _read_state_cookie(request)
+        elif store == 'session':
+            raw = request.session.get(SESSION_KEY)
+        else:
+            raw = _cache().get(_cache_key(key))
+        state = _decode_or_new(key, raw)
+        request._chat_state = state
+    return state
+
+
+def save(request, response, persist=False):
+    """
+    Writes the state back if it changed; sets the cookie for new visitors.
+    With `persist`, a new visitor gets an id (cookie) even if nothing
+    changed, e.g. to group transcript messages.
+    """
+    state = getattr(request, '_chat_state', None)
+    if state is None:
+        return
+    if state.key is None and (persist or state.changed):
+        state.key = secrets.token_urlsafe(16)
+        _set_cookie(response, state)
+    if not state.changed:
+        metrics.incr('chat.state.write_skipped')
+        return
+    encoded = state.encode()
+    store = _store()
+    if store == 'cookie':
+        _set_state_cookie(response, encoded)
+    elif store == 'session':
+        # SessionMiddleware saves the session with the response
+        request.session[SESSION_KEY] = encoded
+    else:
+        _cache().set(_cache_key(state.key), encoded)
+    state._saved = encoded
+    metrics.incr('chat.state.write')
+
+
+# ==========================================
+# 2. ASYNC API
+# ==========================================
+async def aload(request):
+    state = getattr(request, '_chat_state', None)
+    if state is None:
+        key = _cookie_key(request)
+        store = _store()
+        if key is None:
+            raw = None
+        elif store == 'cookie':
+            raw = _read_state_cookie(request)
+        elif store == 'session':
+            raw = await request.session.aget(SESSION_KEY)
+        else:
+            raw = await _cache().aget(_cache_key(key))
+        state = _decode_or_new(key, raw)
+        request._chat_state = state
+    return state
+
+
+async def asave(request, response, persist=False):
+    state = getattr(request, '_chat_state', None)
+    if state is None:
+        return
+    if state.key is None and (persist or state.changed):
+        state.key = secrets.token_urlsafe(16)
+        _set_cookie(response, state)
+    if not state.changed:
+        metrics.incr('chat.state.write_skipped')
+        return
+    encoded = state.encode()
+    store = _store()
+    if store == 'cookie':
+        _set_state_cookie(response, encoded)
+    elif store == 'session':
+        await request.session.aset(SESSION_KEY, encoded)
+    else:
+        await _cache().aset(_cache_key(state.key), encoded)
+    state._saved = encoded
+    metrics.incr('chat.state.write')
+
+
+# ==========================================
+# 3. LONG-LIVED CONNECTIONS (chatbot/websocket.py)
+# ==========================================
+async def ahandshake_cookies(request):
+    """
+    Set-Cookie header values a WebSocket must send on accept, since no
+    response follows: the visitor id and, with the session store, a
+    session key for a visitor without a session. Nothing is stored yet;
+    the session row is only created by the first `awrite`.
+    """
+    state = await aload(request)
+    response = HttpResponse()
+    if state.key is None:
+        state.key = secrets.token_urlsafe(16)
+        _set_cookie(response, state)
+    if _store() == 'session':
+        # Loading drops a key without a row (expired, or never saved)
+        await request.session.aitems()
+        if request.session.session_key is None:
+            request._chat_session_key = get_random_string(32, VALID_KEY_CHARS)
+            response.set_cookie(
+                settings.SESSION_COOKIE_NAME, request._chat_session_key,
+                max_age=settings.SESSION_COOKIE_AGE,
+                domain=settings.SESSION_COOKIE_DOMAIN,
+                path=settings.SESSION_COOKIE_PATH,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=settings.SESSION_COOKIE_HTTPONLY,
+                samesite=settings.SESSION_COOKIE_SAMESITE,
+            )
+    return [cookie.OutputString() for cookie in response.cookies.values()]
+
+
+async def awrite(request, keep_newer=False):
+    """
+    Writes the request's state back if it changed (a checkpoint, no
+    response involved). With `keep_newer`, a state someone else stored
+    since this one was loaded or written (an HTTP request, after chat.js
+    fell back from the socket) is left in place.
+
+    The cookie store has no server side: the new state comes back as a
+    Set-Cookie value for the client to store (a "state" event, which
+    chat.js writes to document.cookie). Returns None otherwise.
+    """
+    state = request._chat_state
+    if not state.changed:
+        metrics.incr('chat.state.write_skipped')
+        return None
+    store = _store()
+    if store == 'cookie':
+        if keep_newer:
+            # The socket is closing: no one is left to hand the cookie to
+            return None
+        response = HttpResponse()
+        _set_state_cookie(response, state.encode())
+        state._saved = state.encode()
+        metrics.incr('chat.state.write')
+        return response.cookies[STATE_COOKIE].OutputString()
+
+    engine = import_module(settings.SESSION_ENGINE)
+    if store == 'session':
+        # The connection's session object is as old as the connection: re-read it,
+        # so that keys saved by other requests meanwhile (a login) are kept
+        session_key = request.session.session_key or getattr(request, '_chat_session_key', None)
+        session = engine.SessionStore(session_key)
+        stored = await session.aget(SESSION_KEY)
+    else:
+        session = None
+        stored = await _cache().aget(_cache_key(state.key))
+    if keep_newer and _decode_or_new(state.key, stored).encode() != state._saved:
+        metrics.incr('chat.state.write_conflict')
+        return None
+
+    encoded = state.encode()
+    if session is not None:
+        if session.session_key is None:
+            # First write: the row gets the key the handshake sent as a cookie
+            session = engine.SessionStore(session_key)
+            await session.asave(must_create=True)
+        # No SessionMiddleware runs for a WebSocket
+        await session.aset(SESSION_KEY, encoded)
+        await session.asave()
+    else:
+        await _cache().aset(_cache_key(state.key), encoded)
+    state._saved = encoded
+    metrics.incr('chat.state.write')
+    return None
@@ -59,4 +59,185 @@ SURVEY_QUESTIONS = {
         "మీకు ఏవైనా ఆరోగ్య సమస్యలు ఉన్నాయా? (అవును / కాదు)",
         "చివరగా, మీ ప్రధాన లక్ష్యం ఏమిటి? (ఉదా. పన్ను ఆదా, ఆరోగ్య రక్షణ, పెట్టుబడి)"
     ]
-}
\ No newline at end of file
+}
+
+# Localized "why this policy" lines for the server-rendered policy card,
+# one per product type. Languages without an entry fall back to English.
+RECOMMENDATION_REASONS = {
+    'CROP': {
+        'en': "As a farmer, this plan protects your crop income against drought, flood and pests.",
+        'hi': "किसान होने के नाते, यह योजना सूखा, बाढ़ और कीटों से आपकी फसल की आय की रक्षा करती है।",
+        'mr': "शेतकरी म्हणून, ही योजना दुष्काळ, पूर आणि कीटकांपासून तुमच्या पिकाच्या उत्पन्नाचे संरक्षण करते.",
+        'gu': "ખેડૂત તરીકે, આ યોજના દુષ્કાળ, પૂર અને જીવાતોથી તમારી પાકની આવકનું રક્ષણ કરે છે.",
+        'bn': "কৃষক হিসেবে, এই পরিকল্পনা খরা, বন্যা ও পোকামাকড় থেকে আপনার ফসলের আয় রক্ষা করে।",
+        'ta': "விவசாயியாக, இந்த திட்டம் வறட்சி, வெள்ளம் மற்றும் பூச்சிகளிலிருந்து உங்கள் பயிர் வருமானத்தைப் பாதுகாக்கிறது.",
+        'te': "రైతుగా, ఈ పథకం కరువు, వరదలు మరియు తెగుళ్ల నుండి మీ పంట ఆదాయాన్ని కాపాడుతుంది.",
+        'kn': "ರೈತರಾಗಿ, ಈ ಯೋಜನೆ ಬರ, ಪ್ರವಾಹ ಮತ್ತು ಕೀಟಗಳಿಂದ ನಿಮ್ಮ ಬೆಳೆ ಆದಾಯವನ್ನು ರಕ್ಷಿಸುತ್ತದೆ.",
+        'ml': "ഒരു കർഷകനെന്ന നിലയിൽ, ഈ പദ്ധതി വരൾച്ച, വെള്ളപ്പൊക്കം, കീടങ്ങൾ എന്നിവയിൽ നിന്ന് നിങ്ങളുടെ വിള വരുമാനം സംരക്ഷിക്കുന്നു.",
+        'pa': "ਕਿਸਾਨ ਹੋਣ ਦੇ ਨਾਤੇ, ਇਹ ਯੋਜਨਾ ਸੋਕੇ, ਹੜ੍ਹ ਅਤੇ ਕੀੜਿਆਂ ਤੋਂ ਤੁਹਾਡੀ ਫ਼ਸਲ ਦੀ ਆਮਦਨ ਦੀ ਰੱਖਿਆ ਕਰਦੀ ਹੈ।",
+    },
+    'LIVESTOCK': {
+        'en': "Your cattle are part of your livelihood; this plan covers them against disease and accidental death.",
+        'hi': "आपके पशु आपकी आजीविका का हिस्सा हैं; यह योजना उन्हें बीमारी और दुर्घटना से मृत्यु से बचाती है।",
+        'mr': "तुमची जनावरे तुमच्या उपजीविकेचा भाग आहेत; ही योजना त्यांना आजार आणि अपघाती मृत्यूपासून संरक्षण देते.",
+        'gu': "તમારા પશુઓ તમારી આજીવિકાનો ભાગ છે; આ યોજના તેમને રોગ અને અકસ્માત મૃત્યુ સામે રક્ષણ આપે છે.",
+        'bn': "আপনার গবাদি পশু আপনার জীবিকার অংশ; এই পরিকল্পনা রোগ ও দুর্ঘটনাজনিত মৃত্যু থেকে তাদের সুরক্ষা দেয়।",
+        'ta': "உங்கள் கால்நடைகள் உங்கள் வாழ்வாதாரத்தின் ஒரு பகுதி; இந்த திட்டம் நோய் மற்றும் விபத்து மரணத்திலிருந்து அவற்றைப் பாதுகாக்கிறது.",
+        'te': "మీ పశువులు మీ జీవనోపాధిలో భాగం; ఈ పథకం వ్యాధి మరియు ప్రమాద మరణం నుండి వాటికి రక్షణ ఇస్తుంది.",
+        'kn': "ನಿಮ್ಮ ಜಾನುವಾರುಗಳು ನಿಮ್ಮ ಜೀವನೋಪಾಯದ ಭಾಗ; ಈ ಯೋಜನೆ ರೋಗ ಮತ್ತು ಅಪಘಾತ ಸಾವಿನಿಂದ ಅವುಗಳನ್ನು ರಕ್ಷಿಸುತ್ತದೆ.",
+        'ml': "നിങ്ങളുടെ കന്നുകാലികൾ നിങ്ങളുടെ ഉപജീവനത്തിന്റെ ഭാഗമാണ്; ഈ പദ്ധതി രോഗത്തിൽ നിന്നും അപകട മരണത്തിൽ നിന്നും അവയെ സംരക്ഷിക്കുന്നു.",
+        'pa': "ਤੁਹਾਡੇ ਪਸ਼ੂ ਤੁਹਾਡੀ ਰੋਜ਼ੀ-ਰੋਟੀ ਦਾ ਹਿੱਸਾ ਹਨ; ਇਹ ਯੋਜਨਾ ਉਹਨਾਂ ਨੂੰ ਬਿਮਾਰੀ ਅਤੇ ਹਾਦਸੇ ਵਿੱਚ ਮੌਤ ਤੋਂ ਬਚਾਉਂਦੀ ਹੈ।",
+    },
+    'VEHICLE': {
+        'en': "You own a vehicle, and this plan covers it against accidents and theft.",
+        'hi': "आपके पास वाहन है, और यह योजना उसे दुर्घटना और चोरी से सुरक्षा देती है।",
+        'mr': "तुमच्याकडे वाहन आहे, आणि ही योजना त्याला अपघात आणि चोरीपासून संरक्षण देते.",
+        'gu': "તમારી પાસે વાહન છે, અને આ યોજના તેને અકસ્માત અને ચોરી સામે રક્ષણ આપે છે.",
+        'bn': "আপনার একটি যানবাহন আছে, এবং এই পরিকল্পনা দুর্ঘটনা ও চুরি থেকে সেটিকে সুরক্ষা দেয়।",
+        'ta': "உங்களிடம் வாகனம் உள்ளது, இந்த திட்டம் விபத்து மற்றும் திருட்டிலிருந்து அதைப் பாதுகாக்கிறது.",
+        'te': "మీకు వాహనం ఉంది, ఈ పథకం ప్రమాదాలు మరియు దొంగతనం నుండి దానికి రక్షణ ఇస్తుంది.",
+        'kn': "ನಿಮ್ಮ ಬಳಿ ವಾಹನವಿದೆ, ಈ ಯೋಜನೆ ಅಪಘಾತ ಮತ್ತು ಕಳ್ಳತನದಿಂದ ಅದನ್ನು ರಕ್ಷಿಸುತ್ತದೆ.",
+        'ml': "നിങ്ങൾക്ക് ഒരു വാഹനമുണ്ട്, ഈ പദ്ധതി അപകടത്തിൽ നിന്നും മോഷണത്തിൽ നിന്നും അതിനെ സംരക്ഷിക്കുന്നു.",
+        'pa': "ਤੁਹਾਡੇ ਕੋਲ ਵਾਹਨ ਹੈ, ਅਤੇ ਇਹ ਯੋਜਨਾ ਇਸਨੂੰ ਹਾਦਸੇ ਅਤੇ ਚੋਰੀ ਤੋਂ ਬਚਾਉਂਦੀ ਹੈ।",
+    },
+    'HEALTH': {
+        'en': "It covers hospital bills for you and your family at a premium that fits your income.",
+        'hi': "यह आपकी आय के अनुसार प्रीमियम पर आपके और आपके परिवार के अस्पताल के खर्च को कवर करती है।",
+        'mr': "ही तुमच्या उत्पन्नाला परवडणाऱ्या प्रीमियममध्ये तुमच्या आणि तुमच्या कुटुंबाच्या रुग्णालय खर्चाला संरक्षण देते.",
+        'gu': "તે તમારી આવકને અનુકૂળ પ્રીમિયમ પર તમારા અને તમારા પરિવારના હોસ્પિટલ ખર્ચને આવરી લે છે.",
+        'bn': "এটি আপনার আয়ের সাথে মানানসই প্রিমিয়ামে আপনার ও আপনার পরিবারের হাসপাতালের খরচ বহন করে।",
+        'ta': "உங்கள் வருமானத்திற்கு ஏற்ற பிரீமியத்தில் உங்களுக்கும் உங்கள் குடும்பத்திற்கும் மருத்துவமனை செலவுகளை இது ஈடுசெய்கிறது.",
+        'te': "మీ ఆదాయానికి తగిన ప్రీమియంతో మీకు మరియు మీ కుటుంబానికి ఆసుపత్రి ఖర్చులను ఇది భరిస్తుంది.",
+        'kn': "ನಿಮ್ಮ ಆದಾಯಕ್ಕೆ ತಕ್ಕ ಪ್ರೀಮಿಯಂನಲ್ಲಿ ನಿಮಗೂ ನಿಮ್ಮ ಕುಟುಂಬಕ್ಕೂ ಆಸ್ಪತ್ರೆ ವೆಚ್ಚವನ್ನು ಇದು ಭರಿಸುತ್ತದೆ.",
+        'ml': "നിങ്ങളുടെ വരുമാനത്തിന് യോജിച്ച പ്രീമിയത്തിൽ നിങ്ങൾക്കും കുടുംബത്തിനും ആശുപത്രി ചെലവുകൾ ഇത് വഹിക്കുന്നു.",
+        'pa': "ਇਹ ਤੁਹਾਡੀ ਆਮਦਨ ਦੇ ਅਨੁਸਾਰ ਪ੍ਰੀਮੀਅਮ 'ਤੇ ਤੁਹਾਡੇ ਅਤੇ ਤੁਹਾਡੇ ਪਰਿਵਾਰ ਦੇ ਹਸਪਤਾਲ ਦੇ ਖਰਚੇ ਕਵਰ ਕਰਦੀ ਹੈ।",
+    },
+    'LIFE': {
+        'en': "It gives your family financial security if something happens to you.",
+        'hi': "अगर आपको कुछ हो जाए, तो यह आपके परिवार को आर्थिक सुरक्षा देती है।",
+        'mr': "तुम्हाला काही झाल्यास, ही तुमच्या कुटुंबाला आर्थिक सुरक्षा देते.",
+        'gu': "જો તમને કંઈ થાય, તો તે તમારા પરિવારને આર્થિક સુરક્ષા આપે છે.",
+        'bn': "আপনার কিছু হলে, এটি আপনার পরিবারকে আর্থিক নিরাপত্তা দেয়।",
+        'ta': "உங்களுக்கு ஏதேனும் நேர்ந்தால், இது உங்கள் குடும்பத்திற்கு நிதிப் பாதுகாப்பு அளிக்கிறது.",
+        'te': "మీకు ఏదైనా జరిగితే, ఇది మీ కుటుంబానికి ఆర్థిక భద్రత ఇస్తుంది.",
+        'kn': "ನಿಮಗೆ ಏನಾದರೂ ಆದರೆ, ಇದು ನಿಮ್ಮ ಕುಟುಂಬಕ್ಕೆ ಆರ್ಥಿಕ ಭದ್ರತೆ ನೀಡುತ್ತದೆ.",
+        'ml': "നിങ്ങൾക്ക് എന്തെങ്കിലും സംഭവിച്ചാൽ, ഇത് നിങ്ങളുടെ കുടുംബത്തിന് സാമ്പത്തിക സുരക്ഷ നൽകുന്നു.",
+        'pa': "ਜੇ ਤੁਹਾਨੂੰ ਕੁਝ ਹੋ ਜਾਵੇ, ਤਾਂ ਇਹ ਤੁਹਾਡੇ ਪਰਿਵਾਰ ਨੂੰ ਵਿੱਤੀ ਸੁਰੱਖਿਆ ਦਿੰਦੀ ਹੈ।",
+    },
+    'PROPERTY': {
+        'en': "It protects your home and belongings against fire, flood and theft.",
+        'hi': "यह आपके घर और सामान को आग, बाढ़ और चोरी से बचाती है।",
+        'mr': "ही तुमचे घर आणि सामान आग, पूर आणि चोरीपासून वाचवते.",
+        'gu': "તે તમારા ઘર અને સામાનને આગ, પૂર અને ચોરી સામે રક્ષણ આપે છે.",
+        'bn': "এটি আগুন, বন্যা ও চুরি থেকে আপনার বাড়ি ও জিনিসপত্র রক্ষা করে।",
+        'ta': "இது தீ, வெள்ளம் மற்றும் திருட்டிலிருந்து உங்கள் வீட்டையும் உடைமைகளையும் பாதுகாக்கிறது.",
+        'te': "ఇది అగ్ని, వరదలు మరియు దొంగతనం నుండి మీ ఇంటిని మరియు వస్తువులను కాపాడుతుంది.",
+        'kn': "ಇದು ಬೆಂಕಿ, ಪ್ರವಾಹ ಮತ್ತು ಕಳ್ಳತನದಿಂದ ನಿಮ್ಮ ಮನೆ ಮತ್ತು ವಸ್ತುಗಳನ್ನು ರಕ್ಷಿಸುತ್ತದೆ.",
+        'ml': "ഇത് തീ, വെള്ളപ്പൊക്കം, മോഷണം എന്നിവയിൽ നിന്ന് നിങ്ങളുടെ വീടും സാധനങ്ങളും സംരക്ഷിക്കുന്നു.",
+        'pa': "ਇਹ ਤੁਹਾਡੇ ਘਰ ਅਤੇ ਸਾਮਾਨ ਨੂੰ ਅੱਗ, ਹੜ੍ਹ ਅਤੇ ਚੋਰੀ ਤੋਂ ਬਚਾਉਂਦੀ ਹੈ।",
+    },
+}
+
+# Replies for intents answered without the LLM (see chatbot/intents.py).
+INTENT_REPLIES = {
+    'claim': {
+        'en': "You can file a claim online in a few minutes. Keep your policy number and documents ready: <a href='/claims/file/'>File a Claim</a>",
+        'hi': "आप कुछ ही मिनटों में ऑनलाइन क्लेम दर्ज कर सकते हैं। अपना पॉलिसी नंबर और दस्तावेज़ तैयार रखें: <a href='/claims/file/'>क्लेम दर्ज करें</a>",
+        'mr': "तुम्ही काही मिनिटांत ऑनलाइन क्लेम दाखल करू शकता. तुमचा पॉलिसी नंबर आणि कागदपत्रे तयार ठेवा: <a href='/claims/file/'>क्लेम दाखल करा</a>",
+        'gu': "તમે થોડી જ મિનિટોમાં ઓનલાઇન ક્લેમ નોંધાવી શકો છો. તમારો પોલિસી નંબર અને દસ્તાવેજો તૈયાર રાખો: <a href='/claims/file/'>ક્લેમ નોંધાવો</a>",
+        'bn': "আপনি কয়েক মিনিটেই অনলাইনে ক্লেম জমা দিতে পারেন। আপনার পলিসি নম্বর ও নথি প্রস্তুত রাখুন: <a href='/claims/file/'>ক্লেম জমা দিন</a>",
+        'ta': "சில நிமிடங்களில் ஆன்லைனில் க்ளெய்ம் பதிவு செய்யலாம். உங்கள் பாலிசி எண் மற்றும் ஆவணங்களை தயாராக வைத்திருங்கள்: <a href='/claims/file/'>க்ளெய்ம் பதிவு செய்</a>",
+        'te': "మీరు కొన్ని నిమిషాల్లో ఆన్‌లైన్‌లో క్లెయిమ్ దాఖలు చేయవచ్చు. మీ పాలసీ నంబర్ మరియు పత్రాలు సిద్ధంగా ఉంచుకోండి: <a href='/claims/file/'>క్లెయిమ్ దాఖలు చేయండి</a>",
+        'kn': "ನೀವು ಕೆಲವೇ ನಿಮಿಷಗಳಲ್ಲಿ ಆನ್‌ಲೈನ್‌ನಲ್ಲಿ ಕ್ಲೈಮ್ ಸಲ್ಲಿಸಬಹುದು. ನಿಮ್ಮ ಪಾಲಿಸಿ ಸಂಖ್ಯೆ ಮತ್ತು ದಾಖಲೆಗಳನ್ನು ಸಿದ್ಧವಾಗಿಡಿ: <a href='/claims/file/'>ಕ್ಲೈಮ್ ಸಲ್ಲಿಸಿ</a>",
+        'ml': "കുറച്ച് മിനിറ്റുകൾക്കുള്ളിൽ ഓൺലൈനായി ക്ലെയിം ഫയൽ ചെയ്യാം. നിങ്ങളുടെ പോളിസി നമ്പറും രേഖകളും തയ്യാറാക്കി വയ്ക്കുക: <a href='/claims/file/'>ക്ലെയിം ഫയൽ ചെയ്യുക</a>",
+        'pa': "ਤੁਸੀਂ ਕੁਝ ਮਿੰਟਾਂ ਵਿੱਚ ਆਨਲਾਈਨ ਕਲੇਮ ਦਰਜ ਕਰ ਸਕਦੇ ਹੋ। ਆਪਣਾ ਪਾਲਿਸੀ ਨੰਬਰ ਅਤੇ ਦਸਤਾਵੇਜ਼ ਤਿਆਰ ਰੱਖੋ: <a href='/claims/file/'>ਕਲੇਮ ਦਰਜ ਕਰੋ</a>",
+    },
+    'agent': {
+        'en': "Our local agents can visit you or call you back: <a href='/accounts/agents/'>Find an Agent</a>",
+        'hi': "हमारे स्थानीय एजेंट आपसे मिल सकते हैं या आपको कॉल कर सकते हैं: <a href='/accounts/agents/'>एजेंट खोजें</a>",
+        'mr': "आमचे स्थानिक एजंट तुम्हाला भेटू शकतात किंवा फोन करू शकतात: <a href='/accounts/agents/'>एजंट शोधा</a>",
+        'gu': "અમારા સ્થાનિક એજન્ટ તમને મળી શકે છે અથવા કૉલ કરી શકે છે: <a href='/accounts/agents/'>એજન્ટ શોધો</a>",
+        'bn': "আমাদের স্থানীয় এজেন্ট আপনার সাথে দেখা করতে বা ফোন করতে পারেন: <a href='/accounts/agents/'>এজেন্ট খুঁজুন</a>",
+        'ta': "எங்கள் உள்ளூர் முகவர்கள் உங்களை சந்திக்கலாம் அல்லது அழைக்கலாம்: <a href='/accounts/agents/'>முகவரைக் கண்டறி</a>",
+        'te': "మా స్థానిక ఏజెంట్లు మిమ్మల్ని కలవగలరు లేదా కాల్ చేయగలరు: <a href='/accounts/agents/'>ఏజెంట్‌ను కనుగొనండి</a>",
+        'kn': "ನಮ್ಮ ಸ್ಥಳೀಯ ಏಜೆಂಟರು ನಿಮ್ಮನ್ನು ಭೇಟಿ ಮಾಡಬಹುದು ಅಥವಾ ಕರೆ ಮಾಡಬಹುದು: <a href='/accounts/agents/'>ಏಜೆಂಟ್ ಹುಡುಕಿ</a>",
+        'ml': "ഞങ്ങളുടെ പ്രാദേശിക ഏജന്റുമാർക്ക് നിങ്ങളെ സന്ദർശിക്കാനോ വിളിക്കാനോ കഴിയും: <a href='/accounts/agents/'>ഏജന്റിനെ കണ്ടെത്തുക</a>",
+        'pa': "ਸਾਡੇ ਸਥਾਨਕ ਏਜੰਟ ਤੁਹਾਨੂੰ ਮਿਲ ਸਕਦੇ ਹਨ ਜਾਂ ਕਾਲ ਕਰ ਸਕਦੇ ਹਨ: <a href='/accounts/agents/'>ਏਜੰਟ ਲੱਭੋ</a>",
+    },
+    'policy_status': {
+        'en': "You can see the status, renewal date and documents of your policies on your <a href='/accounts/dashboard/'>Dashboard</a>.",
+        'hi': "आप अपनी पॉलिसी की स्थिति, नवीनीकरण तिथि और दस्तावेज़ अपने <a href='/accounts/dashboard/'>डैशबोर्ड</a> पर देख सकते हैं।",
+        'mr': "तुमच्या पॉलिसीची स्थिती, नूतनीकरण तारीख आणि कागदपत्रे तुमच्या <a href='/accounts/dashboard/'>डॅशबोर्ड</a>वर पाहू शकता.",
+        'gu': "તમારી પોલિસીની સ્થિતિ, રિન્યુ તારીખ અને દસ્તાવેજો તમારા <a href='/accounts/dashboard/'>ડેશબોર્ડ</a> પર જોઈ શકો છો.",
+        'bn': "আপনার পলিসির অবস্থা, নবীকরণের তারিখ ও নথি আপনার <a href='/accounts/dashboard/'>ড্যাশবোর্ডে</a> দেখতে পারেন।",
+        'ta': "உங்கள் பாலிசிகளின் நிலை, புதுப்பிக்கும் தேதி மற்றும் ஆவணங்களை உங்கள் <a href='/accounts/dashboard/'>டாஷ்போர்டில்</a> பார்க்கலாம்.",
+        'te': "మీ పాలసీల స్థితి, పునరుద్ధరణ తేదీ మరియు పత్రాలను మీ <a href='/accounts/dashboard/'>డాష్‌బోర్డ్</a>‌లో చూడవచ్చు.",
+        'kn': "ನಿಮ್ಮ ಪಾಲಿಸಿಗಳ ಸ್ಥಿತಿ, ನವೀಕರಣ ದಿನಾಂಕ ಮತ್ತು ದಾಖಲೆಗಳನ್ನು ನಿಮ್ಮ <a href='/accounts/dashboard/'>ಡ್ಯಾಶ್‌ಬೋರ್ಡ್</a>‌ನಲ್ಲಿ ನೋಡಬಹುದು.",
+        'ml': "നിങ്ങളുടെ പോളിസികളുടെ നില, പുതുക്കൽ തീയതി, രേഖകൾ എന്നിവ നിങ്ങളുടെ <a href='/accounts/dashboard/'>ഡാഷ്‌ബോർഡിൽ</a> കാണാം.",
+        'pa': "ਤੁਸੀਂ ਆਪਣੀਆਂ ਪਾਲਿਸੀਆਂ ਦੀ ਸਥਿਤੀ, ਨਵੀਨੀਕਰਨ ਮਿਤੀ ਅਤੇ ਦਸਤਾਵੇਜ਼ ਆਪਣੇ <a href='/accounts/dashboard/'>ਡੈਸ਼ਬੋਰਡ</a> 'ਤੇ ਦੇਖ ਸਕਦੇ ਹੋ।",
+    },
+}
+
+# Replies to greetings, thanks, acknowledgements and goodbyes, answered by
+# the local tier of the model router (see chatbot/router.py).
+SMALL_TALK_REPLIES = {
+    'greeting': {
+        'en': "Namaste! How can I help you with insurance today?",
+        'hi': "नमस्ते! आज मैं बीमा में आपकी कैसे मदद कर सकती हूँ?",
+        'mr': "नमस्ते! आज मी विम्याबद्दल तुम्हाला कशी मदत करू शकते?",
+        'gu': "નમસ્તે! આજે હું વીમા અંગે તમારી કેવી મદદ કરી શકું?",
+        'bn': "নমস্কার! আজ বিমা নিয়ে আমি আপনাকে কীভাবে সাহায্য করতে পারি?",
+        'ta': "வணக்கம்! இன்று காப்பீடு குறித்து நான் உங்களுக்கு எப்படி உதவ முடியும்?",
+        'te': "నమస్కారం! ఈ రోజు బీమా గురించి నేను మీకు ఎలా సహాయం చేయగలను?",
+        'kn': "ನಮಸ್ಕಾರ! ಇಂದು ವಿಮೆಯ ಬಗ್ಗೆ ನಾನು ನಿಮಗೆ ಹೇಗೆ ಸಹಾಯ ಮಾಡಲಿ?",
+        'ml': "നമസ്കാരം! ഇന്ന് ഇൻഷുറൻസിനെക്കുറിച്ച് ഞാൻ നിങ്ങളെ എങ്ങനെ സഹായിക്കണം?",
+        'pa': "ਸਤ ਸ੍ਰੀ ਅਕਾਲ! ਅੱਜ ਮੈਂ ਬੀਮੇ ਬਾਰੇ ਤੁਹਾਡੀ ਕਿਵੇਂ ਮਦਦ ਕਰ ਸਕਦੀ ਹਾਂ?",
+    },
+    'thanks': {
+        'en': "You're welcome! Ask me anything else about insurance.",
+        'hi': "आपका स्वागत है! बीमा के बारे में कुछ और पूछना हो तो पूछिए।",
+        'mr': "तुमचे स्वागत आहे! विम्याबद्दल आणखी काही विचारायचे असल्यास विचारा.",
+        'gu': "તમારું સ્વાગત છે! વીમા વિશે બીજું કંઈ પૂછવું હોય તો પૂછો.",
+        'bn': "আপনাকে স্বাগত! বিমা নিয়ে আর কিছু জানতে চাইলে জিজ্ঞাসা করুন।",
+        'ta': "மகிழ்ச்சி! காப்பீடு பற்றி வேறு ஏதாவது கேட்கலாம்.",
+        'te': "మీకు స్వాగతం! బీమా గురించి ఇంకేమైనా అడగండి.",
+        'kn': "ಸ್ವಾಗತ! ವಿಮೆಯ ಬಗ್ಗೆ ಇನ್ನೇನಾದರೂ ಕೇಳಿ.",
+        'ml': "സന്തോഷം! ഇൻഷുറൻസിനെക്കുറിച്ച് മറ്റെന്തെങ്കിലും ചോദിക്കാം.",
+        'pa': "ਤੁਹਾਡਾ ਸਵਾਗਤ ਹੈ! ਬੀਮੇ ਬਾਰੇ ਹੋਰ ਕੁਝ ਪੁੱਛਣਾ ਹੋਵੇ ਤਾਂ ਪੁੱਛੋ।",
+    },
+    'ack': {
+        'en': "Okay! Let me know if you have any other question.",
+        'hi': "ठीक है! कोई और सवाल हो तो बताइए।",
+        'mr': "ठीक आहे! आणखी काही प्रश्न असल्यास सांगा.",
+        'gu': "સારું! બીજો કોઈ પ્રશ્ન હોય તો જણાવો.",
+        'bn': "ঠিক আছে! আর কোনো প্রশ্ন থাকলে জানান।",
+        'ta': "சரி! வேறு கேள்வி இருந்தால் சொல்லுங்கள்.",
+        'te': "సరే! ఇంకేమైనా ప్రశ్న ఉంటే చెప్పండి.",
+        'kn': "ಸರಿ! ಬೇರೆ ಪ್ರಶ್ನೆ ಇದ್ದರೆ ತಿಳಿಸಿ.",
+        'ml': "ശരി! മറ്റെന്തെങ്കിലും ചോദ്യമുണ്ടെങ്കിൽ പറയൂ.",
+        'pa': "ਠੀਕ ਹੈ! ਕੋਈ ਹੋਰ ਸਵਾਲ ਹੋਵੇ ਤਾਂ ਦੱਸੋ।",
+    },
+    'bye': {
+        'en': "Goodbye! Stay safe, and come back any time.",
+        'hi': "अलविदा! सुरक्षित रहिए, और कभी भी वापस आइए।",
+        'mr': "निरोप! सुरक्षित राहा, आणि कधीही परत या.",
+        'gu': "આવજો! સુરક્ષિત રહો, અને ગમે ત્યારે પાછા આવો.",
+        'bn': "বিদায়! নিরাপদে থাকুন, আবার যেকোনো সময় আসবেন।",
+        'ta': "போய் வாருங்கள்! பாதுகாப்பாக இருங்கள், எப்போது வேண்டுமானாலும் வாருங்கள்.",
+        'te': "వీడ్కోలు! జాగ్రత్తగా ఉండండి, ఎప్పుడైనా మళ్ళీ రండి.",
+        'kn': "ಹೋಗಿ ಬನ್ನಿ! ಸುರಕ್ಷಿತವಾಗಿರಿ, ಯಾವಾಗ ಬೇಕಾದರೂ ಮತ್ತೆ ಬನ್ನಿ.",
+        'ml': "വിട! സുരക്ഷിതരായിരിക്കൂ, എപ്പോൾ വേണമെങ്കിലും തിരികെ വരൂ.",
+        'pa': "ਅਲਵਿਦਾ! ਸੁਰੱਖਿਅਤ ਰਹੋ, ਅਤੇ ਕਦੇ ਵੀ ਵਾਪਸ ਆਓ।",
+    },
+}
+
+# First bot message of the chat page, keyed like the chat.js language codes.
+# Passed to the page with json_script and pre-rendered to audio.
+CHAT_GREETINGS = {
+    'en-IN': "Namaste! I am BimaSakhi. How can I help you today?",
+    'hi-IN': "नमस्ते! मैं बीमासखी हूँ। आज मैं आपकी कैसे मदद कर सकती हूँ?",
+    'mr-IN': "नमस्ते! मी बीमासखी आहे. आज मी तुम्हाला कशी मदत करू शकते?",
+    'gu-IN': "નમસ્તે! હું વિમાસખી છું. આજે હું તમારી કેવી મદદ કરી શકું?",
+    'bn-IN': "নমস্কার! আমি বিমাসখি। আজ আমি আপনাকে কীভাবে সাহায্য করতে পারি?",
+    'ta-IN': "வணக்கம்! நான் பீமாசகி. இன்று நான் உங்களுக்கு எப்படி உதவ முடியும்?",
+}
@@ -0,0 +1,229 @@
+"""
+In-process drivers for the WSGI and ASGI applications.
+
+Benchmarks and load tests push requests (and WebSocket messages) through
+the real application objects (full middleware stack, sessions, views)
+without a network server in between, so the numbers reflect the Django
+side only.
+"""
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+from io import BytesIO
+from urllib.parse import urlencode
+
+HOST = 'localhost'
+
+
+def _cookie_header(cookies):
+    return '; '.join(f"{k}={v}" for k, v in cookies.items())
+
+
+def update_cookies(cookies, headers):
+    """Applies Set-Cookie headers (list of (name, value) str pairs) to a dict jar."""
+    for name, value in headers:
+        if name.lower() == 'set-cookie':
+            parsed = SimpleCookie()
+            parsed.load(value)
+            for key, morsel in parsed.items():
+                if morsel['max-age'] == '0' or not morsel.value:
+                    cookies.pop(key, None)
+                else:
+                    cookies[key] = morsel.value
+
+
+# ==========================================
+# 1. SINGLE REQUESTS
+# ==========================================
+def call_wsgi(app, path, query=None, cookies=None, method='GET', body=b'', headers=None):
+    """Returns (status, headers, body) for one request through a WSGI app."""
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': urlencode(query or {}),
+        'SERVER_NAME': HOST,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': HOST,
+        'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': BytesIO(),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    if cookies:
+        environ['HTTP_COOKIE'] = _cookie_header(cookies)
+    if body:
+        environ['CONTENT_LENGTH'] = str(len(body))
+    for name, value in (headers or {}).items():
+        key = name.upper().replace('-', '_')
+        environ[key if key == 'CONTENT_TYPE' else f'HTTP_{key}'] = value
+
+    result = {}
+
+    def start_response(status, headers, exc_info=None):
+        result['status'] = int(status.split(' ', 1)[0])
+        result['headers'] = headers
+
+    body_iter = app(environ, start_response)
+    try:
+        body = b''.join(body_iter)
+    finally:
+        if hasattr(body_iter, 'close'):
+            body_iter.close()
+    return result['status'], result['headers'], body
+
+
+async def call_asgi(app, path, query=None, cookies=None, method='GET', body=b'', headers=None):
+    """Returns (status, headers, body) for one request through an ASGI app."""
+    extra_headers = headers or {}
+    headers = [(b'host', HOST.encode())]
+    if cookies:
+        headers.append((b'cookie', _cookie_header(cookies).encode()))
+    if body:
+        headers.append((b'content-length', str(len(body)).encode()))
+    headers.extend((name.lower().encode(), value.encode()) for name, value in extra_headers.items())
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': urlencode(query or {}).encode(),
+        'root_path': '',
+        'headers': headers,
+        'server': (HOST, 80),
+        'client': ('127.0.0.1', 0),
+    }
+    finished = asyncio.Event()
+    request_sent = False
+    result = {'body': []}
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        # Django listens for a disconnect while the view runs; only send it
+        # once the response is complete.
+        await finished.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            result['status'] = message['status']
+            result['headers'] = [(k.decode('latin-1'), v.decode('latin-1')) for k, v in message['headers']]
+        elif message['type'] == 'http.response.body':
+            result['body'].append(message.get('body', b''))
+            if not message.get('more_body'):
+                finished.set()
+
+    await app(scope, receive, send)
+    finished.set()
+    return result['status'], result['headers'], b''.join(result['body'])
+
+
+# ==========================================
+# 2. CONCURRENT RUNS
+# ==========================================
+def run_wsgi(app, jobs, workers):
+    """
+    Runs (path, query) jobs through a WSGI app on `workers` threads, like a
+    threaded gunicorn worker. Returns (elapsed_s, latencies_ms, statuses).
+    """
+    def one(job):
+        started = time.perf_counter()
+        status, _, _ = call_wsgi(app, *job)
+        return (time.perf_counter() - started) * 1000, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(one, jobs))
+    elapsed = time.perf_counter() - started
+    return elapsed, [r[0] for r in results], [r[1] for r in results]
+
+
+async def run_asgi(app, jobs, concurrency):
+    """Runs jobs through an ASGI app with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(job):
+        async with semaphore:
+            started = time.perf_counter()
+            status, _, _ = await call_asgi(app, *job)
+            return (time.perf_counter() - started) * 1000, status
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one(job) for job in jobs))
+    elapsed = time.perf_counter() - started
+    return elapsed, [r[0] for r in results], [r[1] for r in results]
+
+
+# ==========================================
+# 3. WEBSOCKETS
+# ==========================================
+class AsgiWebSocket:
+    """In-process WebSocket client for an ASGI app (JSON text frames)."""
+
+    def __init__(self, app, path, cookies=None, headers=None):
+        self.app = app
+        self.path = path
+        self.cookies = cookies if cookies is not None else {}
+        self.headers = headers or {}
+        self._inbound = asyncio.Queue()
+        self._outbound = asyncio.Queue()
+        self._task = None
+
+    async def connect(self):
+        """True if the app accepted the connection; Set-Cookie headers update `cookies`."""
+        headers = [(b'host', HOST.encode())]
+        if self.cookies:
+            headers.append((b'cookie', _cookie_header(self.cookies).encode()))
+        headers.extend((name.lower().encode(), value.encode()) for name, value in self.headers.items())
+        scope = {
+            'type': 'websocket',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'scheme': 'ws',
+            'path': self.path,
+            'raw_path': self.path.encode(),
+            'query_string': b'',
+            'root_path': '',
+            'headers': headers,
+            'server': (HOST, 80),
+            'client': ('127.0.0.1', 0),
+            'subprotocols': [],
+        }
+        self._task = asyncio.create_task(self.app(scope, self._inbound.get, self._outbound.put))
+        await self._inbound.put({'type': 'websocket.connect'})
+        message = await self._outbound.get()
+        if message['type'] != 'websocket.accept':
+            await self._task
+            return False
+        update_cookies(self.cookies, [(k.decode('latin-1'), v.decode('latin-1'))
+                                      for k, v in message.get('headers', [])])
+        return True
+
+    async def send_json(self, data):
+        await self._inbound.put({'type': 'websocket.receive', 'text': json.dumps(data)})
+
+    async def receive_json(self):
+        """The next event; "state" events update `cookies`, as chat.js does."""
+        message = await self._outbound.get()
+        if message['type'] == 'websocket.close':
+            raise ConnectionError(f"WebSocket closed ({message.get('code')})")
+        event = json.loads(message['text'])
+        if event.get('type') == 'state':
+            update_cookies(self.cookies, [('Set-Cookie', event['cookie'])])
+        return event
+
+    async def close(self):
+        await self._inbound.put({'type': 'websocket.disconnect', 'code': 1000})
+        await self._task
@@ -0,0 +1,171 @@
+"""
+Keyword intent detection for chat routing.
+
+All keywords of all languages are compiled once, at import, into one
+Aho–Corasick automaton, so a message is scanned in a single pass whatever
+the number of keywords. Users mix scripts and languages freely, so every
+message is matched against every language.
+
+Latin-script keywords must start on a word boundary ("plan" matches
+"plans" but not "explanation"). Indic keywords match anywhere: Python's
+\\w does not cover vowel signs, and inflections are suffixes anyway.
+"""
+import re
+import unicodedata
+from collections import deque
+
+# Letters, digits and the Indic blocks (Devanagari to Malayalam) minus the dandas
+_WORD_RE = re.compile(r'(?:[^\W_]|[\u0900-\u0963\u0966-\u0D7F])+')
+_ZERO_WIDTH = dict.fromkeys(map(ord, '\u200b\u200c\u200d'))
+
+BUY = 'buy'
+CLAIM = 'claim'
+AGENT = 'agent'
+POLICY_STATUS = 'policy_status'
+
+# When several intents match, the first in this list wins
+# ("help me claim on my policy" is a claim, not a purchase).
+PRIORITY = [CLAIM, POLICY_STATUS, AGENT, BUY]
+
+INTENT_KEYWORDS = {
+    BUY: {
+        'en': ['buy', 'plan', 'suggest', 'recommend', 'policy', 'best', 'insurance for me', 'start', 'find', 'help'],
+        'hi': ['खरीद', 'प्लान', 'योजना', 'पॉलिसी', 'बीमा लेना', 'सुझाव', 'सलाह'],
+        'mr': ['खरेदी', 'प्लॅन', 'योजना', 'पॉलिसी', 'विमा घ्या', 'सुचवा'],
+        'gu': ['ખરીદ', 'પ્લાન', 'યોજના', 'પોલિસી', 'વીમો લેવો', 'સૂચવો'],
+        'bn': ['কিনতে', 'কিনব', 'প্ল্যান', 'পরিকল্পনা', 'পলিসি', 'বিমা করতে', 'পরামর্শ'],
+        'ta': ['வாங்க', 'திட்டம்', 'பாலிசி', 'காப்பீடு வேண்டும்', 'பரிந்துரை'],
+        'te': ['కొనాలి', 'కొనుగోలు', 'ప్లాన్', 'పాలసీ', 'బీమా కావాలి', 'సూచించండి'],
+        'kn': ['ಖರೀದಿ', 'ಪ್ಲಾನ್', 'ಯೋಜನೆ', 'ಪಾಲಿಸಿ', 'ವಿಮೆ ಬೇಕು', 'ಸೂಚಿಸಿ'],
+        'ml': ['വാങ്ങ', 'പ്ലാൻ', 'പദ്ധതി', 'പോളിസി', 'ഇൻഷുറൻസ് വേണം', 'നിർദ്ദേശി'],
+        'pa': ['ਖਰੀਦ', 'ਪਲਾਨ', 'ਯੋਜਨਾ', 'ਪਾਲਿਸੀ', 'ਬੀਮਾ ਲੈਣਾ', 'ਸੁਝਾਅ'],
+    },
+    CLAIM: {
+        'en': ['claim', 'compensation', 'reimburse'],
+        'hi': ['क्लेम', 'दावा', 'मुआवजा', 'मुआवज़ा'],
+        'mr': ['क्लेम', 'दावा', 'नुकसान भरपाई'],
+        'gu': ['ક્લેમ', 'દાવો', 'વળતર'],
+        'bn': ['ক্লেম', 'দাবি', 'ক্ষতিপূরণ'],
+        'ta': ['க்ளெய்ம்', 'கிளைம்', 'கோரிக்கை', 'இழப்பீடு'],
+        'te': ['క్లెయిమ్', 'క్లెయిం', 'పరిహారం'],
+        'kn': ['ಕ್ಲೈಮ್', 'ಕ್ಲೇಮ್', 'ಪರಿಹಾರ'],
+        'ml': ['ക്ലെയിം', 'നഷ്ടപരിഹാരം'],
+        'pa': ['ਕਲੇਮ', 'ਦਾਅਵਾ', 'ਮੁਆਵਜ਼ਾ'],
+    },
+    AGENT: {
+        'en': ['agent', 'advisor', 'adviser', 'talk to someone', 'call me', 'human', 'representative'],
+        'hi': ['एजेंट', 'सलाहकार', 'बात करनी', 'कॉल करें'],
+        'mr': ['एजंट', 'एजेंट', 'सल्लागार', 'फोन करा'],
+        'gu': ['એજન્ટ', 'સલાહકાર', 'વાત કરવી'],
+        'bn': ['এজেন্ট', 'উপদেষ্টা', 'কথা বলতে'],
+        'ta': ['முகவர்', 'ஏஜென்ட்', 'ஆலோசகர்'],
+        'te': ['ఏజెంట్', 'సలహాదారు'],
+        'kn': ['ಏಜೆಂಟ್', 'ಸಲಹೆಗಾರ'],
+        'ml': ['ഏജന്റ്', 'ഉപദേഷ്ടാവ്'],
+        'pa': ['ਏਜੰਟ', 'ਸਲਾਹਕਾਰ'],
+    },
+    POLICY_STATUS: {
+        'en': ['policy status', 'my policy', 'my policies', 'renewal', 'renew', 'expiry', 'premium due', 'policy number'],
+        'hi': ['मेरी पॉलिसी', 'पॉलिसी स्थिति', 'पॉलिसी की स्थिति', 'नवीनीकरण', 'रिन्यू'],
+        'mr': ['माझी पॉलिसी', 'पॉलिसीची स्थिती', 'नूतनीकरण'],
+        'gu': ['મારી પોલિસી', 'પોલિસીની સ્થિતિ', 'રિન્યુ'],
+        'bn': ['আমার পলিসি', 'পলিসির অবস্থা', 'নবীকরণ'],
+        'ta': ['என் பாலிசி', 'எனது பாலிசி', 'பாலிசி நிலை', 'புதுப்பித்தல்'],
+        'te': ['నా పాలసీ', 'పాలసీ స్థితి', 'పునరుద్ధరణ'],
+        'kn': ['ನನ್ನ ಪಾಲಿಸಿ', 'ಪಾಲಿಸಿ ಸ್ಥಿತಿ', 'ನವೀಕರಣ'],
+        'ml': ['എന്റെ പോളിസി', 'പോളിസി നില', 'പുതുക്കൽ'],
+        'pa': ['ਮੇਰੀ ਪਾਲਿਸੀ', 'ਪਾਲਿਸੀ ਸਥਿਤੀ', 'ਨਵੀਨੀਕਰਨ'],
+    },
+}
+
+
+def normalize(text):
+    """NFKC, case-folded, whitespace collapsed to single spaces."""
+    return ' '.join(unicodedata.normalize('NFKC', text).casefold().split())
+
+
+def words(text):
+    """Words of normalized `text`: letters, digits and Indic combining marks (\\w misses vowel signs)."""
+    return _WORD_RE.findall(normalize(text).translate(_ZERO_WIDTH))
+
+
+# ==========================================
+# 1. AHO–CORASICK AUTOMATON
+# ==========================================
+class KeywordMatcher:
+    """Multi-pattern matcher over (keyword, payload) pairs."""
+
+    def __init__(self, keywords):
+        # Trie as parallel lists: goto[state] is {char: state}
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]  # (keyword length, keyword, payload) ending at the state
+        for keyword, payload in keywords:
+            keyword = normalize(keyword)
+            state = 0
+            for ch in keyword:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = nxt
+            self.output[state].append((len(keyword), keyword, payload))
+
+        # Breadth-first fail links; outputs inherit their fail state's outputs
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def iter_matches(self, text):
+        """Yields (start, keyword, payload) for every keyword occurrence in normalized `text`."""
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, keyword, payload in output[state]:
+                start = i - length + 1
+                # Latin keywords must begin a word
+                if keyword[0].isascii() and start > 0 and text[start - 1].isalnum():
+                    continue
+                yield start, keyword, payload
+
+
+def _build():
+    return KeywordMatcher(
+        (keyword, intent)
+        for intent, by_lang in INTENT_KEYWORDS.items()
+        for keywords in by_lang.values()
+        for keyword in keywords
+    )
+
+
+MATCHER = _build()
+
+
+# ==========================================
+# 2. DETECTION
+# ==========================================
+def detect_intents(text):
+    """Set of intents whose keywords occur in `text`."""
+    return {payload for _, _, payload in MATCHER.iter_matches(normalize(text))}
+
+
+def detect_intent(text):
+    """Highest-priority intent in `text`, or None."""
+    found = detect_intents(text)
+    for intent in PRIORITY:
+        if intent in found:
+            return intent
+    return None
@@ -0,0 +1,442 @@
+"""
+Local answers from the curated content: FAQs, articles and products.
+
+A BM25 inverted index over FAQ questions and answers, article titles and
+bodies, and product names and descriptions answers common questions
+without an LLM call. Every item is indexed in English and in every
+language it already has a saved translation for (TranslationMemory,
+ProductTranslation), so "UPI से भुगतान?" can match the Hindi FAQ directly.
+
+Only confident matches answer: the best item must score at least
+MIN_SCORE, cover at least MIN_COVERAGE of the query's IDF weight (a
+question with a rare word the item lacks is a different question), and
+beat the runner-up by MIN_MARGIN. Everything else goes to the LLM.
+
+Tokens are NFKC case-folded runs of letters, digits and combining marks
+(Python's \\w misses Indic vowel signs), without zero-width joiners and
+stopwords. English plurals and the common Hindi inflections are stripped.
+
+The index is built on first use (or by `warm()` from the ASGI lifespan
+startup hook; a WSGI or serverless process builds it on the first
+question, not at import) and updated item by item from chatbot.signals.
+A version number in the database (chatbot.versions) makes the other
+workers rebuild theirs, as for the recommendation table, at most once
+every REBUILD_INTERVAL seconds: a burst of admin edits costs one rebuild,
+and until then the previous index answers. Translations saved in bulk
+(manage.py pretranslate) call `invalidate()`.
+"""
+import logging
+import math
+import threading
+import time
+from collections import Counter, namedtuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import SynchronousOnlyOperation
+from django.db import DatabaseError
+
+from insurance.models import FAQ, Article, InsuranceProduct, ProductTranslation, TranslationMemory
+from insurance.translation import normalize, source_hash, split_sentences, translate_text
+
+from insurance_bot import metrics
+
+from . import intents, versions
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_VERSION = 'knowledge'
+
+FAQ_KIND = 'faq'
+ARTICLE_KIND = 'article'
+PRODUCT_KIND = 'product'
+
+STOPWORDS = frozenset("""
+    a an and are am be can could do does for from get have how i in is it me my now of on or our
+    please should tell that the this to use using via was we what when where which who why will
+    with would you your
+    है हैं था का की के को में से पर और या क्या कैसे मैं मुझे मेरा मेरी हम यह वह भी तो ही
+""".split())
+
+# Hindi inflectional suffixes, longest first (light stemming)
+_HINDI_SUFFIXES = sorted(
+    ['ियों', 'ियां', 'ियाँ', 'ाओं', 'ाएं', 'ाएँ', 'ों', 'ें', 'ीं', 'ां', 'ाँ', 'ो', 'े', 'ी', 'ा'],
+    key=len, reverse=True,
+)
+
+Source = namedtuple('Source', 'key texts answers')  # texts and answers are {lang: text}
+Match = namedtuple('Match', 'key lang score coverage')
+
+
+def _config():
+    config = {
+        'ENABLED': True,
+        'MIN_SCORE': 3.0,
+        'MIN_COVERAGE': 0.75,
+        'MIN_MARGIN': 1.25,
+        'K1': 1.2,
+        'B': 0.75,
+        'ARTICLE_SENTENCES': 2,
+        'REBUILD_INTERVAL': 30.0,
+    }
+    config.update(getattr(settings, 'KNOWLEDGE', {}))
+    return config
+
+
+# ==========================================
+# 1. TOKENIZATION
+# ==========================================
+def stem(token):
+    if token.isascii():
+        if len(token) > 4 and token.endswith('ies'):
+            return token[:-3] + 'y'
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            return token[:-1]
+        return token
+    if '\u0900' <= token[0] <= '\u097f':  # Devanagari
+        for suffix in _HINDI_SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+                return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text):
+    return [stem(word) for word in intents.words(text) if word not in STOPWORDS]
+
+
+# ==========================================
+# 2. BM25 INDEX
+# ==========================================
+class BM25Index:
+    """Inverted index with Okapi BM25 scoring; documents can be replaced and removed."""
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}  # term: {doc_id: term frequency}
+        self.terms = {}     # doc_id: Counter of its terms, for removal
+        self.lengths = {}   # doc_id: number of tokens
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.terms)
+
+    def add(self, doc_id, tokens):
+        self.remove(doc_id)
+        counts = Counter(tokens)
+        self.terms[doc_id] = counts
+        self.lengths[doc_id] = len(tokens)
+        self.total_length += len(tokens)
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+
+    def remove(self, doc_id):
+        counts = self.terms.pop(doc_id, None)
+        if counts is None:
+            return
+        self.total_length -= self.lengths.pop(doc_id)
+        for term in counts:
+            docs = self.postings[term]
+            del docs[doc_id]
+            if not docs:
+                del self.postings[term]
+
+    def idf(self, term):
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.terms) - df + 0.5) / (df + 0.5))
+
+    def search(self, tokens):
+        """{doc_id: (score, coverage)} for documents sharing a term with the query."""
+        terms = set(tokens)
+        if not terms or not self.terms:
+            return {}
+        weights = {term: self.idf(term) for term in terms}
+        total_weight = sum(weights.values())
+        avg_length = self.total_length / len(self.terms)
+        scores, matched = {}, {}
+        for term in terms:
+            for doc_id, tf in self.postings.get(term, {}).items():
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + weights[term] * tf * (self.k1 + 1) / (tf + norm)
+                matched[doc_id] = matched.get(doc_id, 0.0) + weights[term]
+        return {doc_id: (score, matched[doc_id] / total_weight) for doc_id, score in scores.items()}
+
+
+# ==========================================
+# 3. SOURCES (curated content per language)
+# ==========================================
+def _memory_for(texts):
+    """{lang: {normalized sentence: translation}} of every sentence of `texts` already translated."""
+    hashes = {source_hash(s) for text in texts for line in split_sentences(text) for s in line}
+    by_lang = {}
+    rows = TranslationMemory.objects.filter(source_hash__in=hashes).values_list(
+        'language', 'source_text', 'translated_text')
+    for lang, source, translated in rows:
+        by_lang.setdefault(lang, {})[normalize(source)] = translated
+    return by_lang
+
+
+def _translated(text, memory):
+    """`text` from the translation memory, or None unless every sentence is in it."""
+    lines = []
+    for line in split_sentences(text):
+        try:
+            lines.append(' '.join(memory[normalize(s)] for s in line))
+        except KeyError:
+            return None
+    return '\n'.join(lines)
+
+
+def _source(key, title, body, answer, memories):
+    """Source indexed under English and every language `title`, `body` and `answer` are translated to."""
+    texts = {'en': f"{title}\n{title}\n{body}"}  # title counted twice
+    answers = {'en': answer}
+    for lang, memory in memories.items():
+        parts = [_translated(text, memory) for text in (title, body, answer)]
+        if None not in parts:
+            texts[lang] = f"{parts[0]}\n{parts[0]}\n{parts[1]}"
+            answers[lang] = parts[2]
+    return Source(key, texts, answers)
+
+
+def _excerpt(text, sentences):
+    return ' '.join([s for line in split_sentences(text) for s in line][:sentences])
+
+
+def faq_sources(faqs):
+    faqs = list(faqs)
+    memories = _memory_for([text for f in faqs for text in (f.question, f.answer)])
+    return [_source((FAQ_KIND, f.pk), f.question, f.answer, f.answer, memories) for f in faqs]
+
+
+def article_sources(articles):
+    articles = list(articles)
+    memories = _memory_for([text for a in articles for text in (a.title, a.content)])
+    sentences = _config()['ARTICLE_SENTENCES']
+    return [
+        _source((ARTICLE_KIND, a.pk), a.title, a.content, f"{a.title}\n{_excerpt(a.content, sentences)}", memories)
+        for a in articles
+    ]
+
+
+def product_sources(products):
+    products = list(products)
+    translations = {}
+    for t in ProductTranslation.objects.filter(product__in=products):
+        translations.setdefault(t.product_id, []).append(t)
+    sources = []
+    for p in products:
+        source = Source((PRODUCT_KIND, p.pk),
+                        {'en': f"{p.name}\n{p.name}\n{p.description}\n{p.key_features}"},
+                        {'en': f"{p.name}\n{p.description}"})
+        # Product names stay in English, as on the product pages
+        for t in translations.get(p.pk, ()):
+            source.texts[t.language] = f"{p.name}\n{p.name}\n{t.translated_description}\n{t.translated_key_features}"
+            source.answers[t.language] = f"{p.name}\n{t.translated_description}"
+        sources.append(source)
+    return sources
+
+
+def load_sources(kind=None, pks=None):
+    """Sources of the active content, all of it or the `pks` of one `kind`."""
+    loaders = {
+        FAQ_KIND: (FAQ, faq_sources),
+        ARTICLE_KIND: (Article, article_sources),
+        PRODUCT_KIND: (InsuranceProduct, product_sources),
+    }
+    sources = []
+    for name, (model, build) in loaders.items():
+        if kind not in (None, name):
+            continue
+        queryset = model.objects.filter(is_active=True)
+        if pks is not None:
+            queryset = queryset.filter(pk__in=pks)
+        sources += build(queryset)
+    return sources
+
+
+# ==========================================
+# 4. KNOWLEDGE BASE
+# ==========================================
+class KnowledgeBase:
+    def __init__(self, sources=()):
+        config = _config()
+        self.index = BM25Index(config['K1'], config['B'])
+        self.sources = {}
+        for source in sources:
+            self.add(source)
+
+    def add(self, source):
+        self.discard(source.key)
+        self.sources[source.key] = source
+        for lang, text in source.texts.items():
+            self.index.add((source.key, lang), tokenize(text))
+
+    def discard(self, key):
+        source = self.sources.pop(key, None)
+        for lang in source.texts if source else ():
+            self.index.remove((key, lang))
+
+    def best(self, query):
+        """Best Match per item for `query`, best first."""
+        best = {}
+        for (key, lang), (score, coverage) in self.index.search(tokenize(query)).items():
+            if key not in best or score > best[key].score:
+                best[key] = Match(key, lang, score, coverage)
+        return sorted(best.values(), key=lambda m: m.score, reverse=True)
+
+    def match(self, query):
+        """The confident Match for `query`, or None."""
+        config = _config()
+        ranked = self.best(query)
+        if not ranked:
+            return None
+        top = ranked[0]
+        if top.score < config['MIN_SCORE'] or top.coverage < config['MIN_COVERAGE']:
+            return None
+        if len(ranked) > 1 and top.score < config['MIN_MARGIN'] * ranked[1].score:
+            return None
+        return top
+
+    def answer_for(self, match, lang_code):
+        """(answer, needs translation): saved answers first, the English one otherwise."""
+        answers = self.sources[match.key].answers
+        if lang_code in answers:
+            return answers[lang_code], False
+        return answers['en'], lang_code != 'en'
+
+
+_base = None
+_base_version = None
+_base_built = 0.0  # monotonic time of the last full build
+_base_lock = threading.Lock()
+
+
+def knowledge_version():
+    return versions.get(KNOWLEDGE_VERSION)
+
+
+def _bump_version():
+    return versions.bump(KNOWLEDGE_VERSION)
+
+
+def _usable(version):
+    """The index if it may answer for `version`: current, or built less than REBUILD_INTERVAL ago."""
+    if _base is None:
+        return None
+    if _base_version == version or time.monotonic() - _base_built < _config()['REBUILD_INTERVAL']:
+        return _base
+    return None
+
+
+def get_base():
+    global _base, _base_version, _base_built
+    version = knowledge_version()
+    base = _usable(version)
+    if base is None:
+        with _base_lock:
+            base = _usable(version)
+            if base is None:
+                with metrics.timer('chat.knowledge.build_ms'):
+                    base = _base = KnowledgeBase(load_sources())
+                _base_version = version
+                _base_built = time.monotonic()
+    return base
+
+
+def invalidate():
+    """Every worker rebuilds on next use (e.g. after translations were saved in bulk)."""
+    global _base
+    _base = None
+    _bump_version()
+
+
+def warm():
+    """Builds the index now rather than on the first question."""
+    if not _config()['ENABLED']:
+        return
+    try:
+        get_base()
+    except (DatabaseError, SynchronousOnlyOperation):
+        # Not migrated yet, or called from an event loop: the first question builds it
+        logger.warning("Knowledge index not built at startup", exc_info=True)
+
+
+def refresh(kind, pk):
+    """Re-reads one item (dropping it if deleted or inactive); called when it changes."""
+    global _base_version
+    with _base_lock:
+        if _base is not None:
+            _base.discard((kind, pk))
+            for source in load_sources(kind, [pk]):
+                _base.add(source)
+        # Other workers rebuild; this one is already current
+        version = _bump_version()
+        if _base is not None:
+            _base_version = version
+
+
+# ==========================================
+# 5. ANSWERING
+# ==========================================
+def _lookup(base, query, lang_code):
+    """(match, answer, needs translation), or None after counting a miss."""
+    match = base.match(query)
+    if match is None:
+        metrics.incr('chat.knowledge.miss')
+        return None
+    return (match,) + base.answer_for(match, lang_code)
+
+
+def _hit(match, started):
+    metrics.incr('chat.knowledge.hit')
+    metrics.incr(f'chat.knowledge.hit.{match.key[0]}')
+    metrics.observe('chat.knowledge.ms', (time.perf_counter() - started) * 1000)
+
+
+def _translation_failed(match, lang_code):
+    # Not worth failing the turn over: the LLM answers instead
+    logger.exception("Translating knowledge answer %s to %s failed", match.key, lang_code)
+    metrics.incr('chat.knowledge.translate_error')
+
+
+def answer(query, lang_code):
+    """Curated answer to `query` in `lang_code`, or None if nothing matches confidently."""
+    if not _config()['ENABLED']:
+        return None
+    started = time.perf_counter()
+    found = _lookup(get_base(), query, lang_code)
+    if found is None:
+        return None
+    match, reply, translate = found
+    if translate:
+        try:
+            reply = translate_text(reply, lang_code)
+        except Exception:
+            _translation_failed(match, lang_code)
+            return None
+    _hit(match, started)
+    return reply
+
+
+async def aanswer(query, lang_code):
+    """
+    `answer` for async views. Touches the database only to re-read the
+    version (at most once a second), to rebuild and to translate.
+    """
+    if not _config()['ENABLED']:
+        return None
+    started = time.perf_counter()
+    base = _usable(await versions.aget(KNOWLEDGE_VERSION)) or await sync_to_async(get_base)()
+    found = _lookup(base, query, lang_code)
+    if found is None:
+        return None
+    match, reply, translate = found
+    if translate:
+        try:
+            reply = await sync_to_async(translate_text)(reply, lang_code)
+        except Exception:
+            _translation_failed(match, lang_code)
+            return None
+    _hit(match, started)
+    return reply
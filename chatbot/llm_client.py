@@ -0,0 +1,762 @@
+"""
+Shared client for the LLM (Gemini) API.
+
+One client is kept per process. It owns a pooled keep-alive HTTP session and
+wraps every call in a deadline, bounded retries with jittered backoff, an
+optional hedged duplicate request and a circuit breaker that fails fast
+while the upstream is down. The transport lives in a pluggable backend so
+the chatbot can run against a local fake.
+
+Every entry point has an async twin (`agenerate`, `areply`, `astream`) for
+the ASGI views. On a long-lived event loop (the ASGI server's, inside
+`serving()`) those use aiohttp, so an in-flight call holds no thread. A
+loop that ends with its request, as async views get under WSGI, would
+leave an aiohttp session behind per call: there they run the pooled sync
+session on a thread instead.
+
+`generate_json` asks for structured output: the model must answer with a
+JSON object matching a response schema, which keeps replies short and
+machine-checkable.
+"""
+import asyncio
+import contextlib
+import json
+import logging
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import aiohttp
+import requests
+from asgiref.sync import sync_to_async
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_REPLY = "I am having trouble connecting. Please try again."
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+def estimate_tokens(text):
+    """
+    Rough prompt-size estimate without a tokenizer: ~4 characters per token
+    for Latin script, ~1 token per character for Indic scripts, which the
+    Gemini tokenizer splits much more finely.
+    """
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+class LLMError(Exception):
+    """Raised when the LLM could not produce a reply."""
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class LLMUnavailable(LLMError):
+    """Raised without touching the network while the circuit is open."""
+
+    def __init__(self, message="LLM circuit is open"):
+        super().__init__(message, retryable=False)
+
+
+class LLMStreamInterrupted(LLMError):
+    """Raised by a stream that failed after part of the reply was yielded: the reply is incomplete."""
+
+    def __init__(self, message):
+        super().__init__(message, retryable=False)
+
+
+# ==========================================
+# 1. CIRCUIT BREAKER
+# ==========================================
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failed calls and rejects calls until
+    `reset_timeout` seconds have passed. Then a single trial call is let
+    through (half-open); its outcome closes or re-opens the circuit. If no
+    outcome arrives within another `reset_timeout`, a new trial is allowed.
+
+    Callers report every call allow() let through via record(), including
+    cancelled calls and abandoned streams, which count as failures.
+    """
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, threshold=5, reset_timeout=30.0):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0  # when the circuit opened or, half-open, when the trial started
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # OPEN long enough, or HALF_OPEN with a trial that never reported back
+                self.state = self.HALF_OPEN
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def is_open(self):
+        """True while calls are rejected (a look only: unlike allow(), never starts a trial)."""
+        with self._lock:
+            return self.state != self.CLOSED and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def record(self, succeeded):
+        if succeeded:
+            self.record_success()
+        else:
+            self.record_failure()
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+# ==========================================
+# 2. BACKENDS
+# ==========================================
+async def _iterate_on_thread(chunks):
+    """Async iteration over a blocking generator, each step on a worker thread."""
+    step = sync_to_async(next, thread_sensitive=False)
+    try:
+        while True:
+            chunk = await step(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        with contextlib.suppress(ValueError):  # still running on the thread (cancelled)
+            chunks.close()
+
+
+class GeminiBackend:
+    """Calls the Gemini REST API over pooled keep-alive connections."""
+
+    def __init__(self, api_key=None, base_url=GEMINI_BASE_URL, model="gemini-2.5-flash",
+                 pool_size=20, connect_timeout=3.05):
+        self.api_key = api_key if api_key is not None else getattr(settings, 'GEMINI_API_KEY', None)
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # aiohttp sessions are bound to an event loop: one per long-lived loop (see serving())
+        self._async_sessions = weakref.WeakKeyDictionary()
+        _backends.add(self)
+
+    def _url(self, method):
+        return f"{self.base_url}/models/{self.model}:{method}"
+
+    def _headers(self):
+        return {"x-goog-api-key": self.api_key or ''}
+
+    @staticmethod
+    def _body(prompt, schema=None):
+        body = {"contents": [{"parts": [{"text": prompt}]}]}
+        if schema is not None:
+            body["generationConfig"] = {"responseMimeType": "application/json", "responseSchema": schema}
+        return body
+
+    @staticmethod
+    def _check_status(status):
+        if status != 200:
+            raise LLMError(f"Gemini returned HTTP {status}", retryable=status in RETRYABLE_STATUS)
+
+    @staticmethod
+    def _parse_reply(data):
+        try:
+            return data['candidates'][0]['content']['parts'][0]['text']
+        except (KeyError, IndexError, TypeError) as e:
+            raise LLMError(f"Unexpected Gemini payload: {e}", retryable=False) from e
+
+    @staticmethod
+    def _parse_event(line):
+        """Text carried by one SSE line of a streamGenerateContent response."""
+        if not line or not line.startswith('data:'):
+            return ''
+        try:
+            event = json.loads(line[5:])
+            parts = event['candidates'][0].get('content', {}).get('parts', [])
+        except (ValueError, KeyError, IndexError) as e:
+            raise LLMError(f"Unexpected Gemini payload: {e}", retryable=False) from e
+        return ''.join(part.get('text', '') for part in parts)
+
+    def generate(self, prompt, timeout, schema=None):
+        try:
+            response = self.session.post(
+                self._url('generateContent'),
+                json=self._body(prompt, schema),
+                headers=self._headers(),
+                timeout=(min(self.connect_timeout, timeout), timeout),
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise LLMError(f"Gemini request failed: {e}") from e
+
+        self._check_status(response.status_code)
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise LLMError(f"Unexpected Gemini payload: {e}", retryable=False) from e
+        return self._parse_reply(data)
+
+    def stream(self, prompt, timeout):
+        """Yields text chunks from streamGenerateContent (Server-Sent Events)."""
+        try:
+            response = self.session.post(
+                self._url('streamGenerateContent'),
+                params={"alt": "sse"},
+                json=self._body(prompt),
+                headers=self._headers(),
+                timeout=(min(self.connect_timeout, timeout), timeout),
+                stream=True,
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise LLMError(f"Gemini request failed: {e}") from e
+
+        with response:
+            self._check_status(response.status_code)
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    text = self._parse_event(line)
+                    if text:
+                        yield text
+            except (requests.ConnectionError, requests.Timeout) as e:
+                raise LLMError(f"Gemini stream interrupted: {e}") from e
+
+    def _async_session(self):
+        """The running loop's aiohttp session; None unless the loop is long-lived."""
+        loop = asyncio.get_running_loop()
+        if loop not in _serving_loops:
+            return None
+        session = self._async_sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            session = aiohttp.ClientSession(connector=connector)
+            self._async_sessions[loop] = session
+        return session
+
+    async def aclose(self):
+        """Closes the aiohttp session of the running event loop."""
+        session = self._async_sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    def _async_timeout(self, timeout):
+        return aiohttp.ClientTimeout(total=timeout, connect=min(self.connect_timeout, timeout))
+
+    async def agenerate(self, prompt, timeout, schema=None):
+        session = self._async_session()
+        if session is None:
+            return await sync_to_async(self.generate, thread_sensitive=False)(prompt, timeout, schema)
+        try:
+            async with session.post(
+                self._url('generateContent'),
+                json=self._body(prompt, schema),
+                headers=self._headers(),
+                timeout=self._async_timeout(timeout),
+            ) as response:
+                self._check_status(response.status)
+                data = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise LLMError(f"Gemini request failed: {e}") from e
+        except ValueError as e:
+            raise LLMError(f"Unexpected Gemini payload: {e}", retryable=False) from e
+        return self._parse_reply(data)
+
+    async def astream(self, prompt, timeout):
+        session = self._async_session()
+        if session is None:
+            async for text in _iterate_on_thread(self.stream(prompt, timeout)):
+                yield text
+            return
+        try:
+            async with session.post(
+                self._url('streamGenerateContent'),
+                params={"alt": "sse"},
+                json=self._body(prompt),
+                headers=self._headers(),
+                timeout=aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=timeout),
+            ) as response:
+                self._check_status(response.status)
+                async for raw in response.content:
+                    text = self._parse_event(raw.decode('utf-8').strip())
+                    if text:
+                        yield text
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise LLMError(f"Gemini stream interrupted: {e}") from e
+
+
+class FakeBackend:
+    """
+    Local stand-in for tests and benchmarks. Replies with a canned text
+    after `latency` seconds and fails a `fail_rate` fraction of calls.
+    When streaming, the first chunk arrives after `ttft` seconds and the
+    rest of `latency` is spread over the remaining chunks. `token_latency`
+    adds decode time per output token, so longer replies take longer, and
+    `prompt_token_latency` prefill time per prompt token, which delays the
+    first chunk too.
+    """
+
+    def __init__(self, reply="This is a test reply from BimaSakhi.", latency=0.0, fail_rate=0.0,
+                 ttft=None, token_latency=0.0, prompt_token_latency=0.0):
+        self.reply = reply
+        self.latency = latency + token_latency * estimate_tokens(reply)
+        self.fail_rate = fail_rate
+        self.ttft = latency if ttft is None else ttft
+        self.prompt_token_latency = prompt_token_latency
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _enter(self):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _prefill(self, prompt):
+        return self.prompt_token_latency * estimate_tokens(prompt)
+
+    def generate(self, prompt, timeout, schema=None):
+        self._enter()
+        try:
+            latency = self.latency + self._prefill(prompt)
+            if latency > timeout:
+                time.sleep(timeout)
+                raise LLMError("Fake backend timed out")
+            time.sleep(latency)
+        finally:
+            self.in_flight -= 1
+        if random.random() < self.fail_rate:
+            raise LLMError("Fake backend failure")
+        return self.reply
+
+    def stream(self, prompt, timeout):
+        self.calls += 1
+        ttft = self.ttft + self._prefill(prompt)
+        if ttft > timeout:
+            time.sleep(timeout)
+            raise LLMError("Fake backend timed out")
+        time.sleep(ttft)
+        if random.random() < self.fail_rate:
+            raise LLMError("Fake backend failure")
+        words = self.reply.split(' ')
+        gap = max(0.0, self.latency - self.ttft) / max(1, len(words) - 1)
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(gap)
+            yield word if i == 0 else ' ' + word
+
+    async def agenerate(self, prompt, timeout, schema=None):
+        self._enter()
+        try:
+            latency = self.latency + self._prefill(prompt)
+            if latency > timeout:
+                await asyncio.sleep(timeout)
+                raise LLMError("Fake backend timed out")
+            await asyncio.sleep(latency)
+        finally:
+            self.in_flight -= 1
+        if random.random() < self.fail_rate:
+            raise LLMError("Fake backend failure")
+        return self.reply
+
+    async def astream(self, prompt, timeout):
+        self.calls += 1
+        ttft = self.ttft + self._prefill(prompt)
+        if ttft > timeout:
+            await asyncio.sleep(timeout)
+            raise LLMError("Fake backend timed out")
+        await asyncio.sleep(ttft)
+        if random.random() < self.fail_rate:
+            raise LLMError("Fake backend failure")
+        words = self.reply.split(' ')
+        gap = max(0.0, self.latency - self.ttft) / max(1, len(words) - 1)
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(gap)
+            yield word if i == 0 else ' ' + word
+
+
+# ==========================================
+# 3. CLIENT
+# ==========================================
+def _decode_json(text):
+    # Models sometimes wrap JSON in a ```json fence despite the mime type
+    text = text.strip()
+    if text.startswith('```'):
+        text = text.strip('`').removeprefix('json').strip()
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        raise LLMError(f"Reply is not valid JSON: {e}", retryable=False) from e
+    if not isinstance(data, dict):
+        raise LLMError("Reply is not a JSON object", retryable=False)
+    return data
+
+
+class LLMClient:
+    """
+    Resilient wrapper around a backend.
+
+    deadline     -- total seconds one `generate` call may take, retries included
+    max_retries  -- extra attempts after the first one for retryable errors
+    backoff      -- base delay for exponential backoff (full jitter)
+    hedge_after  -- if set, a duplicate request is fired when the first one
+                    has not answered after this many seconds; first reply wins
+    """
+
+    def __init__(self, backend, deadline=8.0, max_retries=2, backoff=0.25, hedge_after=None,
+                 breaker=None):
+        self.backend = backend
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.hedge_after = hedge_after
+        self.breaker = breaker or CircuitBreaker()
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='llm-hedge') if hedge_after else None
+
+    def generate(self, prompt, schema=None):
+        """Returns the reply text or raises LLMError."""
+        if not self.breaker.allow():
+            raise LLMUnavailable()
+
+        expires = time.monotonic() + self.deadline
+        error = LLMError("Deadline exceeded before first attempt")
+        succeeded = False
+        try:
+            for attempt in range(self.max_retries + 1):
+                remaining = expires - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    text = self._attempt(prompt, remaining, schema)
+                    succeeded = True
+                    return text
+                except LLMError as e:
+                    error = e
+                    logger.warning("LLM attempt %d failed: %s", attempt + 1, e)
+                    if not e.retryable:
+                        break
+                delay = random.uniform(0, self.backoff * (2 ** attempt))
+                if time.monotonic() + delay >= expires:
+                    break
+                time.sleep(delay)
+            raise error
+        finally:
+            # Also on unexpected exceptions, so a half-open trial never goes unreported
+            self.breaker.record(succeeded)
+
+    def generate_json(self, prompt, schema):
+        """Structured output: returns the decoded JSON object or raises LLMError."""
+        return _decode_json(self.generate(prompt, schema))
+
+    def reply(self, prompt, fallback=FALLBACK_REPLY):
+        """Like `generate`, but degrades to a canned reply instead of raising."""
+        try:
+            return self.generate(prompt)
+        except LLMError as e:
+            logger.error("LLM unavailable: %s", e)
+            return fallback
+
+    def stream(self, prompt, fallback=FALLBACK_REPLY):
+        """
+        Yields reply chunks as the backend produces them. Retries are only
+        possible before the first chunk; the deadline bounds the wait for
+        that chunk. Yields the canned reply if nothing could be produced,
+        and raises LLMStreamInterrupted if the reply breaks off midway.
+        """
+        stream_fn = getattr(self.backend, 'stream', None)
+        if stream_fn is None:
+            yield self.reply(prompt, fallback)
+            return
+        if not self.breaker.allow():
+            yield fallback
+            return
+
+        expires = time.monotonic() + self.deadline
+        succeeded = False
+        try:
+            for attempt in range(self.max_retries + 1):
+                remaining = expires - time.monotonic()
+                if remaining <= 0:
+                    break
+                started = False
+                try:
+                    for chunk in stream_fn(prompt, remaining):
+                        started = True
+                        yield chunk
+                    succeeded = True
+                    return
+                except LLMError as e:
+                    logger.warning("LLM stream attempt %d failed: %s", attempt + 1, e)
+                    if started:
+                        # Part of the reply is already on the wire: it can be neither retried
+                        # nor replaced, and callers must not keep it as a whole reply
+                        raise LLMStreamInterrupted(f"Reply interrupted: {e}") from e
+                    if not e.retryable:
+                        break
+                delay = random.uniform(0, self.backoff * (2 ** attempt))
+                if time.monotonic() + delay >= expires:
+                    break
+                time.sleep(delay)
+        finally:
+            # A consumer that stops reading (GeneratorExit) leaves the outcome unknown: a failure
+            self.breaker.record(succeeded)
+        yield fallback
+
+    def _attempt(self, prompt, timeout, schema=None):
+        if self._pool is None or self.hedge_after >= timeout:
+            return self.backend.generate(prompt, timeout, schema)
+
+        started = time.monotonic()
+        pending = {self._pool.submit(self.backend.generate, prompt, timeout, schema)}
+        done, pending = wait(pending, timeout=self.hedge_after)
+        if not done:
+            hedge_timeout = timeout - (time.monotonic() - started)
+            pending.add(self._pool.submit(self.backend.generate, prompt, hedge_timeout, schema))
+
+        error = None
+        while done or pending:
+            for future in done:
+                try:
+                    return future.result()
+                except LLMError as e:
+                    error = e
+            if not pending:
+                break
+            remaining = timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        raise error or LLMError("Deadline exceeded")
+
+
+    # --- async twins, used by the ASGI views ---
+
+    async def agenerate(self, prompt, schema=None):
+        if not self.breaker.allow():
+            raise LLMUnavailable()
+
+        expires = time.monotonic() + self.deadline
+        error = LLMError("Deadline exceeded before first attempt")
+        succeeded = False
+        try:
+            for attempt in range(self.max_retries + 1):
+                remaining = expires - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    text = await self._aattempt(prompt, remaining, schema)
+                    succeeded = True
+                    return text
+                except LLMError as e:
+                    error = e
+                    logger.warning("LLM attempt %d failed: %s", attempt + 1, e)
+                    if not e.retryable:
+                        break
+                delay = random.uniform(0, self.backoff * (2 ** attempt))
+                if time.monotonic() + delay >= expires:
+                    break
+                await asyncio.sleep(delay)
+            raise error
+        finally:
+            # Cancelled calls (CancelledError) and unexpected exceptions count as failures
+            self.breaker.record(succeeded)
+
+    async def agenerate_json(self, prompt, schema):
+        return _decode_json(await self.agenerate(prompt, schema))
+
+    async def areply(self, prompt, fallback=FALLBACK_REPLY):
+        try:
+            return await self.agenerate(prompt)
+        except LLMError as e:
+            logger.error("LLM unavailable: %s", e)
+            return fallback
+
+    async def astream(self, prompt, fallback=FALLBACK_REPLY):
+        stream_fn = getattr(self.backend, 'astream', None)
+        if stream_fn is None:
+            yield await self.areply(prompt, fallback)
+            return
+        if not self.breaker.allow():
+            yield fallback
+            return
+
+        expires = time.monotonic() + self.deadline
+        succeeded = False
+        try:
+            for attempt in range(self.max_retries + 1):
+                remaining = expires - time.monotonic()
+                if remaining <= 0:
+                    break
+                started = False
+                try:
+                    async for chunk in stream_fn(prompt, remaining):
+                        started = True
+                        yield chunk
+                    succeeded = True
+                    return
+                except LLMError as e:
+                    logger.warning("LLM stream attempt %d failed: %s", attempt + 1, e)
+                    if started:
+                        raise LLMStreamInterrupted(f"Reply interrupted: {e}") from e
+                    if not e.retryable:
+                        break
+                delay = random.uniform(0, self.backoff * (2 ** attempt))
+                if time.monotonic() + delay >= expires:
+                    break
+                await asyncio.sleep(delay)
+        finally:
+            # Disconnected consumers (GeneratorExit) and cancellation count as failures
+            self.breaker.record(succeeded)
+        yield fallback
+
+    async def _acall(self, prompt, timeout, schema=None):
+        agenerate = getattr(self.backend, 'agenerate', None)
+        if agenerate is None:
+            # Sync-only backend: keep it off the event loop
+            call = sync_to_async(self.backend.generate, thread_sensitive=False)(prompt, timeout, schema)
+        else:
+            call = agenerate(prompt, timeout, schema)
+        try:
+            return await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError as e:
+            raise LLMError("Deadline exceeded") from e
+
+    async def _aattempt(self, prompt, timeout, schema=None):
+        if not self.hedge_after or self.hedge_after >= timeout:
+            return await self._acall(prompt, timeout, schema)
+
+        started = time.monotonic()
+        tasks = [asyncio.ensure_future(self._acall(prompt, timeout, schema))]
+        done, pending = await asyncio.wait(tasks, timeout=self.hedge_after)
+        if not done:
+            hedge_timeout = timeout - (time.monotonic() - started)
+            tasks.append(asyncio.ensure_future(self._acall(prompt, hedge_timeout, schema)))
+            pending.add(tasks[-1])
+
+        error = None
+        try:
+            while done or pending:
+                for task in done:
+                    try:
+                        return task.result()
+                    except LLMError as e:
+                        error = e
+                if not pending:
+                    break
+                remaining = timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()  # no-op for finished ones
+                task.add_done_callback(_discard_outcome)
+        raise error or LLMError("Deadline exceeded")
+
+
+def _discard_outcome(task):
+    """Retrieves the error of an abandoned attempt so asyncio does not log it as unhandled."""
+    if not task.cancelled():
+        task.exception()
+
+
+# ==========================================
+# 4. PROCESS-WIDE INSTANCE
+# ==========================================
+_client = None
+_built = None  # the client get_client() built from settings
+_client_lock = threading.Lock()
+
+
+def build_client(config=None):
+    """Builds a client from a dict shaped like `settings.LLM_CLIENT`."""
+    config = config if config is not None else getattr(settings, 'LLM_CLIENT', {})
+    backend_cls = import_string(config.get('BACKEND', 'chatbot.llm_client.GeminiBackend'))
+    return LLMClient(
+        backend_cls(**config.get('OPTIONS', {})),
+        deadline=config.get('DEADLINE', 8.0),
+        max_retries=config.get('MAX_RETRIES', 2),
+        backoff=config.get('BACKOFF', 0.25),
+        hedge_after=config.get('HEDGE_AFTER'),
+        breaker=CircuitBreaker(
+            threshold=config.get('BREAKER_THRESHOLD', 5),
+            reset_timeout=config.get('BREAKER_RESET', 30.0),
+        ),
+    )
+
+
+def get_client():
+    global _client, _built
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _built = build_client()
+    return _client
+
+
+def set_client(client):
+    """
+    Swaps the process-wide client (used by benchmarks and tests); None
+    rebuilds it from settings. Router tiers without a client of their own
+    use a swapped-in client too (chatbot/router.py).
+    """
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def is_swapped():
+    """True while the process-wide client is one passed to set_client()."""
+    return _client is not None and _client is not _built
+
+
+# ==========================================
+# 5. LONG-LIVED EVENT LOOPS
+# ==========================================
+_serving_loops = weakref.WeakSet()
+_backends = weakref.WeakSet()
+
+
+@contextlib.asynccontextmanager
+async def serving():
+    """
+    Marks the running event loop as long-lived for the block, so async
+    backends keep their aiohttp sessions (and connections) on it; they are
+    closed at the end. The ASGI lifespan (insurance_bot/asgi.py) wraps the
+    worker's lifetime in it.
+    """
+    loop = asyncio.get_running_loop()
+    _serving_loops.add(loop)
+    try:
+        yield
+    finally:
+        _serving_loops.discard(loop)
+        for backend in list(_backends):
+            await backend.aclose()
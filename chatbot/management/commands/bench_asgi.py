@@ -0,0 +1,56 @@
+import asyncio
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.urls import reverse
+
+from chatbot import harness
+from chatbot.llm_client import FakeBackend, LLMClient, get_client, set_client
+from insurance_bot.metrics import summarize
+
+
+class Command(BaseCommand):
+    help = "Compares concurrent chat throughput under WSGI (threads) and ASGI (event loop) against a fake LLM"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400)
+        parser.add_argument('--concurrency', type=int, default=200, help="Concurrent clients")
+        parser.add_argument('--threads', type=int, default=8, help="WSGI worker threads (gunicorn --threads)")
+        parser.add_argument('--latency', type=float, default=0.5, help="Fake LLM latency (s)")
+
+    def handle(self, *args, **options):
+        original = get_client()
+        path = reverse('get_response')
+
+        def jobs(label):
+            # Distinct questions so the response cache never answers
+            return [(path, {'userMessage': f"{label} question number {i}"}) for i in range(options['requests'])]
+
+        try:
+            rows = []
+            backend = FakeBackend(latency=options['latency'])
+            set_client(LLMClient(backend, hedge_after=None))
+            elapsed, latencies, statuses = harness.run_wsgi(get_wsgi_application(), jobs('wsgi'), options['threads'])
+            rows.append(('WSGI', elapsed, latencies, statuses, backend.peak_in_flight))
+
+            backend = FakeBackend(latency=options['latency'])
+            set_client(LLMClient(backend, hedge_after=None))
+            elapsed, latencies, statuses = asyncio.run(
+                harness.run_asgi(get_asgi_application(), jobs('asgi'), options['concurrency'])
+            )
+            rows.append(('ASGI', elapsed, latencies, statuses, backend.peak_in_flight))
+        finally:
+            set_client(original)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['requests']} chat requests, fake LLM latency {options['latency']}s, "
+            f"WSGI threads={options['threads']}, ASGI concurrency={options['concurrency']}"
+        ))
+        for label, elapsed, latencies, statuses, peak in rows:
+            s = summarize(latencies)
+            errors = sum(1 for status in statuses if status >= 400)
+            self.stdout.write(
+                f"  {label}: {len(latencies) / elapsed:8.1f} req/s  p50={s['p50']}ms  p95={s['p95']}ms  "
+                f"p99={s['p99']}ms  peak in-flight LLM calls={peak}  errors={errors}"
+            )
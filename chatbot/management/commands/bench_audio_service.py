@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+
+from chatbot.audio_service import AudioService, get_service, set_service
+from insurance_bot import metrics
+from insurance_bot.metrics import summarize
+
+
+class Command(BaseCommand):
+    help = ("Fires concurrent TTS requests at the speak endpoint against a fake engine: identical "
+            "texts (coalesced into one synthesis) and distinct texts (bounded pool, 503 past the queue limit)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--latency', type=float, default=0.5, help="Fake synthesis time (s)")
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--max-queue', type=int, default=16)
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        calls = []
+        calls_lock = threading.Lock()
+
+        def fake_synthesize(text, lang):
+            with calls_lock:
+                calls.append(text)
+            time.sleep(options['latency'])
+            return b'\xff\xfb' + text.encode()
+
+        original = get_service()
+        rows = []
+        logging.getLogger('django.request').disabled = True  # one line per shed request otherwise
+        try:
+            for label, distinct in (('identical', False), ('distinct', True)):
+                service = AudioService(backends={'gtts': fake_synthesize}, workers=options['workers'],
+                                       max_queue=options['max_queue'])
+                set_service(service)
+                calls.clear()
+                metrics.reset()
+                with tempfile.TemporaryDirectory() as cache_dir, \
+                        override_settings(AUDIO_CACHE={'DIR': cache_dir, 'MAX_BYTES': 10 ** 9, 'MAX_AGE': 60}):
+                    latencies, statuses = asyncio.run(self.fire(options['concurrency'], distinct))
+                service.shutdown()
+                rows.append((label, latencies, statuses, len(calls), metrics.get_counter('tts.coalesced')))
+        finally:
+            set_service(original)
+            logging.getLogger('django.request').disabled = False
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['concurrency']} concurrent requests, fake TTS {options['latency']}s, "
+            f"{options['workers']} workers, queue limit {options['max_queue']}"
+        ))
+        for label, latencies, statuses, synth_calls, coalesced in rows:
+            ok = [ms for ms, status in zip(latencies, statuses) if status == 200]
+            s = summarize(ok)
+            shed = statuses.count(503)
+            self.stdout.write(
+                f"  {label:<10} 200={len(ok):<3} 503={shed:<3} synth calls={synth_calls:<3} "
+                f"coalesced={coalesced:<3} p50={s['p50']}ms p95={s['p95']}ms"
+            )
+
+    async def fire(self, count, distinct):
+        client = AsyncClient()
+        url = reverse('speak_text')
+
+        async def one(i):
+            text = f"Product description number {i}" if distinct else "Product description"
+            started = time.perf_counter()
+            response = await client.get(url, {'text': text, 'lang': 'hi'})
+            if response.status_code == 200:
+                b''.join(response.streaming_content)
+            return (time.perf_counter() - started) * 1000, response.status_code
+
+        results = await asyncio.gather(*(one(i) for i in range(count)))
+        return [r[0] for r in results], [r[1] for r in results]
@@ -0,0 +1,167 @@
+import asyncio
+import base64
+import json
+import threading
+import time
+
+import requests
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+
+from chatbot import audio_service
+from chatbot.bhashini_utils import BhashiniHandler, get_handler, set_handler
+from chatbot.llm_client import FakeBackend, LLMClient, get_client, set_client
+from fake_services.server import FakeServer
+from insurance_bot import metrics
+from insurance_bot.metrics import summarize
+
+LLM_REPLY = (
+    "Term insurance pays your family a fixed amount if something happens to you. "
+    "The premium stays the same for the whole policy term. "
+    "Most people choose a cover of ten to fifteen times their yearly income. "
+    "You can add riders for accidents or critical illness at a small extra cost."
+)
+
+
+def legacy_text_to_speech(config_url, text, lang_code):
+    """Baseline: the previous handler, one config fetch and two fresh connections per call."""
+    payload = {
+        "pipelineTasks": [{"taskType": "tts", "config": {"language": {"sourceLanguage": lang_code}}}],
+        "pipelineRequestConfig": {"pipelineId": "64392f96daac500b55c543cd"},
+    }
+    data = requests.post(config_url, json=payload, headers={"userID": "u", "ulcaApiKey": "k"}).json()
+    url = data["pipelineInferenceAPIEndPoint"]["callbackUrl"]
+    auth = data["pipelineInferenceAPIEndPoint"]["inferenceApiKey"]["value"]
+    service_id = data["pipelineResponseConfig"][0]["config"][0]["serviceId"]
+    payload = {
+        "pipelineTasks": [{"taskType": "tts", "config": {"language": {"sourceLanguage": lang_code}, "serviceId": service_id}}],
+        "input": [{"source": text}],
+    }
+    res = requests.post(url, json=payload, headers={"Authorization": auth})
+    return res.json()["pipelineResponse"][0]["audio"][0]["audioContent"]
+
+
+def separate_voice_turn(handler, audio, lang_code):
+    """Baseline voice turn: one request per task, and one TTS request per reply sentence."""
+    transcript = handler.speech_to_text(audio, lang_code)
+    handler.translate([transcript], lang_code, 'en')
+    sentences = audio_service.split_sentences(LLM_REPLY)
+    translations = handler.translate(sentences, 'en', lang_code)
+    return [handler.text_to_speech(t, lang_code) for t in translations]
+
+
+def chained_voice_turn(handler, audio, lang_code):
+    """ASR chained with translation, then translation chained with batched TTS."""
+    handler.speech_to_text_translated(audio, lang_code)
+    _, clips = handler.translate_and_speak(audio_service.split_sentences(LLM_REPLY), 'en', lang_code)
+    return clips
+
+
+class Command(BaseCommand):
+    help = ("Compares round trips and latency of Bhashini calls against the fake ULCA server: TTS with and without "
+            "config caching, and a regional-language voice turn with separate vs chained pipelines")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=200)
+        parser.add_argument('--latency', type=float, default=0.02, help="Fake ULCA latency per request (s)")
+        parser.add_argument('--rotate-every', type=int, default=50,
+                            help="Rotate the inference key every N calls (0: never)")
+        parser.add_argument('--turns', type=int, default=20, help="Voice turns per variant")
+
+    def handle(self, *args, **options):
+        server = FakeServer(profile='fast', rotate_every=options['rotate_every'])
+        server.configure(services={'ulca': {'latency': options['latency'], 'per_item': options['latency'] * 0.5}})
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        config_url = f"{server.url}/ulca/config"
+        langs = ['hi', 'mr', 'ta']
+        rows = []
+        try:
+            for label in ('legacy', 'cached'):
+                server.reset()
+                metrics.reset()
+                handler = BhashiniHandler("u", "k", base_url=config_url)
+                latencies = []
+                for i in range(options['calls']):
+                    started = time.perf_counter()
+                    if label == 'legacy':
+                        legacy_text_to_speech(config_url, f"sentence {i}", langs[i % len(langs)])
+                    else:
+                        handler.text_to_speech(f"sentence {i}", langs[i % len(langs)])
+                    latencies.append((time.perf_counter() - started) * 1000)
+                handler.close()
+                rows.append((label, latencies, server.stats()['counts']))
+            server.rotate_every = 0
+            voice_rows = self.voice_turns(server, config_url, options['turns'])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['calls']} TTS calls over 3 languages, ULCA latency {options['latency'] * 1000:.0f}ms, "
+            f"inference key rotated every {options['rotate_every']} calls"
+        ))
+        for label, latencies, counts in rows:
+            s = summarize(latencies)
+            trips = counts.get('ulca.config', 0) + counts.get('ulca.inference', 0)
+            self.stdout.write(
+                f"  {label:<7} round trips/call={trips / options['calls']:.2f}  config={counts.get('ulca.config', 0):<4} "
+                f"401s={counts.get('ulca.unauthorized', 0):<3} connections={counts.get('connections', 0):<4} "
+                f"p50={s['p50']}ms p95={s['p95']}ms"
+            )
+
+        sentences = len(audio_service.split_sentences(LLM_REPLY))
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['turns']} Hindi voice turns (LLM reply of {sentences} sentences), configs warm"
+        ))
+        for label, latencies, counts in voice_rows:
+            s = summarize(latencies)
+            self.stdout.write(
+                f"  {label:<9} inference requests/turn={counts['ulca.inference'] / options['turns']:.2f}  "
+                f"p50={s['p50']}ms p95={s['p95']}ms"
+            )
+
+    def voice_turns(self, server, config_url, turns):
+        audio = base64.b64encode(b'RIFF' + bytes(64)).decode()
+        handler = BhashiniHandler("u", "k", base_url=config_url)
+        # Warm the configs of both variants so only inference requests are counted
+        separate_voice_turn(handler, audio, 'hi')
+        chained_voice_turn(handler, audio, 'hi')
+        rows = []
+        for label, turn in (('separate', separate_voice_turn), ('chained', chained_voice_turn)):
+            server.reset()
+            latencies = []
+            for _ in range(turns):
+                started = time.perf_counter()
+                turn(handler, audio, 'hi')
+                latencies.append((time.perf_counter() - started) * 1000)
+            rows.append((label, latencies, server.stats()['counts']))
+
+        # The same chained turn end to end through the voice endpoint, with a fake LLM
+        setup_test_environment()
+        original_handler, original_client = get_handler(), get_client()
+        set_handler(handler)
+        set_client(LLMClient(FakeBackend(reply=LLM_REPLY)))
+        try:
+            server.reset()
+            latencies = asyncio.run(self.post_voice(audio, turns))
+        finally:
+            set_handler(original_handler)
+            set_client(original_client)
+            handler.close()
+        rows.append(('endpoint', latencies, server.stats()['counts']))
+        return rows
+
+    async def post_voice(self, audio, turns):
+        client = AsyncClient()
+        url = reverse('voice_chat')
+        body = json.dumps({'audio': audio, 'language': 'hi'})
+        latencies = []
+        for _ in range(turns):
+            started = time.perf_counter()
+            response = await client.post(url, body, content_type='application/json')
+            if response.status_code != 200:
+                raise RuntimeError(f"voice endpoint answered {response.status_code}: {response.content[:200]}")
+            latencies.append((time.perf_counter() - started) * 1000)
+        return latencies
@@ -0,0 +1,73 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from chatbot import intents
+
+# The routing check chat used before the compiled matcher
+LEGACY_BUY_KEYWORDS = ['buy', 'plan', 'suggest', 'recommend', 'policy', 'best', 'insurance for me', 'start', 'find', 'help']
+
+# Sample of real-looking chat openers across the supported languages
+CORPUS = [
+    "I want to buy insurance", "Suggest a plan for my family", "How do I file a claim?",
+    "I need to talk to an agent", "What is my policy status?", "When is my renewal due?",
+    "What is crop insurance?", "hello", "Is cattle covered in floods?",
+    "मुझे बीमा खरीदना है", "मेरी फसल खराब हो गई, क्लेम कैसे करें?", "एजेंट से बात करनी है",
+    "मेरी पॉलिसी कब रिन्यू होगी?", "फसल बीमा क्या है?",
+    "मला विमा खरेदी करायचा आहे", "क्लेम कसा करायचा?", "माझी पॉलिसी कधी संपते?",
+    "મારે પ્લાન જોઈએ છે", "ક્લેમ કેવી રીતે કરવો?", "એજન્ટ સાથે વાત કરવી છે",
+    "আমি পলিসি কিনতে চাই", "ক্লেম কীভাবে করব?", "এজেন্ট এর সাথে কথা বলতে চাই",
+    "எனக்கு ஒரு பாலிசி வாங்க வேண்டும்", "க்ளெய்ம் எப்படி செய்வது?", "முகவரிடம் பேச வேண்டும்",
+    "నాకు బీమా కావాలి", "క్లెయిమ్ ఎలా చేయాలి?", "నా పాలసీ స్థితి ఏమిటి?",
+    "ನನಗೆ ಪಾಲಿಸಿ ಖರೀದಿ ಮಾಡಬೇಕು", "ಕ್ಲೈಮ್ ಹೇಗೆ ಮಾಡುವುದು?", "ಏಜೆಂಟ್ ಜೊತೆ ಮಾತನಾಡಬೇಕು",
+    "എനിക്ക് ഒരു പോളിസി വാങ്ങണം", "ക്ലെയിം എങ്ങനെ ചെയ്യാം?", "ഏജന്റിനെ വിളിക്കണം",
+    "ਮੈਂ ਬੀਮਾ ਖਰੀਦਣਾ ਚਾਹੁੰਦਾ ਹਾਂ", "ਕਲੇਮ ਕਿਵੇਂ ਕਰੀਏ?", "ਮੈਨੂੰ ਏਜੰਟ ਨਾਲ ਗੱਲ ਕਰਨੀ ਹੈ",
+    "What does health insurance cover?", "बाढ़ में पशु बीमा मिलता है क्या?",
+]
+
+
+def legacy_is_buy(text):
+    return any(k in text.lower() for k in LEGACY_BUY_KEYWORDS)
+
+
+ALL_KEYWORDS = [(intents.normalize(k), intent)
+                for intent, by_lang in intents.INTENT_KEYWORDS.items()
+                for kw in by_lang.values() for k in kw]
+
+
+def loop_all(text):
+    """The old loop extended to every keyword: one substring scan per keyword."""
+    text = intents.normalize(text)
+    return {intent for k, intent in ALL_KEYWORDS if k in text}
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the compiled intent matcher against the old keyword loop and counts LLM calls avoided"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        rounds = options['rounds']
+        legacy = timeit.timeit(lambda: [legacy_is_buy(m) for m in CORPUS], number=rounds)
+        looped = timeit.timeit(lambda: [loop_all(m) for m in CORPUS], number=rounds)
+        compiled = timeit.timeit(lambda: [intents.detect_intent(m) for m in CORPUS], number=rounds)
+        per_msg = 1e6 / (rounds * len(CORPUS))
+        keywords = len(ALL_KEYWORDS)
+
+        self.stdout.write(self.style.SUCCESS(f"Intent matching over {len(CORPUS)} messages x {rounds} rounds"))
+        self.stdout.write(f"  legacy loop    {len(LEGACY_BUY_KEYWORDS):>4} keywords, 1 intent   {legacy * per_msg:7.2f} us/msg")
+        self.stdout.write(f"  loop, all kw   {keywords:>4} keywords, 4 intents  {looped * per_msg:7.2f} us/msg")
+        self.stdout.write(f"  aho-corasick   {keywords:>4} keywords, 4 intents  {compiled * per_msg:7.2f} us/msg")
+
+        # Before: anything that was not a buy keyword went to the LLM.
+        # After: every detected intent is answered locally.
+        before = sum(1 for m in CORPUS if not legacy_is_buy(m))
+        after = sum(1 for m in CORPUS if intents.detect_intent(m) is None)
+        self.stdout.write(f"LLM calls on the corpus: {before} -> {after} ({before - after} avoided, "
+                          f"{100 * (before - after) / len(CORPUS):.0f}% of messages)")
+        by_intent = {}
+        for m in CORPUS:
+            intent = intents.detect_intent(m) or 'llm'
+            by_intent[intent] = by_intent.get(intent, 0) + 1
+        self.stdout.write(f"Routing: {by_intent}")
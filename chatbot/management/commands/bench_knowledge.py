@@ -0,0 +1,160 @@
+import asyncio
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+
+from chatbot import knowledge
+from chatbot.llm_client import FakeBackend, LLMClient, get_client, set_client
+from insurance.models import FAQ, Article, InsuranceProduct, TranslationMemory
+from insurance.translation import normalize, source_hash
+from insurance_bot import metrics
+from insurance_bot.metrics import summarize
+
+FAQS = [
+    ("What is the age limit?", "Usually 18 to 65 years depending on the plan."),
+    ("Can I pay via UPI?", "Yes, we support BHIM UPI, GPay, and PhonePe."),
+    ("What documents do I need?",
+     "An Aadhaar card, a bank passbook and a passport-size photo. Farmers also need land records."),
+    ("Can I cancel and get a refund?", "Yes, within the 15-day free-look period you get a full refund."),
+    ("Who is a nominee?", "The nominee is the person who receives the money if something happens to you."),
+    ("Is there a waiting period for hospitalisation?",
+     "Illness is covered after 30 days. Accidents are covered from the first day."),
+    ("What if I miss a premium payment?",
+     "You have a 30-day grace period. After that cover stops, but it can be revived within two years."),
+    ("Does crop insurance cover flood damage?", "Yes. Crop cover includes drought, flood, pests and unseasonal rain."),
+]
+# Saved Hindi translations, so Hindi questions match the FAQ directly
+HINDI = {
+    "Can I pay via UPI?": "क्या मैं यूपीआई से भुगतान कर सकता हूँ?",
+    "Yes, we support BHIM UPI, GPay, and PhonePe.": "हाँ, हम भीम यूपीआई, जीपे और फोनपे स्वीकार करते हैं।",
+}
+ARTICLES = [
+    ("Why Crop Insurance is Essential for Farmers",
+     "One bad monsoon can wipe out a season's income. Crop insurance pays for losses from drought, flood and "
+     "pests, so the next season can still be sown. The premium is shared with the government."),
+    ("Understanding Term Life Insurance",
+     "Term life insurance pays a fixed sum to your family if you die during the term. It has no maturity "
+     "benefit, which keeps the premium low."),
+]
+PRODUCTS = [
+    ("Kisan Crop Shield", 'CROP', "Protects standing crops against drought, flood, hailstorm and pest attack."),
+    ("Pashu Suraksha", 'LIVESTOCK', "Covers cattle, buffaloes and goats against death from disease or accident."),
+    ("Parivar Health Cover", 'HEALTH', "Cashless hospitalisation for the whole family in network hospitals."),
+    ("Jeevan Raksha Term", 'LIFE', "Pure term cover with a large sum assured at a low premium."),
+]
+
+# (question, expected FAQ question or None when the LLM should answer)
+QUESTIONS = [
+    ("Can I pay using UPI?", "Can I pay via UPI?"),
+    ("what is the age limit", "What is the age limit?"),
+    ("Which documents do I need?", "What documents do I need?"),
+    ("can I cancel and get my refund", "Can I cancel and get a refund?"),
+    ("who is the nominee", "Who is a nominee?"),
+    ("waiting period for hospitalisation?", "Is there a waiting period for hospitalisation?"),
+    ("I missed my premium payment, what now?", "What if I miss a premium payment?"),
+    ("does it cover flood damage to crops", "Does crop insurance cover flood damage?"),
+    ("क्या यूपीआई से भुगतान कर सकता हूँ?", "Can I pay via UPI?"),
+    ("What is the difference between ULIP and endowment?", None),
+    ("My cow is sick, what should I do?", None),
+    ("How does inflation affect my savings?", None),
+    ("hello, how are you?", None),
+    ("Is GST charged on the premium?", None),
+    ("What is the age limit for a loan from the bank?", None),
+    ("Explain insurance in simple words", None),
+]
+
+
+class Command(BaseCommand):
+    help = ("Measures how much general chat the FAQ/article/product knowledge base answers without the LLM, "
+            "and how fast (sample content is removed afterwards)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=5, help="Passes over the question list")
+        parser.add_argument('--latency', type=float, default=1.0, help="Fake LLM time per call (s)")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        created = self.create_content()
+        original = get_client()
+        set_client(LLMClient(FakeBackend(reply="An answer from the LLM.", latency=options['latency'])))
+        try:
+            started = time.perf_counter()
+            knowledge.invalidate()
+            knowledge.warm()
+            build_ms = (time.perf_counter() - started) * 1000
+            metrics.reset()
+            # No response cache, so repeated questions still cost an LLM call
+            caches = dict(settings.CACHES, chat_responses={'BACKEND': 'django.core.cache.backends.dummy.DummyCache'})
+            with override_settings(CACHES=caches):
+                rows = asyncio.run(self.converse(options['rounds']))
+        finally:
+            set_client(original)
+            for objects in created:
+                objects.delete()
+            knowledge.invalidate()
+
+        local = [ms for ms, answered, _ in rows if answered]
+        remote = [ms for ms, answered, _ in rows if not answered]
+        wrong = sum(1 for _, answered, ok in rows if not ok)
+        counters = metrics.snapshot()['counters']
+        hits, misses = counters.get('chat.knowledge.hit', 0), counters.get('chat.knowledge.miss', 0)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(rows)} general questions ({len(QUESTIONS)} distinct), index built in {build_ms:.1f} ms"))
+        self.stdout.write(f"  deflected        {hits}/{hits + misses} = {hits / max(1, hits + misses):.0%}"
+                          f"  ({counters.get('chat.knowledge.hit.faq', 0)} FAQ, "
+                          f"{counters.get('chat.knowledge.hit.article', 0)} article, "
+                          f"{counters.get('chat.knowledge.hit.product', 0)} product)")
+        self.stdout.write(f"  wrong routing    {wrong} (answered locally but not by the expected FAQ, or missed it)")
+        for label, samples in (('knowledge', local), ('LLM', remote)):
+            s = summarize(samples)
+            self.stdout.write(f"  {label:<10} turn ms p50={s['p50']:>8}  p95={s['p95']:>8}  p99={s['p99']:>8}"
+                              f"  (n={s['count']})")
+        lookup = metrics.snapshot()['histograms'].get('chat.knowledge.ms')
+        self.stdout.write(f"  chat.knowledge.ms (lookup, server side): {lookup}")
+
+    def create_content(self):
+        faqs = [FAQ.objects.create(question=q, answer=a, category="General") for q, a in FAQS]
+        articles = [Article.objects.create(title=t, content=c, featured_image='') for t, c in ARTICLES]
+        products = [
+            InsuranceProduct.objects.create(
+                name=name, product_type=kind, description=description, key_features="Low premium",
+                base_premium=Decimal(1200), min_entry_age=18, max_entry_age=65,
+            )
+            for name, kind, description in PRODUCTS
+        ]
+        memory = [
+            TranslationMemory.objects.create(
+                source_hash=source_hash(english), language='hi', source_text=normalize(english), translated_text=hindi,
+            )
+            for english, hindi in HINDI.items()
+        ]
+        return [FAQ.objects.filter(pk__in=[f.pk for f in faqs]),
+                Article.objects.filter(pk__in=[a.pk for a in articles]),
+                InsuranceProduct.objects.filter(pk__in=[p.pk for p in products]),
+                TranslationMemory.objects.filter(pk__in=[m.pk for m in memory])]
+
+    async def converse(self, rounds):
+        """[(turn ms, answered locally, routed as expected)] per question."""
+        answers = {q: a for q, a in FAQS}
+        rows = []
+        for _ in range(rounds):
+            for question, expected in QUESTIONS:
+                client = AsyncClient()  # one question per conversation
+                hits = metrics.get_counter('chat.knowledge.hit')
+                started = time.perf_counter()
+                response = await client.get(reverse('get_response'), {'userMessage': question})
+                ms = (time.perf_counter() - started) * 1000
+                reply = response.json()['botResponse']
+                answered = metrics.get_counter('chat.knowledge.hit') > hits
+                if expected is None:
+                    ok = not answered
+                else:
+                    ok = answered and reply in (answers[expected], HINDI.get(answers[expected]))
+                rows.append((ms, answered, ok))
+        return rows
@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+
+from chatbot.llm_client import FakeBackend, LLMClient, estimate_tokens, get_client, set_client
+from insurance_bot import metrics
+from insurance_bot.metrics import summarize
+
+QUESTIONS = [
+    "What is crop insurance?",
+    "And for my parents?",
+    "How much is the premium for that?",
+    "Is there a waiting period?",
+    "What documents do I need?",
+    "Can I pay it monthly?",
+]
+
+# Effectively unbounded: every turn verbatim, no budget
+FULL_HISTORY = {'RECENT_TURNS': 10 ** 6, 'TURN_TOKENS': 10 ** 6, 'MAX_PROMPT_TOKENS': 10 ** 6}
+
+
+class RecordingBackend(FakeBackend):
+    """FakeBackend that keeps the size of every prompt it is sent."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prompt_tokens = []
+
+    async def agenerate(self, prompt, timeout, schema=None):
+        self.prompt_tokens.append(estimate_tokens(prompt))
+        return await super().agenerate(prompt, timeout, schema)
+
+
+class Command(BaseCommand):
+    help = "Compares prompt size and turn latency of a long general chat with full history and with bounded memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--turns', type=int, default=50)
+        parser.add_argument('--latency', type=float, default=0.05, help="Fixed LLM time per call (s)")
+        parser.add_argument('--prefill', type=float, default=0.0002, help="LLM time per prompt token (s)")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        original = get_client()
+        reply = ("Crop insurance protects farmers against loss from drought, flood and pests. "
+                 "The premium depends on the crop and the sum insured, and the government pays most of it. ") * 2
+        turns = options['turns']
+        window = max(1, min(10, turns // 5))
+
+        self.stdout.write(self.style.SUCCESS(f"{turns}-turn conversation (first/last {window} turns)"))
+        try:
+            for label, config in (('full history', FULL_HISTORY), ('bounded', {})):
+                backend = RecordingBackend(reply=reply, latency=options['latency'],
+                                           prompt_token_latency=options['prefill'])
+                set_client(LLMClient(backend))
+                metrics.reset()
+                with override_settings(CHAT_MEMORY=config):
+                    latencies = asyncio.run(self.converse(turns, label))
+                tokens = backend.prompt_tokens
+                first, last = summarize(latencies[:window]), summarize(latencies[-window:])
+                self.stdout.write(
+                    f"  {label:<13} prompt tokens first={tokens[0]:>6} last={tokens[-1]:>6} max={max(tokens):>6}"
+                    f"   turn ms p50 first={first['p50']:>8} last={last['p50']:>8}"
+                )
+            self.stdout.write("Server-side prompt size histogram (bounded run):")
+            self.stdout.write(f"  chat.prompt_tokens.general: "
+                              f"{metrics.snapshot()['histograms'].get('chat.prompt_tokens.general')}")
+        finally:
+            set_client(original)
+
+    async def converse(self, turns, label):
+        client = AsyncClient()  # keeps the chat cookie, so every turn is the same conversation
+        latencies = []
+        for i in range(turns):
+            # Distinct per run and turn, so the response cache answers none of them
+            params = {'userMessage': f"{QUESTIONS[i % len(QUESTIONS)]} ({label} {i})"}
+            started = time.perf_counter()
+            await client.get(reverse('get_response'), params)
+            latencies.append((time.perf_counter() - started) * 1000)
+        return latencies
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from chatbot import recommender
+from chatbot.llm_client import FakeBackend, LLMClient, estimate_tokens, get_client, set_client
+from chatbot.views import build_recommendation_prompt, enrich_recommendation
+from insurance_bot import metrics
+from insurance_bot.metrics import summarize
+
+# The prompt tail the chatbot used before structured output: the model wrote
+# the whole policy card as HTML.
+HTML_FORMAT = """
+    HTML FORMAT:
+    <div class="policy-card">
+       <div class="policy-header">🏆 Best Match: [Product Name]</div>
+       <div class="policy-body">
+           <p><b>Why:</b> [Reasoning in Hindi]</p>
+           <p class="price">₹[Premium] / year</p>
+       </div>
+       <a href="/products/product/[ID]/" class="buy-btn">View Details</a>
+    </div>
+    """
+
+PRODUCTS = [
+    {'id': 1, 'name': "Kisan Suraksha Crop Plan", 'base_premium': 1500,
+     'description': "Covers crop loss from drought, flood and pests"},
+    {'id': 2, 'name': "Arogya Basic Health", 'base_premium': 4000,
+     'description': "Cashless hospitalisation up to 3 lakh"},
+    {'id': 3, 'name': "Jeevan Term Life", 'base_premium': 9000,
+     'description': "Life cover of 20 lakh for the family"},
+]
+SURVEY = {'occupation': "किसान", 'age': "40", 'income': "2 लाख", 'vehicle': "नहीं"}
+REASON = "किसान होने के नाते, यह योजना सूखा, बाढ़ और कीटों से आपकी फसल की आय की रक्षा करती है।"
+
+
+class Command(BaseCommand):
+    help = "Compares HTML-card and structured-JSON recommendation replies: output tokens and latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20)
+        parser.add_argument('--latency', type=float, default=0.3, help="Fixed time per call (s)")
+        parser.add_argument('--token-latency', type=float, default=0.005, help="Decode time per output token (s)")
+
+    def handle(self, *args, **options):
+        json_prompt = build_recommendation_prompt(SURVEY, PRODUCTS, 'hi')
+        html_prompt = json_prompt.rsplit("Answer with JSON only", 1)[0] + "Explain why in Hindi.\n" + HTML_FORMAT
+        html_reply = "```html\n" + recommender.render_card(PRODUCTS[0], REASON) + "\n```"
+        json_reply = json.dumps({'product_id': 1, 'reason': REASON}, ensure_ascii=False)
+
+        original = get_client()
+        try:
+            results = {}
+            for label, prompt, reply in (('html', html_prompt, html_reply), ('json', json_prompt, json_reply)):
+                backend = FakeBackend(reply=reply, latency=options['latency'],
+                                      token_latency=options['token_latency'])
+                set_client(LLMClient(backend))
+                metrics.reset()
+                samples = asyncio.run(self.measure(label, prompt, options['requests']))
+                results[label] = (estimate_tokens(prompt), estimate_tokens(reply), summarize(samples))
+        finally:
+            set_client(original)
+
+        self.stdout.write(self.style.SUCCESS("Recommendation turn, fake LLM with per-token decode time"))
+        self.stdout.write(f"  {'mode':<5} {'prompt tok':>10} {'output tok':>10} {'p50 ms':>9} {'p95 ms':>9}")
+        for label, (prompt_tokens, output_tokens, s) in results.items():
+            self.stdout.write(f"  {label:<5} {prompt_tokens:>10} {output_tokens:>10} {s['p50']:>9} {s['p95']:>9}")
+        html, structured = results['html'], results['json']
+        self.stdout.write(
+            f"Output tokens -{100 - 100 * structured[1] / html[1]:.0f}%, "
+            f"p50 latency -{100 - 100 * structured[2]['p50'] / html[2]['p50']:.0f}%"
+        )
+
+    async def measure(self, label, prompt, count):
+        samples = []
+        for _ in range(count):
+            started = time.perf_counter()
+            if label == 'html':
+                await get_client().areply(prompt)
+            else:
+                card = await enrich_recommendation(prompt, PRODUCTS, fallback=None)
+                assert card and 'Kisan Suraksha' in card, "structured reply was rejected"
+            samples.append((time.perf_counter() - started) * 1000)
+        return samples
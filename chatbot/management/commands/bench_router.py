@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+
+from chatbot import router
+from chatbot.llm_client import FakeBackend, LLMClient, get_client, set_client
+from insurance_bot import metrics
+from insurance_bot.metrics import summarize
+
+# A general-chat mix: small talk, short questions and open-ended advice
+# (no intent keywords such as "plan" or "policy", which the survey would take)
+MESSAGES = [
+    "hi", "Hello!", "ok thanks", "धन्यवाद", "ठीक है", "bye",
+    "What is crop insurance?", "Is cattle insurance available in Nashik?", "What is sum assured?",
+    "Does health cover include my wife?", "What is a premium holiday?", "क्या पशु बीमा मिलता है?",
+    "Which is better for a farmer, term cover or an endowment, and why?",
+    "Should I take health cover for my parents or increase my own sum assured first?",
+    "I earn about 2 lakh a year from farming and have two children, how much life cover is enough for us?",
+    "टर्म बीमा या एंडोमेंट, मेरे परिवार के लिए क्या बेहतर है?",
+]
+
+
+class Command(BaseCommand):
+    help = "Compares a general-chat traffic mix with the model router on and off (fake models per tier)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=5)
+        parser.add_argument('--full-latency', type=float, default=1.5, help="Full model time per call (s)")
+        parser.add_argument('--fast-latency', type=float, default=0.5, help="Fast model time per call (s)")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        original = get_client()
+        try:
+            for label, enabled in (('router off', False), ('router on', True)):
+                full = FakeBackend(reply="A considered answer.", latency=options['full_latency'])
+                fast = FakeBackend(reply="A short answer.", latency=options['fast_latency'])
+                set_client(LLMClient(full))
+                router.set_tier_client(router.FAST, LLMClient(fast))
+                metrics.reset()
+                # No response cache, so repeated messages still reach the models
+                caches = dict(settings.CACHES,
+                              chat_responses={'BACKEND': 'django.core.cache.backends.dummy.DummyCache'})
+                with override_settings(LLM_ROUTER=dict(settings.LLM_ROUTER, ENABLED=enabled), CACHES=caches):
+                    latencies = asyncio.run(self.converse(options['rounds']))
+                self.report(label, latencies, full.calls, fast.calls)
+        finally:
+            set_client(original)
+            router.set_tier_client(router.FAST, None)
+
+    def report(self, label, latencies, full_calls, fast_calls):
+        s = summarize(latencies)
+        self.stdout.write(self.style.SUCCESS(
+            f"{label}: {s['count']} turns, turn ms p50={s['p50']} p95={s['p95']} mean={s['mean']}; "
+            f"model calls full={full_calls} fast={fast_calls}"))
+        snapshot = metrics.snapshot()
+        for tier in (router.LOCAL, router.FAST, router.FULL):
+            count = snapshot['counters'].get(f'chat.tier.{tier}', 0)
+            if count:
+                t = snapshot['histograms'][f'chat.tier_ms.{tier}']
+                self.stdout.write(f"  {tier:<6} {count:>4} turns ({count / s['count']:.0%})  "
+                                  f"ms p50={t['p50']:>8} p95={t['p95']:>8}")
+
+    async def converse(self, rounds):
+        latencies = []
+        for _ in range(rounds):
+            for message in MESSAGES:
+                client = AsyncClient()  # one message per conversation
+                started = time.perf_counter()
+                await client.get(reverse('get_response'), {'userMessage': message})
+                latencies.append((time.perf_counter() - started) * 1000)
+        return latencies
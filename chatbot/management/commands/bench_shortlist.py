@@ -0,0 +1,62 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from chatbot.llm_client import estimate_tokens
+from chatbot.recommendation_logic import shortlist_products
+from chatbot.views import build_recommendation_prompt
+from insurance.models import InsuranceProduct
+
+PROFILE = {'occupation': 'farmer', 'age': '42', 'income': '2 lakh', 'vehicle': 'yes, a tractor'}
+
+
+class Command(BaseCommand):
+    help = "Measures recommendation prompt size and shortlist latency as the catalog grows (rolled back afterwards)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,100,1000,5000')
+        parser.add_argument('--runs', type=int, default=20)
+
+    def handle(self, *args, **options):
+        sizes = [int(s) for s in options['sizes'].split(',')]
+        types = [code for code, _ in InsuranceProduct.POLICY_TYPE_CHOICES]
+        self.stdout.write(self.style.SUCCESS(
+            f"{'catalog':>8} {'tokens(all)':>12} {'tokens(top-K)':>14} {'shortlist ms':>13} {'all-products ms':>16}"
+        ))
+
+        with transaction.atomic():
+            created = 0
+            for size in sizes:
+                InsuranceProduct.objects.bulk_create([
+                    InsuranceProduct(
+                        name=f"Bench Plan {i}",
+                        product_type=random.choice(types),
+                        description="Covers loss of income, hospitalisation and accidental damage for rural families.",
+                        key_features="Low premium",
+                        base_premium=Decimal(random.randint(500, 20000)),
+                        min_entry_age=random.choice([18, 21, 25]),
+                        max_entry_age=random.choice([45, 60, 65, 70]),
+                    )
+                    for i in range(created, size)
+                ])
+                created = max(created, size)
+
+                started = time.perf_counter()
+                for _ in range(options['runs']):
+                    every = list(InsuranceProduct.objects.filter(is_active=True)
+                                 .values('id', 'name', 'base_premium', 'description'))
+                all_ms = (time.perf_counter() - started) * 1000 / options['runs']
+
+                started = time.perf_counter()
+                for _ in range(options['runs']):
+                    top = shortlist_products(PROFILE)
+                top_ms = (time.perf_counter() - started) * 1000 / options['runs']
+
+                before = estimate_tokens(build_recommendation_prompt(PROFILE, every, 'en'))
+                after = estimate_tokens(build_recommendation_prompt(PROFILE, top, 'en'))
+                self.stdout.write(f"{len(every):>8} {before:>12} {after:>14} {top_ms:>13.2f} {all_ms:>16.2f}")
+
+            transaction.set_rollback(True)
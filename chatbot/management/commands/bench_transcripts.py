@@ -0,0 +1,99 @@
+import asyncio
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django.urls import reverse
+
+from chatbot import harness, transcripts
+from chatbot.llm_client import FakeBackend, LLMClient, get_client, set_client
+from chatbot.models import ChatMessage, ChatSession
+from insurance_bot import metrics
+from insurance_bot.metrics import summarize
+
+
+class InlineWriter:
+    """Baseline: every message is INSERTed while the request waits."""
+
+    def __init__(self):
+        # The ORM refuses to run on the event loop thread; a worker thread
+        # that the caller blocks on costs the same as an inline write.
+        self._pool = ThreadPoolExecutor(max_workers=1)
+
+    def log(self, entry):
+        self._pool.submit(transcripts.write_batch, [entry]).result()
+        return True
+
+    def flush(self):
+        pass
+
+    def stop(self):
+        self._pool.shutdown()
+
+
+class Command(BaseCommand):
+    help = "Measures chat latency with transcript logging off, written inline, and buffered (bulk_create)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--latency', type=float, default=0.05, help="Fake LLM latency (s)")
+
+    def handle(self, *args, **options):
+        original = get_client()
+        path = reverse('get_response')
+        app = get_asgi_application()
+        before = set(ChatSession.objects.values_list('id', flat=True))
+
+        rows = []
+        try:
+            for mode in ('off', 'inline', 'buffered'):
+                set_client(LLMClient(FakeBackend(latency=options['latency']), hedge_after=None))
+                metrics.reset()
+                writer = InlineWriter() if mode == 'inline' else transcripts.TranscriptBuffer()
+                transcripts.set_buffer(writer)
+                jobs = [(path, {'userMessage': f"{mode} transcript question {i}"}) for i in range(options['requests'])]
+                with override_settings(CHAT_TRANSCRIPTS={'ENABLED': mode != 'off'}):
+                    elapsed, latencies, statuses = asyncio.run(
+                        harness.run_asgi(app, jobs, options['concurrency'])
+                    )
+                writer.stop()
+                counters = metrics.snapshot()
+                flushes = counters['histograms'].get('chat.transcript.flush_ms', {}).get('count', 0)
+                rows.append((mode, elapsed, latencies, statuses, flushes))
+        finally:
+            set_client(original)
+            transcripts.set_buffer(None)
+
+        created = ChatSession.objects.exclude(id__in=before)
+        written = ChatMessage.objects.filter(session__in=created).count()
+        created.delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['requests']} chat requests over ASGI, concurrency={options['concurrency']}, "
+            f"fake LLM latency {options['latency']}s"
+        ))
+        for mode, elapsed, latencies, statuses, flushes in rows:
+            s = summarize(latencies)
+            errors = sum(1 for status in statuses if status != 200)
+            extra = f"  bulk flushes={flushes}" if mode == 'buffered' else ''
+            self.stdout.write(
+                f"  {mode:<9} {len(latencies) / elapsed:7.1f} req/s  p50={s['p50']}ms  p95={s['p95']}ms  "
+                f"p99={s['p99']}ms  errors={errors}{extra}"
+            )
+        self.stdout.write(f"Transcript rows written (inline + buffered, since removed): {written}")
+
+        # What the request itself pays: queueing one turn, with the flusher idle
+        transcripts.set_buffer(transcripts.TranscriptBuffer(batch_size=10 ** 9, flush_interval=3600,
+                                                            max_pending=10 ** 9))
+        with override_settings(CHAT_TRANSCRIPTS={'ENABLED': True}):
+            count = 20000
+            cost = timeit.timeit(
+                lambda: transcripts.log_turn('bench-session-key-0001', 'en', "hello", "reply", 'general', 10.0),
+                number=count,
+            )
+        transcripts.set_buffer(None)
+        self.stdout.write(f"Request-path cost of log_turn: {cost / count * 1e6:.1f} us per turn "
+                          f"(the rest of the gap to 'off' is the flusher's CPU in the same process)")
@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+
+from chatbot.llm_client import FakeBackend, LLMClient, get_client, set_client
+from insurance_bot import metrics
+from insurance_bot.metrics import summarize
+
+
+class Command(BaseCommand):
+    help = "Compares time-to-first-token of the blocking and streaming chat endpoints against a fake LLM"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20)
+        parser.add_argument('--latency', type=float, default=2.0, help="Full completion time (s)")
+        parser.add_argument('--ttft', type=float, default=0.4, help="Time to the first streamed chunk (s)")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        original = get_client()
+        reply = "Crop insurance protects farmers against loss from drought, flood and pests. " * 4
+        set_client(LLMClient(FakeBackend(reply=reply, latency=options['latency'], ttft=options['ttft'])))
+        metrics.reset()
+
+        try:
+            blocking, stream = asyncio.run(self.measure(options['requests']))
+        finally:
+            set_client(original)
+
+        self.stdout.write(self.style.SUCCESS("Time to first token (ms, client side)"))
+        for label, samples in (('blocking', blocking), ('stream', stream)):
+            s = summarize(samples)
+            self.stdout.write(f"  {label:<9} p50={s['p50']:>8}  p95={s['p95']:>8}  p99={s['p99']:>8}")
+        server = metrics.snapshot()['histograms']
+        self.stdout.write("Server-side TTFT histograms:")
+        for name in ('chat.ttft_ms.blocking', 'chat.ttft_ms.stream'):
+            self.stdout.write(f"  {name}: {server.get(name)}")
+
+    async def measure(self, count):
+        client = AsyncClient()
+        question = "What is crop insurance?"
+        blocking, stream = [], []
+        for i in range(count):
+            # Vary the question so the response cache does not answer
+            params = {'userMessage': f"{question} blocking {i}"}
+            started = time.perf_counter()
+            await client.get(reverse('get_response'), params)
+            blocking.append((time.perf_counter() - started) * 1000)
+
+            params = {'userMessage': f"{question} stream {i}"}
+            started = time.perf_counter()
+            response = await client.get(reverse('stream_response'), params)
+            first = None
+            async for chunk in response.streaming_content:
+                if first is None and chunk.startswith(b'data:'):
+                    first = (time.perf_counter() - started) * 1000
+            stream.append(first)
+        return blocking, stream
@@ -0,0 +1,78 @@
+import asyncio
+import math
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+
+from chatbot.audio_service import AudioService, get_service, set_service
+from insurance_bot.metrics import summarize
+
+REPLY = (
+    "Pradhan Mantri Fasal Bima Yojana protects farmers against crop loss from drought, flood and pests. "
+    "The premium is only two percent of the sum insured for kharif crops. "
+    "You can enroll through your bank or the nearest common service centre before the cut-off date. "
+    "Keep your land records and sowing certificate ready. "
+    "Claims are settled directly into your bank account after the crop cutting experiment."
+)
+
+
+class Command(BaseCommand):
+    help = ("Compares time to the first audio byte of the whole-reply TTS endpoint and the "
+            "sentence-streaming one, against a fake TTS engine on a cold cache")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=10)
+        parser.add_argument('--request-latency', type=float, default=0.3,
+                            help="Fake TTS time per 100 characters (s); gTTS makes one request per ~100")
+        parser.add_argument('--workers', type=int, default=4, help="TTS worker pool size")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        per_request = options['request_latency']
+
+        def fake_synthesize(text, lang):
+            time.sleep(per_request * math.ceil(len(text) / 100))
+            return b'\xff\xfb' + text.encode()
+
+        original = get_service()
+        set_service(AudioService(backends={'gtts': fake_synthesize}, workers=options['workers']))
+        try:
+            rows = asyncio.run(self.measure(options['requests']))
+        finally:
+            set_service(original)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(REPLY)}-character reply, fake TTS {per_request}s per 100 characters, cold cache"
+        ))
+        for label, first, total in rows:
+            f, t = summarize(first), summarize(total)
+            self.stdout.write(f"  {label:<7} first byte p50={f['p50']:>7}ms p95={f['p95']:>7}ms   "
+                              f"complete p50={t['p50']:>7}ms")
+
+    async def measure(self, count):
+        client = AsyncClient()
+        rows = []
+        for label, url in (('speak', reverse('speak_text')), ('stream', reverse('speak_stream'))):
+            first, total = [], []
+            for _ in range(count):
+                # An empty cache for every request: sentences repeat across requests
+                with tempfile.TemporaryDirectory() as cache_dir, \
+                        override_settings(AUDIO_CACHE={'DIR': cache_dir, 'MAX_BYTES': 10 ** 9, 'MAX_AGE': 60}):
+                    started = time.perf_counter()
+                    response = await client.get(url, {'text': REPLY, 'lang': 'en'})
+                    if response.is_async:
+                        got_first = None
+                        async for chunk in response.streaming_content:
+                            if got_first is None:
+                                got_first = time.perf_counter()
+                    else:
+                        got_first = time.perf_counter()
+                        b''.join(response.streaming_content)
+                    first.append((got_first - started) * 1000)
+                    total.append((time.perf_counter() - started) * 1000)
+            rows.append((label, first, total))
+        return rows
@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django.urls import reverse
+
+from chatbot import harness, router, websocket
+from chatbot.llm_client import FakeBackend, LLMClient, get_client, set_client
+from insurance_bot import metrics
+from insurance_bot.metrics import summarize
+
+# One visitor's conversation: a survey, an intent, general questions, small talk
+SCRIPT = [
+    "I want to buy a plan", "farmer", "42", "2 lakh", "tractor",
+    "How do I file a claim?", "What is a premium holiday?", "Is cattle insurance available in Nashik?",
+    "hi", "ok thanks",
+]
+
+
+class Command(BaseCommand):
+    help = ("Compares chat messages per second on one ASGI worker over HTTP (blocking and SSE) and over "
+            "the WebSocket channel, against a fake LLM")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=50, help="Concurrent chat visitors")
+        parser.add_argument('--messages', type=int, default=30, help="Messages per visitor")
+        parser.add_argument('--latency', type=float, default=0.0, help="Fake LLM time per call (s)")
+
+    def handle(self, *args, **options):
+        app = websocket.route(get_asgi_application())
+        original = get_client()
+        fake = LLMClient(FakeBackend(reply="A short answer about insurance.", latency=options['latency']),
+                         hedge_after=None)
+        set_client(fake)
+        router.set_tier_client(router.FAST, fake)
+        # No response cache, so repeated questions still go through the model
+        caches = dict(settings.CACHES, chat_responses={'BACKEND': 'django.core.cache.backends.dummy.DummyCache'})
+        try:
+            rows = []
+            with override_settings(CACHES=caches):
+                for label, visitor in (('HTTP get-response', self.http_visitor('get_response')),
+                                       ('HTTP stream (SSE)', self.http_visitor('stream_response')),
+                                       ('WebSocket', self.socket_visitor)):
+                    metrics.reset()
+                    elapsed, latencies, errors = asyncio.run(self.run(app, visitor, options))
+                    writes = metrics.get_counter('chat.state.write')
+                    rows.append((label, elapsed, latencies, errors, writes))
+        finally:
+            set_client(original)
+            router.set_tier_client(router.FAST, None)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['clients']} visitors x {options['messages']} messages on one event loop, "
+            f"fake LLM latency {options['latency']}s"
+        ))
+        for label, elapsed, latencies, errors, writes in rows:
+            s = summarize(latencies)
+            self.stdout.write(
+                f"  {label:<18} {len(latencies) / elapsed:8.1f} msg/s  p50={s['p50']:>7}ms  p95={s['p95']:>7}ms  "
+                f"state writes={writes:<5} errors={errors}"
+            )
+
+    async def run(self, app, visitor, options):
+        messages = [SCRIPT[i % len(SCRIPT)] for i in range(options['messages'])]
+        started = time.perf_counter()
+        results = await asyncio.gather(*(visitor(app, messages) for _ in range(options['clients'])))
+        elapsed = time.perf_counter() - started
+        latencies = [ms for visitor_latencies, _ in results for ms in visitor_latencies]
+        return elapsed, latencies, sum(errors for _, errors in results)
+
+    def http_visitor(self, route):
+        async def visitor(app, messages):
+            cookies = {}
+            _, headers, _ = await harness.call_asgi(app, reverse('chat'), cookies=cookies)
+            harness.update_cookies(cookies, headers)
+            latencies, errors = [], 0
+            for message in messages:
+                started = time.perf_counter()
+                status, headers, _ = await harness.call_asgi(app, reverse(route), {'userMessage': message}, cookies)
+                latencies.append((time.perf_counter() - started) * 1000)
+                harness.update_cookies(cookies, headers)
+                errors += status != 200
+            return latencies, errors
+        return visitor
+
+    async def socket_visitor(self, app, messages):
+        cookies = {}
+        _, headers, _ = await harness.call_asgi(app, reverse('chat'), cookies=cookies)
+        harness.update_cookies(cookies, headers)
+        socket = harness.AsgiWebSocket(app, settings.CHAT_WEBSOCKET['PATH'], cookies)
+        if not await socket.connect():
+            return [], len(messages)
+        await socket.receive_json()  # ready
+        latencies, errors = [], 0
+        for message in messages:
+            started = time.perf_counter()
+            await socket.send_json({'type': 'message', 'text': message})
+            while True:
+                event = await socket.receive_json()
+                if event['type'] in ('done', 'error'):
+                    break
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += event['type'] == 'error'
+        await socket.close()
+        return latencies, errors
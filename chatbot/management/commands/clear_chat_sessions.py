@@ -0,0 +1,68 @@
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+# Keys the chatbot used to keep in the database session
+CHAT_SESSION_KEYS = {'survey_step', 'survey_data', 'language'}
+
+
+class Command(BaseCommand):
+    help = ("Removes session rows left behind by the old DB-backed chat state: expired rows, "
+            "rows holding nothing but chat keys, and chat keys inside other sessions")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help="Report what would change without writing")
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        batch_size = options['batch_size']
+
+        expired = Session.objects.filter(expire_date__lt=timezone.now())
+        expired_count = expired.count()
+        if not dry_run:
+            expired.delete()
+
+        deleted = stripped = scanned = 0
+        last_key = ''
+        store_class = Session.get_session_store_class()
+        while True:
+            # Keyset pagination: stable while rows are being deleted
+            batch = list(
+                Session.objects.filter(session_key__gt=last_key)
+                .order_by('session_key')
+                .values_list('session_key', 'session_data')[:batch_size]
+            )
+            if not batch:
+                break
+            last_key = batch[-1][0]
+            scanned += len(batch)
+
+            chat_only, to_strip = [], []
+            for key, data in batch:
+                decoded = store_class().decode(data)
+                keys = set(decoded)
+                if not keys & CHAT_SESSION_KEYS:
+                    continue
+                if keys <= CHAT_SESSION_KEYS:
+                    chat_only.append(key)  # anonymous chat visitor, nothing else to keep
+                else:
+                    to_strip.append((key, {k: v for k, v in decoded.items() if k not in CHAT_SESSION_KEYS}))
+            deleted += len(chat_only)
+            stripped += len(to_strip)
+            if dry_run:
+                continue
+
+            with transaction.atomic():
+                Session.objects.filter(session_key__in=chat_only).delete()
+                # Rewrite the data only, keeping each session's expiry
+                encoder = store_class()
+                for key, remaining in to_strip:
+                    Session.objects.filter(session_key=key).update(session_data=encoder.encode(remaining))
+
+        prefix = "Would remove" if dry_run else "Removed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {expired_count} expired sessions, {deleted} chat-only sessions "
+            f"and chat keys from {stripped} other sessions ({scanned} scanned)"
+        ))
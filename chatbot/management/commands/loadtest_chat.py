@@ -0,0 +1,347 @@
+import asyncio
+import copy
+import json
+import logging
+import random
+import re
+import tempfile
+import time
+import warnings
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.test import override_settings
+from django.urls import reverse
+
+from chatbot import audio_service, harness, intents, llm_client, response_cache, router
+from chatbot.constants import LANGUAGES
+from chatbot.llm_client import FALLBACK_REPLY, get_client, set_client
+from fake_services import clients as fake_clients
+from fake_services.profiles import PROFILES
+from fake_services.server import start as start_fakes
+from insurance_bot import metrics
+from insurance_bot.metrics import summarize
+
+# Popular questions come first; users pick them with Zipf-like weights, so
+# some repeat across users as they do in production
+GENERAL_QUESTIONS = {
+    'en': [
+        "What is term insurance?", "How does crop insurance work?", "What is sum assured?",
+        "What documents do I need for health insurance?", "Is there insurance for cattle?",
+        "What happens if I miss a premium payment?", "Can my wife be the nominee?",
+        "How is life insurance different from health insurance?", "What is PMJJBY?", "What is PMSBY?",
+        "Explain premium in simple words", "Is accident cover worth it for a daily wage worker?",
+        "Does health insurance cover hospital bills in a government hospital?",
+        "How much cover does a family of five need?", "What is a waiting period?",
+        "Is insurance money taxable?", "What is the free look period?", "Can I pay the premium monthly?",
+        "What does tractor insurance cover?",
+    ],
+    'hi': ["टर्म इंश्योरेंस क्या है?", "फसल बीमा कैसे काम करता है?", "स्वास्थ्य बीमा में क्या मिलता है?"],
+    'mr': ["आरोग्य विमा म्हणजे काय?", "पीक विमा कसा काम करतो?"],
+    'ta': ["பயிர் காப்பீடு என்றால் என்ன?"],
+}
+SURVEY_ANSWERS = {
+    'occupation': ["farmer", "shopkeeper", "driver", "teacher", "daily wage worker", "tailor"],
+    'income': ["80000", "2 lakh", "3.5 lakh", "6 lakh", "12 lakh"],
+    'vehicle': ["no", "yes, a bike", "tractor", "car"],
+}
+# Whole profiles in one message (the survey then needs no follow-up questions)
+ONE_SHOT_SURVEYS = {
+    'en': ["I am a 42 year old farmer, earn 2 lakh, have a tractor",
+           "shopkeeper, age 35, income 3.5 lakh, no vehicle",
+           "I'm a teacher, 29 years old, salary 6 lakh a year, I have a bike",
+           "driver aged 45, earning Rs 15000 a month, own a car"],
+    'hi': ["मैं 38 साल का किसान हूँ, आय 1.5 लाख, ट्रैक्टर है",
+           "मैं दुकानदार हूँ, उम्र 50 साल, कमाई 3 लाख, गाड़ी नहीं है"],
+}
+CSRF_RE = re.compile(r'data-csrf="([^"]+)"')
+SESSION_KINDS = ('general', 'survey', 'intent')
+
+
+def weighted_choice(rng, items):
+    return rng.choices(items, weights=[1 / (rank + 1) for rank in range(len(items))])[0]
+
+
+def intent_phrase(intent, lang):
+    keywords = intents.INTENT_KEYWORDS[intent]
+    return keywords.get(lang, keywords['en'])[0]
+
+
+class WsgiTarget:
+    """The WSGI app on a fixed pool of worker threads, like gunicorn --threads (queueing included)."""
+
+    def __init__(self, threads):
+        self.app = get_wsgi_application()
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='wsgi')
+
+    async def call(self, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, partial(harness.call_wsgi, self.app, *args, **kwargs))
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+
+class AsgiTarget:
+    """The ASGI app on this event loop, like one uvicorn worker."""
+
+    def __init__(self):
+        self.app = get_asgi_application()
+
+    async def call(self, *args, **kwargs):
+        return await harness.call_asgi(self.app, *args, **kwargs)
+
+    def close(self):
+        pass
+
+
+class Command(BaseCommand):
+    help = ("Simulates concurrent chat users (general questions, four-step surveys in several languages, "
+            "audio playback) against the WSGI and/or ASGI app with fake upstream services, and reports "
+            "throughput, p50/p95/p99 latency and error rates per route")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help="Concurrent simulated users")
+        parser.add_argument('--duration', type=float, default=30, help="Seconds per app")
+        parser.add_argument('--app', choices=('wsgi', 'asgi', 'both'), default='both')
+        parser.add_argument('--threads', type=int, default=8, help="WSGI worker threads")
+        parser.add_argument('--think', type=float, default=1.0,
+                            help="Mean think time between a user's requests (s, exponential)")
+        parser.add_argument('--languages', nargs='+', default=['en', 'hi', 'mr', 'ta', 'bn'])
+        parser.add_argument('--mix', type=float, nargs=3, default=(0.5, 0.35, 0.15),
+                            metavar=('GENERAL', 'SURVEY', 'INTENT'), help="Share of each session kind")
+        parser.add_argument('--audio-share', type=float, default=0.8, help="Share of replies played aloud")
+        parser.add_argument('--one-shot-share', type=float, default=0.0,
+                            help="Share of surveys answered in a single message")
+        parser.add_argument('--profile', choices=sorted(PROFILES), default='typical',
+                            help="Latency/error profile of the fake services")
+        parser.add_argument('--llm-latency', help="Override, e.g. 'lognormal:0.9:4' (p50, p99 in s)")
+        parser.add_argument('--llm-error-rate', type=float)
+        parser.add_argument('--tts-latency', help="Override, e.g. 'uniform:0.3:1'")
+        parser.add_argument('--tts-error-rate', type=float)
+        parser.add_argument('--burst', type=int, default=0,
+                            help="Extra users who all send --burst-message within --burst-window (an SMS campaign)")
+        parser.add_argument('--burst-message', default="PM Fasal Bima kya hai?")
+        parser.add_argument('--burst-at', type=float, default=5.0, help="Seconds into the run")
+        parser.add_argument('--burst-window', type=float, default=2.0, help="Seconds over which they arrive")
+        parser.add_argument('--single-flight', choices=('on', 'off'),
+                            help="Coalescing of identical concurrent prompts (default: settings)")
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        unknown = set(options['languages']) - set(LANGUAGES)
+        if unknown:
+            raise CommandError(f"Unknown languages: {', '.join(sorted(unknown))}")
+        self.options = options
+        apps = ('wsgi', 'asgi') if options['app'] == 'both' else (options['app'],)
+        self.paths = {name: reverse(name) for name in
+                      ('chat', 'set_language', 'get_response', 'speak_text', 'speak_stream')}
+
+        original_client, original_service = get_client(), audio_service.get_service()
+        # Injected upstream failures would print one line each
+        self.quiet = [logging.getLogger(name) for name in ('django.request', 'chatbot.llm_client')]
+        reports = []
+        try:
+            with warnings.catch_warnings():
+                # Async views streamed under WSGI (and file responses under ASGI) warn on every response
+                warnings.filterwarnings('ignore', message='StreamingHttpResponse must consume')
+                for app in apps:
+                    reports.append(self.run_app(app))
+        finally:
+            set_client(original_client)
+            audio_service.set_service(original_service)
+            for logger in self.quiet:
+                logger.disabled = False
+
+        for report in reports:
+            self.print_report(report)
+
+    # ==========================================
+    # 1. ONE RUN
+    # ==========================================
+    def run_app(self, app):
+        """Fresh fakes, caches and clients per app, so runs are comparable."""
+        options = self.options
+        server = start_fakes(profile=options['profile'])
+        services = {}
+        for service, prefix in (('gemini', 'llm'), ('tts', 'tts')):
+            changes = {}
+            if options[f'{prefix}_latency']:
+                changes['latency'] = options[f'{prefix}_latency']
+            if options[f'{prefix}_error_rate'] is not None:
+                changes['error_rate'] = options[f'{prefix}_error_rate']
+            if changes:
+                services[service] = changes
+        server.configure(services=services)
+
+        saved = {name: getattr(settings, name) for name in
+                 ('LLM_CLIENT', 'BHASHINI', 'AUDIO_SERVICE', 'TRANSLATION', 'FAKE_SERVICES')}
+        single_flight = dict(settings.LLM_SINGLE_FLIGHT)
+        if options['single_flight']:
+            single_flight['ENABLED'] = options['single_flight'] == 'on'
+        with tempfile.TemporaryDirectory() as cache_dir, override_settings(
+            AUDIO_CACHE=dict(settings.AUDIO_CACHE, DIR=cache_dir),
+            LLM_SINGLE_FLIGHT=single_flight,
+            **{name: copy.deepcopy(value) for name, value in saved.items()},  # wire() edits them in place
+        ):
+            fake_clients.wire(server.url)
+            set_client(None)  # rebuilt from settings, so the tiers are too
+            for tier in settings.LLM_ROUTER.get('TIERS', {}):
+                router.set_tier_client(tier, None)  # rebuilt against this run's fakes
+            metrics.reset()
+            audio_service.set_service(None)  # rebuilt from settings with the fake TTS backend
+            response_cache.purge()
+            target = WsgiTarget(options['threads']) if app == 'wsgi' else AsgiTarget()
+            for logger in self.quiet:
+                logger.disabled = True  # after the app is built: django.setup() reconfigures logging
+            try:
+                self.results = defaultdict(list)  # route -> [(latency_ms, status)]
+                self.sessions = Counter()
+                self.fallbacks = 0  # 200s carrying the "trouble connecting" reply
+                started = time.perf_counter()
+                asyncio.run(self.run_users(target, time.monotonic() + options['duration']))
+                elapsed = time.perf_counter() - started
+            finally:
+                target.close()
+                audio_service.get_service().shutdown()
+                server.shutdown()
+                server.server_close()
+        return (app, elapsed, self.results, self.sessions, self.fallbacks, server.stats()['counts'],
+                metrics.snapshot())
+
+    async def run_users(self, target, deadline):
+        options = self.options
+        burst_rng = random.Random(options['seed'] * 7919)
+        # As the ASGI lifespan does: LLM connections stay pooled on this loop for the run
+        async with llm_client.serving():
+            await asyncio.gather(
+                *(self.user(target, random.Random(options['seed'] * 100003 + i), deadline)
+                  for i in range(options['users'])),
+                *(self.burst_user(target, options['burst_at'] + burst_rng.uniform(0, options['burst_window']))
+                  for _ in range(options['burst'])),
+            )
+
+    async def user(self, target, rng, deadline):
+        # Stagger arrivals over the first think time
+        await asyncio.sleep(rng.uniform(0, self.options['think']))
+        while time.monotonic() < deadline:
+            await self.session(target, rng, deadline)
+
+    # ==========================================
+    # 2. SESSIONS
+    # ==========================================
+    async def session(self, target, rng, deadline):
+        """One visit: open the chat page, pick a language, then one kind of conversation."""
+        cookies = {}
+        lang = rng.choice(self.options['languages'])
+        status, body = await self.request(target, 'chat', cookies)
+        match = CSRF_RE.search(body.decode('utf-8', 'replace')) if status == 200 else None
+        if match and lang != 'en':
+            await self.request(
+                target, 'set_language', cookies, method='POST', body=json.dumps({'language': lang}).encode(),
+                headers={'Content-Type': 'application/json', 'X-CSRFToken': match.group(1)},
+            )
+
+        kind = rng.choices(SESSION_KINDS, weights=self.options['mix'])[0]
+        self.sessions[kind] += 1
+        if kind == 'general':
+            questions = GENERAL_QUESTIONS.get(lang, []) + GENERAL_QUESTIONS['en']
+            messages = [weighted_choice(rng, questions) for _ in range(rng.randint(1, 3))]
+        elif kind == 'survey' and rng.random() < self.options['one_shot_share']:
+            messages = [rng.choice(ONE_SHOT_SURVEYS.get(lang, ONE_SHOT_SURVEYS['en']))]
+        elif kind == 'survey':
+            messages = [
+                intent_phrase(intents.BUY, lang),
+                rng.choice(SURVEY_ANSWERS['occupation']),
+                str(rng.randint(18, 65)),
+                rng.choice(SURVEY_ANSWERS['income']),
+                rng.choice(SURVEY_ANSWERS['vehicle']),
+            ]
+        else:
+            messages = [intent_phrase(rng.choice((intents.CLAIM, intents.AGENT)), lang)]
+
+        for message in messages:
+            if time.monotonic() >= deadline:
+                return
+            await self.think(rng)
+            status, body = await self.request(target, 'get_response', cookies, query={'userMessage': message})
+            if status != 200:
+                continue
+            reply = json.loads(body).get('botResponse', '')
+            if reply == FALLBACK_REPLY:
+                self.fallbacks += 1
+            if rng.random() >= self.options['audio_share']:
+                continue
+            # Playback as chat.js does it: tags and markdown stripped, long replies streamed
+            text = audio_service.spoken_text(reply)
+            if len(text) >= 2:
+                route = 'speak_stream' if len(text) > 200 else 'speak_text'
+                await self.request(target, route, cookies, query={'text': text, 'lang': lang})
+
+    async def burst_user(self, target, at):
+        """Sends the campaign message once, `at` seconds in (straight from the link, no page load)."""
+        await asyncio.sleep(at)
+        self.sessions['burst'] += 1
+        status, body = await self.request(target, 'get_response', {},
+                                          query={'userMessage': self.options['burst_message']})
+        if status == 200 and json.loads(body).get('botResponse') == FALLBACK_REPLY:
+            self.fallbacks += 1
+
+    async def think(self, rng):
+        if self.options['think'] > 0:
+            await asyncio.sleep(rng.expovariate(1 / self.options['think']))
+
+    async def request(self, target, route, cookies, query=None, **kwargs):
+        started = time.perf_counter()
+        try:
+            status, headers, body = await target.call(self.paths[route], query, cookies, **kwargs)
+        except Exception:
+            status, headers, body = 599, [], b''  # the app itself raised
+        self.results[route].append(((time.perf_counter() - started) * 1000, status))
+        harness.update_cookies(cookies, headers)
+        return status, body
+
+    # ==========================================
+    # 3. REPORT
+    # ==========================================
+    def print_report(self, report):
+        app, elapsed, results, sessions, fallbacks, upstream, snapshot = report
+        options = self.options
+        total = sum(len(samples) for samples in results.values())
+        workers = f"{options['threads']} threads" if app == 'wsgi' else "1 event loop"
+        self.stdout.write(self.style.SUCCESS(
+            f"{app.upper()} ({workers}): {options['users']} users for {elapsed:.0f}s, think {options['think']}s, "
+            f"profile {options['profile']} -> {total / elapsed:.1f} req/s, "
+            f"sessions " + ", ".join(f"{kind}={sessions[kind]}" for kind in SESSION_KINDS + ('burst',)
+                                     if kind != 'burst' or sessions[kind])
+        ))
+        self.stdout.write(f"  {'route':<13} {'count':>6} {'req/s':>7} {'p50 ms':>9} {'p95 ms':>9} "
+                          f"{'p99 ms':>9} {'errors':>7}")
+        for route in self.paths:
+            samples = results.get(route, [])
+            if not samples:
+                continue
+            s = summarize(ms for ms, status in samples)
+            errors = Counter(status for _, status in samples if status >= 400)
+            detail = ' '.join(f"{status}x{count}" for status, count in sorted(errors.items()))
+            if route == 'get_response' and fallbacks:
+                detail += f" (+{fallbacks} fallback replies)"
+            self.stdout.write(
+                f"  {route:<13} {len(samples):>6} {len(samples) / elapsed:>7.1f} {s['p50']:>9} {s['p95']:>9} "
+                f"{s['p99']:>9} {sum(errors.values()) / len(samples):>7.1%} {detail}"
+            )
+        calls = ', '.join(f"{name}={count}" for name, count in sorted(upstream.items()) if name != 'connections')
+        self.stdout.write(f"  upstream calls: {calls or 'none'}")
+        round_trips = snapshot['histograms'].get('chat.survey.round_trips')
+        if round_trips:
+            self.stdout.write(f"  surveys completed: {round_trips['count']}, "
+                              f"round trips mean={round_trips['mean']} p95={round_trips['p95']}")
+        coalesced = {name.rsplit('.', 1)[1]: count for name, count in snapshot['counters'].items()
+                     if name.startswith('llm.single_flight.')}
+        if coalesced:
+            self.stdout.write("  single-flight: " + ', '.join(f"{name}={count}" for name, count in sorted(coalesced.items())))
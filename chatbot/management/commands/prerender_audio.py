@@ -0,0 +1,121 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+
+from accounts import views as account_views
+from chatbot import audio_cache, audio_service, views as chat_views
+from chatbot.constants import CHAT_GREETINGS, INTENT_REPLIES, SURVEY_QUESTIONS
+
+def _localized(table, lang):
+    return table.get(lang, table['en'])
+
+
+def chat_prompts(languages):
+    """(source, text, lang) for every fixed message the chat page speaks."""
+    for code, greeting in CHAT_GREETINGS.items():
+        if code.split('-')[0] in languages:
+            yield 'chat.greeting', greeting, code.split('-')[0]
+    for lang in languages:
+        yield 'chat.survey_opening', chat_views.survey_opening(lang), lang
+        for script in _localized(chat_views.SURVEY_SCRIPTS, lang)[1:]:
+            yield 'chat.survey_script', script, lang
+        for question in SURVEY_QUESTIONS.get(lang, [])[1:]:
+            yield 'chat.survey_question', question, lang
+        yield 'chat.no_eligible_product', _localized(chat_views.NO_ELIGIBLE_PRODUCT, lang), lang
+        for intent, replies in INTENT_REPLIES.items():
+            yield f'chat.intent.{intent}', _localized(replies, lang), lang
+
+
+def onboarding_prompts(languages):
+    """(source, text, lang) for the onboarding wizard, which sends full codes like hi-IN."""
+    def localized(source, table):
+        for code, text in table.items():
+            lang = audio_service.normalize_lang(code)
+            if lang in languages:
+                yield source, text, lang
+
+    for question in account_views.ONBOARDING_QUESTIONS:
+        field = question['field']
+        yield from localized(f'onboarding.{field}', question['questions'])
+        yield from localized(f'onboarding.{field}.error', question['error_msg'])
+    yield from localized('onboarding.type_manually', account_views.TYPE_MANUALLY)
+
+
+class Command(BaseCommand):
+    help = ("Synthesizes every fixed voice prompt (survey, greetings, intent replies, onboarding) "
+            "in every supported language into the audio cache, and pins them with a manifest")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Parallel TTS requests")
+        parser.add_argument('--languages', nargs='+', help="Only these language codes (default: all)")
+        parser.add_argument('--force', action='store_true', help="Re-synthesize prompts already on disk")
+        parser.add_argument('--prune', action='store_true',
+                            help="Delete audio of prompts no longer in the manifest (text changed or removed)")
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be rendered without writing")
+
+    def handle(self, *args, **options):
+        languages = set(options['languages'] or chat_views.LANGUAGES)
+
+        # Deduplicate by key: the same sentence may be reachable from several places
+        prompts = {}
+        for source, text, lang in [*chat_prompts(languages), *onboarding_prompts(languages)]:
+            text = audio_cache.normalize_text(audio_service.spoken_text(text))
+            if len(text) < 2:
+                continue
+            key = audio_cache.audio_key(text, lang)
+            prompts.setdefault(key, {'text': text, 'lang': lang, 'voice': audio_cache.DEFAULT_VOICE,
+                                     'source': source})
+
+        todo = [key for key in prompts if options['force'] or not audio_cache.path_for(key).exists()]
+        old = audio_cache.load_manifest()
+        stale = [key for key in old if key not in prompts] if not options['languages'] else []
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f"Would render {len(todo)} of {len(prompts)} prompts ({len(prompts) - len(todo)} already cached); "
+                f"{len(stale)} manifest entries are stale"
+            ))
+            return
+
+        started = time.monotonic()
+        failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            futures = {
+                pool.submit(self.render, key, prompts[key]): key
+                for key in todo
+            }
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"  failed [{prompts[key]['lang']}] {prompts[key]['source']}: {e}")
+
+        # Incremental: entries for other languages survive a --languages run
+        entries = {key: entry for key, entry in old.items() if key not in stale}
+        for key, entry in prompts.items():
+            path = audio_cache.path_for(key)
+            if path.exists():
+                entries[key] = dict(entry, bytes=path.stat().st_size)
+        if options['prune']:
+            for key in stale:
+                audio_cache.path_for(key).unlink(missing_ok=True)
+        else:
+            # Keep stale files pinned until --prune so a rollback still finds them
+            entries.update({key: old[key] for key in stale})
+        audio_cache.save_manifest(entries)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {len(todo) - failed} prompts, skipped {len(prompts) - len(todo)} already cached, "
+            f"{failed} failed in {elapsed:.1f}s with {options['workers']} workers"
+        ))
+        pruned = "pruned" if options['prune'] else "kept (use --prune to delete)"
+        self.stdout.write(f"Manifest: {len(entries)} pinned prompts, {len(stale)} stale {pruned}")
+
+    def render(self, key, entry):
+        synthesize = audio_service.get_service().backends[entry['voice']]
+        audio = synthesize(entry['text'], entry['lang'])
+        audio_cache.store(key, audio)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from chatbot import response_cache
+
+
+class Command(BaseCommand):
+    help = ("Drops every cached general-chat answer on all workers, e.g. after a product or FAQ "
+            "correction; new answers are cached as they are asked")
+
+    def handle(self, *args, **options):
+        version = response_cache.purge()
+        self.stdout.write(self.style.SUCCESS(
+            f"Chatbot response cache purged (version {version}); every worker stops serving "
+            f"the old answers within a few seconds"
+        ))
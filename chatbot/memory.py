@@ -0,0 +1,214 @@
+"""
+Bounded conversation memory for general chat.
+
+Follow-ups ("and for my parents?") need the earlier turns, but sending the
+whole history makes every prompt, and so every turn, slower the longer a
+conversation runs. The memory keeps the last RECENT_TURNS turns verbatim
+(replies clipped to TURN_TOKENS) and folds older turns into a rolling
+summary of one line per turn (the question and the first sentence of the
+answer), dropping its oldest lines past SUMMARY_TOKENS. `build_prompt`
+then fits instructions, summary, recent turns and the new message into
+MAX_PROMPT_TOKENS, giving up the oldest context first.
+
+The summary is extractive, so folding costs no extra LLM call. Memory is
+keyed by the visitor's id and expires after IDLE_TIMEOUT seconds without
+a turn. With the cache chat state store it lives in the same (shared)
+cache alias; otherwise in the visitor's ChatSession row, so every worker
+sees it. It cannot ride in the state cookie: it is too large, and a
+streamed turn is remembered after the response headers are sent.
+"""
+import json
+import logging
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError
+from django.utils import timezone
+
+from insurance_bot import metrics
+
+from . import chat_state
+from .llm_client import estimate_tokens
+from .models import ChatSession
+
+logger = logging.getLogger(__name__)
+
+VERSION = 1
+
+_TAGS_RE = re.compile(r'<[^>]+>')
+_FIRST_SENTENCE_RE = re.compile(r'^(.+?[.!?।])(\s|$)')
+_QUESTION_END_RE = re.compile(r'\?\W*$')
+
+INSTRUCTIONS = """
+    You are BimaSakhi (Insurance Agent).
+    {context}User: "{user_msg}"
+    Answer in {language_name}. Be helpful, empathetic, and concise.{follow_up}
+    If the user seems interested in buying, ask: "Shall I suggest a plan for you?"
+    """
+FOLLOW_UP = " The user may refer to earlier turns; use them for context."
+
+
+def _config():
+    config = {
+        'RECENT_TURNS': 4,
+        'TURN_TOKENS': 120,
+        'SUMMARY_TOKENS': 200,
+        'MAX_PROMPT_TOKENS': 900,
+        'IDLE_TIMEOUT': 2 * 60 * 60,
+    }
+    config.update(getattr(settings, 'CHAT_MEMORY', {}))
+    return config
+
+
+def clip(text, max_tokens):
+    """`text` cut at a word boundary to at most `max_tokens` (estimated)."""
+    text = ' '.join(text.split())
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    words = text.split(' ')
+    low, high = 0, len(words)  # longest prefix of words that fits
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(' '.join(words[:mid]) + ' …') <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return ' '.join(words[:low]) + ' …' if low else ''
+
+
+def plain(text):
+    """Reply text without HTML (recommendation cards) or markdown emphasis."""
+    return ' '.join(_TAGS_RE.sub(' ', text).replace('**', '').split())
+
+
+class Memory:
+    def __init__(self, summary=None, turns=None, asked=False):
+        self.summary = list(summary or [])  # one line per folded turn, oldest first
+        self.turns = [tuple(turn) for turn in turns or []]  # (user, reply), oldest first
+        # The last reply ended with a question; kept apart since clipping may cut it off
+        self.asked = asked
+
+    def __bool__(self):
+        return bool(self.summary or self.turns)
+
+    def encode(self):
+        encoded = [VERSION, self.summary, self.turns]
+        if self.asked:
+            encoded.append(1)
+        return json.dumps(encoded, ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def decode(cls, raw):
+        try:
+            version, summary, turns, *rest = json.loads(raw)
+        except (TypeError, ValueError):
+            return cls()
+        return cls(summary, turns, bool(rest and rest[0])) if version == VERSION else cls()
+
+    def add(self, user_msg, reply):
+        config = _config()
+        self.asked = bool(_QUESTION_END_RE.search(plain(reply)))
+        self.turns.append((clip(user_msg, config['TURN_TOKENS']), clip(plain(reply), config['TURN_TOKENS'])))
+        while len(self.turns) > config['RECENT_TURNS']:
+            self.fold(*self.turns.pop(0))
+        while self.summary and estimate_tokens('\n'.join(self.summary)) > config['SUMMARY_TOKENS']:
+            self.summary.pop(0)
+
+    def fold(self, user_msg, reply):
+        match = _FIRST_SENTENCE_RE.match(reply)
+        gist = match.group(1) if match else reply
+        self.summary.append(clip(f"- Asked: {user_msg} Told: {gist}", _config()['TURN_TOKENS'] // 2))
+
+
+def _context(summary, turns):
+    parts = []
+    if summary:
+        parts.append("Earlier in this conversation:\n" + '\n'.join(summary))
+    if turns:
+        parts.append("Recent turns:\n" + '\n'.join(f'User: "{u}"\nBimaSakhi: {r}' for u, r in turns))
+    return '\n'.join(parts) + '\n' if parts else ''
+
+
+def build_prompt(user_msg, language_name, memory=None):
+    """
+    The general-chat prompt within MAX_PROMPT_TOKENS: drops summary lines,
+    then the oldest recent turns, then clips the message itself. Without
+    memory it is the plain single-turn prompt.
+    """
+    budget = _config()['MAX_PROMPT_TOKENS']
+    memory = memory or Memory()
+    summary, turns = list(memory.summary), list(memory.turns)
+
+    def render(message):
+        return INSTRUCTIONS.format(
+            context=_context(summary, turns), user_msg=message, language_name=language_name,
+            follow_up=FOLLOW_UP if summary or turns else '',
+        )
+
+    prompt = render(user_msg)
+    while estimate_tokens(prompt) > budget and (turns or summary):
+        (summary if summary else turns).pop(0)
+        prompt = render(user_msg)
+    if estimate_tokens(prompt) > budget:
+        overhead = estimate_tokens(render(''))
+        prompt = render(clip(user_msg, max(1, budget - overhead)))
+    metrics.observe('chat.prompt_tokens.general', estimate_tokens(prompt))
+    metrics.observe('chat.memory.turns', len(turns) + len(summary))
+    return prompt
+
+
+# ==========================================
+# STORAGE
+# ==========================================
+def _cache():
+    return caches[chat_state.CACHE_ALIAS]
+
+
+def _in_cache():
+    return chat_state._store() == 'cache'
+
+
+def _cache_key(key):
+    return f"chatmem:{key}"
+
+
+async def aload(key):
+    """The memory of visitor `key` (empty for new visitors)."""
+    if not key:
+        return Memory()
+    if _in_cache():
+        return Memory.decode(await _cache().aget(_cache_key(key)))
+    since = timezone.now() - timedelta(seconds=_config()['IDLE_TIMEOUT'])
+    raw = await ChatSession.objects.filter(key=key, memory_at__gte=since).values_list('memory', flat=True).afirst()
+    return Memory.decode(raw)
+
+
+async def aremember(key, user_msg, reply, language=chat_state.DEFAULT_LANGUAGE):
+    """Adds one turn to visitor `key`'s memory. Best effort: the reply is already out."""
+    if not key:
+        return
+    memory = await aload(key)
+    memory.add(user_msg, reply)
+    if _in_cache():
+        await _cache().aset(_cache_key(key), memory.encode(), _config()['IDLE_TIMEOUT'])
+        return
+    # One upsert statement: the transcript buffer may not have created the row yet
+    session = ChatSession(key=key, language=language, memory=memory.encode(), memory_at=timezone.now())
+    try:
+        await ChatSession.objects.abulk_create(
+            [session], update_conflicts=True, unique_fields=['key'], update_fields=['memory', 'memory_at'],
+        )
+    except DatabaseError:
+        logger.warning("Could not remember a turn of %s", key[:8], exc_info=True)
+        metrics.incr('chat.memory.write_failed')
+
+
+def forget(key):
+    if not key:
+        return
+    if _in_cache():
+        _cache().delete(_cache_key(key))
+    else:
+        ChatSession.objects.filter(key=key).exclude(memory='').update(memory='', memory_at=None)
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 22:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0002_contentversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='memory',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='chatsession',
+            name='memory_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import models
+from django.utils import timezone
+
+# ==========================================
+# 1. CHAT TRANSCRIPTS
+# ==========================================
+class ChatSession(models.Model):
+    """One chat visitor, identified by the chat state cookie id."""
+    key = models.CharField(max_length=64, unique=True)
+    language = models.CharField(max_length=5, default='en')
+    started_at = models.DateTimeField(default=timezone.now)
+    # Conversation memory (chatbot/memory.py) when there is no shared cache
+    memory = models.TextField(blank=True)
+    memory_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Chat {self.key[:8]} ({self.language})"
+
+
+class ChatMessage(models.Model):
+    """
+    One chat turn side. Rows are written in batches by chatbot/transcripts.py,
+    so `created_at` is the time of the message, not of the insert.
+    """
+    ROLE_CHOICES = [
+        ('user', 'User'),
+        ('bot', 'Bot'),
+    ]
+
+    session = models.ForeignKey(ChatSession, on_delete=models.CASCADE, related_name='messages')
+    role = models.CharField(max_length=4, choices=ROLE_CHOICES)
+    text = models.TextField()
+    language = models.CharField(max_length=5, default='en')
+    intent = models.CharField(max_length=20, blank=True)
+    latency_ms = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [models.Index(fields=['session', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.get_role_display()}: {self.text[:50]}"
+
+
+# ==========================================
+# 2. SHARED CONTENT VERSIONS (chatbot/versions.py)
+# ==========================================
+class ContentVersion(models.Model):
+    """Bumped when derived in-memory data (recommendation table, knowledge index) goes stale."""
+    name = models.CharField(max_length=50, unique=True)
+    version = models.PositiveIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
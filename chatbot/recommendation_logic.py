@@ -1,3 +1,11 @@
+import re
+import unicodedata
+
+from django.db.models import Case, IntegerField, Value, When
+
+from insurance.models import InsuranceProduct
+
+
 def generate_recommendations(answers):
     recommendations = set()
     if answers.get('q1') == 'My Family': recommendations.add('HEALTH'); recommendations.add('LIFE')
@@ -6,4 +14,144 @@ def generate_recommendations(answers):
     if answers.get('q2') == 'Business Owner': recommendations.add('PROPERTY')
     if answers.get('q4') == 'Yes': recommendations.add('VEHICLE')
     if not recommendations: recommendations.add('HEALTH')
-    return list(recommendations)
\ No newline at end of file
+    return list(recommendations)
+
+# ==========================================
+# SHORTLIST FOR THE CHAT SURVEY
+# ==========================================
+# The chat survey stores free text under occupation/age/income/vehicle.
+# Hard eligibility and ranking run in the database, so only the top few
+# products reach the LLM prompt regardless of catalog size.
+SHORTLIST_SIZE = 5
+
+FARMING_WORDS = [
+    'farm', 'farmer', 'farming', 'agri', 'agriculture', 'kisan', 'kisaan', 'krishi', 'dairy', 'cattle',
+    'किसान', 'खेती', 'कृषि', 'शेतकरी', 'शेती', 'ખેડૂત', 'ખેતી', 'কৃষক', 'চাষ', 'விவசாய',
+    'రైతు', 'వ్యవసాయ', 'ರೈತ', 'ಕೃಷಿ', 'കർഷക', 'കൃഷി', 'ਕਿਸਾਨ', 'ਖੇਤੀ', 'पशुपालन',
+]
+VEHICLE_WORDS = [
+    'car', 'bike', 'scooter', 'tractor', 'truck', 'auto', 'motorcycle', 'jeep', 'tempo',
+    'कार', 'बाइक', 'ट्रैक्टर', 'ट्रॅक्टर', 'गाड़ी', 'गाडी', 'ટ્રેક્ટર', 'ট্রাক্টর', 'டிராக்டர்',
+    'ట్రాక్టర్', 'ಟ್ರ್ಯಾಕ್ಟರ್', 'ട്രാക്ടർ', 'ਟਰੈਕਟਰ',
+]
+YES_WORDS = [
+    'yes', 'y', 'haan', 'han', 'ha', 'ho', 'ji',
+    'हाँ', 'हां', 'होय', 'હા', 'হ্যাঁ', 'ஆம்', 'అవును', 'ಹೌದು', 'അതെ', 'ਹਾਂ',
+]
+NO_WORDS = [
+    'no', 'nahi', 'nahin', 'none', 'nope',
+    'नहीं', 'नही', 'नाही', 'ના', 'না', 'இல்லை', 'లేదు', 'ಇಲ್ಲ', 'ഇല്ല', 'ਨਹੀਂ',
+]
+
+
+# Multipliers for amounts such as "5 lakhs", "2.5 लाख", "1 crore", "50k"
+AMOUNT_UNITS = {
+    'thousand': 10**3, 'k': 10**3, 'हजार': 10**3, 'हज़ार': 10**3, 'હજાર': 10**3, 'হাজার': 10**3,
+    'ஆயிரம்': 10**3, 'వేలు': 10**3, 'ಸಾವಿರ': 10**3, 'ആയിരം': 10**3, 'ਹਜ਼ਾਰ': 10**3,
+    'lakh': 10**5, 'lakhs': 10**5, 'lac': 10**5, 'lacs': 10**5, 'l': 10**5, 'लाख': 10**5, 'લાખ': 10**5,
+    'লাখ': 10**5, 'லட்சம்': 10**5, 'లక్ష': 10**5, 'ಲಕ್ಷ': 10**5, 'ലക്ഷം': 10**5, 'ਲੱਖ': 10**5,
+    'crore': 10**7, 'crores': 10**7, 'cr': 10**7, 'करोड़': 10**7, 'करोड': 10**7, 'कोटी': 10**7,
+    'કરોડ': 10**7, 'কোটি': 10**7, 'கோடி': 10**7, 'కోటి': 10**7, 'ಕೋಟಿ': 10**7, 'കോടി': 10**7, 'ਕਰੋੜ': 10**7,
+}
+_UNITS_LONGEST_FIRST = sorted(AMOUNT_UNITS, key=len, reverse=True)
+
+
+def _ascii_digits(text):
+    return ''.join(str(unicodedata.digit(ch)) if unicodedata.category(ch) == 'Nd' else ch for ch in text)
+
+
+def _has_word(text, words):
+    """ASCII words must match whole words; Indic words match as substrings."""
+    text = text.lower()
+    for word in words:
+        if word.isascii():
+            if re.search(rf'\b{re.escape(word)}\b', text):
+                return True
+        elif word in text:
+            return True
+    return False
+
+
+def parse_age(text):
+    match = re.search(r'\d+', text or '')  # \d also matches Devanagari/other Indic digits
+    return int(match.group()) if match else None
+
+
+def parse_income(text):
+    """
+    Annual income in rupees from free text: "50,000", "2,50,000",
+    "5 lakhs", "2.5 लाख", "१ करोड़", "80k". Returns None if no number.
+    """
+    text = _ascii_digits((text or '').lower())
+    match = re.search(r'\d[\d,]*(?:\.\d+)?', text)
+    if not match:
+        return None
+    value = float(match.group().replace(',', ''))
+    return int(value * (amount_unit(text[match.end():]) or 1))
+
+
+def amount_unit(rest):
+    """Multiplier of the unit that `rest` (the text after a number) starts with, or None."""
+    rest = rest.lstrip(' .-')
+    for unit in _UNITS_LONGEST_FIRST:
+        if rest.startswith(unit):
+            after = rest[len(unit):len(unit) + 1]
+            # ASCII units must end at a word boundary ("l" must not match "lots")
+            if unit.isascii() and after.isalpha():
+                continue
+            return AMOUNT_UNITS[unit]
+    return None
+
+
+def is_farming(occupation):
+    return _has_word(occupation or '', FARMING_WORDS)
+
+
+def owns_vehicle(answer):
+    answer = answer or ''
+    if _has_word(answer, VEHICLE_WORDS):
+        return not _has_word(answer, NO_WORDS)
+    return _has_word(answer, YES_WORDS) and not _has_word(answer, NO_WORDS)
+
+
+def survey_to_answers(survey_data):
+    """Maps chat survey answers onto the questionnaire keys used above."""
+    return {
+        'q1': 'Myself',
+        'q2': 'Farmer' if is_farming(survey_data.get('occupation')) else '',
+        'q4': 'Yes' if owns_vehicle(survey_data.get('vehicle')) else 'No',
+    }
+
+
+def shortlist_queryset(survey_data, k=SHORTLIST_SIZE):
+    """
+    Eligible active products for the profile, best first, limited to `k`.
+    Hard rules: entry-age window, VEHICLE only for vehicle owners,
+    CROP/LIVESTOCK only for farming occupations. Ranking prefers the
+    categories from generate_recommendations, then the lower premium.
+    """
+    products = InsuranceProduct.objects.filter(is_active=True)
+
+    age = parse_age(survey_data.get('age'))
+    if age is not None:
+        products = products.filter(min_entry_age__lte=age, max_entry_age__gte=age)
+    if not owns_vehicle(survey_data.get('vehicle')):
+        products = products.exclude(product_type='VEHICLE')
+    if not is_farming(survey_data.get('occupation')):
+        products = products.exclude(product_type__in=['CROP', 'LIVESTOCK'])
+
+    preferred = generate_recommendations(survey_to_answers(survey_data))
+    return (
+        products
+        .annotate(match=Case(
+            When(product_type__in=preferred, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        ))
+        .order_by('-match', 'base_premium', 'id')
+        .values('id', 'name', 'base_premium', 'description')[:k]
+    )
+
+
+def shortlist_products(survey_data, k=SHORTLIST_SIZE):
+    return list(shortlist_queryset(survey_data, k))
@@ -0,0 +1,210 @@
+"""
+Deterministic, local policy recommendation for the chat survey.
+
+Survey answers are parsed into typed features and bucketed. The best
+product for every bucket is precomputed from the active catalog, so a
+recommendation is a dictionary lookup. The table is rebuilt lazily after
+any InsuranceProduct change (see chatbot.signals); a version number in the
+database (chatbot.versions) lets every worker notice the change.
+
+Age buckets are cut at the catalog's own entry-age limits, so eligibility
+is exact for every age inside a bucket.
+"""
+import bisect
+import threading
+from collections import namedtuple
+
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+
+from insurance.models import InsuranceProduct
+
+from . import versions
+from .constants import RECOMMENDATION_REASONS
+from .recommendation_logic import (
+    generate_recommendations, is_farming, owns_vehicle, parse_age, parse_income,
+)
+
+CATALOG_VERSION = 'catalog'
+
+# Annual income bands in rupees; a plan is "affordable" if its premium is
+# at most AFFORDABLE_SHARE of the band's lower bound. The lowest band's
+# bound is 0, so it gets LOWEST_BAND_BUDGET (5% of a 50,000 income) instead.
+INCOME_BANDS = [0, 100000, 300000, 1000000]
+AFFORDABLE_SHARE = 0.05
+LOWEST_BAND_BUDGET = 2500
+
+# Structured output asked of the LLM when enrichment is on; the card itself
+# is always rendered here from the catalog row.
+RECOMMENDATION_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "product_id": {"type": "INTEGER"},
+        "reason": {"type": "STRING"},
+    },
+    "required": ["product_id", "reason"],
+}
+MAX_REASON_CHARS = 400
+
+ProfileFeatures = namedtuple('ProfileFeatures', 'age income farmer vehicle_owner')
+Product = namedtuple('Product', 'id name product_type base_premium min_entry_age max_entry_age')
+
+
+# ==========================================
+# 1. FEATURES & BUCKETS
+# ==========================================
+def extract_features(survey_data):
+    return ProfileFeatures(
+        age=parse_age(survey_data.get('age')),
+        income=parse_income(survey_data.get('income')),
+        farmer=is_farming(survey_data.get('occupation')),
+        vehicle_owner=owns_vehicle(survey_data.get('vehicle')),
+    )
+
+
+def income_band(income):
+    """Index into INCOME_BANDS, or -1 if the income is unknown."""
+    if income is None:
+        return -1
+    return bisect.bisect_right(INCOME_BANDS, income) - 1
+
+
+def budget_for(band):
+    """Highest affordable annual premium for the band, or None if the income is unknown."""
+    if band < 0:
+        return None
+    if band == 0:
+        return LOWEST_BAND_BUDGET
+    return INCOME_BANDS[band] * AFFORDABLE_SHARE
+
+
+# ==========================================
+# 2. PRECOMPUTED TABLE
+# ==========================================
+class RecommendationTable:
+    def __init__(self, products):
+        self.products = {p.id: p for p in products}
+        # Eligibility only changes at these ages
+        self.age_breaks = sorted({p.min_entry_age for p in products} | {p.max_entry_age + 1 for p in products})
+        self.best = {}
+        for age_bucket, age in enumerate(self.age_breaks):
+            for band in range(-1, len(INCOME_BANDS)):
+                for farmer in (False, True):
+                    for vehicle_owner in (False, True):
+                        key = (age_bucket, band, farmer, vehicle_owner)
+                        self.best[key] = self._pick(products, age, band, farmer, vehicle_owner)
+
+    @classmethod
+    def from_catalog(cls):
+        rows = InsuranceProduct.objects.filter(is_active=True).values_list(*Product._fields)
+        return cls([Product(*row) for row in rows])
+
+    def bucket(self, features):
+        """Table key for the profile, or None if the age is unknown or below every product."""
+        if features.age is None:
+            return None
+        age_bucket = bisect.bisect_right(self.age_breaks, features.age) - 1
+        if age_bucket < 0:
+            return None
+        return (age_bucket, income_band(features.income), features.farmer, features.vehicle_owner)
+
+    def lookup(self, features):
+        key = self.bucket(features)
+        product_id = self.best.get(key) if key else None
+        return self.products.get(product_id)
+
+    @staticmethod
+    def _pick(products, age, band, farmer, vehicle_owner):
+        # Same hard rules and category preference as shortlist_queryset(), but a
+        # plan the income band can afford beats a preferred one it cannot
+        preferred = set(generate_recommendations({
+            'q1': 'Myself',
+            'q2': 'Farmer' if farmer else '',
+            'q4': 'Yes' if vehicle_owner else 'No',
+        }))
+        budget = budget_for(band)
+
+        best, best_rank = None, None
+        for p in products:
+            if not p.min_entry_age <= age <= p.max_entry_age:
+                continue
+            if p.product_type == 'VEHICLE' and not vehicle_owner:
+                continue
+            if p.product_type in ('CROP', 'LIVESTOCK') and not farmer:
+                continue
+            affordable = budget is None or p.base_premium <= budget
+            rank = (not affordable, p.product_type not in preferred, p.base_premium, p.id)
+            if best_rank is None or rank < best_rank:
+                best, best_rank = p.id, rank
+        return best
+
+
+_table = None
+_table_version = None
+_table_lock = threading.Lock()
+
+
+def catalog_version():
+    return versions.get(CATALOG_VERSION)
+
+
+def invalidate():
+    """Called when the catalog changes; every worker rebuilds on next use."""
+    global _table
+    _table = None
+    versions.bump(CATALOG_VERSION)
+
+
+def get_table():
+    global _table, _table_version
+    version = catalog_version()
+    if _table is None or _table_version != version:
+        with _table_lock:
+            if _table is None or _table_version != version:
+                _table = RecommendationTable.from_catalog()
+                _table_version = version
+    return _table
+
+
+# ==========================================
+# 3. RECOMMEND & RENDER
+# ==========================================
+def recommend(survey_data):
+    """Best eligible product (a `Product` tuple) for the survey, or None."""
+    return get_table().lookup(extract_features(survey_data))
+
+
+def reason_for(product, lang_code):
+    reasons = RECOMMENDATION_REASONS.get(product.product_type, RECOMMENDATION_REASONS['HEALTH'])
+    return reasons.get(lang_code, reasons['en'])
+
+
+def render_card(product, reason):
+    return render_to_string('chatbot/policy_card.html', {'product': product, 'reason': reason}).strip()
+
+
+def recommend_card(survey_data, lang_code):
+    """Rendered policy card HTML for the survey, or None if nothing is eligible."""
+    product = recommend(survey_data)
+    if product is None:
+        return None
+    return render_card(product, reason_for(product, lang_code))
+
+
+def validate_choice(data, products):
+    """
+    Checks the LLM's {"product_id", "reason"} against the shortlisted
+    `products` (dicts with an 'id'). Returns (product, reason) or None.
+    """
+    try:
+        product_id = int(data.get('product_id'))
+    except (TypeError, ValueError):
+        return None
+    product = next((p for p in products if p['id'] == product_id), None)
+    reason = data.get('reason')
+    if product is None or not isinstance(reason, str):
+        return None
+    reason = strip_tags(reason).strip()[:MAX_REASON_CHARS]
+    if not reason:
+        return None
+    return product, reason
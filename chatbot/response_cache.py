@@ -0,0 +1,85 @@
+"""
+Cache of general-chat answers, keyed on the normalized question and language.
+
+Most traffic is the same few dozen questions asked with small variations
+("What is crop insurance?", "what is crop insurance"), so the key is built
+from a case-folded, punctuation- and whitespace-free form of the message with
+Indic digits mapped to ASCII. Entries live in the `chat_responses` cache
+alias, whose TIMEOUT and MAX_ENTRIES give the TTL and LRU bound.
+
+Keys carry a version shared by every worker (chatbot/versions.py), since
+the default alias is per process: `purge` bumps it, so no worker serves
+an entry cached before the purge (after at most versions.CHECK_INTERVAL),
+and the old entries age out.
+"""
+import hashlib
+import unicodedata
+
+from django.core.cache import caches
+
+from insurance_bot import metrics
+
+from . import versions
+
+CACHE_ALIAS = 'chat_responses'
+RESPONSES_VERSION = 'chat_responses'
+
+
+def normalize_message(text):
+    """Canonical form of a chat message used for cache lookups."""
+    text = unicodedata.normalize('NFKC', text).casefold()
+    out = []
+    for ch in text:
+        category = unicodedata.category(ch)
+        if category == 'Nd':
+            out.append(str(unicodedata.digit(ch)))  # ४२ / ৪২ / ௪௨ -> 42
+        elif category[0] in 'LMN':
+            out.append(ch)  # letters, Indic vowel signs/viramas, other numerals
+        # punctuation, symbols and whitespace are dropped
+    return ''.join(out)
+
+
+def cache_key(message, lang_code, version=0):
+    digest = hashlib.sha1(normalize_message(message).encode('utf-8')).hexdigest()
+    return f"chat:{version}:{lang_code}:{digest}"
+
+
+def get(message, lang_code):
+    reply = caches[CACHE_ALIAS].get(cache_key(message, lang_code, versions.get(RESPONSES_VERSION)))
+    metrics.incr('chat.response_cache.hit' if reply is not None else 'chat.response_cache.miss')
+    return reply
+
+
+def set(message, lang_code, reply):
+    if not normalize_message(message):
+        return
+    caches[CACHE_ALIAS].set(cache_key(message, lang_code, versions.get(RESPONSES_VERSION)), reply)
+
+
+async def aget(message, lang_code):
+    key = cache_key(message, lang_code, await versions.aget(RESPONSES_VERSION))
+    reply = await caches[CACHE_ALIAS].aget(key)
+    metrics.incr('chat.response_cache.hit' if reply is not None else 'chat.response_cache.miss')
+    return reply
+
+
+async def aset(message, lang_code, reply):
+    if not normalize_message(message):
+        return
+    key = cache_key(message, lang_code, await versions.aget(RESPONSES_VERSION))
+    await caches[CACHE_ALIAS].aset(key, reply)
+
+
+def purge():
+    """Drops every cached answer, on all workers; returns the new version."""
+    version = versions.bump(RESPONSES_VERSION)
+    caches[CACHE_ALIAS].clear()  # frees this process's memory at once
+    metrics.incr('chat.response_cache.purge')
+    return version
+
+
+def stats():
+    hits = metrics.get_counter('chat.response_cache.hit')
+    misses = metrics.get_counter('chat.response_cache.miss')
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_ratio': round(hits / total, 3) if total else 0.0}
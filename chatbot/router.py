@@ -0,0 +1,274 @@
+"""
+Cost/latency-aware routing of general-chat turns to a model tier.
+
+`classify` looks only at the message (no model call) and picks:
+
+- LOCAL for greetings, thanks, acknowledgements and goodbyes ("hi",
+  "ok thanks ji", "धन्यवाद"), answered from SMALL_TALK_REPLIES, unless
+  the previous reply asked something ("Shall I suggest a plan?"): then
+  "ok" is an answer and goes to a model with the conversation;
+- FAST for short questions (at most FAST_MAX_WORDS words, no advice
+  markers), sent to the smaller model of LLM_ROUTER['TIERS']['fast'];
+- FULL for open-ended advice ("which is better for my parents?") and long
+  messages, sent to the LLM_CLIENT model.
+
+A tier's client is LLM_CLIENT with the tier's overrides (model, deadline,
+hedging). While the fast model's circuit is open its turns go to the full
+model. Counters chat.tier.<tier> and latency histograms chat.tier_ms.<tier>
+show the split, so the thresholds can be tuned.
+"""
+import threading
+import time
+
+from django.conf import settings
+
+from insurance_bot import metrics
+
+from . import intents, llm_client, singleflight
+from .constants import SMALL_TALK_REPLIES
+from .llm_client import FALLBACK_REPLY
+
+LOCAL = 'local'
+FAST = 'fast'
+FULL = 'full'
+
+GREETING = 'greeting'
+THANKS = 'thanks'
+ACK = 'ack'
+BYE = 'bye'
+
+# A message made only of these phrases (and FILLER words) is small talk.
+# "yes"/"no" are not: they answer the LLM's "Shall I suggest a plan?".
+SMALL_TALK = {
+    GREETING: {
+        'en': ['hi', 'hii', 'hello', 'hey', 'namaste', 'namaskar', 'good morning', 'good afternoon',
+               'good evening'],
+        'hi': ['नमस्ते', 'नमस्कार', 'हेलो', 'हैलो', 'प्रणाम', 'राम राम'],
+        'mr': ['नमस्कार', 'नमस्ते'],
+        'gu': ['નમસ્તે', 'નમસ્કાર', 'કેમ છો'],
+        'bn': ['নমস্কার', 'হ্যালো'],
+        'ta': ['வணக்கம்'],
+        'te': ['నమస్కారం', 'హలో'],
+        'kn': ['ನಮಸ್ಕಾರ', 'ಹಲೋ'],
+        'ml': ['നമസ്കാരം', 'ഹലോ'],
+        'pa': ['ਸਤ ਸ੍ਰੀ ਅਕਾਲ', 'ਨਮਸਤੇ'],
+    },
+    THANKS: {
+        'en': ['thanks', 'thank you', 'thank u', 'thx', 'ty', 'thanks a lot', 'many thanks'],
+        'hi': ['धन्यवाद', 'शुक्रिया', 'थैंक यू', 'थैंक्स'],
+        'mr': ['धन्यवाद', 'आभार'],
+        'gu': ['આભાર', 'ધન્યવાદ'],
+        'bn': ['ধন্যবাদ'],
+        'ta': ['நன்றி'],
+        'te': ['ధన్యవాదాలు', 'ధన్యవాదం'],
+        'kn': ['ಧನ್ಯವಾದ', 'ಧನ್ಯವಾದಗಳು'],
+        'ml': ['നന്ദി'],
+        'pa': ['ਧੰਨਵਾਦ', 'ਸ਼ੁਕਰੀਆ'],
+    },
+    ACK: {
+        'en': ['ok', 'okay', 'okk', 'k', 'fine', 'great', 'cool', 'nice', 'got it', 'understood', 'alright'],
+        'hi': ['ठीक है', 'ठीक', 'अच्छा', 'समझ गया', 'समझ गई', 'ओके'],
+        'mr': ['ठीक आहे', 'बरं', 'समजलं'],
+        'gu': ['સારું', 'બરાબર'],
+        'bn': ['ঠিক আছে', 'আচ্ছা'],
+        'ta': ['சரி'],
+        'te': ['సరే'],
+        'kn': ['ಸರಿ'],
+        'ml': ['ശരി'],
+        'pa': ['ਠੀਕ ਹੈ', 'ਅੱਛਾ'],
+    },
+    BYE: {
+        'en': ['bye', 'goodbye', 'good bye', 'see you', 'good night', 'tata'],
+        'hi': ['अलविदा', 'फिर मिलेंगे', 'बाय'],
+        'mr': ['निरोप', 'पुन्हा भेटू'],
+        'gu': ['આવજો'],
+        'bn': ['বিদায়'],
+        'ta': ['போய் வருகிறேன்'],
+        'te': ['వీడ్కోలు'],
+        'kn': ['ಹೋಗಿ ಬರುತ್ತೇನೆ'],
+        'ml': ['വിട'],
+        'pa': ['ਅਲਵਿਦਾ'],
+    },
+}
+FILLER = {'ji', 'sir', 'madam', 'mam', 'maam', 'dear', 'very', 'much', 'so', 'a', 'lot', 'bimasakhi',
+          'जी', 'बहुत', 'सर'}
+
+# When a message mixes kinds ("ok thanks, bye"), the first in this list wins
+SMALL_TALK_PRIORITY = [BYE, THANKS, GREETING, ACK]
+
+# Markers of open-ended advice, matched like intent keywords
+ADVICE_KEYWORDS = {
+    'en': ['should i', 'should we', 'which is better', 'which one', 'better', 'compare', 'difference',
+           'versus', 'vs', 'recommend', 'suggest', 'advice', 'advise', 'worth', 'explain', 'why',
+           'help me decide'],
+    'hi': ['क्या मुझे', 'बेहतर', 'सलाह', 'तुलना', 'अंतर', 'फर्क', 'क्यों', 'समझाइए', 'समझाओ', 'सुझाव'],
+    'mr': ['सल्ला', 'तुलना', 'फरक', 'चांगली', 'का घ्यावी'],
+    'gu': ['સલાહ', 'સરખામણી', 'ફરક', 'કેમ'],
+    'bn': ['পরামর্শ', 'তুলনা', 'পার্থক্য', 'কেন'],
+    'ta': ['ஆலோசனை', 'ஒப்பிட', 'வித்தியாசம்', 'ஏன்'],
+    'te': ['సలహా', 'పోల్చ', 'తేడా', 'ఎందుకు'],
+    'kn': ['ಸಲಹೆ', 'ಹೋಲಿಸ', 'ವ್ಯತ್ಯಾಸ', 'ಏಕೆ'],
+    'ml': ['ഉപദേശ', 'താരതമ്യ', 'വ്യത്യാസ', 'എന്തുകൊണ്ട്'],
+    'pa': ['ਸਲਾਹ', 'ਤੁਲਨਾ', 'ਫਰਕ', 'ਕਿਉਂ'],
+}
+
+
+def _config():
+    config = {
+        'ENABLED': True,
+        'LOCAL_MAX_WORDS': 6,
+        'FAST_MAX_WORDS': 15,
+        'TIERS': {},
+    }
+    config.update(getattr(settings, 'LLM_ROUTER', {}))
+    return config
+
+
+# ==========================================
+# 1. CLASSIFICATION
+# ==========================================
+def _build_phrases():
+    phrases = {}
+    for kind, by_lang in SMALL_TALK.items():
+        for keywords in by_lang.values():
+            for keyword in keywords:
+                phrases.setdefault(tuple(intents.words(keyword)), kind)
+    return phrases
+
+
+PHRASES = _build_phrases()
+MAX_PHRASE_WORDS = max(len(phrase) for phrase in PHRASES)
+ADVICE_MATCHER = intents.KeywordMatcher(
+    (keyword, 'advice') for keywords in ADVICE_KEYWORDS.values() for keyword in keywords
+)
+
+
+def small_talk_kind(text):
+    """GREETING, THANKS, ACK or BYE if `text` is nothing but small talk, else None."""
+    words = intents.words(text)
+    if not words or len(words) > _config()['LOCAL_MAX_WORDS']:
+        return None
+    kinds = set()
+    i = 0
+    while i < len(words):
+        if words[i] in FILLER:
+            i += 1
+            continue
+        # Longest phrase starting here
+        for size in range(min(MAX_PHRASE_WORDS, len(words) - i), 0, -1):
+            kind = PHRASES.get(tuple(words[i:i + size]))
+            if kind:
+                kinds.add(kind)
+                i += size
+                break
+        else:
+            return None
+    return next((kind for kind in SMALL_TALK_PRIORITY if kind in kinds), None)
+
+
+def classify(text, after_question=False):
+    """LOCAL, FAST or FULL for one general-chat message; `after_question` if the last reply asked one."""
+    config = _config()
+    if not config['ENABLED']:
+        return FULL
+    if not after_question and small_talk_kind(text):
+        return LOCAL
+    if len(intents.words(text)) > config['FAST_MAX_WORDS']:
+        return FULL
+    if next(ADVICE_MATCHER.iter_matches(intents.normalize(text)), None):
+        return FULL
+    return FAST
+
+
+# ==========================================
+# 2. TIERS
+# ==========================================
+_clients = {}    # built from the tier's settings
+_overrides = {}  # set_tier_client()
+_clients_lock = threading.Lock()
+
+
+def tier_config(tier):
+    """LLM_CLIENT with the tier's overrides (OPTIONS merged key by key)."""
+    base = getattr(settings, 'LLM_CLIENT', {})
+    overrides = _config()['TIERS'].get(tier, {})
+    config = dict(base, **overrides)
+    config['OPTIONS'] = dict(base.get('OPTIONS', {}), **overrides.get('OPTIONS', {}))
+    return config
+
+
+def get_tier_client(tier):
+    """
+    The LLMClient of `tier`: one set with set_tier_client, else a client
+    swapped in with llm_client.set_client (a fake one in benchmarks must not
+    leave a tier calling Gemini), else one built from the tier's settings.
+    FULL and unconfigured tiers use the process-wide client.
+    """
+    if tier == FULL or tier not in _config()['TIERS']:
+        return llm_client.get_client()
+    client = _overrides.get(tier)
+    if client is not None:
+        return client
+    if llm_client.is_swapped():
+        return llm_client.get_client()
+    client = _clients.get(tier)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(tier)
+            if client is None:
+                client = _clients[tier] = llm_client.build_client(tier_config(tier))
+    return client
+
+
+def set_tier_client(tier, client):
+    """Swaps a tier's client (None rebuilds it from settings); used by benchmarks."""
+    with _clients_lock:
+        _clients.pop(tier, None)
+        if client is None:
+            _overrides.pop(tier, None)
+        else:
+            _overrides[tier] = client
+
+
+def _dispatch(tier):
+    """(tier actually used, its client)."""
+    client = get_tier_client(tier)
+    if tier == FAST and client.breaker.is_open():
+        # The small model is down; the full model answers meanwhile
+        metrics.incr('chat.tier.fast.escalated')
+        return FULL, get_tier_client(FULL)
+    return tier, client
+
+
+# ==========================================
+# 3. ANSWERING
+# ==========================================
+def local_reply(text, lang_code):
+    """Template reply to small talk, in `lang_code`."""
+    started = time.perf_counter()
+    replies = SMALL_TALK_REPLIES[small_talk_kind(text) or ACK]
+    reply = replies.get(lang_code, replies['en'])
+    metrics.incr(f'chat.tier.{LOCAL}')
+    metrics.observe(f'chat.tier_ms.{LOCAL}', (time.perf_counter() - started) * 1000)
+    return reply
+
+
+async def areply(prompt, tier=FULL, fallback=FALLBACK_REPLY):
+    """The tier's reply; identical concurrent prompts share one call (chatbot/singleflight.py)."""
+    tier, client = _dispatch(tier)
+    metrics.incr(f'chat.tier.{tier}')
+    started = time.perf_counter()
+    try:
+        return await singleflight.do(f"{tier}\0{prompt}", lambda: client.areply(prompt, fallback))
+    finally:
+        metrics.observe(f'chat.tier_ms.{tier}', (time.perf_counter() - started) * 1000)
+
+
+async def astream(prompt, tier=FULL, fallback=FALLBACK_REPLY):
+    """The tier's reply in chunks; concurrent identical prompts wait for the first one's reply."""
+    tier, client = _dispatch(tier)
+    metrics.incr(f'chat.tier.{tier}')
+    started = time.perf_counter()
+    async for chunk in singleflight.stream(f"{tier}\0{prompt}", lambda: client.astream(prompt, fallback)):
+        yield chunk
+    metrics.observe(f'chat.tier_ms.{tier}', (time.perf_counter() - started) * 1000)
@@ -0,0 +1,37 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from insurance.models import FAQ, Article, InsuranceProduct, ProductTranslation
+
+from . import knowledge, recommender
+
+
+@receiver(post_save, sender=InsuranceProduct)
+@receiver(post_delete, sender=InsuranceProduct)
+def catalog_changed(sender, **kwargs):
+    # Precomputed recommendations are stale once the catalog changes
+    recommender.invalidate()
+
+
+@receiver(post_save, sender=FAQ)
+@receiver(post_delete, sender=FAQ)
+def faq_changed(sender, instance, **kwargs):
+    knowledge.refresh(knowledge.FAQ_KIND, instance.pk)
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def article_changed(sender, instance, **kwargs):
+    knowledge.refresh(knowledge.ARTICLE_KIND, instance.pk)
+
+
+@receiver(post_save, sender=InsuranceProduct)
+@receiver(post_delete, sender=InsuranceProduct)
+def product_changed(sender, instance, **kwargs):
+    knowledge.refresh(knowledge.PRODUCT_KIND, instance.pk)
+
+
+@receiver(post_save, sender=ProductTranslation)
+@receiver(post_delete, sender=ProductTranslation)
+def product_translation_changed(sender, instance, **kwargs):
+    knowledge.refresh(knowledge.PRODUCT_KIND, instance.product_id)
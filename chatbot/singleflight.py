@@ -0,0 +1,229 @@
+"""
+Single-flight coalescing of identical concurrent LLM calls.
+
+When many users send the same message at once (an SMS campaign), the
+response cache cannot help until the first answer arrives, and every one
+of them would call the model. `do(key, fn)` lets the first caller for a
+key (the fully rendered prompt) run `fn` while later callers with the same
+key wait for its result instead. `stream(key, fn)` does the same for a
+streamed reply: the leader's caller gets the chunks as they arrive, the
+waiters get the finished reply as one chunk. Blocking and streamed calls
+for the same key share one upstream call. A stream that fails midway
+hands nothing to its waiters: they make the call themselves.
+
+Within a process, waiters share a concurrent.futures.Future, which works
+across event loops (under WSGI every request runs on its own loop). With
+SHARED on, a lock in the CACHE alias (its own alias, Redis in
+production) extends this to all worker processes: the leader of each burst stores its result for RESULT_TTL
+seconds and waiters elsewhere poll for it. A waiter whose leader dies or
+is cancelled makes the call itself.
+"""
+import asyncio
+import concurrent.futures
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from insurance_bot import metrics
+
+
+class _LeaderGone(Exception):
+    """The leading call was cancelled; waiters call for themselves."""
+
+
+def _config():
+    config = {
+        'ENABLED': True,
+        'SHARED': False,
+        'CACHE': 'llm_single_flight',
+        'POLL_INTERVAL': 0.05,
+        'RESULT_TTL': 5,
+    }
+    config.update(getattr(settings, 'LLM_SINGLE_FLIGHT', {}))
+    return config
+
+
+def _max_wait():
+    # A leader gives up after the LLM deadline
+    return getattr(settings, 'LLM_CLIENT', {}).get('DEADLINE', 8.0) + 1.0
+
+
+# ==========================================
+# 1. WITHIN A PROCESS
+# ==========================================
+_calls = {}  # key: concurrent.futures.Future of the leading call
+_calls_lock = threading.Lock()
+
+
+def _join(key):
+    """(future of the key's call, True if the caller leads it)."""
+    with _calls_lock:
+        future = _calls.get(key)
+        if future is not None:
+            metrics.incr('llm.single_flight.shared')
+            return future, False
+        future = _calls[key] = concurrent.futures.Future()
+    metrics.incr('llm.single_flight.leader')
+    return future, True
+
+
+def _leave(key):
+    with _calls_lock:
+        del _calls[key]
+
+
+async def _leader_result(future):
+    """The leading call's result, or None if the leader was cancelled."""
+    try:
+        # Shielded: a waiter that gives up must not cancel the shared call
+        return await asyncio.shield(asyncio.wrap_future(future))
+    except _LeaderGone:
+        metrics.incr('llm.single_flight.orphaned')
+        return None
+
+
+async def _within_process(key, fn):
+    future, leader = _join(key)
+    if not leader:
+        result = await _leader_result(future)
+        return result if result is not None else await fn()
+
+    try:
+        result = await fn()
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    except BaseException:
+        future.set_exception(_LeaderGone())
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        _leave(key)
+
+
+# ==========================================
+# 2. ACROSS PROCESSES (cache lock)
+# ==========================================
+def _cache_keys(key):
+    return f"singleflight:lock:{key}", f"singleflight:result:{key}"
+
+
+async def _remote_result(cache, key, config):
+    """The result of another process's leading call, or None if it ended without one."""
+    lock_key, result_key = _cache_keys(key)
+    metrics.incr('llm.single_flight.shared_remote')
+    expires = time.monotonic() + _max_wait()
+    while time.monotonic() < expires:
+        await asyncio.sleep(config['POLL_INTERVAL'])
+        result = await cache.aget(result_key)
+        if result is not None:
+            return result
+        if not await cache.ahas_key(lock_key):
+            # The leader ended without a result (crashed or cancelled)
+            result = await cache.aget(result_key)
+            if result is not None:
+                return result
+            break
+    metrics.incr('llm.single_flight.orphaned')
+    return None
+
+
+async def _across_processes(key, fn, config):
+    cache = caches[config['CACHE']]
+    lock_key, result_key = _cache_keys(key)
+
+    if await cache.aadd(lock_key, 1, _max_wait()):
+        try:
+            result = await fn()
+            await cache.aset(result_key, result, config['RESULT_TTL'])
+            return result
+        finally:
+            await cache.adelete(lock_key)
+
+    result = await _remote_result(cache, key, config)
+    return result if result is not None else await fn()
+
+
+async def _stream_across_processes(key, fn, config):
+    cache = caches[config['CACHE']]
+    lock_key, result_key = _cache_keys(key)
+
+    if await cache.aadd(lock_key, 1, _max_wait()):
+        try:
+            parts = []
+            async for chunk in fn():
+                parts.append(chunk)
+                yield chunk
+            await cache.aset(result_key, ''.join(parts), config['RESULT_TTL'])
+        finally:
+            await cache.adelete(lock_key)
+        return
+
+    result = await _remote_result(cache, key, config)
+    if result is not None:
+        yield result
+        return
+    async for chunk in fn():
+        yield chunk
+
+
+# ==========================================
+# 3. ENTRY POINTS
+# ==========================================
+def _digest(key):
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+async def do(key, fn):
+    """`await fn()`, shared with every concurrent caller passing the same `key`."""
+    config = _config()
+    if not config['ENABLED']:
+        return await fn()
+    key = _digest(key)
+    if config['SHARED']:
+        return await _within_process(key, lambda: _across_processes(key, fn, config))
+    return await _within_process(key, fn)
+
+
+async def stream(key, fn):
+    """
+    The chunks of `fn()` (an async iterator of strings), shared like `do`:
+    the leading caller streams them, concurrent callers with the same
+    `key` wait and get the whole reply as one chunk.
+    """
+    config = _config()
+    if not config['ENABLED']:
+        async for chunk in fn():
+            yield chunk
+        return
+    key = _digest(key)
+    future, leader = _join(key)
+    if not leader:
+        result = await _leader_result(future)
+        if result is not None:
+            yield result
+            return
+        async for chunk in fn():
+            yield chunk
+        return
+
+    parts = []
+    try:
+        chunks = _stream_across_processes(key, fn, config) if config['SHARED'] else fn()
+        async for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+    except BaseException:
+        # Broke off midway (waiters must not get part of a reply as the whole), was
+        # cancelled, or the leader's own client went away (GeneratorExit)
+        future.set_exception(_LeaderGone())
+        raise
+    else:
+        future.set_result(''.join(parts))
+    finally:
+        _leave(key)
@@ -7,15 +7,14 @@ console.log("🚀 BimaSakhi v12.0 (Full Features: Voice, Lang, Offline)");
 let currentAudio = null;
 let currentLang = 'en-IN'; // Default Language
 let recognition = null;
+const STREAM_TTS_MIN_CHARS = 200; // a couple of sentences
+const SOCKET_RETRY_MS = 10000;
+const INTERRUPTED_NOTE = "<br><i>(The reply was cut off. Please ask again.)</i>";
 
-// MULTI-LANGUAGE GREETINGS
-const GREETINGS = {
-    'en-IN': "Namaste! I am BimaSakhi. How can I help you today?",
-    'hi-IN': "नमस्ते! मैं बीमासखी हूँ। आज मैं आपकी कैसे मदद कर सकती हूँ?",
-    'mr-IN': "नमस्ते! मी बीमासखी आहे. आज मी तुम्हाला कशी मदत करू शकते?",
-    'gu-IN': "નમસ્તે! હું વિમાસખી છું. આજે હું તમારી કેવી મદદ કરી શકું?",
-    'bn-IN': "নমস্কার! আমি বিমাসখি। আজ আমি আপনাকে কীভাবে সাহায্য করতে পারি?",
-    'ta-IN': "வணக்கம்! நான் பீமாசகி. இன்று நான் உங்களுக்கு எப்படி உதவ முடியும்?"
+// MULTI-LANGUAGE GREETINGS (rendered by the server, whose audio is pre-rendered)
+const greetingsEl = document.getElementById('chat-greetings');
+const GREETINGS = greetingsEl ? JSON.parse(greetingsEl.textContent) : {
+    'en-IN': "Namaste! I am BimaSakhi. How can I help you today?"
 };
 
 // OFFLINE KNOWLEDGE BASE
@@ -76,14 +75,38 @@ async function sendMessage() {
         return;
     }
 
-    // 3. ONLINE FETCH
+    // 3. WEBSOCKET (one connection for the whole chat; HTTP if it is down)
+    if (socketReady()) {
+        try {
+            await socketReply(msg, loadingId);
+            return;
+        } catch (error) {
+            console.warn("WebSocket failed, falling back to HTTP:", error);
+        }
+    }
+    connectSocket(); // try again for the next message
+
+    // 4. ONLINE FETCH (stream when the browser supports it)
+    const config = document.getElementById('chat-config');
+    const STREAM_URL = config ? config.dataset.streamUrl : null;
+
+    if (STREAM_URL && window.ReadableStream && window.TextDecoder) {
+        try {
+            await streamReply(`${STREAM_URL}?userMessage=${encodeURIComponent(msg)}`, loadingId);
+            return;
+        } catch (error) {
+            console.warn("Streaming failed, falling back to JSON:", error);
+        }
+    }
+
     try {
-        const config = document.getElementById('chat-config');
         const API_URL = config ? config.dataset.apiUrl : '/chatbot/get-response/';
 
         // Fetch from server
+        const started = performance.now();
         const response = await fetch(`${API_URL}?userMessage=${encodeURIComponent(msg)}`);
         const data = await response.json();
+        console.log(`⏱️ TTFT (blocking): ${Math.round(performance.now() - started)} ms`);
         
         removeLoading(loadingId);
         
@@ -102,8 +125,151 @@ async function sendMessage() {
     }
 }
 
+// Reads the SSE stream and renders text as it arrives.
+// Throws only before anything is rendered, so the caller can fall back to
+// JSON: once part of the reply is shown, the server has taken the message
+// (a survey answer is already applied), and sending it again would repeat
+// the turn. A reply cut off later ends with a note instead.
+async function streamReply(url, loadingId) {
+    const started = performance.now();
+    const response = await fetch(url, { headers: { 'Accept': 'text/event-stream' } });
+    if (!response.ok || !response.body) throw new Error(`HTTP ${response.status}`);
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let fullText = "";
+    let bubble = null;
+
+    try {
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            // SSE events are separated by a blank line
+            let boundary;
+            while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                if (rawEvent.startsWith("event: done")) continue;
+                if (rawEvent.startsWith("event: error")) throw new Error("Reply interrupted");
+                const dataLine = rawEvent.split("\n").find(line => line.startsWith("data:"));
+                if (!dataLine) continue;
+
+                const chunk = JSON.parse(dataLine.slice(5)).text || "";
+                if (!bubble) {
+                    console.log(`⏱️ TTFT (stream): ${Math.round(performance.now() - started)} ms`);
+                    removeLoading(loadingId);
+                    bubble = appendMessage("", "bot-message");
+                }
+                fullText += chunk;
+                bubble.innerHTML = fullText;
+                const chatBox = document.getElementById("chatBox");
+                if (chatBox) chatBox.scrollTop = chatBox.scrollHeight;
+            }
+        }
+    } catch (error) {
+        if (!bubble) throw error;
+        console.warn("Stream interrupted:", error);
+        bubble.innerHTML = fullText + INTERRUPTED_NOTE;
+        return;
+    }
+
+    if (!bubble) throw new Error("Empty stream");
+    playAudio(fullText); // Speak once the whole answer is in
+}
+
 // ========================================================
-// 3. AUDIO & VOICE FUNCTIONS
+// 3. WEBSOCKET TRANSPORT
+// ========================================================
+// Server events: ready, typing, token (pieces of the reply), done (whole
+// reply), audio (URL of the reply's speech, once synthesized), state (the
+// chat state cookie, for the HTTP endpoints), error.
+let chatSocket = null;
+let socketRetryAt = 0;
+let pendingTurn = null;
+
+function connectSocket() {
+    const config = document.getElementById('chat-config');
+    const path = config ? config.dataset.wsPath : '';
+    if (!path || !window.WebSocket || Date.now() < socketRetryAt) return;
+    if (chatSocket && chatSocket.readyState <= WebSocket.OPEN) return;
+
+    const scheme = location.protocol === 'https:' ? 'wss' : 'ws';
+    const socket = new WebSocket(`${scheme}://${location.host}${path}`);
+    socket.onmessage = (event) => handleSocketEvent(JSON.parse(event.data));
+    socket.onclose = () => {
+        if (chatSocket === socket) chatSocket = null;
+        socketRetryAt = Date.now() + SOCKET_RETRY_MS;
+        if (pendingTurn) finishTurn(new Error("Socket closed"));
+    };
+    chatSocket = socket;
+}
+
+function socketReady() {
+    return chatSocket !== null && chatSocket.readyState === WebSocket.OPEN;
+}
+
+function setSocketLanguage(langCode) {
+    if (socketReady()) chatSocket.send(JSON.stringify({ type: "language", language: langCode }));
+}
+
+// Resolves once the reply is complete. Rejects only if nothing was
+// rendered yet, so the caller can still fall back to HTTP.
+function socketReply(msg, loadingId) {
+    return new Promise((resolve, reject) => {
+        pendingTurn = { loadingId, bubble: null, text: "", started: performance.now(), resolve, reject };
+        chatSocket.send(JSON.stringify({ type: "message", text: msg, audio: true }));
+    });
+}
+
+function finishTurn(error) {
+    const turn = pendingTurn;
+    pendingTurn = null;
+    if (error && !turn.bubble) {
+        turn.reject(error);
+        return;
+    }
+    if (error) turn.bubble.innerHTML = turn.text + INTERRUPTED_NOTE;
+    turn.resolve(turn.text);
+}
+
+function handleSocketEvent(event) {
+    if (event.type === "audio") {
+        playAudioUrl(event.url);
+        return;
+    }
+    if (event.type === "state") {
+        document.cookie = event.cookie;
+        return;
+    }
+    const turn = pendingTurn;
+    if (!turn) return;
+
+    if (event.type === "typing") {
+        const loader = document.getElementById(turn.loadingId);
+        const content = loader ? loader.querySelector(".message-content") : null;
+        if (content) content.textContent = "Typing...";
+    } else if (event.type === "token" || event.type === "done") {
+        if (!turn.bubble) {
+            console.log(`⏱️ TTFT (socket): ${Math.round(performance.now() - turn.started)} ms`);
+            removeLoading(turn.loadingId);
+            turn.bubble = appendMessage("", "bot-message");
+        }
+        turn.text = event.type === "done" ? event.text : turn.text + event.text;
+        turn.bubble.innerHTML = turn.text;
+        const chatBox = document.getElementById("chatBox");
+        if (chatBox) chatBox.scrollTop = chatBox.scrollHeight;
+        if (event.type === "done") finishTurn(null);
+    } else if (event.type === "error") {
+        finishTurn(new Error(event.error));
+    }
+}
+
+// ========================================================
+// 4. AUDIO & VOICE FUNCTIONS
 // ========================================================
 function playAudio(text) {
     // Don't try to speak HTML tags or short text
@@ -111,11 +277,17 @@ function playAudio(text) {
     if (cleanText.length < 2) return;
 
     const config = document.getElementById('chat-config');
-    const SPEAK_URL = config ? config.dataset.speakUrl : '/chatbot/speak/';
+    // Long replies stream sentence by sentence so playback starts sooner
+    const SPEAK_URL = cleanText.length > STREAM_TTS_MIN_CHARS
+        ? (config ? config.dataset.speakStreamUrl : '/chatbot/speak/stream/')
+        : (config ? config.dataset.speakUrl : '/chatbot/speak/');
     const langShort = currentLang.split('-')[0]; // 'en', 'hi', etc.
 
-    const audioUrl = `${SPEAK_URL}?text=${encodeURIComponent(cleanText)}&lang=${langShort}`;
-    
+    playAudioUrl(`${SPEAK_URL}?text=${encodeURIComponent(cleanText)}&lang=${langShort}`);
+}
+
+function playAudioUrl(audioUrl) {
+    stopAudio();
     currentAudio = new Audio(audioUrl);
     const avatar = document.getElementById("sakhiAvatar");
 
@@ -175,7 +347,7 @@ function setupVoiceInput() {
 }
 
 // ========================================================
-// 4. UI HELPER FUNCTIONS
+// 5. UI HELPER FUNCTIONS
 // ========================================================
 function appendMessage(html, type) {
     const chatBox = document.getElementById("chatBox");
@@ -193,6 +365,7 @@ function appendMessage(html, type) {
     chatBox.scrollTop = chatBox.scrollHeight;
     
     if (typeof feather !== 'undefined') feather.replace();
+    return div.querySelector(".message-content");
 }
 
 function showLoading(id) {
@@ -212,7 +385,7 @@ function removeLoading(id) {
 }
 
 // ========================================================
-// 5. INITIALIZATION
+// 6. INITIALIZATION
 // ========================================================
 document.addEventListener("DOMContentLoaded", function() {
     const userInput = document.getElementById("userInput");
@@ -222,6 +395,9 @@ document.addEventListener("DOMContentLoaded", function() {
     // SETUP VOICE
     setupVoiceInput();
 
+    // OPEN THE CHAT SOCKET (messages go over HTTP until it is up)
+    connectSocket();
+
     // ENTER KEY LISTENER
     if (userInput) {
         userInput.addEventListener("keypress", function(event) {
@@ -241,6 +417,7 @@ document.addEventListener("DOMContentLoaded", function() {
     document.querySelectorAll('.custom-option').forEach(opt => {
         opt.addEventListener('click', function() {
             currentLang = this.dataset.value;
+            setSocketLanguage(currentLang.split('-')[0]);
             // Update text on screen
             document.getElementById('selected-language-text').textContent = this.textContent;
             // Send to backend
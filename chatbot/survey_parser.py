@@ -0,0 +1,195 @@
+"""
+One-shot extraction of the survey profile from free text.
+
+"I am a 42 year old farmer, earn 2 lakh, have a tractor" answers all four
+survey questions at once. `extract_profile` finds whichever of occupation,
+age, income and vehicle a message states, so the survey only asks for the
+rest instead of taking four round trips.
+
+The parser is deliberately strict, since "suggest a plan for 2 years" or
+"cover of 5 lakh for my 10 year old son" must not become answers:
+
+- an age needs an age marker ("age 42", "I am 42") or "N years old" /
+  "N साल का", in a clause that is not about someone else ("my son");
+- an income needs an income marker ("earn", "salary", "आय", "कमाता");
+- occupations are job words, not "shop" or "job" alone.
+
+`speaks_of_self` tells whether a buy request describes the user at all
+("I am ...", "my age ..."); only then does the survey take answers from
+it. A bare answer to the question being asked ("35") is still handled by
+the survey step itself.
+"""
+import re
+
+from . import intents
+from .recommendation_logic import (
+    FARMING_WORDS, NO_WORDS, VEHICLE_WORDS, _ascii_digits, _has_word, amount_unit,
+)
+
+# A message outside the survey that states this many fields is a profile
+# ("42 year old farmer with a tractor"), even without a "buy" keyword
+STATEMENT_MIN_FIELDS = 3
+
+OCCUPATION_WORDS = FARMING_WORDS + [
+    'teacher', 'driver', 'shopkeeper', 'businessman', 'businesswoman', 'trader', 'vendor',
+    'labour', 'labourer', 'laborer', 'worker', 'daily wage', 'mazdoor', 'salaried',
+    'government employee', 'clerk', 'student', 'housewife', 'homemaker', 'tailor', 'fisherman',
+    'mechanic', 'carpenter', 'plumber', 'electrician', 'weaver', 'nurse', 'doctor', 'engineer',
+    'retired', 'self employed', 'self-employed',
+    'मजदूर', 'मज़दूर', 'दुकानदार', 'व्यापारी', 'शिक्षक', 'टीचर',
+    'ड्राइवर', 'गृहिणी', 'छात्र', 'दर्जी', 'मछुआरा', 'मजूर', 'શિક્ષક', 'દુકાનદાર', 'વેપારી',
+    'শিক্ষক', 'দোকানদার', 'ஆசிரியர்', 'ஓட்டுநர்', 'ఉపాధ్యాయుడు', 'డ్రైవర్', 'ಶಿಕ್ಷಕ', 'ಚಾಲಕ',
+    'അധ്യാപക', 'ഡ്രൈവർ', 'ਅਧਿਆਪਕ', 'ਡਰਾਈਵਰ', 'ਦੁਕਾਨਦਾਰ',
+]
+# Said of a vehicle without naming one ("I have a vehicle", "गाड़ी नहीं है")
+GENERIC_VEHICLE_WORDS = [
+    'vehicle', 'gaadi', 'gadi', 'वाहन', 'ગાડી', 'વાહન', 'গাড়ি', 'வாகனம்', 'వాహనం', 'ವಾಹನ', 'വാഹനം',
+    'ਵਾਹਨ', 'ਗੱਡੀ',
+]
+NEGATION_WORDS = NO_WORDS + ["don't", 'dont', 'do not', 'not', 'without', 'never']
+
+# Phrases in which the user describes themself
+SELF_MARKERS = [
+    'i am', "i'm", 'im', 'i earn', 'i have', 'i own', 'i work', 'i run', 'my age', 'my income', 'my salary',
+    'myself', 'meri umar', 'meri umra', 'mere paas', 'मैं', 'मेरी उम्र', 'मेरी आय', 'मेरी कमाई',
+    'मेरे पास', 'माझे वय', 'माझे उत्पन्न', 'माझ्याकडे', 'હું', 'মই', 'আমি', 'நான்', 'నేను', 'ನಾನು',
+    'ഞാൻ', 'ਮੈਂ',
+]
+# Also ordinary words ("main benefit", and मी inside जमीन): these count only
+# as whole words followed by a number ("main 42 saal ka") or with a
+# first-person verb in the next few words ("मी शेतकरी आहे")
+WEAK_SELF_MARKERS = {'main', 'मी'}
+FIRST_PERSON_VERBS = {'hoon', 'hun', 'hu', 'karta', 'karti', 'kamata', 'kamati', 'हूँ', 'हूं', 'हु', 'आहे',
+                      'करतो', 'करते', 'कमावतो', 'कमावते'}
+WEAK_MARKER_REACH = 5  # words to the verb; a number must come within two
+# A clause naming someone else is not about the user's own age
+OTHER_PERSON_WORDS = [
+    'son', 'daughter', 'child', 'children', 'kid', 'kids', 'baby', 'father', 'mother', 'parents', 'wife',
+    'husband', 'brother', 'sister', 'he', 'she', 'his', 'her', 'they', 'beta', 'beti',
+    'बेटा', 'बेटी', 'बेटे', 'बच्चा', 'बच्चे', 'बच्ची', 'पिता', 'पापा', 'माता', 'मां', 'माँ', 'पत्नी', 'पति',
+    'भाई', 'बहन', 'वह', 'उसकी', 'उसका', 'मुलगा', 'मुलगी', 'आई', 'वडील',
+]
+# Words right after an age ("42 years old", "42 साल का") or right before it ("age 42", "उम्र 42")
+AGE_UNITS = [
+    'years old', 'year old', 'yrs old', 'yr old', 'y/o', 'year-old', 'saal ka', 'saal ki', 'sal ka', 'sal ki',
+    'साल का', 'साल की', 'वर्ष का', 'वर्ष की', 'वर्षांचा', 'वर्षांची', 'વર્ષનો', 'વર્ષની', 'বছর বয়সী',
+    'வயது', 'ఏళ్ళ', 'ವರ್ಷದ', 'വയസ്സ്', 'വയസ്', 'ਸਾਲ ਦਾ', 'ਸਾਲ ਦੀ',
+]
+AGE_MARKERS = [
+    'age', 'aged', 'i am', "i'm", 'im', 'my age', 'umar', 'umra', 'उम्र', 'उमर', 'आयु', 'वय', 'ઉંમર', 'বয়স',
+    'வயது', 'వయస్సు', 'ವಯಸ್ಸು', 'പ്രായം', 'ਉਮਰ',
+]
+# Before the amount ("income 2 lakh") or, as in Hindi, after it ("2 लाख कमाता हूँ")
+INCOME_MARKERS = [
+    'earn', 'earns', 'earning', 'income', 'salary', 'kamai', 'kamata', 'kamati',
+    'कमाई', 'कमाता', 'कमाती', 'आय', 'आमदनी', 'वेतन', 'उत्पन्न', 'पगार', 'આવક', 'আয়', 'வருமானம்',
+    'ఆదాయం', 'ಆದಾಯ', 'വരുമാനം', 'ਆਮਦਨ',
+]
+INCOME_VERBS_AFTER = ['kamata', 'kamati', 'kamate', 'कमाता', 'कमाती', 'कमाते', 'कमावतो', 'कमावते', 'કમાઉં']
+CURRENCY_WORDS = ['rs', 'inr', 'rupees', 'rupaye', 'रुपये', 'रुपए', '₹']
+
+NUMBER_RE = re.compile(r'\d[\d,]*(?:\.\d+)?')
+# Clauses: "farmer, 2 lakh and no tractor" -> the negation stays with "tractor"
+CLAUSE_RE = re.compile(r'[,.;!?\n।]| and | but | aur | और | पर | लेकिन | आणि ')
+
+
+def _alternation(words):
+    """Regex alternative for `words`; ASCII words must stand alone."""
+    parts = []
+    for word in sorted(words, key=len, reverse=True):
+        escaped = re.escape(word)
+        parts.append(rf'(?<![a-z]){escaped}(?![a-z])' if word.isascii() else escaped)
+    return '|'.join(parts)
+
+
+AGE_AFTER_RE = re.compile(rf'^\s*-?\s*(?:{_alternation(AGE_UNITS)})')
+AGE_BEFORE_RE = re.compile(rf'(?:{_alternation(AGE_MARKERS)})\s*(?:is|of|about|around|:|-)?\s*$')
+# Fillers allowed between an income marker and the amount ("earning about Rs 15000")
+_FILLER = _alternation(['is', 'of', 'about', 'around', 'approx', 'nearly'] + CURRENCY_WORDS)
+INCOME_BEFORE_RE = re.compile(rf'(?:{_alternation(INCOME_MARKERS)})(?:\s*(?:{_FILLER}|:|-|\.))*\s*$')
+# The verb follows within the same few words ("2 लाख रुपये कमाता हूँ")
+INCOME_AFTER_RE = re.compile(rf'^[^,.;!?।]{{0,25}}?(?:{_alternation(INCOME_VERBS_AFTER)})')
+# "15000 a month", "15 हज़ार रुपये महीना": the survey asks for annual income
+MONTHLY_RE = re.compile(
+    r'^[^,.;!?।]{0,20}?'
+    rf'(?:{_alternation(["per month", "a month", "monthly", "mahina", "mahine", "महीना", "महीने", "मासिक", "प्रति माह"])})'
+)
+SELF_RE = re.compile(_alternation(SELF_MARKERS))
+
+
+def _first_word(text, words):
+    """The entry of `words` found earliest in `text`, or None."""
+    found = re.search(_alternation(words), text)
+    if not found:
+        return None
+    return next(word for word in words if word == found.group())
+
+
+# ==========================================
+# 1. FIELDS
+# ==========================================
+def _clause_at(text, start, end):
+    """The clause around text[start:end]."""
+    begin = max((m.end() for m in CLAUSE_RE.finditer(text, 0, start)), default=0)
+    stop = CLAUSE_RE.search(text, end)
+    return text[begin:stop.start() if stop else len(text)]
+
+
+def _numbers(text):
+    """(age, income) found among the message's numbers; either may be None."""
+    age = income = None
+    for match in NUMBER_RE.finditer(text):
+        value = float(match.group().replace(',', ''))
+        before, after = text[:match.start()], text[match.end():]
+        if income is None and (INCOME_BEFORE_RE.search(before) or INCOME_AFTER_RE.search(after)):
+            income = int(value * (amount_unit(after) or 1)) * (12 if MONTHLY_RE.search(after) else 1)
+        elif age is None and value < 120 and (AGE_AFTER_RE.search(after) or AGE_BEFORE_RE.search(before)):
+            if not _has_word(_clause_at(text, match.start(), match.end()), OTHER_PERSON_WORDS):
+                age = int(value)
+    return age, income
+
+
+def _vehicle(text):
+    """"No", a named vehicle ("tractor") or "Yes"; None if no vehicle is mentioned."""
+    negated = False
+    for clause in CLAUSE_RE.split(text):
+        word = _first_word(clause, VEHICLE_WORDS) or _first_word(clause, GENERIC_VEHICLE_WORDS)
+        if word is None:
+            continue
+        if _has_word(clause, NEGATION_WORDS):
+            negated = True
+            continue
+        return 'Yes' if word in GENERIC_VEHICLE_WORDS else word
+    return 'No' if negated else None
+
+
+def speaks_of_self(text):
+    """True if the message describes the user ("I am ...", "my age ...", "मैं ...")."""
+    text = _ascii_digits((text or '').lower())
+    if SELF_RE.search(text):
+        return True
+    words = intents.words(text)
+    for i, word in enumerate(words):
+        if word in WEAK_SELF_MARKERS:
+            following = words[i + 1:i + 1 + WEAK_MARKER_REACH]
+            if any(w.isdigit() for w in following[:2]) or any(w in FIRST_PERSON_VERBS for w in following):
+                return True
+    return False
+
+
+def extract_profile(text):
+    """{survey field: answer} for every field the message states."""
+    text = _ascii_digits((text or '').lower())
+    profile = {}
+    occupation = _first_word(text, OCCUPATION_WORDS)
+    if occupation:
+        profile['occupation'] = occupation
+    age, income = _numbers(text)
+    if age is not None:
+        profile['age'] = str(age)
+    if income is not None:
+        profile['income'] = str(income)
+    vehicle = _vehicle(text)
+    if vehicle:
+        profile['vehicle'] = vehicle
+    return profile
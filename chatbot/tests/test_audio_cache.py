@@ -0,0 +1,79 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import RequestFactory, SimpleTestCase
+
+from chatbot import audio_cache
+
+AUDIO = bytes(range(100))
+
+
+class FileResponseTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = Path(directory) / 'abc123.mp3'
+        self.path.write_bytes(AUDIO)
+        self.etag = '"abc123"'
+
+    def get(self, **headers):
+        request = RequestFactory().get('/chatbot/speak/', headers=headers)
+        return audio_cache.file_response(request, self.path)
+
+    def body(self, response):
+        return b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_whole_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), AUDIO)
+        self.assertEqual(response['ETag'], self.etag)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('max-age=', response['Cache-Control'])
+
+    def test_evicted_file_is_a_miss(self):
+        self.path.unlink()
+        self.assertIsNone(self.get())
+        self.assertIsNone(self.get(range='bytes=0-9'))
+
+    def test_file_evicted_while_served_is_still_sent(self):
+        response = self.get()
+        self.path.unlink()
+        self.assertEqual(self.body(response), AUDIO)
+
+    def test_not_modified(self):
+        for header in (self.etag, f'W/{self.etag}', f'"other", {self.etag}', '*'):
+            with self.subTest(header=header):
+                response = self.get(if_none_match=header)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], self.etag)
+        self.assertEqual(self.get(if_none_match='"other"').status_code, 200)
+
+    def test_ranges(self):
+        cases = {
+            'bytes=0-9': (0, 9),
+            'bytes=90-': (90, 99),
+            'bytes=-5': (95, 99),
+            'bytes=95-1000': (95, 99),
+        }
+        for header, (start, end) in cases.items():
+            with self.subTest(header=header):
+                response = self.get(range=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/100')
+                self.assertEqual(self.body(response), AUDIO[start:end + 1])
+
+    def test_unsatisfiable_range(self):
+        response = self.get(range='bytes=100-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_malformed_or_multiple_ranges_get_the_whole_file(self):
+        for header in ('bytes=0-1,5-6', 'lines=1-2', 'bytes=-'):
+            with self.subTest(header=header):
+                self.assertEqual(self.get(range=header).status_code, 200)
+
+    def test_if_range(self):
+        self.assertEqual(self.get(range='bytes=0-9', if_range=self.etag).status_code, 206)
+        self.assertEqual(self.get(range='bytes=0-9', if_range='"old"').status_code, 200)
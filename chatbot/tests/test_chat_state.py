@@ -0,0 +1,74 @@
+from django.contrib.sessions.models import Session
+from django.core import signing
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from chatbot import chat_state
+from chatbot.chat_state import ChatState
+
+
+class EncodingTests(SimpleTestCase):
+    def test_round_trip(self):
+        state = ChatState('k' * 16, step=2, answers={'occupation': 'किसान', 'age': '42'}, language='hi', turns=3)
+        decoded = ChatState.decode(state.key, state.encode())
+        self.assertEqual((decoded.step, decoded.answers, decoded.language, decoded.turns),
+                         (2, {'occupation': 'किसान', 'age': '42'}, 'hi', 3))
+        self.assertFalse(decoded.changed)
+
+    def test_default_state_is_short(self):
+        self.assertEqual(ChatState().encode(), '[1,-1,"en",[]]')
+
+    def test_states_without_turns_still_decode(self):
+        self.assertEqual(ChatState.decode('k', '[1,1,"en",["farmer"]]').turns, 0)
+
+    def test_unknown_version_and_garbage_are_rejected(self):
+        self.assertIsNone(ChatState.decode('k', '[2,1,"en",[]]'))
+        self.assertIsNone(ChatState.decode('k', 'not json'))
+        self.assertIsNone(ChatState.decode('k', None))
+
+    def test_changed_tracks_the_encoding(self):
+        state = ChatState('k')
+        state.language = 'en'
+        self.assertFalse(state.changed)
+        state.start_survey()
+        self.assertTrue(state.changed)
+
+
+class StoreTests(TestCase):
+    def ask(self, message):
+        return self.client.get(reverse('get_response'), {'userMessage': message}).json()['botResponse']
+
+    def test_survey_survives_another_workers_cache(self):
+        self.ask("I want to buy a policy")
+        caches[chat_state.CACHE_ALIAS].clear()  # as if the next request hit another process
+        self.assertIn("**age**", self.ask("farmer"))
+
+    def test_state_is_kept_in_a_signed_cookie(self):
+        self.ask("I want to buy a policy")
+        self.ask("farmer")
+        raw = signing.loads(self.client.cookies[chat_state.STATE_COOKIE].value, salt='chatbot.chat_state')
+        self.assertEqual(ChatState.decode('k', raw).step, 1)
+        self.assertFalse(Session.objects.exists())
+
+    def test_tampered_cookie_is_a_new_state(self):
+        self.ask("I want to buy a policy")
+        self.client.cookies[chat_state.STATE_COOKIE] = signing.dumps('[1,3,"en",[]]', salt='wrong')
+        self.assertNotIn("**vehicle**", self.ask("2 lakh"))
+
+    def test_default_state_stores_nothing(self):
+        self.client.get(reverse('chat'))
+        self.ask("hi")
+        self.assertNotIn(chat_state.STATE_COOKIE, self.client.cookies)
+
+    @override_settings(CHAT_STATE={'STORE': 'session'})
+    def test_session_store(self):
+        self.ask("I want to buy a policy")
+        self.ask("farmer")
+        self.assertEqual(ChatState.decode('k', self.client.session[chat_state.SESSION_KEY]).step, 1)
+
+    @override_settings(CHAT_STATE={'STORE': 'cache'})
+    def test_cache_store(self):
+        self.ask("I want to buy a policy")
+        self.assertNotIn(chat_state.STATE_COOKIE, self.client.cookies)
+        self.assertIn("**age**", self.ask("farmer"))
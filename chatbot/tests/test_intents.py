@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase
+
+from chatbot import intents
+from chatbot.intents import KeywordMatcher
+
+
+class KeywordMatcherTests(SimpleTestCase):
+    def test_finds_overlapping_keywords(self):
+        matcher = KeywordMatcher([('बी', 1), ('बीमा', 2), ('मा', 3)])
+        found = sorted((start, keyword) for start, keyword, _ in matcher.iter_matches('बीमा'))
+        self.assertEqual(found, [(0, 'बी'), (0, 'बीमा'), (2, 'मा')])
+
+    def test_keyword_inside_a_longer_one(self):
+        # 'plan' is only reached through the fail link out of 'new plan'
+        matcher = KeywordMatcher([('new plan', 'a'), ('plan', 'b')])
+        self.assertEqual(sorted(payload for _, _, payload in matcher.iter_matches('a new plan')), ['a', 'b'])
+
+    def test_latin_keywords_start_a_word(self):
+        matcher = KeywordMatcher([('plan', 'buy')])
+        self.assertEqual(len(list(matcher.iter_matches('two plans'))), 1)
+        self.assertEqual(list(matcher.iter_matches('an explanation')), [])
+
+    def test_indic_keywords_match_inside_words(self):
+        matcher = KeywordMatcher([('खरीद', 'buy')])
+        self.assertEqual(len(list(matcher.iter_matches('मुझे खरीदना है'))), 1)
+
+
+class DetectIntentTests(SimpleTestCase):
+    def test_languages_and_scripts(self):
+        cases = {
+            "I want to buy a plan": intents.BUY,
+            "मुझे पॉलिसी खरीदनी है": intents.BUY,
+            "How do I file a claim?": intents.CLAIM,
+            "hello there": None,
+        }
+        for text, intent in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(intents.detect_intent(text), intent)
+
+    def test_priority(self):
+        # "help me claim on my policy" is a claim, not a purchase
+        self.assertLessEqual({intents.BUY, intents.CLAIM}, intents.detect_intents("help me claim on my policy"))
+        self.assertEqual(intents.detect_intent("help me claim on my policy"), intents.CLAIM)
+
+    def test_normalization(self):
+        self.assertEqual(intents.detect_intent("BUY　A ＰＬＡＮ"), intents.BUY)
@@ -0,0 +1,50 @@
+from django.db.models import F
+from django.test import TestCase, override_settings
+
+from chatbot import knowledge, versions
+from chatbot.models import ContentVersion
+from insurance.models import FAQ
+
+UPI_ANSWER = "Yes, premiums can be paid by UPI from the payments page."
+
+
+class KnowledgeTests(TestCase):
+    def setUp(self):
+        versions._seen.clear()
+        knowledge.invalidate()
+        FAQ.objects.create(question="Can I pay my premium by UPI?", answer=UPI_ANSWER)
+        FAQ.objects.create(question="How do I file a crop insurance claim?",
+                           answer="Report crop loss within 72 hours through the claims page.")
+        FAQ.objects.create(question="What documents are needed for a claim?",
+                           answer="An ID proof, the policy number and bank details.")
+
+    def test_confident_match_answers(self):
+        self.assertEqual(knowledge.answer("can i pay premium by upi", 'en'), UPI_ANSWER)
+
+    def test_unrelated_question_goes_to_the_llm(self):
+        self.assertIsNone(knowledge.answer("what is the weather in pune today", 'en'))
+
+    def test_question_with_a_rare_word_the_item_lacks_is_not_matched(self):
+        # "upi" matches, but most of the question's weight is elsewhere
+        self.assertIsNone(knowledge.answer("can my employer deduct upi mandate refunds", 'en'))
+
+    @override_settings(KNOWLEDGE={'MIN_SCORE': 1000.0})
+    def test_min_score(self):
+        self.assertIsNone(knowledge.answer("can i pay premium by upi", 'en'))
+
+    @override_settings(KNOWLEDGE={'MIN_MARGIN': 1000.0})
+    def test_min_margin_needs_a_clear_winner(self):
+        self.assertIsNone(knowledge.answer("how do i file a claim", 'en'))
+
+    def test_change_made_by_another_worker_is_noticed(self):
+        self.assertIsNone(knowledge.answer("is there a grace period for renewal", 'en'))
+        # Saved elsewhere: no signal here, only the shared version row changes
+        FAQ.objects.bulk_create([FAQ(question="Is there a grace period for renewal?",
+                                     answer="Yes, 30 days after the due date.")])
+        ContentVersion.objects.filter(name=knowledge.KNOWLEDGE_VERSION).update(version=F('version') + 1)
+        versions._seen.clear()  # as if CHECK_INTERVAL had passed
+        # The previous index answers until REBUILD_INTERVAL has passed since it was built
+        self.assertIsNone(knowledge.answer("is there a grace period for renewal", 'en'))
+        knowledge._base_built -= knowledge._config()['REBUILD_INTERVAL']
+        self.assertEqual(knowledge.answer("is there a grace period for renewal", 'en'),
+                         "Yes, 30 days after the due date.")
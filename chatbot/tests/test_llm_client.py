@@ -0,0 +1,254 @@
+import asyncio
+import time
+
+from django.test import SimpleTestCase
+
+from chatbot import llm_client
+from chatbot.llm_client import (
+    FALLBACK_REPLY, CircuitBreaker, FakeBackend, GeminiBackend, LLMClient, LLMError, LLMStreamInterrupted,
+    LLMUnavailable,
+)
+from fake_services.server import GEMINI_REPLY
+from fake_services.server import start as start_fakes
+
+
+class FlakyBackend(FakeBackend):
+    """Fails the first `failures` calls with `error`, then answers."""
+
+    def __init__(self, failures, error=None, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+        self.error = error or LLMError("Flaky backend failure")
+
+    def generate(self, prompt, timeout, schema=None):
+        if self.failures:
+            self.failures -= 1
+            self.calls += 1
+            raise self.error
+        return super().generate(prompt, timeout, schema)
+
+    async def agenerate(self, prompt, timeout, schema=None):
+        return self.generate(prompt, timeout, schema)
+
+
+class SlowFirstBackend(FakeBackend):
+    """The first call takes a second; later ones answer at once."""
+
+    async def agenerate(self, prompt, timeout, schema=None):
+        if self.calls == 0:
+            self.calls += 1
+            await asyncio.sleep(1)
+            return self.reply
+        return await super().agenerate(prompt, timeout, schema)
+
+
+class BreakingBackend(FakeBackend):
+    """Streams the first word of its reply, then loses the connection."""
+
+    def stream(self, prompt, timeout):
+        self.calls += 1
+        yield self.reply.split(' ')[0]
+        raise LLMError("Connection reset")
+
+    async def astream(self, prompt, timeout):
+        self.calls += 1
+        yield self.reply.split(' ')[0]
+        raise LLMError("Connection reset")
+
+
+def half_open_breaker():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    return breaker
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_opens_after_threshold_failures(self):
+        breaker = CircuitBreaker(threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        self.assertTrue(breaker.is_open())
+
+    def test_single_trial_when_half_open(self):
+        breaker = half_open_breaker()
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_trial_reopens(self):
+        breaker = half_open_breaker()
+        breaker.allow()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_unreported_trial_is_replaced_after_reset_timeout(self):
+        breaker = half_open_breaker()
+        breaker.allow()
+        time.sleep(0.06)
+        self.assertFalse(breaker.is_open())
+        self.assertTrue(breaker.allow())
+
+
+class ClientTests(SimpleTestCase):
+    def make_client(self, backend, **kwargs):
+        kwargs.setdefault('backoff', 0)
+        return LLMClient(backend, **kwargs)
+
+    def test_retries_retryable_errors(self):
+        backend = FlakyBackend(failures=2)
+        self.assertEqual(self.make_client(backend, max_retries=2).generate("hi"), backend.reply)
+        self.assertEqual(backend.calls, 3)
+
+    def test_non_retryable_error_is_not_retried(self):
+        backend = FlakyBackend(failures=1, error=LLMError("bad request", retryable=False))
+        with self.assertRaises(LLMError):
+            self.make_client(backend).generate("hi")
+        self.assertEqual(backend.calls, 1)
+
+    def test_open_circuit_fails_fast(self):
+        backend = FlakyBackend(failures=10)
+        client = self.make_client(backend, max_retries=0, breaker=CircuitBreaker(threshold=1, reset_timeout=60))
+        self.assertEqual(client.reply("hi"), FALLBACK_REPLY)
+        with self.assertRaises(LLMUnavailable):
+            client.generate("hi")
+        self.assertEqual(backend.calls, 1)
+
+    def test_hedged_request_answers_for_a_slow_first_call(self):
+        client = self.make_client(SlowFirstBackend(latency=0.0), hedge_after=0.05, max_retries=0)
+        started = time.monotonic()
+        self.assertEqual(asyncio.run(client.agenerate("hi")), client.backend.reply)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(client.backend.calls, 2)
+
+    def test_no_hedge_for_a_fast_call(self):
+        client = self.make_client(FakeBackend(latency=0.0), hedge_after=0.05)
+        asyncio.run(client.agenerate("hi"))
+        self.assertEqual(client.backend.calls, 1)
+
+    def test_unexpected_exception_counts_as_failure(self):
+        client = self.make_client(FlakyBackend(failures=1, error=KeyError('candidates')), breaker=half_open_breaker())
+        with self.assertRaises(KeyError):
+            asyncio.run(client.agenerate("hi"))
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+    def test_cancelled_call_counts_as_failure(self):
+        client = self.make_client(FakeBackend(latency=1), breaker=half_open_breaker())
+
+        async def cancel():
+            task = asyncio.create_task(client.agenerate("hi"))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        asyncio.run(cancel())
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+    def test_abandoned_stream_counts_as_failure(self):
+        client = self.make_client(FakeBackend(reply="one two three"), breaker=half_open_breaker())
+        chunks = client.stream("hi")
+        self.assertEqual(next(chunks), "one")
+        chunks.close()
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+    def test_abandoned_async_stream_counts_as_failure(self):
+        client = self.make_client(FakeBackend(reply="one two three"), breaker=half_open_breaker())
+
+        async def read_one():
+            chunks = client.astream("hi")
+            self.assertEqual(await chunks.__anext__(), "one")
+            await chunks.aclose()
+
+        asyncio.run(read_one())
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+    def test_finished_stream_closes_circuit(self):
+        client = self.make_client(FakeBackend(reply="one two three"), breaker=half_open_breaker())
+        self.assertEqual(''.join(client.stream("hi")), "one two three")
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_stream_broken_midway_raises(self):
+        client = self.make_client(BreakingBackend(reply="one two three"))
+        chunks = client.stream("hi")
+        self.assertEqual(next(chunks), "one")
+        with self.assertRaises(LLMStreamInterrupted):
+            next(chunks)
+        self.assertEqual(client.backend.calls, 1)  # part of a reply is not retried
+        self.assertEqual(client.breaker.failures, 1)
+
+    def test_async_stream_broken_midway_raises(self):
+        client = self.make_client(BreakingBackend(reply="one two three"))
+        received = []
+
+        async def read():
+            async for chunk in client.astream("hi"):
+                received.append(chunk)
+
+        with self.assertRaises(LLMStreamInterrupted):
+            asyncio.run(read())
+        self.assertEqual(received, ["one"])
+        self.assertEqual(client.breaker.failures, 1)
+
+
+class GeminiBackendTests(SimpleTestCase):
+    """Against the local fake Gemini, which counts the TCP connections it accepts."""
+
+    def setUp(self):
+        self.server = start_fakes(profile='fast')
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.backend = GeminiBackend(api_key='fake', base_url=f'{self.server.url}/gemini/v1beta')
+
+    def connections(self):
+        return self.server.stats()['counts'].get('connections', 0)
+
+    def test_sync_calls_reuse_one_connection(self):
+        for _ in range(3):
+            self.assertEqual(self.backend.generate("hi", timeout=5), GEMINI_REPLY)
+        self.assertEqual(self.connections(), 1)
+
+    def test_hung_upstream_costs_the_deadline_then_the_fallback(self):
+        self.server.configure(services={'gemini': {'latency': 2.0}})
+        client = LLMClient(self.backend, deadline=0.3, max_retries=0)
+        started = time.monotonic()
+        self.assertEqual(client.reply("hi"), FALLBACK_REPLY)
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    def test_upstream_errors_are_retried_within_the_budget(self):
+        self.server.configure(services={'gemini': {'error_rate': 1.0}})
+        client = LLMClient(self.backend, max_retries=2, backoff=0.01)
+        self.assertEqual(client.reply("hi"), FALLBACK_REPLY)
+        self.assertEqual(self.server.stats()['counts']['gemini.generate'], 3)
+
+    def test_serving_loop_keeps_one_session_and_closes_it(self):
+        async def calls():
+            async with llm_client.serving():
+                replies = [await self.backend.agenerate("hi", timeout=5) for _ in range(3)]
+                session = self.backend._async_session()
+            return replies, session
+
+        replies, session = asyncio.run(calls())
+        self.assertEqual(replies, [GEMINI_REPLY] * 3)
+        self.assertEqual(self.connections(), 1)
+        self.assertTrue(session.closed)
+
+    def test_short_lived_loops_use_the_sync_pool(self):
+        # Async views under WSGI: a new event loop per request
+        for _ in range(3):
+            self.assertEqual(asyncio.run(self.backend.agenerate("hi", timeout=5)), GEMINI_REPLY)
+        self.assertEqual(len(self.backend._async_sessions), 0)
+        self.assertEqual(self.connections(), 1)
+
+    def test_stream_on_a_short_lived_loop(self):
+        async def collect():
+            return [chunk async for chunk in self.backend.astream("hi", timeout=5)]
+
+        chunks = asyncio.run(collect())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(''.join(chunks), GEMINI_REPLY)
+        self.assertEqual(len(self.backend._async_sessions), 0)
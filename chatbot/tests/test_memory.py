@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from chatbot import memory
+from chatbot.memory import Memory
+from chatbot.models import ChatSession
+
+KEY = 'visitor-0123456789abcdef'
+
+
+class MemoryTests(SimpleTestCase):
+    def test_question_is_noticed_even_if_the_reply_is_clipped(self):
+        history = Memory()
+        history.add("I am a farmer", "Crop insurance covers floods. " * 60 + "Shall I suggest a plan for you? 🙂")
+        self.assertTrue(Memory.decode(history.encode()).asked)
+        history.add("what is a premium", "The amount you pay.")
+        self.assertFalse(Memory.decode(history.encode()).asked)
+
+
+class MemoryStoreTests(TestCase):
+    async def test_remembered_in_the_database_without_a_shared_cache(self):
+        await memory.aremember(KEY, "What is a premium?", "The amount you pay.", 'hi')
+        session = await ChatSession.objects.aget(key=KEY)
+        self.assertEqual(session.language, 'hi')
+        self.assertEqual((await memory.aload(KEY)).turns, [("What is a premium?", "The amount you pay.")])
+
+    async def test_second_turn_keeps_the_first(self):
+        await memory.aremember(KEY, "What is a premium?", "The amount you pay.")
+        await memory.aremember(KEY, "And for my parents?", "Senior plans cost more.")
+        self.assertEqual(len((await memory.aload(KEY)).turns), 2)
+
+    async def test_idle_memory_is_forgotten(self):
+        await memory.aremember(KEY, "What is a premium?", "The amount you pay.")
+        await ChatSession.objects.filter(key=KEY).aupdate(memory_at=timezone.now() - timedelta(hours=3))
+        self.assertFalse(await memory.aload(KEY))
+
+    def test_forget_keeps_the_transcript_row(self):
+        ChatSession.objects.create(key=KEY, memory='[1,[],[]]', memory_at=timezone.now())
+        memory.forget(KEY)
+        self.assertEqual(ChatSession.objects.get(key=KEY).memory, '')
+
+    @override_settings(CHAT_STATE={'STORE': 'cache', 'CACHE': 'chat_state'})
+    async def test_cache_store_keeps_memory_in_the_cache(self):
+        await memory.aremember(KEY, "What is a premium?", "The amount you pay.")
+        self.assertFalse(await ChatSession.objects.filter(key=KEY).aexists())
+        self.assertTrue(await memory.aload(KEY))
+        memory.forget(KEY)
+        self.assertFalse(await memory.aload(KEY))
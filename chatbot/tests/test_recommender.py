@@ -0,0 +1,66 @@
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase
+
+from chatbot import recommender, versions, views
+from chatbot.constants import LANGUAGES
+from chatbot.models import ContentVersion
+from insurance.models import InsuranceProduct
+
+FARMER = {'occupation': 'farmer', 'age': '40', 'income': '2 lakh', 'vehicle': 'no'}
+
+
+def product(name, product_type, premium, **kwargs):
+    return InsuranceProduct.objects.create(
+        name=name, product_type=product_type, base_premium=premium, description='', key_features='', **kwargs
+    )
+
+
+class CatalogVersionTests(TestCase):
+    def setUp(self):
+        versions._seen.clear()
+
+    def test_catalog_change_bumps_shared_version(self):
+        before = recommender.catalog_version()
+        product("Kisan Suraksha", 'CROP', 500)
+        self.assertEqual(ContentVersion.objects.get(name=recommender.CATALOG_VERSION).version,
+                         recommender.catalog_version())
+        self.assertGreater(recommender.catalog_version(), before)
+
+    def test_change_made_by_another_worker_is_noticed(self):
+        product("Kisan Suraksha", 'CROP', 500)
+        self.assertEqual(recommender.recommend(FARMER).name, "Kisan Suraksha")
+
+        # Another process adds a cheaper plan: no signal fires here, only the version row changes
+        InsuranceProduct.objects.bulk_create([InsuranceProduct(
+            name="Fasal Raksha", product_type='CROP', base_premium=300, description='', key_features='',
+        )])
+        self.assertEqual(recommender.recommend(FARMER).name, "Kisan Suraksha")
+        ContentVersion.objects.filter(name=recommender.CATALOG_VERSION).update(version=F('version') + 1)
+        versions._seen.clear()  # as if CHECK_INTERVAL had passed
+        self.assertEqual(recommender.recommend(FARMER).name, "Fasal Raksha")
+
+
+class PickTests(TestCase):
+    def setUp(self):
+        versions._seen.clear()
+        product("Kisan Suraksha", 'CROP', 4000)
+        product("Ghar Suraksha", 'PROPERTY', 1000)  # not a farmer's preferred category
+
+    def recommend(self, income):
+        return recommender.recommend(dict(FARMER, income=income)).name
+
+    def test_lowest_band_has_a_budget(self):
+        self.assertEqual(recommender.budget_for(recommender.income_band(50000)), recommender.LOWEST_BAND_BUDGET)
+        self.assertIsNone(recommender.budget_for(recommender.income_band(None)))
+
+    def test_affordable_plan_beats_a_preferred_one_out_of_reach(self):
+        # 4000 is beyond a sub-1-lakh budget, 1000 is not
+        self.assertEqual(self.recommend('80000'), "Ghar Suraksha")
+
+    def test_preference_decides_when_both_are_affordable(self):
+        self.assertEqual(self.recommend('2 lakh'), "Kisan Suraksha")
+
+
+class NoEligibleProductTests(SimpleTestCase):
+    def test_every_chat_language_has_the_reply(self):
+        self.assertEqual(set(views.NO_ELIGIBLE_PRODUCT), set(LANGUAGES))
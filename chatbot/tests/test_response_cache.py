@@ -0,0 +1,31 @@
+from io import StringIO
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase
+
+from chatbot import response_cache, versions
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        versions._seen.clear()
+        caches[response_cache.CACHE_ALIAS].clear()
+
+    def test_same_question_hits_across_spellings(self):
+        response_cache.set("What is a Premium?", 'en', "The amount you pay.")
+        self.assertEqual(response_cache.get("what is a premium", 'en'), "The amount you pay.")
+        self.assertIsNone(response_cache.get("what is a premium", 'hi'))
+
+    def test_purge_reaches_other_workers(self):
+        response_cache.set("What is a premium?", 'en', "The amount you pay.")
+        versions.bump(response_cache.RESPONSES_VERSION)  # purged by another worker
+        versions._seen.clear()  # as if CHECK_INTERVAL had passed
+        self.assertIsNone(response_cache.get("What is a premium?", 'en'))
+
+    def test_command_purges(self):
+        response_cache.set("What is a premium?", 'en', "The amount you pay.")
+        out = StringIO()
+        call_command('purge_response_cache', stdout=out)
+        self.assertIn("purged", out.getvalue())
+        self.assertIsNone(response_cache.get("What is a premium?", 'en'))
@@ -0,0 +1,61 @@
+import asyncio
+
+from django.test import SimpleTestCase
+
+from chatbot import llm_client, memory, router, views
+from chatbot.llm_client import FakeBackend, LLMClient
+
+
+class ClassifyTests(SimpleTestCase):
+    def test_small_talk_is_answered_locally(self):
+        self.assertEqual(router.classify("ok thanks ji"), router.LOCAL)
+        self.assertEqual(router.classify("ठीक है"), router.LOCAL)
+
+    def test_ok_after_a_question_is_an_answer(self):
+        self.assertEqual(router.classify("ok", after_question=True), router.FAST)
+
+    def test_general_chat_follows_up_on_its_own_question(self):
+        history = memory.Memory()
+        history.add("I am a farmer", "Crop insurance covers floods. Shall I suggest a plan for you?")
+        turn = asyncio.run(views.handle_general_chat("ok", 'en', history))
+        self.assertNotIn('botResponse', turn)
+        self.assertIn("Shall I suggest a plan", turn['prompt'])
+
+
+class TierClientTests(SimpleTestCase):
+    def setUp(self):
+        original = llm_client.get_client()
+        self.addCleanup(llm_client.set_client, original)
+        self.addCleanup(router.set_tier_client, router.FAST, None)
+
+    def test_tiers_are_built_from_settings(self):
+        fast = router.get_tier_client(router.FAST)
+        self.assertIsNot(fast, llm_client.get_client())
+        self.assertEqual(fast.backend.model, router.tier_config(router.FAST)['OPTIONS']['model'])
+
+    def test_a_swapped_client_stands_in_for_every_tier(self):
+        router.get_tier_client(router.FAST)  # built and cached before the swap
+        fake = LLMClient(FakeBackend())
+        llm_client.set_client(fake)
+        self.assertIs(router.get_tier_client(router.FAST), fake)
+        self.assertIs(router.get_tier_client(router.FULL), fake)
+
+    def test_a_tier_client_beats_the_swapped_one(self):
+        fast = LLMClient(FakeBackend())
+        llm_client.set_client(LLMClient(FakeBackend()))
+        router.set_tier_client(router.FAST, fast)
+        self.assertIs(router.get_tier_client(router.FAST), fast)
+
+    def test_restoring_the_built_client_restores_the_tiers(self):
+        original = llm_client.get_client()
+        llm_client.set_client(LLMClient(FakeBackend()))
+        llm_client.set_client(original)
+        self.assertIsNot(router.get_tier_client(router.FAST), original)
+
+    def test_a_fake_benchmark_reaches_no_real_backend(self):
+        backend = FakeBackend(reply="fast answer")
+        llm_client.set_client(LLMClient(backend, hedge_after=None))
+        self.assertEqual(router.classify("What is sum assured?"), router.FAST)
+        reply = asyncio.run(router.areply("What is sum assured?", router.FAST))
+        self.assertEqual(reply, "fast answer")
+        self.assertEqual(backend.calls, 1)
@@ -0,0 +1,148 @@
+import asyncio
+
+from django.test import SimpleTestCase, override_settings
+
+from chatbot import router, singleflight
+from chatbot.llm_client import FakeBackend, LLMClient, LLMStreamInterrupted
+
+
+class Upstream:
+    """Counts calls; each answers `reply` after `delay` seconds, in two chunks when streamed."""
+
+    def __init__(self, reply="shared answer", delay=0.05):
+        self.reply = reply
+        self.delay = delay
+        self.calls = 0
+
+    async def call(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.reply
+
+    async def stream(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        head, tail = self.reply.split(' ', 1)
+        yield head
+        yield ' ' + tail
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_calls_share_one_upstream_call(self):
+        upstream = Upstream()
+
+        async def burst():
+            return await asyncio.gather(*(singleflight.do('prompt', upstream.call) for _ in range(10)))
+
+        self.assertEqual(asyncio.run(burst()), ["shared answer"] * 10)
+        self.assertEqual(upstream.calls, 1)
+
+    def test_different_keys_are_not_shared(self):
+        upstream = Upstream()
+
+        async def burst():
+            await asyncio.gather(singleflight.do('a', upstream.call), singleflight.do('b', upstream.call))
+
+        asyncio.run(burst())
+        self.assertEqual(upstream.calls, 2)
+
+    @override_settings(LLM_SINGLE_FLIGHT={'ENABLED': False})
+    def test_disabled(self):
+        upstream = Upstream()
+
+        async def burst():
+            await asyncio.gather(*(singleflight.do('prompt', upstream.call) for _ in range(3)))
+
+        asyncio.run(burst())
+        self.assertEqual(upstream.calls, 3)
+
+    def test_streams_share_one_upstream_call(self):
+        upstream = Upstream()
+
+        async def burst():
+            return await asyncio.gather(*(collect(singleflight.stream('prompt', upstream.stream)) for _ in range(5)))
+
+        leader, *waiters = asyncio.run(burst())
+        self.assertEqual(leader, ["shared", " answer"])  # streamed as it arrives
+        self.assertEqual(waiters, [["shared answer"]] * 4)  # the finished reply at once
+        self.assertEqual(upstream.calls, 1)
+
+    def test_blocking_call_joins_a_stream(self):
+        upstream = Upstream()
+
+        async def burst():
+            streamed = asyncio.ensure_future(collect(singleflight.stream('prompt', upstream.stream)))
+            await asyncio.sleep(0)
+            return await asyncio.gather(streamed, singleflight.do('prompt', upstream.call))
+
+        self.assertEqual(asyncio.run(burst()), [["shared", " answer"], "shared answer"])
+        self.assertEqual(upstream.calls, 1)
+
+    def test_waiters_call_themselves_when_the_leader_is_cancelled(self):
+        upstream = Upstream()
+
+        async def burst():
+            leader = asyncio.ensure_future(singleflight.do('prompt', upstream.call))
+            await asyncio.sleep(0)
+            waiter = asyncio.ensure_future(singleflight.do('prompt', upstream.call))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await waiter
+
+        self.assertEqual(asyncio.run(burst()), "shared answer")
+        self.assertEqual(upstream.calls, 2)
+
+    def test_waiters_stream_themselves_when_the_leaders_client_leaves(self):
+        upstream = Upstream()
+
+        async def burst():
+            leader = singleflight.stream('prompt', upstream.stream)
+            await leader.__anext__()
+            waiter = asyncio.ensure_future(collect(singleflight.stream('prompt', upstream.stream)))
+            await asyncio.sleep(0)
+            await leader.aclose()
+            return await waiter
+
+        self.assertEqual(asyncio.run(burst()), ["shared", " answer"])
+        self.assertEqual(upstream.calls, 2)
+
+    def test_stream_broken_midway_is_not_shared(self):
+        upstream = Upstream()
+        broken = []
+
+        async def breaks_once():
+            upstream.calls += 1
+            await asyncio.sleep(upstream.delay)
+            yield "shared"
+            if not broken:
+                broken.append(True)
+                raise LLMStreamInterrupted("Connection reset")
+            yield " answer"
+
+        async def burst():
+            leader = asyncio.ensure_future(collect(singleflight.stream('prompt', breaks_once)))
+            await asyncio.sleep(0)
+            waiter = asyncio.ensure_future(collect(singleflight.stream('prompt', breaks_once)))
+            return await asyncio.gather(leader, waiter, return_exceptions=True)
+
+        leader, waiter = asyncio.run(burst())
+        self.assertIsInstance(leader, LLMStreamInterrupted)
+        self.assertEqual(waiter, ["shared", " answer"])  # its own call, not "shared" alone
+        self.assertEqual(upstream.calls, 2)
+
+    def test_router_coalesces_streamed_prompts(self):
+        backend = FakeBackend(reply="one two three", latency=0.05)
+        router.set_tier_client(router.FAST, LLMClient(backend))
+        try:
+            async def burst():
+                return await asyncio.gather(*(collect(router.astream("prompt", router.FAST)) for _ in range(5)))
+
+            replies = asyncio.run(burst())
+        finally:
+            router.set_tier_client(router.FAST, None)
+        self.assertEqual({''.join(reply) for reply in replies}, {"one two three"})
+        self.assertEqual(backend.calls, 1)
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.test import TestCase
+from django.urls import reverse
+
+from chatbot import harness, llm_client, memory, response_cache, websocket
+from chatbot.llm_client import LLMClient
+
+from .test_llm_client import BreakingBackend
+
+QUESTION = "What is the free look period?"
+
+
+class InterruptedReplyTests(TestCase):
+    def setUp(self):
+        original = llm_client.get_client()
+        self.addCleanup(llm_client.set_client, original)
+        llm_client.set_client(LLMClient(BreakingBackend(reply="The free look period is 15 days.")))
+        self.addCleanup(response_cache.purge)
+        response_cache.purge()
+        self.app = websocket.route(get_asgi_application())
+        self.cookies = {}
+
+    async def test_sse_ends_with_an_error_and_keeps_nothing(self):
+        _, headers, body = await harness.call_asgi(self.app, reverse('stream_response'), {'userMessage': QUESTION},
+                                                   self.cookies)
+        harness.update_cookies(self.cookies, headers)
+        events = body.decode()
+        self.assertIn('"text": "The"', events)
+        self.assertTrue(events.endswith("event: error\ndata: {}\n\n"))
+        self.assertNotIn("event: done", events)
+        self.assertIsNone(await response_cache.aget(QUESTION, 'en'))
+        self.assertFalse(await memory.aload(self.cookies['bimasakhi_chat']))
+
+    async def test_socket_reports_the_interruption(self):
+        socket = harness.AsgiWebSocket(self.app, settings.CHAT_WEBSOCKET['PATH'], self.cookies)
+        self.assertTrue(await socket.connect())
+        await socket.receive_json()  # ready
+        await socket.send_json({'type': 'message', 'text': QUESTION})
+        events = [await socket.receive_json() for _ in range(3)]
+        self.assertEqual([e['type'] for e in events], ['typing', 'token', 'error'])
+        await socket.close()
+        self.assertIsNone(await response_cache.aget(QUESTION, 'en'))
+        self.assertFalse(await memory.aload(self.cookies['bimasakhi_chat']))
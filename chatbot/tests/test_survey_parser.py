@@ -0,0 +1,75 @@
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from chatbot.survey_parser import extract_profile, speaks_of_self
+
+
+class ExtractProfileTests(SimpleTestCase):
+    def test_one_shot_profiles(self):
+        cases = {
+            "I am a 42 year old farmer, earn 2 lakh, have a tractor":
+                {'occupation': 'farmer', 'age': '42', 'income': '200000', 'vehicle': 'tractor'},
+            "shopkeeper, age 35, income 3.5 lakh, no vehicle":
+                {'occupation': 'shopkeeper', 'age': '35', 'income': '350000', 'vehicle': 'No'},
+            "I'm a teacher, 29 years old, salary 6 lakh a year, I have a bike":
+                {'occupation': 'teacher', 'age': '29', 'income': '600000', 'vehicle': 'bike'},
+            "driver aged 45, earning Rs 15000 a month, own a car":
+                {'occupation': 'driver', 'age': '45', 'income': '180000', 'vehicle': 'car'},
+            "मैं 38 साल का किसान हूँ, आय 1.5 लाख, ट्रैक्टर है":
+                {'occupation': 'किसान', 'age': '38', 'income': '150000', 'vehicle': 'ट्रैक्टर'},
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(extract_profile(text), expected)
+
+    def test_income_verb_after_amount(self):
+        self.assertEqual(extract_profile("साल में 2 लाख रुपये कमाता हूँ")['income'], '200000')
+
+    def test_durations_are_not_ages(self):
+        self.assertEqual(extract_profile("suggest a plan for 2 years"), {})
+        self.assertEqual(extract_profile("I need cover for 25 years"), {})
+
+    def test_someone_elses_age_is_not_the_users(self):
+        self.assertNotIn('age', extract_profile("recommend health plan for my 10 year old son"))
+        self.assertNotIn('age', extract_profile("plan for my mother, she is 60 years old"))
+        self.assertNotIn('age', extract_profile("मेरा बेटा 10 साल का है"))
+
+    def test_amounts_without_income_marker_are_not_income(self):
+        self.assertEqual(extract_profile("best plan with cover of 5 lakh"), {})
+        self.assertEqual(extract_profile("premium under 15000 rupees"), {})
+
+    def test_generic_words_are_not_occupations(self):
+        for text in ("a policy for my shop", "insurance for my job", "customer service number"):
+            with self.subTest(text=text):
+                self.assertNotIn('occupation', extract_profile(text))
+
+
+class SpeaksOfSelfTests(SimpleTestCase):
+    def test_first_person(self):
+        for text in ("I am 42 and want a plan", "my age is 30", "I earn 2 lakh", "मैं किसान हूँ",
+                     "main 42 saal ka hoon, plan chahiye", "मी शेतकरी आहे", "मी ३५ वर्षांचा आहे"):
+            with self.subTest(text=text):
+                self.assertTrue(speaks_of_self(text))
+
+    def test_requests_about_others(self):
+        for text in ("recommend health plan for my 10 year old son", "a policy for my shop",
+                     "suggest a plan for 2 years", "suggest a plan, main benefit should be 5 lakh cover",
+                     "जमीन के लिए बीमा सुझाव दो", "कमी प्रीमियमचा प्लॅन सुचवा"):
+            with self.subTest(text=text):
+                self.assertFalse(speaks_of_self(text))
+
+
+class BuyRequestTests(TestCase):
+    def ask(self, message):
+        response = self.client.get(reverse('get_response'), {'userMessage': message})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['botResponse']
+
+    def test_request_about_a_child_asks_from_the_start(self):
+        reply = self.ask("recommend health plan for my 10 year old son")
+        self.assertNotIn("18+", reply)
+        self.assertIn("**main occupation**", reply)
+
+    def test_first_person_request_prefills_answers(self):
+        reply = self.ask("I am a 42 year old farmer and want to buy a policy")
+        self.assertIn("**annual family income**", reply)
@@ -0,0 +1,174 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.asgi import get_asgi_application
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from chatbot import chat_state, harness, websocket
+from chatbot.chat_state import ChatState
+
+SessionStore = import_module(settings.SESSION_ENGINE).SessionStore
+
+
+class ChatSocketTests(TestCase):
+    def setUp(self):
+        self.app = websocket.route(get_asgi_application())
+        self.cookies = {}
+
+    async def connect(self):
+        socket = harness.AsgiWebSocket(self.app, settings.CHAT_WEBSOCKET['PATH'], self.cookies)
+        self.assertTrue(await socket.connect())
+        self.assertEqual(await socket.receive_json(), {'type': 'ready', 'language': 'en'})
+        return socket
+
+    async def say(self, socket, text):
+        """Events of one turn, up to 'done'."""
+        await socket.send_json({'type': 'message', 'text': text})
+        events = []
+        while not events or events[-1]['type'] not in ('done', 'error'):
+            events.append(await socket.receive_json())
+        return events
+
+    async def test_turn_events(self):
+        socket = await self.connect()
+        events = await self.say(socket, "hi")
+        self.assertEqual([e['type'] for e in events], ['typing', 'token', 'done'])
+        self.assertEqual(events[-1]['text'], events[1]['text'])
+        await socket.close()
+
+    async def test_new_visitor_gets_an_id_on_accept(self):
+        socket = await self.connect()
+        self.assertIn(chat_state.COOKIE_NAME, self.cookies)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, self.cookies)
+        await socket.close()
+
+    async def test_checkpoints_hand_the_state_cookie_to_the_client(self):
+        socket = await self.connect()
+        events = await self.say(socket, "I want to buy a policy")
+        self.assertEqual([e['type'] for e in events], ['typing', 'token', 'state', 'done'])
+        self.assertIn(chat_state.STATE_COOKIE, self.cookies)
+        await socket.close()
+        self.assertFalse(await Session.objects.aexists())
+
+    @override_settings(CHAT_STATE={'STORE': 'session'})
+    async def test_session_row_waits_for_the_first_write(self):
+        socket = await self.connect()
+        key = self.cookies[settings.SESSION_COOKIE_NAME]
+        await self.say(socket, "hi")
+        self.assertFalse(await Session.objects.aexists())
+
+        await self.say(socket, "I want to buy a policy")
+        session = await SessionStore(key).aload()
+        self.assertEqual(ChatState.decode('k', session[chat_state.SESSION_KEY]).step, 0)
+        await socket.close()
+
+        # A reconnect keeps the session (and its cookie)
+        socket = await self.connect()
+        self.assertEqual(self.cookies[settings.SESSION_COOKIE_NAME], key)
+        self.assertIn("**age**", (await self.say(socket, "farmer"))[-1]['text'])
+        await socket.close()
+
+    async def test_bad_events_get_errors(self):
+        socket = await self.connect()
+        for event in ('not json', '[1, 2]'):
+            await socket._inbound.put({'type': 'websocket.receive', 'text': event})
+            self.assertEqual((await socket.receive_json())['type'], 'error')
+        await socket.send_json({'type': 'dance'})
+        self.assertEqual(await socket.receive_json(), {'type': 'error', 'error': 'Unknown event type'})
+        await socket.send_json({'type': 'message', 'text': ''})
+        self.assertEqual((await socket.receive_json())['type'], 'error')
+        await socket.close()
+
+    async def test_language(self):
+        socket = await self.connect()
+        await socket.send_json({'type': 'language', 'language': 'xx'})
+        self.assertEqual((await socket.receive_json())['type'], 'error')
+        await socket.send_json({'type': 'language', 'language': 'hi'})
+        self.assertEqual((await socket.receive_json())['type'], 'state')
+        self.assertEqual(await socket.receive_json(), {'type': 'ready', 'language': 'hi'})
+        await socket.close()
+
+    async def test_http_fallback_resumes_the_survey_where_the_socket_left_off(self):
+        await self.check_http_fallback()
+
+    @override_settings(CHAT_STATE={'STORE': 'session'})
+    async def test_http_fallback_with_the_session_store(self):
+        await self.check_http_fallback()
+
+    async def check_http_fallback(self):
+        socket = await self.connect()
+        await self.say(socket, "I want to buy a policy")
+        await self.say(socket, "farmer")
+        # The socket is still open, but chat.js sends the next answer over HTTP
+        self.assertIn("**annual family income**", await self.ask_http('42'))
+        await socket.close()
+
+        # Disconnecting did not put the older state (step 1) back
+        self.assertIn("**vehicle**", await self.ask_http('2 lakh'))
+
+    async def ask_http(self, message):
+        _, headers, body = await harness.call_asgi(self.app, reverse('get_response'), {'userMessage': message},
+                                                   self.cookies)
+        harness.update_cookies(self.cookies, headers)
+        return body.decode()
+
+
+@override_settings(CHAT_STATE={'STORE': 'session'})
+class CheckpointTests(TestCase):
+    async def socket_request(self):
+        request = RequestFactory().get('/')
+        request.COOKIES[chat_state.COOKIE_NAME] = 'k' * 22
+        request.session = SessionStore()
+        await request.session.acreate()
+        await chat_state.aload(request)
+        return request
+
+    async def stored(self, request):
+        raw = await SessionStore(request.session.session_key).aget(chat_state.SESSION_KEY)
+        return ChatState.decode('k', raw)
+
+    async def store_elsewhere(self, request, state):
+        session = SessionStore(request.session.session_key)
+        await session.aset(chat_state.SESSION_KEY, state.encode())
+        await session.asave()
+
+    async def test_disconnect_keeps_a_newer_state(self):
+        request = await self.socket_request()
+        request._chat_state.start_survey()
+        await chat_state.awrite(request)
+        await self.store_elsewhere(request, ChatState(step=1, answers={'occupation': 'farmer'}, turns=2))
+
+        request._chat_state.language = 'hi'  # not yet written
+        await chat_state.awrite(request, keep_newer=True)
+        self.assertEqual((await self.stored(request)).step, 1)
+
+    async def test_checkpoint_writes_over_the_stored_state(self):
+        request = await self.socket_request()
+        request._chat_state.start_survey()
+        await chat_state.awrite(request)
+        self.assertEqual((await self.stored(request)).step, 0)
+
+    async def test_write_keeps_other_session_keys(self):
+        request = await self.socket_request()
+        session = SessionStore(request.session.session_key)
+        await session.aset('_auth_user_id', '7')  # a login over HTTP meanwhile
+        await session.asave()
+        request._chat_state.start_survey()
+        await chat_state.awrite(request)
+        self.assertEqual(await SessionStore(request.session.session_key).aget('_auth_user_id'), '7')
+
+
+class CookieCheckpointTests(TestCase):
+    async def test_write_returns_the_cookie_for_the_client(self):
+        request = RequestFactory().get('/')
+        request.COOKIES[chat_state.COOKIE_NAME] = 'k' * 22
+        await chat_state.aload(request)
+        request._chat_state.start_survey()
+        cookie = await chat_state.awrite(request)
+        self.assertTrue(cookie.startswith(f"{chat_state.STATE_COOKIE}="))
+        self.assertIsNone(await chat_state.awrite(request))  # unchanged
+
+        request._chat_state.language = 'hi'
+        self.assertIsNone(await chat_state.awrite(request, keep_newer=True))
@@ -0,0 +1,169 @@
+"""
+Chat transcript logging off the request path.
+
+Views hand each turn to `log_turn`, which only appends to an in-process
+buffer. A daemon thread writes the buffer with `bulk_create` whenever
+BATCH_SIZE messages are waiting or FLUSH_INTERVAL_MS has passed, whichever
+comes first. When MAX_PENDING messages are queued (the database is slow or
+down) new messages are dropped and counted instead of slowing down chat.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import deque, namedtuple
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from insurance_bot import metrics
+
+logger = logging.getLogger(__name__)
+
+Entry = namedtuple('Entry', 'session_key language role text intent latency_ms created_at')
+
+
+class TranscriptBuffer:
+    def __init__(self, batch_size=100, flush_interval=0.5, max_pending=10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+
+    def log(self, entry):
+        """Queues one message without blocking. Returns False if it was dropped."""
+        with self._cond:
+            if len(self._pending) >= self.max_pending:
+                metrics.incr('chat.transcript.dropped')
+                return False
+            self._pending.append(entry)
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+            if self._thread is None:
+                self._start()
+        return True
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name='chat-transcripts', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._pending) < self.batch_size and not self._stopped:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._stopped and not self._pending:
+                    return
+            self.flush()
+
+    def _take(self):
+        with self._cond:
+            count = min(self.batch_size, len(self._pending))
+            return [self._pending.popleft() for _ in range(count)]
+
+    def flush(self):
+        """Writes everything queued so far (also called at exit)."""
+        with self._write_lock:
+            while True:
+                batch = self._take()
+                if not batch:
+                    return
+                close_old_connections()
+                try:
+                    with metrics.timer('chat.transcript.flush_ms'):
+                        write_batch(batch)
+                    metrics.incr('chat.transcript.written', len(batch))
+                except Exception as e:
+                    metrics.incr('chat.transcript.failed', len(batch))
+                    logger.error("Dropping %d transcript messages: %s", len(batch), e)
+                finally:
+                    close_old_connections()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self.flush()
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+
+def write_batch(batch):
+    """One bulk insert of sessions we have not seen yet, one of messages."""
+    from .models import ChatMessage, ChatSession
+
+    first_seen = {}
+    for entry in batch:
+        first_seen.setdefault(entry.session_key, entry)
+    ChatSession.objects.bulk_create(
+        [ChatSession(key=key, language=e.language, started_at=e.created_at) for key, e in first_seen.items()],
+        ignore_conflicts=True,
+    )
+    session_ids = dict(ChatSession.objects.filter(key__in=first_seen).values_list('key', 'id'))
+    ChatMessage.objects.bulk_create([
+        ChatMessage(
+            session_id=session_ids[e.session_key],
+            role=e.role,
+            text=e.text,
+            language=e.language,
+            intent=e.intent or '',
+            latency_ms=e.latency_ms,
+            created_at=e.created_at,
+        )
+        for e in batch
+    ])
+
+
+# ==========================================
+# PROCESS-WIDE BUFFER
+# ==========================================
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                config = getattr(settings, 'CHAT_TRANSCRIPTS', {})
+                _buffer = TranscriptBuffer(
+                    batch_size=config.get('BATCH_SIZE', 100),
+                    flush_interval=config.get('FLUSH_INTERVAL_MS', 500) / 1000.0,
+                    max_pending=config.get('MAX_PENDING', 10000),
+                )
+                atexit.register(_buffer.stop)
+    return _buffer
+
+
+def set_buffer(buffer):
+    """Swaps the process-wide buffer (used by benchmarks and tests)."""
+    global _buffer
+    with _buffer_lock:
+        _buffer = buffer
+
+
+def enabled():
+    return getattr(settings, 'CHAT_TRANSCRIPTS', {}).get('ENABLED', False)
+
+
+def log_turn(session_key, language, user_msg, reply, intent=None, latency_ms=None):
+    """Queues both sides of one chat turn."""
+    if not session_key or not enabled():
+        return
+    now = timezone.now()
+    buffer = get_buffer()
+    buffer.log(Entry(session_key, language, 'user', user_msg, intent, None, now))
+    buffer.log(Entry(session_key, language, 'bot', reply, intent,
+                     int(latency_ms) if latency_ms is not None else None, now))
@@ -7,7 +7,11 @@ urlpatterns = [
     # Chat-related URLs
     path('', views.chat_view, name='chat'),
     path('get-response/', views.get_response, name='get_response'),
+    path('stream/', views.stream_response, name='stream_response'),
     path('set-language', views.set_language, name='set_language'),
     path('speak/', views.speak_text, name='speak_text'),
+    path('speak/stream/', views.speak_stream, name='speak_stream'),
+    path('voice/', views.voice_chat, name='voice_chat'),
+    path('metrics/', views.metrics_view, name='chat_metrics'),
    
 ]
\ No newline at end of file
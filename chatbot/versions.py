@@ -0,0 +1,61 @@
+"""
+Content versions shared by every worker process.
+
+The recommendation table and the knowledge index are built in process
+memory and rebuilt when their version changes. The version is a database
+row, like the content it describes, so a change saved by one worker or a
+management command reaches every other worker and serverless instance; a
+counter in a per-process cache would not.
+
+A process re-reads a version at most every CHECK_INTERVAL seconds, so a
+change shows up elsewhere within that time; the process that made the
+change sees it at once.
+"""
+import time
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import ContentVersion
+
+CHECK_INTERVAL = 1.0  # seconds
+
+_seen = {}  # name -> (version, monotonic time it was read)
+
+
+def _remembered(name):
+    seen = _seen.get(name)
+    if seen is not None and time.monotonic() - seen[1] < CHECK_INTERVAL:
+        return seen[0]
+    return None
+
+
+def _remember(name, version):
+    version = version or 0  # no row yet: nothing has changed since deploy
+    _seen[name] = (version, time.monotonic())
+    return version
+
+
+def get(name):
+    version = _remembered(name)
+    if version is None:
+        version = _remember(name, ContentVersion.objects.filter(name=name).values_list('version', flat=True).first())
+    return version
+
+
+async def aget(name):
+    version = _remembered(name)
+    if version is None:
+        row = await ContentVersion.objects.filter(name=name).values_list('version', flat=True).afirst()
+        version = _remember(name, row)
+    return version
+
+
+def bump(name):
+    """Marks `name` as changed; returns its new version."""
+    with transaction.atomic():
+        row, created = ContentVersion.objects.select_for_update().get_or_create(name=name)
+        if not created:
+            ContentVersion.objects.filter(pk=row.pk).update(version=F('version') + 1)
+            row.refresh_from_db(fields=['version'])
+    return _remember(name, row.version)
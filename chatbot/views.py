@@ -1,13 +1,23 @@
-import os
 import json
-import requests
+import logging
 import re
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
+from django.utils.html import escape
 from django.views.decorators.csrf import csrf_exempt
-from gtts import gTTS
-from io import BytesIO
-from insurance.models import InsuranceProduct
+from django.contrib.admin.views.decorators import staff_member_required
+from insurance.models import InsuranceProduct, Policy
+from insurance_bot import metrics
+from . import (audio_cache, audio_service, bhashini_utils, chat_state, intents, knowledge, memory, recommender,
+               response_cache, router, survey_parser, transcripts)
+from .constants import CHAT_GREETINGS, INTENT_REPLIES
+from .llm_client import FALLBACK_REPLY, LLMError, LLMStreamInterrupted, estimate_tokens, get_client
+from .recommendation_logic import shortlist_queryset
+
+logger = logging.getLogger(__name__)
 
 # ==========================================
 # 1. CONFIGURATIONS
@@ -26,8 +36,8 @@ LANGUAGES = {
     'pa': 'Punjabi'
 }
 
-# The Keys for saving data
-SURVEY_STEPS = ["occupation", "age", "income", "vehicle"]
+# The Keys for saving data (order is part of the chat state encoding)
+SURVEY_STEPS = list(chat_state.SURVEY_FIELDS)
 
 # The Scripts (Questions) - NOW INCLUDES ALL LANGUAGES
 SURVEY_SCRIPTS = {
@@ -93,91 +103,278 @@ SURVEY_SCRIPTS = {
     ]
 }
 
+# Localized Intro, spoken before the first survey question
+SURVEY_INTROS = {
+    'en': "Sure! I can help you find the best policy. ",
+    'hi': "ज़रूर! मैं आपको सबसे अच्छी पॉलिसी खोजने में मदद कर सकती हूँ। ",
+    'mr': "नक्कीच! मी तुम्हाला सर्वोत्तम पॉलिसी शोधण्यात मदत करू शकते. ",
+    'te': "తప్పకుండా! మీకు ఉత్తమమైన పాలసీని కనుగొనడంలో నేను సహాయపడగలను. "
+}
+
+NO_ELIGIBLE_PRODUCT = {
+    'en': "I could not find a policy that fits your profile right now. Our agents can help: <a href='/accounts/agents/'>Find an Agent</a>.",
+    'hi': "अभी आपकी प्रोफ़ाइल के अनुसार कोई पॉलिसी नहीं मिली। हमारे एजेंट आपकी मदद कर सकते हैं: <a href='/accounts/agents/'>एजेंट खोजें</a>।",
+    'mr': "सध्या तुमच्या प्रोफाइलला जुळणारी पॉलिसी सापडली नाही. आमचे एजंट तुम्हाला मदत करू शकतात: <a href='/accounts/agents/'>एजंट शोधा</a>.",
+    'gu': "હાલમાં તમારી પ્રોફાઇલને અનુરૂપ કોઈ પોલિસી મળી નથી. અમારા એજન્ટ તમને મદદ કરી શકે છે: <a href='/accounts/agents/'>એજન્ટ શોધો</a>.",
+    'bn': "এই মুহূর্তে আপনার প্রোফাইলের সাথে মেলে এমন কোনো পলিসি পাওয়া যায়নি। আমাদের এজেন্টরা আপনাকে সাহায্য করতে পারেন: <a href='/accounts/agents/'>এজেন্ট খুঁজুন</a>।",
+    'ta': "இப்போது உங்கள் சுயவிவரத்திற்கு பொருந்தும் பாலிசி எதுவும் கிடைக்கவில்லை. எங்கள் முகவர்கள் உங்களுக்கு உதவ முடியும்: <a href='/accounts/agents/'>முகவரைக் கண்டறி</a>.",
+    'te': "ప్రస్తుతం మీ ప్రొఫైల్‌కు సరిపోయే పాలసీ ఏదీ కనుగొనలేకపోయాను. మా ఏజెంట్లు మీకు సహాయం చేయగలరు: <a href='/accounts/agents/'>ఏజెంట్‌ను కనుగొనండి</a>.",
+    'kn': "ಈಗ ನಿಮ್ಮ ಪ್ರೊಫೈಲ್‌ಗೆ ಹೊಂದುವ ಯಾವುದೇ ಪಾಲಿಸಿ ಸಿಗಲಿಲ್ಲ. ನಮ್ಮ ಏಜೆಂಟರು ನಿಮಗೆ ಸಹಾಯ ಮಾಡಬಹುದು: <a href='/accounts/agents/'>ಏಜೆಂಟ್ ಹುಡುಕಿ</a>.",
+    'ml': "ഇപ്പോൾ നിങ്ങളുടെ പ്രൊഫൈലിന് യോജിച്ച പോളിസി ഒന്നും കണ്ടെത്താനായില്ല. ഞങ്ങളുടെ ഏജന്റുമാർക്ക് നിങ്ങളെ സഹായിക്കാനാകും: <a href='/accounts/agents/'>ഏജന്റിനെ കണ്ടെത്തുക</a>.",
+    'pa': "ਇਸ ਵੇਲੇ ਤੁਹਾਡੀ ਪ੍ਰੋਫਾਈਲ ਨਾਲ ਮੇਲ ਖਾਂਦੀ ਕੋਈ ਪਾਲਿਸੀ ਨਹੀਂ ਮਿਲੀ। ਸਾਡੇ ਏਜੰਟ ਤੁਹਾਡੀ ਮਦਦ ਕਰ ਸਕਦੇ ਹਨ: <a href='/accounts/agents/'>ਏਜੰਟ ਲੱਭੋ</a>।",
+    'ur': "فی الحال آپ کی پروفائل کے مطابق کوئی پالیسی نہیں ملی۔ ہمارے ایجنٹ آپ کی مدد کر سکتے ہیں: <a href='/accounts/agents/'>ایجنٹ تلاش کریں</a>۔",
+}
+
 # ==========================================
 # 2. CORE VIEWS
 # ==========================================
 
 def chat_view(request):
     # Reset survey if page is refreshed to start fresh interaction
-    if 'survey_step' in request.session: 
-        del request.session['survey_step']
-    return render(request, 'chatbot/chat.html')
+    state = chat_state.load(request)
+    state.reset_survey()
+    memory.forget(state.key)  # the page shows a new conversation
+    response = render(request, 'chatbot/chat.html', {
+        'chat_language': state.language,
+        'chat_greetings': CHAT_GREETINGS,
+        'chat_ws_path': settings.CHAT_WEBSOCKET['PATH'] if settings.CHAT_WEBSOCKET['ENABLED'] else '',
+    })
+    chat_state.save(request, response)
+    return response
 
-def get_response(request):
+async def get_response(request):
+    """Blocking mode: returns the whole reply as one JSON object."""
+    started = time.perf_counter()
     user_msg = request.GET.get('userMessage', '').strip()
-    lang_code = request.session.get('language', 'en')
-    
-    # Initialize Session if not present
-    if 'survey_step' not in request.session:
-        request.session['survey_step'] = -1
-        request.session['survey_data'] = {}
+    lang_code = (await chat_state.aload(request)).language
+
+    turn = await route_message(request, user_msg, lang_code)
+    if 'prompt' in turn:
+        reply = await call_gemini(turn['prompt'], tier=turn.get('tier', router.FULL))
+        if turn.get('cacheable') and reply != FALLBACK_REPLY:
+            await response_cache.aset(user_msg, lang_code, reply)
+    else:
+        reply = turn['botResponse']
+
+    # In blocking mode the first token reaches the user with the last one
+    ttft_ms = (time.perf_counter() - started) * 1000
+    metrics.observe('chat.ttft_ms.blocking', ttft_ms)
+    response = JsonResponse({"botResponse": reply})
+    response['Server-Timing'] = f'ttft;dur={ttft_ms:.1f}'
+    state = await chat_state.aload(request)
+    # Every chatting visitor gets an id: memory and transcripts are keyed by it
+    await chat_state.asave(request, response, persist=True)
+    if reply != FALLBACK_REPLY:
+        await memory.aremember(state.key, user_msg, reply, lang_code)
+    transcripts.log_turn(state.key, lang_code, user_msg, reply, turn.get('intent'), ttft_ms)
+    return response
+
+async def stream_response(request):
+    """
+    Streaming mode: relays LLM chunks to the browser as Server-Sent Events.
+    Each event carries {"text": chunk}; a final `done` event closes the turn.
+    """
+    started = time.perf_counter()
+    user_msg = request.GET.get('userMessage', '').strip()
+    lang_code = (await chat_state.aload(request)).language
+
+    # Routing (and any state update) happens before the body is streamed
+    turn = await route_message(request, user_msg, lang_code)
+    if 'prompt' in turn:
+        chunks = router.astream(turn['prompt'], turn.get('tier', router.FULL))
+        if turn.get('cacheable'):
+            chunks = cache_stream(chunks, user_msg, lang_code)
+    else:
+        chunks = single_chunk(turn['botResponse'])
+
+    state = await chat_state.aload(request)
+
+    async def log_reply(reply, ttft_ms):
+        if reply != FALLBACK_REPLY:
+            await memory.aremember(state.key, user_msg, reply, lang_code)
+        transcripts.log_turn(state.key, lang_code, user_msg, reply, turn.get('intent'), ttft_ms)
+
+    response = StreamingHttpResponse(sse_events(chunks, started, log_reply), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+    # The id must be set now: the reply is remembered after the headers are sent
+    await chat_state.asave(request, response, persist=True)
+    return response
+
+async def sse_events(chunks, started, on_complete=None):
+    """
+    SSE framing; `await on_complete(reply, ttft_ms)` gets the full reply at
+    the end. A reply that breaks off midway ends with an `error` event
+    instead of `done`, and is not passed on.
+    """
+    parts = []
+    ttft_ms = None
+    try:
+        async for chunk in chunks:
+            if ttft_ms is None:
+                ttft_ms = (time.perf_counter() - started) * 1000
+                metrics.observe('chat.ttft_ms.stream', ttft_ms)
+            parts.append(chunk)
+            yield f"data: {json.dumps({'text': chunk})}\n\n"
+    except LLMStreamInterrupted as e:
+        logger.warning("Chat stream interrupted: %s", e)
+        metrics.incr('chat.stream.interrupted')
+        yield "event: error\ndata: {}\n\n"
+        return
+    yield "event: done\ndata: {}\n\n"
+    if on_complete:
+        await on_complete(''.join(parts), ttft_ms)
+
+async def single_chunk(text):
+    yield text
+
+async def cache_stream(chunks, user_msg, lang_code):
+    """Passes chunks through and caches the full reply once it completes (not if it breaks off)."""
+    parts = []
+    async for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    reply = ''.join(parts)
+    if reply != FALLBACK_REPLY:
+        await response_cache.aset(user_msg, lang_code, reply)
 
-    step = request.session['survey_step']
+async def route_message(request, user_msg, lang_code):
+    """
+    Decides how to answer one chat turn. Returns either a finished reply
+    ({"botResponse": ...}) or a prompt that still has to go to the LLM
+    ({"prompt": ..., "tier": ...}); "intent" names the route taken.
+    """
+    state = await chat_state.aload(request)
 
     # --- ROUTE 1: IN SURVEY? ---
-    if step >= 0:
-        return handle_survey_logic(request, user_msg, lang_code)
+    if state.step >= 0:
+        return dict(await handle_survey_logic(request, user_msg, lang_code), intent='survey')
 
     # --- ROUTE 2: INTENT DETECTION ---
-    buy_keywords = ['buy', 'plan', 'suggest', 'recommend', 'policy', 'best', 'insurance for me', 'start', 'find', 'help']
-    if any(k in user_msg.lower() for k in buy_keywords):
-        # Start Survey
-        request.session['survey_step'] = 0
-        request.session['survey_data'] = {} # Clear old data
-        
-        # Get script for selected language, fallback to English if somehow missing
-        scripts = SURVEY_SCRIPTS.get(lang_code, SURVEY_SCRIPTS['en'])
-        
-        # Localized Intro
-        intros = {
-            'en': "Sure! I can help you find the best policy. ",
-            'hi': "ज़रूर! मैं आपको सबसे अच्छी पॉलिसी खोजने में मदद कर सकती हूँ। ",
-            'mr': "नक्कीच! मी तुम्हाला सर्वोत्तम पॉलिसी शोधण्यात मदत करू शकते. ",
-            'te': "తప్పకుండా! మీకు ఉత్తమమైన పాలసీని కనుగొనడంలో నేను సహాయపడగలను. "
-        }
-        intro = intros.get(lang_code, intros['en'])
-        
-        return JsonResponse({"botResponse": intro + scripts[0]})
-
-    # --- ROUTE 3: GENERAL CHAT ---
-    return handle_general_chat(user_msg, lang_code)
+    # One pass of the compiled multilingual keyword matcher
+    intent = intents.detect_intent(user_msg)
+    profile = {}
+    if intent is None or (intent == intents.BUY and survey_parser.speaks_of_self(user_msg)):
+        # A buy request only pre-fills answers when it is about the user
+        # ("I am 42 ...", not "a plan for my 10 year old son")
+        profile = survey_parser.extract_profile(user_msg)
+    if intent is None and len(profile) >= survey_parser.STATEMENT_MIN_FIELDS:
+        intent = intents.BUY  # "I am a 42 year old farmer, earn 2 lakh, have a tractor"
+    if intent:
+        metrics.incr(f'chat.intent.{intent}')
+    if intent == intents.BUY:
+        # Start Survey (clears old answers)
+        state.start_survey()
+        if profile:
+            # Everything already stated is kept; only the rest is asked
+            return {"botResponse": await advance_survey(state, profile, lang_code), "intent": intent}
+        return {"botResponse": survey_opening(lang_code), "intent": intent}
+    if intent in (intents.CLAIM, intents.AGENT):
+        replies = INTENT_REPLIES[intent]
+        return {"botResponse": replies.get(lang_code, replies['en']), "intent": intent}
+    if intent == intents.POLICY_STATUS:
+        return {"botResponse": await policy_status_reply(request, lang_code), "intent": intent}
+
+    # --- ROUTE 3: KNOWLEDGE BASE ---
+    # Confident matches in the FAQs, articles and products need no LLM call
+    reply = await knowledge.aanswer(user_msg, lang_code)
+    if reply is not None:
+        return {"botResponse": reply, "intent": "knowledge"}
+
+    # --- ROUTE 4: GENERAL CHAT ---
+    history = await memory.aload(state.key)
+    return dict(await handle_general_chat(user_msg, lang_code, history), intent='general')
+
+
+def survey_opening(lang_code):
+    """Intro plus the first survey question, falling back to English if missing."""
+    scripts = SURVEY_SCRIPTS.get(lang_code, SURVEY_SCRIPTS['en'])
+    return SURVEY_INTROS.get(lang_code, SURVEY_INTROS['en']) + scripts[0]
+
+
+async def policy_status_reply(request, lang_code):
+    """Dashboard link, plus the status of each policy for a logged-in user."""
+    replies = INTENT_REPLIES[intents.POLICY_STATUS]
+    reply = replies.get(lang_code, replies['en'])
+    user = await request.auser()
+    if user.is_authenticated:
+        async for policy in Policy.objects.filter(user=user).select_related('product'):
+            reply += f"<br>• {escape(policy.policy_number)} ({escape(policy.product.name)}): {policy.get_status_display()}"
+    return reply
 
 
 # ==========================================
 # 3. HELPER: SURVEY LOGIC
 # ==========================================
-def handle_survey_logic(request, user_msg, lang_code):
-    step = request.session['survey_step']
-    survey_data = request.session['survey_data']
-    
-    # 1. Identify current question key
-    if step < len(SURVEY_STEPS):
-        current_key = SURVEY_STEPS[step]
-
-        # 2. Validate Input
-        is_valid, error_msg = validate_input(current_key, user_msg)
-        if not is_valid:
-            return JsonResponse({"botResponse": error_msg})
-
-        # 3. Save Answer
-        survey_data[current_key] = user_msg
-        request.session['survey_data'] = survey_data
-        
-        # 4. Determine Next Step
-        next_step = step + 1
-        scripts = SURVEY_SCRIPTS.get(lang_code, SURVEY_SCRIPTS['en'])
-
-        # Check if we have a next question
-        if next_step < len(SURVEY_STEPS):
-            request.session['survey_step'] = next_step
-            return JsonResponse({"botResponse": scripts[next_step]})
-    
-    # 5. SURVEY COMPLETE -> RAG (Recommendation)
-    relevant_products = InsuranceProduct.objects.filter(is_active=True).values('id', 'name', 'base_premium', 'description')
-    
+async def handle_survey_logic(request, user_msg, lang_code):
+    state = await chat_state.aload(request)
+    state.turns += 1
+
+    # 1. Fields stated in the message, whichever question was asked
+    # ("42, farmer, 2 lakh, tractor" answers all of them)
+    answers = survey_parser.extract_profile(user_msg)
+
+    # 2. Otherwise the whole message answers the current question
+    if state.step < len(SURVEY_STEPS):
+        current_key = SURVEY_STEPS[state.step]
+        if current_key not in answers and not set(answers) - set(state.answers):
+            answers[current_key] = user_msg
+
+    return {"botResponse": await advance_survey(state, answers, lang_code)}
+
+
+async def advance_survey(state, answers, lang_code):
+    """
+    Saves the valid `answers`, then asks the first missing question (or
+    re-asks an invalid one); with all four fields known, recommends.
+    """
+    # 3. Validate and save
+    error_step = None
+    for step, key in enumerate(SURVEY_STEPS):
+        if key not in answers:
+            continue
+        is_valid, error_msg = validate_input(key, answers[key])
+        if is_valid:
+            state.answers[key] = answers[key]
+        elif error_step is None:
+            error_step, error = step, error_msg
+    if error_step is not None:
+        state.step = error_step
+        return error
+
+    # 4. Next missing question
+    scripts = SURVEY_SCRIPTS.get(lang_code, SURVEY_SCRIPTS['en'])
+    for step, key in enumerate(SURVEY_STEPS):
+        if key not in state.answers:
+            state.step = step
+            return scripts[step]
+
+    # 5. SURVEY COMPLETE -> local recommendation (precomputed table lookup)
+    metrics.incr('chat.survey.completed')
+    metrics.observe('chat.survey.round_trips', state.turns)
+    survey_data = state.answers
+    state.reset_survey()
+    with metrics.timer('chat.recommend_ms.local'):
+        card = await sync_to_async(recommender.recommend_card)(survey_data, lang_code)
+    if card is None:
+        return NO_ELIGIBLE_PRODUCT.get(lang_code, NO_ELIGIBLE_PRODUCT['en'])
+    if not settings.CHATBOT_LLM_ENRICHMENT:
+        metrics.incr('chat.recommend.local')
+        return card
+
+    # Optional enrichment: the LLM only picks from the rule-based shortlist and
+    # writes the reason; the card is rendered here from the real catalog row
+    relevant_products = [p async for p in shortlist_queryset(survey_data)]
+    prompt = build_recommendation_prompt(survey_data, relevant_products, lang_code)
+    metrics.observe('chat.prompt_tokens.recommendation', estimate_tokens(prompt))
+    return await enrich_recommendation(prompt, relevant_products, card)
+
+
+def build_recommendation_prompt(survey_data, products, lang_code):
+    """Recommendation prompt for the given (already shortlisted) products."""
     context_text = "\n".join([
         f"- ID {p['id']}: {p['name']} ({p['description']}) @ ₹{p['base_premium']}/yr" 
-        for p in relevant_products
+        for p in products
     ])
     
     user_profile = ", ".join([f"{k}: {v}" for k,v in survey_data.items()])
@@ -189,21 +386,29 @@ def handle_survey_logic(request, user_msg, lang_code):
     AVAILABLE POLICIES: {context_text}
     
     Task: Recommend ONE best policy from the list based on the profile.
-    Explain why in {language_name}.
-    
-    HTML FORMAT:
-    <div class="policy-card">
-       <div class="policy-header">🏆 Best Match: [Product Name]</div>
-       <div class="policy-body">
-           <p><b>Why:</b> [Reasoning in {language_name}]</p>
-           <p class="price">₹[Premium] / year</p>
-       </div>
-       <a href="/products/product/[ID]/" class="buy-btn">View Details</a>
-    </div>
+    Answer with JSON only: "product_id" is the ID from the list and
+    "reason" is one or two short sentences in {language_name} explaining why.
     """
-    
-    request.session['survey_step'] = -1  # Reset survey
-    return call_gemini(prompt, os.getenv("GEMINI_API_KEY"))
+    return prompt
+
+
+async def enrich_recommendation(prompt, products, fallback):
+    """LLM-chosen card, or `fallback` if the call fails or the choice is invalid."""
+    try:
+        with metrics.timer('chat.recommend_ms.llm'):
+            data = await get_client().agenerate_json(prompt, recommender.RECOMMENDATION_SCHEMA)
+    except LLMError as e:
+        logger.warning("Recommendation enrichment failed: %s", e)
+        return fallback
+
+    metrics.observe('chat.output_tokens.recommendation', estimate_tokens(json.dumps(data, ensure_ascii=False)))
+    choice = recommender.validate_choice(data, products)
+    if choice is None:
+        metrics.incr('chat.recommend.rejected')
+        return fallback
+    metrics.incr('chat.recommend.enriched')
+    product, reason = choice
+    return await sync_to_async(recommender.render_card)(product, reason)
 
 
 # ==========================================
@@ -224,55 +429,94 @@ def validate_input(key, text):
 # ==========================================
 # 5. UTILS & AI CALL
 # ==========================================
-def handle_general_chat(user_msg, lang_code):
+async def handle_general_chat(user_msg, lang_code, history=None):
+    # Greetings and thanks get a template; the rest goes to the model tier
+    # the router picks (see chatbot/router.py)
+    tier = router.classify(user_msg, after_question=bool(history and history.asked))
+    if tier == router.LOCAL:
+        return {"botResponse": router.local_reply(user_msg, lang_code), "tier": tier}
+
+    # Repeated questions are answered from the cache without a network call.
+    # Only opening questions: a follow-up's answer depends on the conversation.
+    # FAQ-style questions never get here with or without history: the
+    # knowledge route answers them first.
+    if not history:
+        cached = await response_cache.aget(user_msg, lang_code)
+        if cached is not None:
+            return {"botResponse": cached}
+
     language_name = LANGUAGES.get(lang_code, 'English')
-    prompt = f"""
-    You are BimaSakhi (Insurance Agent).
-    User: "{user_msg}"
-    Answer in {language_name}. Be helpful, empathetic, and concise.
-    If the user seems interested in buying, ask: "Shall I suggest a plan for you?"
-    """
-    return call_gemini(prompt, os.getenv("GEMINI_API_KEY"))
+    prompt = memory.build_prompt(user_msg, language_name, history)
+    return {"prompt": prompt, "cacheable": not history, "tier": tier}
 
-def call_gemini(prompt, api_key):
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={api_key}"
-    try:
-        response = requests.post(url, json={"contents": [{"parts": [{"text": prompt}]}]})
-        response.raise_for_status()
-        reply = response.json()['candidates'][0]['content']['parts'][0]['text']
-        return JsonResponse({"botResponse": reply})
-    except Exception as e:
-        print(f"Gemini Error: {e}")
-        return JsonResponse({"botResponse": "I am having trouble connecting. Please try again."})
+async def call_gemini(prompt, fallback=FALLBACK_REPLY, tier=router.FULL):
+    # Pooled, deadline-bounded call to the tier's model; degrades to `fallback` on failure
+    return await router.areply(prompt, tier, fallback)
 
 # ==========================================
 # 6. AUDIO & LANGUAGE (GTTS Implementation)
 # ==========================================
 
-def speak_text(request):
+async def speak_text(request):
     """
-    Generates audio using Google Text-to-Speech (gTTS).
+    Generates audio using Google Text-to-Speech (gTTS), cached on disk.
+    Synthesis runs on the audio service's worker pool, off the event loop.
     """
     text = request.GET.get('text', '')
     # Get lang code (e.g., 'hi' from 'hi-IN')
-    lang = request.GET.get('lang', 'en').split('-')[0] 
+    lang = audio_service.normalize_lang(request.GET.get('lang', 'en'))
     
     if not text: 
         return HttpResponse(status=400)
     
     try:
-        # Generate Audio using gTTS
-        tts = gTTS(text=text, lang=lang, slow=False)
-        
-        # Save to memory buffer instead of disk
-        audio_file = BytesIO()
-        tts.write_to_fp(audio_file)
-        audio_file.seek(0)
-        
-        return HttpResponse(audio_file, content_type='audio/mpeg')
+        # Each sentence is synthesized once, then served from the disk cache
+        return await audio_service.aspeech_response(request, text, lang)
+    except audio_service.Overloaded:
+        return audio_service.overloaded_response()
+    except Exception as e:
+        logger.warning("TTS failed: %s", e)
+        return HttpResponse(status=500)
+
+async def speak_stream(request):
+    """
+    Progressive TTS for long replies: MP3 sentence by sentence, each one
+    cached on its own. The first sentence is awaited before the response
+    starts so a TTS failure is still a 500 and not a truncated stream.
+    """
+    text = request.GET.get('text', '')
+    lang = audio_service.normalize_lang(request.GET.get('lang', 'en'))
+
+    if not text:
+        return HttpResponse(status=400)
+
+    started = time.perf_counter()
+    chunks = audio_service.get_service().astream(text, lang)
+    try:
+        first = await anext(chunks)
+    except StopAsyncIteration:
+        return HttpResponse(status=400)
+    except audio_service.Overloaded:
+        return audio_service.overloaded_response()
     except Exception as e:
-        print(f"TTS Error: {e}")
+        logger.warning("TTS failed: %s", e)
         return HttpResponse(status=500)
+    metrics.observe('tts.stream.first_chunk_ms', (time.perf_counter() - started) * 1000)
+
+    response = StreamingHttpResponse(audio_chunks(first, chunks), content_type=audio_cache.CONTENT_TYPE)
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+async def audio_chunks(first, rest):
+    yield first
+    try:
+        async for chunk in rest:
+            yield chunk
+    except Exception as e:
+        # Headers are sent: the best we can do is end the audio early
+        logger.warning("TTS stream failed: %s", e)
+        metrics.incr('tts.stream.truncated')
 
 @csrf_exempt
 def set_language(request):
@@ -281,8 +525,86 @@ def set_language(request):
             data = json.loads(request.body)
             lang_code = data.get('language', 'en')
             if lang_code in LANGUAGES:
-                request.session['language'] = lang_code
-                return JsonResponse({'status': 'success', 'language': LANGUAGES[lang_code]})
+                chat_state.load(request).language = lang_code
+                response = JsonResponse({'status': 'success', 'language': LANGUAGES[lang_code]})
+                chat_state.save(request, response)
+                return response
         except:
             pass
     return JsonResponse({'status': 'error'}, status=400)
+
+@staff_member_required
+def metrics_view(request):
+    """Per-process chatbot counters and latency percentiles (JSON)."""
+    return JsonResponse(metrics.snapshot())
+
+# ==========================================
+# 7. VOICE CHAT (Bhashini)
+# ==========================================
+@csrf_exempt
+async def voice_chat(request):
+    """
+    One spoken turn: {"audio": base64 WAV, "language": "hi"} in, transcript,
+    reply and one WAV clip per reply sentence out. Regional-language turns
+    cost two Bhashini requests: ASR chained with translation to English on
+    the way in, and (for LLM answers, which are generated in English)
+    translation chained with TTS on the way out.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required'}, status=405)
+    handler = bhashini_utils.get_handler()
+    if handler is None:
+        return JsonResponse({'error': 'Voice chat is not configured'}, status=503)
+    try:
+        data = json.loads(request.body)
+        audio = data['audio']
+    except (ValueError, KeyError):
+        return JsonResponse({'error': 'Expected JSON with base64 "audio"'}, status=400)
+
+    started = time.perf_counter()
+    state = await chat_state.aload(request)
+    lang_code = audio_service.normalize_lang(data.get('language') or state.language)
+
+    def bhashini(method):
+        # Blocking HTTP; keep it off the event loop
+        return sync_to_async(method, thread_sensitive=False)
+
+    try:
+        if lang_code == 'en':
+            user_msg = english = await bhashini(handler.speech_to_text)(audio, lang_code)
+        else:
+            user_msg, english = await bhashini(handler.speech_to_text_translated)(audio, lang_code)
+        user_msg = user_msg.strip()
+
+        turn = await route_message(request, user_msg, lang_code)
+        if 'prompt' in turn and lang_code != 'en':
+            history = await memory.aload(state.key)
+            reply, clips = await voice_general_chat(handler, english, lang_code, bhashini, history)
+        else:
+            reply = turn.get('botResponse') or await call_gemini(turn['prompt'], tier=turn.get('tier', router.FULL))
+            sentences = audio_service.split_sentences(audio_service.spoken_text(reply))
+            clips = await bhashini(handler.text_to_speech_many)(sentences, lang_code) if sentences else []
+    except Exception as e:
+        logger.warning("Voice turn failed: %s", e)
+        return JsonResponse({'error': 'Voice service unavailable'}, status=502)
+
+    latency_ms = (time.perf_counter() - started) * 1000
+    metrics.observe('chat.voice.turn_ms', latency_ms)
+    response = JsonResponse({"transcript": user_msg, "botResponse": reply, "audio": clips, "audioFormat": "wav"})
+    await chat_state.asave(request, response, persist=True)
+    if reply != FALLBACK_REPLY:
+        await memory.aremember(state.key, user_msg, reply, lang_code)
+    transcripts.log_turn(state.key, lang_code, user_msg, reply, turn.get('intent'), latency_ms)
+    return response
+
+async def voice_general_chat(handler, english, lang_code, bhashini, history=None):
+    """English LLM answer (cached like text chat), translated and voiced sentence by sentence in one request."""
+    turn = await handle_general_chat(english, 'en', history)
+    reply_en = turn.get('botResponse')
+    if reply_en is None:
+        reply_en = await call_gemini(turn['prompt'], tier=turn['tier'])
+        if turn.get('cacheable') and reply_en != FALLBACK_REPLY:
+            await response_cache.aset(english, 'en', reply_en)
+    sentences = audio_service.split_sentences(audio_service.spoken_text(reply_en))
+    translations, clips = await bhashini(handler.translate_and_speak)(sentences, 'en', lang_code)
+    return ' '.join(translations), clips
@@ -0,0 +1,281 @@
+"""
+WebSocket chat channel, served straight from the ASGI entry point.
+
+Over HTTP every turn is a new request: cookies, the middleware stack and a
+chat state load and save each time, and the server cannot push anything.
+`route(app)` wraps the Django ASGI application so that WebSocket
+connections to CHAT_WEBSOCKET['PATH'] are served by ChatSocket instead.
+
+One connection is one visitor. The chat state is loaded once on connect
+and kept in connection memory; it is written back only at checkpoints:
+every survey step, a language change, every CHECKPOINT_EVERY turns and
+on disconnect, unless the visitor carried on over HTTP meanwhile. Replies
+use the same routing as the HTTP views.
+
+Client -> server, JSON text frames:
+
+    {"type": "message", "text": "...", "audio": true}
+    {"type": "language", "language": "hi"}
+
+Server -> client:
+
+    {"type": "ready", "language": "en"}
+    {"type": "typing"}
+    {"type": "token", "text": "..."}          (LLM replies arrive in pieces)
+    {"type": "done", "text": "<whole reply>", "intent": "survey"}
+    {"type": "audio", "url": "/chatbot/speak/?text=...&lang=hi"}
+    {"type": "state", "cookie": "bimasakhi_state=...; Path=/"}
+    {"type": "error", "error": "..."}
+
+"state" carries a checkpoint of the cookie store, which only the client
+can keep: chat.js writes it to document.cookie. "audio" follows "done" once the reply's speech is synthesized (long
+replies get the progressive speak/stream/ URL at once). chat.js falls back
+to the HTTP endpoints when the socket cannot be opened.
+"""
+import asyncio
+import json
+import logging
+import time
+from functools import partial
+from importlib import import_module
+from io import BytesIO
+from urllib.parse import urlencode, urlsplit
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.middleware import auser
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from django.urls import reverse
+
+from insurance_bot import metrics
+
+from . import audio_service, chat_state, memory, router, transcripts, views
+from .llm_client import FALLBACK_REPLY, LLMStreamInterrupted
+
+logger = logging.getLogger(__name__)
+
+STREAM_AUDIO_MIN_CHARS = 200  # as chat.js: longer replies use speak/stream/
+
+
+def _config():
+    config = {
+        'ENABLED': True,
+        'PATH': '/ws/chat/',
+        'CHECKPOINT_EVERY': 5,
+        'MAX_MESSAGE_CHARS': 2000,
+        'MAX_QUEUED': 8,
+    }
+    config.update(getattr(settings, 'CHAT_WEBSOCKET', {}))
+    return config
+
+
+def route(app):
+    """ASGI application: chat WebSockets here, everything else to `app`."""
+    async def application(scope, receive, send):
+        if scope['type'] != 'websocket':
+            return await app(scope, receive, send)
+        config = _config()
+        if config['ENABLED'] and scope['path'] == config['PATH']:
+            return await ChatSocket(scope, receive, send).run()
+        # Django itself cannot serve WebSockets
+        await receive()
+        await send({'type': 'websocket.close', 'code': 4404})
+    return application
+
+
+def _origin_allowed(request):
+    """Browsers send Origin on WebSocket handshakes; other sites must not connect."""
+    origin = request.headers.get('Origin')
+    if not origin:
+        return True
+    return urlsplit(origin).netloc == request.get_host() or origin in settings.CSRF_TRUSTED_ORIGINS
+
+
+def _request(scope):
+    """A Django request for the handshake, with its session and user, for the chat views."""
+    request = ASGIRequest(dict(scope, method='GET'), BytesIO())
+    engine = import_module(settings.SESSION_ENGINE)
+    request.session = engine.SessionStore(request.COOKIES.get(settings.SESSION_COOKIE_NAME))
+    request.auser = partial(auser, request)
+    return request
+
+
+# ==========================================
+# 1. CONNECTION
+# ==========================================
+class ChatSocket:
+    def __init__(self, scope, receive, send):
+        self.scope = scope
+        self.receive = receive
+        self._send = send
+        self._send_lock = asyncio.Lock()
+        self._audio_tasks = set()
+        self.config = _config()
+        self.request = None
+        self.state = None
+        self.turns = 0
+
+    async def send_json(self, **event):
+        async with self._send_lock:
+            await self._send({'type': 'websocket.send', 'text': json.dumps(event, ensure_ascii=False)})
+
+    async def run(self):
+        if (await self.receive())['type'] != 'websocket.connect':
+            return
+        self.request = _request(self.scope)
+        if not _origin_allowed(self.request):
+            metrics.incr('chat.ws.rejected')
+            await self._send({'type': 'websocket.close', 'code': 4403})
+            return
+
+        self.state = await chat_state.aload(self.request)
+        # Memory and transcripts are keyed by the visitor id
+        cookies = await chat_state.ahandshake_cookies(self.request)
+        headers = [(b'set-cookie', cookie.encode('latin-1')) for cookie in cookies]
+        await self._send({'type': 'websocket.accept', 'headers': headers})
+        metrics.incr('chat.ws.connect')
+        await self.send_json(type='ready', language=self.state.language)
+
+        queue = asyncio.Queue(self.config['MAX_QUEUED'])
+        worker = asyncio.create_task(self.work(queue))
+        try:
+            while True:
+                message = await self.receive()
+                if message['type'] == 'websocket.disconnect':
+                    break
+                if message['type'] == 'websocket.receive':
+                    await self.accept_event(message, queue)
+        finally:
+            worker.cancel()
+            for task in self._audio_tasks:
+                task.cancel()
+            await asyncio.gather(worker, *self._audio_tasks, return_exceptions=True)
+            # A newer state from the HTTP endpoints (chat.js fell back mid-survey) wins
+            await chat_state.awrite(self.request, keep_newer=True)
+            metrics.incr('chat.ws.disconnect')
+
+    async def accept_event(self, message, queue):
+        """Queues one client event; malformed ones get an error event."""
+        try:
+            event = json.loads(message.get('text') or message.get('bytes') or b'')
+            if not isinstance(event, dict):
+                raise ValueError
+        except ValueError:
+            await self.send_json(type='error', error='Expected a JSON object')
+            return
+        if event.get('type') == 'message':
+            text = str(event.get('text', '')).strip()
+            if not text or len(text) > self.config['MAX_MESSAGE_CHARS']:
+                await self.send_json(type='error', error='Empty or too long message')
+                return
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            metrics.incr('chat.ws.busy')
+            await self.send_json(type='error', error='Too many messages at once')
+
+    async def work(self, queue):
+        """Handles events one at a time, in order."""
+        while True:
+            event = await queue.get()
+            try:
+                if event.get('type') == 'message':
+                    await self.turn(str(event['text']).strip(), bool(event.get('audio')))
+                elif event.get('type') == 'language':
+                    await self.set_language(event.get('language'))
+                else:
+                    await self.send_json(type='error', error='Unknown event type')
+            except Exception:
+                logger.exception("WebSocket chat turn failed")
+                metrics.incr('chat.ws.error')
+                await self.send_json(type='error', error='Something went wrong')
+            finally:
+                # Like the end of an HTTP request: drop stale DB connections
+                await sync_to_async(close_old_connections)()
+
+    # ==========================================
+    # 2. EVENTS
+    # ==========================================
+    async def set_language(self, lang_code):
+        if lang_code not in views.LANGUAGES:
+            await self.send_json(type='error', error='Unknown language')
+            return
+        self.state.language = lang_code
+        await self.checkpoint()
+        await self.send_json(type='ready', language=lang_code)
+
+    async def checkpoint(self):
+        cookie = await chat_state.awrite(self.request)
+        if cookie:
+            await self.send_json(type='state', cookie=cookie)
+
+    async def turn(self, user_msg, audio):
+        """One chat turn, as get_response/stream_response but without the request overhead."""
+        started = time.perf_counter()
+        await self.send_json(type='typing')
+        state = self.state
+        lang_code = state.language
+        step = state.step
+
+        turn = await views.route_message(self.request, user_msg, lang_code)
+        if 'prompt' in turn:
+            chunks = router.astream(turn['prompt'], turn.get('tier', router.FULL))
+            if turn.get('cacheable'):
+                chunks = views.cache_stream(chunks, user_msg, lang_code)
+        else:
+            chunks = views.single_chunk(turn['botResponse'])
+
+        parts = []
+        ttft_ms = None
+        try:
+            async for chunk in chunks:
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - started) * 1000
+                    metrics.observe('chat.ttft_ms.ws', ttft_ms)
+                parts.append(chunk)
+                await self.send_json(type='token', text=chunk)
+        except LLMStreamInterrupted as e:
+            # Not remembered: the next turn must not build on half a reply
+            logger.warning("WebSocket reply interrupted: %s", e)
+            metrics.incr('chat.ws.interrupted')
+            await self.send_json(type='error', error='Reply interrupted')
+            return
+        reply = ''.join(parts)
+        # Checkpoints: every survey step (so an HTTP fallback resumes where the socket
+        # left off), or enough turns went by. Before "done", so the client has the state
+        # by the time it may send the next message over HTTP
+        self.turns += 1
+        if state.step != step or state.step >= 0 or self.turns % self.config['CHECKPOINT_EVERY'] == 0:
+            await self.checkpoint()
+        await self.send_json(type='done', text=reply, intent=turn.get('intent'))
+        metrics.observe('chat.ws.turn_ms', (time.perf_counter() - started) * 1000)
+
+        if reply != FALLBACK_REPLY:
+            await memory.aremember(state.key, user_msg, reply, lang_code)
+        transcripts.log_turn(state.key, lang_code, user_msg, reply, turn.get('intent'), ttft_ms)
+        if audio:
+            self.start_audio(reply, lang_code)
+
+    def start_audio(self, reply, lang_code):
+        text = audio_service.spoken_text(reply)
+        if len(text) < 2:
+            return
+        task = asyncio.create_task(self.audio_ready(text, audio_service.normalize_lang(lang_code)))
+        self._audio_tasks.add(task)
+        task.add_done_callback(self._audio_tasks.discard)
+
+    async def audio_ready(self, text, lang):
+        """Tells the client where the reply's audio is, once it can be played without waiting."""
+        query = urlencode({'text': text, 'lang': lang})
+        if len(text) > STREAM_AUDIO_MIN_CHARS:
+            await self.send_json(type='audio', url=f"{reverse('speak_stream')}?{query}")
+            return
+        try:
+            # Synthesized into the disk cache, so the client's GET is a cache hit
+            await audio_service.get_service().aget(text, lang)
+        except Exception as e:
+            metrics.incr('chat.ws.audio_failed')
+            logger.warning("WebSocket audio failed: %s", e)
+            return
+        await self.send_json(type='audio', url=f"{reverse('speak_text')}?{query}")
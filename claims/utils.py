@@ -1,6 +1,7 @@
 from django.conf import settings
-from twilio.rest import Client
 from django.core.mail import send_mail
+from django.utils.module_loading import import_string
+
 
 def send_claim_notification(user, claim):
     """
@@ -29,7 +30,9 @@ def send_claim_notification(user, claim):
     try:
         # Check if settings exist to avoid crashes during dev
         if hasattr(settings, 'TWILIO_ACCOUNT_SID'):
-            client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+            # TWILIO_CLIENT swaps in a stand-in (fake_services) for load tests
+            client_cls = import_string(getattr(settings, 'TWILIO_CLIENT', 'twilio.rest.Client'))
+            client = client_cls(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
             
             # Use user profile phone or fallback
             user_phone = user.profile.phone_number if hasattr(user, 'profile') and user.profile.phone_number else ''
@@ -0,0 +1,14 @@
+"""
+Local stand-ins for the external services: Gemini, Bhashini (ULCA), gTTS,
+googletrans and Twilio.
+
+Every fake has a latency distribution, an error rate and canned payloads
+(fake_services/profiles.py) and is served by one HTTP server
+(fake_services/server.py). Set FAKE_SERVICES=inprocess to run the server
+in a thread of the Django process, or start it with
+`manage.py run_fake_services` and set FAKE_SERVICES=http (and
+FAKE_SERVICES_URL). Either way the app then talks to the fakes through
+its normal clients: the Gemini and Bhashini clients over HTTP at the fake
+URLs, gTTS, googletrans and Twilio through the adapters in
+fake_services/clients.py.
+"""
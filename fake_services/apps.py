@@ -0,0 +1,24 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class FakeServicesConfig(AppConfig):
+    name = 'fake_services'
+    verbose_name = 'Fake external services'
+    server = None  # the in-process server, when MODE is "inprocess"
+
+    def ready(self):
+        config = getattr(settings, 'FAKE_SERVICES', {})
+        mode = config.get('MODE')
+        if not mode:
+            return
+        from .clients import wire
+
+        if mode == 'inprocess':
+            from .server import start
+            self.server = start(profile=config.get('PROFILE', 'typical'))
+            wire(self.server.url)
+        elif mode == 'http':
+            wire(config['URL'])
+        else:
+            raise ValueError(f"FAKE_SERVICES['MODE'] must be '', 'inprocess' or 'http', not {mode!r}")
@@ -0,0 +1,102 @@
+"""
+Client side of the fakes, for libraries whose hosts cannot be pointed
+elsewhere (gTTS, googletrans, Twilio). Each one has the signature of the
+hook it plugs into; `wire` installs them together with the URLs of the
+Gemini and Bhashini fakes. Also small helpers to read and change a running
+server's counts and profile.
+"""
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+TIMEOUT = (3.05, 30)
+
+_session = requests.Session()
+_session.mount('http://', HTTPAdapter(pool_connections=2, pool_maxsize=64))
+
+
+def _url(path):
+    return settings.FAKE_SERVICES['URL'].rstrip('/') + path
+
+
+def _post(path, **kwargs):
+    response = _session.post(_url(path), timeout=TIMEOUT, **kwargs)
+    response.raise_for_status()
+    return response
+
+
+# ==========================================
+# 1. HOOKS
+# ==========================================
+def synthesize(text, lang):
+    """AUDIO_SERVICE['BACKENDS'] entry standing in for gTTS: MP3 bytes."""
+    return _post('/tts', json={'text': text, 'lang': lang}).content
+
+
+def translate(sentences, lang):
+    """TRANSLATION['BACKEND'] standing in for googletrans: one rate-limited request per sentence, as there."""
+    from insurance.translation import get_limiter
+
+    results = []
+    for sentence in sentences:
+        get_limiter().acquire()
+        results.append(_post('/translate', json={'text': sentence, 'dest': lang}).json()['text'])
+    return results
+
+
+class TwilioClient:
+    """TWILIO_CLIENT standing in for twilio.rest.Client (SMS only)."""
+
+    def __init__(self, account_sid, auth_token):
+        self.messages = _Messages(account_sid)
+
+
+class _Messages:
+    def __init__(self, account_sid):
+        self.path = f'/twilio/2010-04-01/Accounts/{account_sid}/Messages.json'
+
+    def create(self, body, from_, to):
+        return _Message(_post(self.path, data={'Body': body, 'From': from_, 'To': to}).json())
+
+
+class _Message:
+    def __init__(self, data):
+        self.sid = data['sid']
+        self.status = data['status']
+
+
+def wire(url):
+    """Points every external client of the app at the fakes served from `url`."""
+    url = url.rstrip('/')
+    settings.FAKE_SERVICES['URL'] = url
+    settings.LLM_CLIENT['BACKEND'] = 'chatbot.llm_client.GeminiBackend'
+    settings.LLM_CLIENT['OPTIONS'] = dict(settings.LLM_CLIENT.get('OPTIONS', {}),
+                                          base_url=f'{url}/gemini/v1beta', api_key='fake')
+    settings.BHASHINI.update(USER_ID='fake', API_KEY='fake', CONFIG_URL=f'{url}/ulca/config')
+    settings.AUDIO_SERVICE['BACKENDS'] = {'gtts': 'fake_services.clients.synthesize'}
+    settings.TRANSLATION['BACKEND'] = 'fake_services.clients.translate'
+    settings.TWILIO_CLIENT = 'fake_services.clients.TwilioClient'
+    settings.TWILIO_ACCOUNT_SID = 'ACfake'
+    settings.TWILIO_AUTH_TOKEN = 'fake'
+    settings.TWILIO_PHONE_NUMBER = '+15005550006'
+
+
+# ==========================================
+# 2. SERVER CONTROL
+# ==========================================
+def stats():
+    """{'profile': name, 'counts': {endpoint: requests, ...}} of the running fakes."""
+    response = _session.get(_url('/_stats'), timeout=TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+def reset():
+    return _post('/_reset').json()
+
+
+def configure(profile=None, services=None, rotate_every=None):
+    """Changes the running fakes, e.g. configure(services={'gemini': {'error_rate': 0.2}})."""
+    body = {key: value for key, value in
+            (('profile', profile), ('services', services), ('rotate_every', rotate_every)) if value is not None}
+    return _post('/_config', json=body).json()
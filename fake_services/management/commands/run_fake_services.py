@@ -0,0 +1,31 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from fake_services.profiles import PROFILES
+from fake_services.server import FakeServer
+
+
+class Command(BaseCommand):
+    help = ("Serves fake Gemini, Bhashini, gTTS, googletrans and Twilio endpoints; point the app at them "
+            "with FAKE_SERVICES=http FAKE_SERVICES_URL=<printed URL>")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--profile', default='typical', choices=sorted(PROFILES))
+        parser.add_argument('--rotate-every', type=int, default=0,
+                            help="Rotate the Bhashini inference key every N inferences (0: never)")
+
+    def handle(self, *args, **options):
+        server = FakeServer((options['host'], options['port']), options['profile'], options['rotate_every'])
+        self.stdout.write(self.style.SUCCESS(f"Fake services at {server.url} (profile {options['profile']})"))
+        for name, profile in server.profiles.items():
+            self.stdout.write(f"  {name:<10} {profile.describe()}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(json.dumps(server.stats()['counts'], sort_keys=True))
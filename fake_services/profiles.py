@@ -0,0 +1,144 @@
+"""
+How the fake services behave: a latency distribution per request, a
+failure rate with the HTTP status failures are answered with, and
+optional canned payloads.
+
+Latencies are given as specs: '0.2' or 'const:0.2', 'uniform:0.1:0.5',
+or 'lognormal:0.8:4' (median and 99th percentile, in seconds). Real APIs
+have long right tails, so the named profiles use lognormal latencies.
+"""
+import math
+import random
+import time
+
+# z-score of the 99th percentile of a standard normal distribution
+_Z99 = 2.326
+
+
+class Constant:
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def sample(self):
+        return self.seconds
+
+    def __str__(self):
+        return f"const:{self.seconds:g}"
+
+
+class Uniform:
+    def __init__(self, low, high):
+        self.low = low
+        self.high = high
+
+    def sample(self):
+        return random.uniform(self.low, self.high)
+
+    def __str__(self):
+        return f"uniform:{self.low:g}:{self.high:g}"
+
+
+class LogNormal:
+    """Median `p50` seconds, 99th percentile `p99` seconds."""
+
+    def __init__(self, p50, p99):
+        self.p50 = p50
+        self.p99 = p99
+        self.mu = math.log(p50)
+        self.sigma = max(0.0, math.log(p99 / p50) / _Z99)
+
+    def sample(self):
+        return random.lognormvariate(self.mu, self.sigma)
+
+    def __str__(self):
+        return f"lognormal:{self.p50:g}:{self.p99:g}"
+
+
+def parse_latency(spec):
+    """A latency distribution from a spec string, a number of seconds, or a distribution."""
+    if hasattr(spec, 'sample'):
+        return spec
+    if isinstance(spec, (int, float)):
+        return Constant(float(spec))
+    kind, _, args = spec.partition(':')
+    if not args:
+        return Constant(float(kind))
+    values = [float(v) for v in args.split(':')]
+    if kind == 'const':
+        return Constant(*values)
+    if kind == 'uniform':
+        return Uniform(*values)
+    if kind == 'lognormal':
+        if values[0] <= 0:
+            return Constant(0.0)
+        return LogNormal(*values)
+    raise ValueError(f"Unknown latency distribution: {spec!r}")
+
+
+class Profile:
+    """
+    Behaviour of one fake service.
+
+    latency      -- time per request
+    ttft         -- time to the first chunk of a streamed reply (Gemini)
+    per_item     -- extra seconds per additional input of a batched request (ULCA)
+    error_rate   -- fraction of requests answered with `error_status`
+    payload      -- canned reply text (Gemini) or transcript (ULCA ASR)
+    """
+
+    def __init__(self, latency=0.0, ttft=None, per_item=0.0, error_rate=0.0, error_status=503, payload=None):
+        self.latency = parse_latency(latency)
+        self.ttft = parse_latency(ttft) if ttft is not None else None
+        self.per_item = per_item
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.payload = payload
+
+    def delay(self, items=1):
+        time.sleep(self.latency.sample() + self.per_item * max(0, items - 1))
+
+    def fails(self):
+        return random.random() < self.error_rate
+
+    def replace(self, **changes):
+        fields = {
+            'latency': self.latency, 'ttft': self.ttft, 'per_item': self.per_item,
+            'error_rate': self.error_rate, 'error_status': self.error_status, 'payload': self.payload,
+        }
+        fields.update(changes)
+        return Profile(**fields)
+
+    def describe(self):
+        ttft = f" ttft={self.ttft}" if self.ttft else ""
+        return f"{self.latency}{ttft} errors={self.error_rate:.1%} ({self.error_status})"
+
+
+SERVICES = ('gemini', 'ulca', 'tts', 'translate', 'twilio')
+
+# Named profiles: 'fast' measures our own overhead, 'typical' roughly matches
+# the real services from India, 'degraded' is a bad day upstream.
+PROFILES = {
+    'fast': {service: Profile() for service in SERVICES},
+    'typical': {
+        'gemini': Profile('lognormal:0.9:4', ttft='lognormal:0.35:1.5', error_rate=0.01, error_status=503),
+        'ulca': Profile('lognormal:0.25:1.2', per_item=0.08, error_rate=0.01, error_status=500),
+        'tts': Profile('lognormal:0.6:2.5', error_rate=0.01, error_status=500),
+        'translate': Profile('lognormal:0.15:0.8', error_rate=0.01, error_status=429),
+        'twilio': Profile('lognormal:0.3:1', error_rate=0.005, error_status=500),
+    },
+    'degraded': {
+        'gemini': Profile('lognormal:2.5:10', ttft='lognormal:1.2:6', error_rate=0.1, error_status=503),
+        'ulca': Profile('lognormal:0.8:4', per_item=0.2, error_rate=0.05, error_status=500),
+        'tts': Profile('lognormal:1.5:6', error_rate=0.05, error_status=500),
+        'translate': Profile('lognormal:0.5:3', error_rate=0.1, error_status=429),
+        'twilio': Profile('lognormal:1:4', error_rate=0.05, error_status=500),
+    },
+}
+
+
+def get_profiles(name):
+    """A copy of the named profile set, so a server can change it at runtime."""
+    try:
+        return dict(PROFILES[name])
+    except KeyError:
+        raise ValueError(f"Unknown fake services profile {name!r}; choose from {', '.join(PROFILES)}")
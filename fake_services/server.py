@@ -0,0 +1,302 @@
+"""
+One local HTTP server for all fakes. Routes:
+
+  POST /gemini/v1beta/models/<model>:generateContent        Gemini REST
+  POST /gemini/v1beta/models/<model>:streamGenerateContent  Gemini SSE
+  POST /ulca/config, /ulca/inference                        Bhashini (ULCA) pipelines
+  POST /tts                                                 gTTS ({"text", "lang"} -> MP3)
+  POST /translate                                           googletrans ({"text", "dest"})
+  POST /twilio/2010-04-01/Accounts/<sid>/Messages.json      Twilio SMS
+
+  GET  /_stats    request counts per endpoint, errors and connections
+  POST /_reset    zero the counts
+  POST /_config   {"profile": "degraded", "services": {"gemini": {"error_rate": 0.2}},
+                   "rotate_every": 50}
+"""
+import base64
+import io
+import json
+import sys
+import threading
+import time
+import uuid
+import wave
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from .profiles import get_profiles
+
+GEMINI_REPLY = (
+    "Term insurance pays your family a fixed amount if something happens to you. "
+    "The premium stays the same for the whole policy term, so it is easy to plan for. "
+    "Most families choose a cover of ten to fifteen times their yearly income."
+)
+STRUCTURED_TEXT = "This plan fits your age, income and family needs."
+ASR_TRANSCRIPT = "mujhe bima ke baare mein bataiye"
+
+# One MPEG-1 Layer III frame (128 kbps, 44.1 kHz, mono): ~26 ms of silence
+MP3_FRAME = b'\xff\xfb\x90\xc4' + bytes(413)
+WORDS_PER_CHUNK = 5
+
+
+def silent_mp3(text):
+    """Roughly as long as speaking `text` (0.4 s per word)."""
+    return MP3_FRAME * max(8, 15 * len(text.split()))
+
+
+def silent_wav(text):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(16000)
+        out.writeframes(bytes(2 * int(16000 * 0.4 * max(1, len(text.split())))))
+    return buffer.getvalue()
+
+
+def schema_example(schema):
+    """The simplest value matching a Gemini responseSchema, for structured-output calls."""
+    kind = schema.get('type', 'STRING').upper()
+    if kind == 'OBJECT':
+        return {name: schema_example(prop) for name, prop in schema.get('properties', {}).items()}
+    if kind == 'ARRAY':
+        return [schema_example(schema.get('items', {}))]
+    if kind == 'INTEGER':
+        return 1
+    if kind == 'NUMBER':
+        return 1.0
+    if kind == 'BOOLEAN':
+        return True
+    return STRUCTURED_TEXT
+
+
+class FakeServer(ThreadingHTTPServer):
+    """Serves every fake with the latencies and failures of a named profile, counting requests."""
+    daemon_threads = True
+    request_queue_size = 256  # load tests open many connections at once
+
+    def __init__(self, address=('127.0.0.1', 0), profile='typical', rotate_every=0):
+        super().__init__(address, FakeHandler)
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.profile_name = profile
+        self.profiles = get_profiles(profile)
+        self.rotate_every = rotate_every  # rotate the ULCA inference key every N inferences
+        self.key_version = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name):
+        with self.lock:
+            self.counts[name] += 1
+            return self.counts[name]
+
+    def stats(self):
+        with self.lock:
+            return {'profile': self.profile_name, 'counts': dict(self.counts)}
+
+    def reset(self):
+        with self.lock:
+            self.counts.clear()
+
+    def handle_error(self, request, client_address):
+        # Clients give up on slow replies (deadlines, hedged requests); that is not an error here
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def configure(self, profile=None, services=None, rotate_every=None):
+        """Switches to another named profile and/or overrides fields of single services."""
+        with self.lock:
+            if profile:
+                self.profiles = get_profiles(profile)
+                self.profile_name = profile
+            for service, changes in (services or {}).items():
+                self.profiles[service] = self.profiles[service].replace(**changes)
+            if rotate_every is not None:
+                self.rotate_every = rotate_every
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # keep-alive, like the real endpoints
+    disable_nagle_algorithm = True  # headers and body are separate writes
+
+    def setup(self):
+        super().setup()
+        self.server.count('connections')
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == '/_stats':
+            return self.reply(200, self.server.stats())
+        self.reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        path = self.path.partition('?')[0]
+        if path == '/_reset':
+            self.server.reset()
+            return self.reply(200, self.server.stats())
+        if path == '/_config':
+            try:
+                self.server.configure(**json.loads(raw or b'{}'))
+            except (ValueError, TypeError, KeyError) as e:
+                return self.reply(400, {"error": str(e)})
+            return self.reply(200, {name: p.describe() for name, p in self.server.profiles.items()})
+
+        route = self.route(path)
+        if route is None:
+            return self.reply(404, {"error": f"no fake for {path}"})
+        name, service, handle = route
+        profile = self.server.profiles[service]
+        self.server.count(name)
+        if profile.fails():
+            profile.delay()
+            self.server.count(f'{name}.errors')
+            return self.reply(profile.error_status,
+                              {"error": {"code": profile.error_status, "message": "Injected failure"}})
+        try:
+            body = parse_qs(raw.decode()) if service == 'twilio' else json.loads(raw or b'{}')
+        except ValueError:
+            return self.reply(400, {"error": "malformed body"})
+        handle(profile, body)
+
+    def route(self, path):
+        """(count name, profile name, handler) for a request path."""
+        if path.startswith('/gemini/'):
+            if path.endswith(':streamGenerateContent'):
+                return 'gemini.stream', 'gemini', self.gemini_stream
+            if path.endswith(':generateContent'):
+                return 'gemini.generate', 'gemini', self.gemini_generate
+        elif path == '/ulca/config':
+            return 'ulca.config', 'ulca', self.ulca_config
+        elif path == '/ulca/inference':
+            return 'ulca.inference', 'ulca', self.ulca_inference
+        elif path == '/tts':
+            return 'tts', 'tts', self.tts
+        elif path == '/translate':
+            return 'translate', 'translate', self.translate
+        elif path.startswith('/twilio/') and path.endswith('/Messages.json'):
+            return 'twilio.sms', 'twilio', self.twilio_sms
+        return None
+
+    # ==========================================
+    # 1. GEMINI
+    # ==========================================
+    def gemini_generate(self, profile, body):
+        profile.delay()
+        schema = body.get('generationConfig', {}).get('responseSchema')
+        text = json.dumps(schema_example(schema)) if schema else (profile.payload or GEMINI_REPLY)
+        self.reply(200, {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}]})
+
+    def gemini_stream(self, profile, body):
+        words = (profile.payload or GEMINI_REPLY).split(' ')
+        chunks = [' '.join(words[i:i + WORDS_PER_CHUNK]) for i in range(0, len(words), WORDS_PER_CHUNK)]
+        total = profile.latency.sample()
+        ttft = min(total, profile.ttft.sample()) if profile.ttft else total
+        gap = (total - ttft) / max(1, len(chunks) - 1)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        time.sleep(ttft)
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(gap)
+            text = chunk if i == len(chunks) - 1 else chunk + ' '
+            event = {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}]}
+            self.write_chunk(f"data: {json.dumps(event)}\r\n\r\n".encode())
+        self.write_chunk(b'')
+
+    # ==========================================
+    # 2. BHASHINI (ULCA)
+    # ==========================================
+    def ulca_config(self, profile, body):
+        profile.delay()
+        if not (self.headers.get('userID') and self.headers.get('ulcaApiKey')):
+            return self.reply(401, {"error": "missing credentials"})
+        self.reply(200, {
+            "pipelineInferenceAPIEndPoint": {
+                "callbackUrl": f"http://{self.headers.get('Host')}/ulca/inference",
+                "inferenceApiKey": {"value": f"fake-key-{self.server.key_version}"},
+            },
+            "pipelineResponseConfig": [
+                {"config": [{"serviceId": f"fake-{task['taskType']}"}]} for task in body["pipelineTasks"]
+            ],
+        })
+
+    def ulca_inference(self, profile, body):
+        if self.headers.get('Authorization') != f"fake-key-{self.server.key_version}":
+            self.server.count('ulca.unauthorized')
+            return self.reply(401, {"error": "invalid key"})
+        calls = self.server.counts['ulca.inference']
+        if self.server.rotate_every and calls % self.server.rotate_every == 0:
+            self.server.key_version += 1  # the next call with the cached key gets a 401
+        inputs = body["input"]
+        profile.delay(items=len(inputs))
+        self.reply(200, {"pipelineResponse": [self.ulca_task(task, inputs, profile) for task in body["pipelineTasks"]]})
+
+    def ulca_task(self, task, inputs, profile):
+        kind = task["taskType"]
+        if kind == "asr":
+            transcript = profile.payload or ASR_TRANSCRIPT
+            return {"taskType": kind, "output": [{"source": transcript} for _ in inputs]}
+        if kind == "translation":
+            target = task["config"]["language"]["targetLanguage"]
+            return {"taskType": kind, "output": [
+                {"source": item.get("source", ""), "target": f"[{target}] {item.get('source', '')}"}
+                for item in inputs
+            ]}
+        # tts: clip length follows the input sentence
+        return {"taskType": kind, "audio": [
+            {"audioContent": base64.b64encode(silent_wav(item.get("source", ""))).decode()} for item in inputs
+        ]}
+
+    # ==========================================
+    # 3. gTTS, GOOGLETRANS, TWILIO
+    # ==========================================
+    def tts(self, profile, body):
+        profile.delay()
+        self.reply_bytes(200, silent_mp3(body.get('text', '')), 'audio/mpeg')
+
+    def translate(self, profile, body):
+        profile.delay()
+        self.reply(200, {"text": f"[{body.get('dest', '')}] {body.get('text', '')}"})
+
+    def twilio_sms(self, profile, body):
+        profile.delay()
+        fields = {name: values[0] for name, values in body.items()}
+        self.reply(201, {
+            "sid": f"SM{uuid.uuid4().hex}", "status": "queued",
+            "to": fields.get('To'), "from": fields.get('From'), "body": fields.get('Body'),
+        })
+
+    # ==========================================
+    # 4. RESPONSES
+    # ==========================================
+    def reply(self, status, body):
+        self.reply_bytes(status, json.dumps(body).encode(), 'application/json')
+
+    def reply_bytes(self, status, data, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def write_chunk(self, data):
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        self.wfile.flush()
+
+
+def start(host='127.0.0.1', port=0, profile='typical', rotate_every=0):
+    """Serves the fakes from a daemon thread of this process; the server's `.url` is where."""
+    server = FakeServer((host, port), profile, rotate_every)
+    threading.Thread(target=server.serve_forever, name='fake-services', daemon=True).start()
+    return server
@@ -6,7 +6,7 @@ from .models import InsuranceProduct, Policy, FAQ, Article
 from django.contrib import admin
 from .models import (
     InsuranceProduct, ProductTranslation, AgentRequest, 
-    Policy, Payment, Article, FAQ
+    Policy, Payment, Article, FAQ, TranslationMemory
 )
 
 # Register core models
@@ -32,3 +32,9 @@ class FAQAdmin(admin.ModelAdmin):
     list_display = ('question', 'is_active')
     list_filter = ('is_active',)
 
+
+@admin.register(TranslationMemory)
+class TranslationMemoryAdmin(admin.ModelAdmin):
+    list_display = ('language', 'source_text', 'translated_text', 'created_at')
+    list_filter = ('language',)
+    search_fields = ('source_text', 'translated_text')
@@ -0,0 +1,97 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from chatbot import knowledge
+from insurance import translation
+from insurance.models import FAQ, Article, InsuranceProduct, ProductTranslation, TranslationMemory
+from insurance_bot import metrics
+
+BATCH_SIZE = 20  # sentences per job
+
+
+class Command(BaseCommand):
+    help = ("Machine-translates all products (into ProductTranslation), FAQs and articles (into the "
+            "translation memory) for every language, concurrently and rate limited")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--languages', nargs='+', help="Only these language codes (default: all)")
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--rate', type=float, help="Translator calls per second (default: settings)")
+        parser.add_argument('--refresh', action='store_true',
+                            help="Re-translate machine-made product rows (after English text changed)")
+        parser.add_argument('--dry-run', action='store_true', help="Count sentences not yet in memory")
+
+    def handle(self, *args, **options):
+        languages = options['languages'] or [code for code, _ in ProductTranslation.LANGUAGE_CHOICES]
+        products = list(InsuranceProduct.objects.filter(is_active=True))
+        texts = [text for p in products for text in (p.description, p.key_features)]
+        texts += [text for f in FAQ.objects.filter(is_active=True) for text in (f.question, f.answer)]
+        texts += [text for a in Article.objects.filter(is_active=True) for text in (a.title, a.content)]
+
+        # Each distinct sentence once, so parallel jobs never translate the same one twice
+        sentences = {}
+        for text in texts:
+            for line in translation.split_sentences(text):
+                for sentence in line:
+                    sentences.setdefault(translation.source_hash(sentence), translation.normalize(sentence))
+
+        missing = {}
+        for lang in languages:
+            known = set(
+                TranslationMemory.objects.filter(language=lang, source_hash__in=sentences)
+                .values_list('source_hash', flat=True)
+            )
+            missing[lang] = [sentence for h, sentence in sentences.items() if h not in known]
+            if options['dry_run']:
+                rows = ProductTranslation.objects.filter(language=lang, product__in=products).count()
+                self.stdout.write(f"  {lang}: {len(missing[lang])} of {len(sentences)} sentences to translate, "
+                                  f"{rows}/{len(products)} product rows exist")
+        if options['dry_run']:
+            return
+        if options['rate']:
+            translation.set_limiter(translation.RateLimiter(options['rate'], burst=1))
+
+        # 1. New sentences, in batches across a worker pool (the rate limiter is shared)
+        metrics.reset()
+        started = time.monotonic()
+        jobs = [
+            (lang, batch[i:i + BATCH_SIZE])
+            for lang, batch in missing.items()
+            for i in range(0, len(batch), BATCH_SIZE)
+        ]
+        failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            futures = {pool.submit(self.translate_batch, batch, lang): lang for lang, batch in jobs}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"  failed batch [{futures[future]}]: {e}")
+        sent = metrics.get_counter('translate.memory.miss')
+
+        # 2. Product rows, assembled from memory
+        for lang in languages:
+            for product in products:
+                try:
+                    translation.translate_product(product, lang, refresh=options['refresh'])
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"  failed [{lang}] product {product.pk}: {e}")
+
+        # The chat knowledge base indexes the new translations
+        knowledge.invalidate()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(sentences)} distinct sentences x {len(languages)} languages: {sent} sent to the translator "
+            f"in {time.monotonic() - started:.1f}s, {len(products)} products written through, {failed} failures"
+        ))
+
+    def translate_batch(self, batch, lang):
+        try:
+            translation.translate_sentences(batch, lang)
+        finally:
+            close_old_connections()
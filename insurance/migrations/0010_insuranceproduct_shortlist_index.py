@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insurance', '0009_insuranceproduct_icon_agentrequest_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='insuranceproduct',
+            index=models.Index(fields=['is_active', 'product_type', 'base_premium'], name='insurance_i_is_acti_503161_idx'),
+        ),
+    ]
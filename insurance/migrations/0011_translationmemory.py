@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insurance', '0010_insuranceproduct_shortlist_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producttranslation',
+            name='machine_translated',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='TranslationMemory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_hash', models.CharField(max_length=64)),
+                ('language', models.CharField(max_length=5)),
+                ('source_text', models.TextField()),
+                ('translated_text', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('source_hash', 'language')},
+            },
+        ),
+    ]
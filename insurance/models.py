@@ -55,6 +55,10 @@ class InsuranceProduct(models.Model):
     icon = models.ImageField(upload_to='product_icons/', blank=True, null=True) # Added icon for UI
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        # Chat shortlist filters active products by type and sorts by premium
+        indexes = [models.Index(fields=['is_active', 'product_type', 'base_premium'])]
+
     def __str__(self):
         return f"{self.name} ({self.get_product_type_display()})"
 
@@ -76,6 +80,8 @@ class ProductTranslation(models.Model):
     language = models.CharField(max_length=5, choices=LANGUAGE_CHOICES)
     translated_description = models.TextField()
     translated_key_features = models.TextField()
+    # Filled by insurance.translation (write-through); hand-written rows are never overwritten
+    machine_translated = models.BooleanField(default=False)
     
     class Meta:
         unique_together = ('product', 'language')
@@ -84,6 +90,25 @@ class ProductTranslation(models.Model):
         return f"{self.product.name} - {self.get_language_display()}"
 
 
+class TranslationMemory(models.Model):
+    """
+    Sentence-level cache of machine translations from English, shared by
+    products, FAQs and articles: a sentence is sent to the translator once
+    per language.
+    """
+    source_hash = models.CharField(max_length=64)  # sha256 of the normalized English sentence
+    language = models.CharField(max_length=5)
+    source_text = models.TextField()
+    translated_text = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('source_hash', 'language')
+
+    def __str__(self):
+        return f"[{self.language}] {self.source_text[:50]}"
+
+
 # ==========================================
 # 3. AGENT INTERACTION MODEL (New)
 # ==========================================
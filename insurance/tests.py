@@ -1,3 +1,68 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 
-# Create your tests here.
+from . import translation
+from .models import InsuranceProduct, ProductTranslation, TranslationMemory
+
+
+class FakeTranslator:
+    """Upper-cases sentences and records what it was asked for."""
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, sentences, lang):
+        self.requests.append(list(sentences))
+        return [f"[{lang}] {s.upper()}" for s in sentences]
+
+
+class SplitSentencesTests(SimpleTestCase):
+    def test_lines_and_sentences(self):
+        self.assertEqual(
+            translation.split_sentences("Low premium. Covers floods!\nपहला वाक्य। दूसरा"),
+            [["Low premium.", "Covers floods!"], ["पहला वाक्य।", "दूसरा"]],
+        )
+
+    def test_hash_ignores_whitespace_differences(self):
+        self.assertEqual(translation.source_hash("Low  premium."), translation.source_hash(" Low premium. "))
+
+
+class TranslationMemoryTests(TestCase):
+    def setUp(self):
+        self.translator = FakeTranslator()
+        translation.set_backend(self.translator)
+        self.addCleanup(translation.set_backend, None)
+
+    def test_only_new_sentences_go_to_the_translator(self):
+        translation.translate_text("Low premium. Covers floods.", 'hi')
+        reply = translation.translate_text("Covers floods. Easy claims.\nLow premium.", 'hi')
+        self.assertEqual(self.translator.requests, [["Low premium.", "Covers floods."], ["Easy claims."]])
+        self.assertEqual(reply, "[hi] COVERS FLOODS. [hi] EASY CLAIMS.\n[hi] LOW PREMIUM.")
+        self.assertEqual(TranslationMemory.objects.filter(language='hi').count(), 3)
+
+    def test_english_is_not_translated(self):
+        self.assertEqual(translation.translate_text("Low premium.", 'en'), "Low premium.")
+        self.assertEqual(self.translator.requests, [])
+
+    def test_product_translation_is_written_through(self):
+        product = InsuranceProduct.objects.create(
+            name="Kisan Suraksha", product_type='CROP', base_premium=500,
+            description="Covers floods.", key_features="Low premium.",
+        )
+        row = translation.translate_product(product, 'mr')
+        self.assertTrue(row.machine_translated)
+        self.assertEqual(row.translated_description, "[mr] COVERS FLOODS.")
+        translation.translate_product(product, 'mr')
+        self.assertEqual(len(self.translator.requests), 2)  # description and features, once
+
+    def test_refresh_keeps_hand_written_rows(self):
+        product = InsuranceProduct.objects.create(
+            name="Kisan Suraksha", product_type='CROP', base_premium=500,
+            description="Covers floods.", key_features="Low premium.",
+        )
+        ProductTranslation.objects.create(
+            product=product, language='hi', translated_description="बाढ़ से सुरक्षा।",
+            translated_key_features="कम प्रीमियम।", machine_translated=False,
+        )
+        row = translation.translate_product(product, 'hi', refresh=True)
+        self.assertEqual(row.translated_description, "बाढ़ से सुरक्षा।")
+        self.assertEqual(self.translator.requests, [])
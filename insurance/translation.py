@@ -0,0 +1,180 @@
+"""
+Machine translation from English with a sentence-level translation memory.
+
+`translate_text` splits text into sentences, reads every sentence it has
+seen before from `TranslationMemory` in one query, and sends only the new
+ones to the translator (googletrans). Product translations are written
+through to `ProductTranslation`, so after `manage.py pretranslate` (or the
+first request per product and language) the product pages and the product
+audio make no translation calls at all.
+
+Calls to the translator go through a process-wide token bucket
+(TRANSLATION['RATE_PER_S']) so batch jobs do not get the server's IP
+throttled.
+"""
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from insurance_bot import metrics
+
+from .models import ProductTranslation, TranslationMemory
+
+# Sentence ends: Latin punctuation and the Devanagari danda, followed by space
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?।॥])\s+')
+
+
+def normalize(text):
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def source_hash(sentence):
+    return hashlib.sha256(normalize(sentence).encode('utf-8')).hexdigest()
+
+
+def split_sentences(text):
+    """[[sentence, ...] per line]: line breaks (paragraphs, bullet lists) survive translation."""
+    return [
+        [s for s in _SENTENCE_END_RE.split(line.strip()) if s]
+        for line in text.splitlines()
+    ]
+
+
+# ==========================================
+# 1. RATE LIMIT & BACKEND
+# ==========================================
+class RateLimiter:
+    """Token bucket shared by threads: `rate` calls per second, bursts of up to `burst`."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Take the token now (possibly going negative) and sleep off the debt outside the lock
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+def google_translate(sentences, lang):
+    """One googletrans request per sentence, each behind the rate limiter."""
+    from googletrans import Translator
+    translator = Translator()
+    results = []
+    for sentence in sentences:
+        get_limiter().acquire()
+        with metrics.timer('translate.call_ms'):
+            results.append(translator.translate(sentence, src='en', dest=lang).text)
+    return results
+
+
+_backend = None
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                config = getattr(settings, 'TRANSLATION', {})
+                _limiter = RateLimiter(config.get('RATE_PER_S', 5), config.get('BURST', 5))
+    return _limiter
+
+
+def set_limiter(limiter):
+    global _limiter
+    with _limiter_lock:
+        _limiter = limiter
+
+
+def get_backend():
+    """The translator: a callable (sentences, lang) -> translations, TRANSLATION['BACKEND'] by default."""
+    if _backend is not None:
+        return _backend
+    path = getattr(settings, 'TRANSLATION', {}).get('BACKEND')
+    return import_string(path) if path else google_translate
+
+
+def set_backend(backend):
+    """Swaps the translator (benchmarks and tests); None goes back to the configured one."""
+    global _backend
+    _backend = backend
+
+
+# ==========================================
+# 2. TRANSLATION MEMORY
+# ==========================================
+def translate_sentences(sentences, lang):
+    """{normalized sentence: translation}, asking the backend only for sentences not in memory."""
+    by_hash = {source_hash(s): normalize(s) for s in sentences}
+    known = dict(
+        TranslationMemory.objects.filter(language=lang, source_hash__in=by_hash)
+        .values_list('source_hash', 'translated_text')
+    )
+    missing = [h for h in by_hash if h not in known]
+    metrics.incr('translate.memory.hit', len(known))
+    metrics.incr('translate.memory.miss', len(missing))
+    if missing:
+        translated = get_backend()([by_hash[h] for h in missing], lang)
+        TranslationMemory.objects.bulk_create(
+            [
+                TranslationMemory(source_hash=h, language=lang, source_text=by_hash[h], translated_text=t)
+                for h, t in zip(missing, translated)
+            ],
+            ignore_conflicts=True,  # another worker got there first
+        )
+        known.update(zip(missing, translated))
+    return {by_hash[h]: known[h] for h in by_hash}
+
+
+def translate_text(text, lang):
+    """`text` (English) in `lang`, keeping its line structure."""
+    if lang == 'en' or not text.strip():
+        return text
+    lines = split_sentences(text)
+    memory = translate_sentences([s for line in lines for s in line], lang)
+    return '\n'.join(' '.join(memory[normalize(s)] for s in line) for line in lines)
+
+
+# ==========================================
+# 3. PRODUCTS (write-through)
+# ==========================================
+def translate_product(product, lang, refresh=False):
+    """
+    The product's ProductTranslation for `lang`, machine-translating and
+    saving it if missing. With `refresh`, machine rows are re-translated
+    (after the English text changed); hand-written rows are kept.
+    """
+    row = ProductTranslation.objects.filter(product=product, language=lang).first()
+    if row is not None and not (refresh and row.machine_translated):
+        return row
+    fields = {
+        'translated_description': translate_text(product.description, lang),
+        'translated_key_features': translate_text(product.key_features, lang),
+    }
+    if row is None:
+        # A concurrent request may have saved the row meanwhile; keep theirs
+        row, _ = ProductTranslation.objects.get_or_create(
+            product=product, language=lang, defaults=dict(fields, machine_translated=True),
+        )
+        return row
+    for name, value in fields.items():
+        setattr(row, name, value)
+    row.save(update_fields=list(fields))
+    return row
@@ -1,10 +1,11 @@
-from django.shortcuts import render, get_object_or_404, redirect
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponse, JsonResponse
 from django.contrib import messages
 from .models import InsuranceProduct, ProductTranslation, AgentRequest, Policy
-from gtts import gTTS
-import io
+from asgiref.sync import sync_to_async
+from chatbot import audio_service
+from . import translation
 from django.utils import timezone
 from datetime import timedelta
 
@@ -52,16 +53,16 @@ def product_detail(request, pk):
     return render(request, 'insurance/product_detail.html', context)
 
 # 3. VOICE ASSISTANCE API (gTTS)
-from googletrans import Translator 
-
-def get_audio_description(request, pk):
+async def get_audio_description(request, pk):
     """
     1. Fetches English text from DB.
-    2. Translates it to the selected language (e.g., Hindi).
-    3. Converts that translated text to Audio.
+    2. Uses its translation for the selected language (e.g., Hindi),
+       machine-translating and saving it on first use.
+    3. Converts that text to Audio on the audio service's worker pool;
+       concurrent requests for the same product share one call.
     """
-    product = get_object_or_404(InsuranceProduct, pk=pk)
-    target_lang = request.GET.get('lang', 'en')
+    product = await aget_object_or_404(InsuranceProduct, pk=pk)
+    target_lang = audio_service.normalize_lang(request.GET.get('lang', 'en'))
     
     # 1. Get original English Text
     text_to_speak = product.description
@@ -69,34 +70,33 @@ def get_audio_description(request, pk):
     # 2. Translate if not English
     if target_lang != 'en':
         try:
-            translator = Translator()
-            # Translate English -> Target Language
-            translation = translator.translate(text_to_speak, dest=target_lang)
-            text_to_speak = translation.text
-            print(f"DEBUG: Translated to {target_lang}: {text_to_speak[:50]}...")
+            text_to_speak = await translated_description(product, target_lang)
         except Exception as e:
             print(f"Translation Failed: {e}")
             # Fallback: Speak English if translation fails (prevents crash)
             target_lang = 'en' 
 
-    # Clean up text (remove Markdown symbols that sound weird)
-    text_to_speak = text_to_speak.replace('*', '').replace('#', '').replace('-', '')
-
     try:
-        # 3. Generate Audio using gTTS with the TRANSLATED text
-        tts = gTTS(text=text_to_speak, lang=target_lang, slow=False)
-        
-        # Save to memory buffer
-        audio_file = io.BytesIO()
-        tts.write_to_fp(audio_file)
-        audio_file.seek(0)
-        
-        response = HttpResponse(audio_file, content_type='audio/mpeg')
-        response['Content-Disposition'] = f'inline; filename="desc_{pk}_{target_lang}.mp3"'
-        return response
-        
+        # 3. Generate Audio using gTTS
+        return await audio_service.aspeech_response(
+            request, audio_service.clean_for_speech(text_to_speak), target_lang,
+            filename=f"desc_{pk}_{target_lang}.mp3",
+        )
+    except audio_service.Overloaded:
+        return audio_service.overloaded_response()
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
+
+async def translated_description(product, lang):
+    # Saved translation first: after warm-up (manage.py pretranslate) no translator call
+    row = await ProductTranslation.objects.filter(product=product, language=lang).afirst()
+    if row is not None:
+        return row.translated_description
+    if lang in dict(ProductTranslation.LANGUAGE_CHOICES):
+        row = await sync_to_async(translation.translate_product)(product, lang)
+        return row.translated_description
+    return await sync_to_async(translation.translate_text)(product.description, lang)
+
 # 4. AGENT REQUEST ACTION
 @login_required
 def talk_to_agent(request, pk):
@@ -13,4 +13,32 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'insurance_bot.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from asgiref.sync import sync_to_async  # noqa: E402
+
+from chatbot import knowledge, llm_client, websocket  # noqa: E402
+
+# Chat WebSockets (CHAT_WEBSOCKET['PATH']) are served next to Django's HTTP views
+chat_application = websocket.route(django_application)
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    return await chat_application(scope, receive, send)
+
+
+async def lifespan(receive, send):
+    """
+    ASGI startup/shutdown. Each uvicorn worker imports this module inside
+    its event loop, where the ORM refuses to run, so the chat knowledge
+    index is built here on a thread (and otherwise on the first question).
+    LLM connections stay pooled on the worker's loop until shutdown.
+    """
+    async with llm_client.serving():
+        while (message := await receive())['type'] != 'lifespan.shutdown':
+            if message['type'] == 'lifespan.startup':
+                await sync_to_async(knowledge.warm)()
+                await send({'type': 'lifespan.startup.complete'})
+    await send({'type': 'lifespan.shutdown.complete'})
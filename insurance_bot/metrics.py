@@ -0,0 +1,84 @@
+"""
+In-process metrics, shared by the project's apps (chatbot, insurance).
+
+Counters and latency histograms are kept per worker process and exposed as
+JSON through the staff-only `chat_metrics` view. Histograms keep a
+bounded window of recent samples, which is enough for p50/p95/p99.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+WINDOW = 2048
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+
+
+def incr(name, amount=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def observe(name, value):
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = {'count': 0, 'total': 0.0, 'samples': deque(maxlen=WINDOW)}
+        hist['count'] += 1
+        hist['total'] += value
+        hist['samples'].append(value)
+
+
+@contextmanager
+def timer(name):
+    """Observes the wall time of the block, in milliseconds."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, (time.perf_counter() - started) * 1000)
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples):
+    samples = list(samples)
+    return {
+        'count': len(samples),
+        'mean': round(sum(samples) / len(samples), 2) if samples else 0.0,
+        'p50': round(percentile(samples, 50), 2),
+        'p95': round(percentile(samples, 95), 2),
+        'p99': round(percentile(samples, 99), 2),
+    }
+
+
+def get_counter(name):
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def snapshot():
+    with _lock:
+        counters = dict(_counters)
+        histograms = {name: (h['count'], list(h['samples'])) for name, h in _histograms.items()}
+    result = {'counters': counters, 'histograms': {}}
+    for name, (count, samples) in histograms.items():
+        summary = summarize(samples)
+        summary['count'] = count
+        result['histograms'][name] = summary
+    return result
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
@@ -52,6 +52,7 @@ INSTALLED_APPS = [
     "insurance",
     "claims",
     "accounts",
+    "fake_services",
 ]
 
 SITE_ID = 1
@@ -61,7 +62,7 @@ SITE_ID = 1
 # --------------------------------------------------
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "insurance_bot.middleware.AsyncWhiteNoiseMiddleware",
 
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -75,10 +76,11 @@ MIDDLEWARE = [
 ]
 
 # --------------------------------------------------
-# URLS / WSGI
+# URLS / WSGI / ASGI
 # --------------------------------------------------
 ROOT_URLCONF = "insurance_bot.urls"
 WSGI_APPLICATION = "insurance_bot.wsgi.application"
+ASGI_APPLICATION = "insurance_bot.asgi.application"
 
 # --------------------------------------------------
 # TEMPLATES
@@ -110,6 +112,48 @@ DATABASES = {
     )
 }
 
+# --------------------------------------------------
+# CACHES
+# --------------------------------------------------
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # General-chat answers; LocMemCache culls least-recently-used entries
+    "chat_responses": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "chat-responses",
+        "TIMEOUT": 6 * 60 * 60,
+        "OPTIONS": {"MAX_ENTRIES": 5000, "CULL_FREQUENCY": 10},
+    },
+}
+
+# Shared cache for chat state and memory: set REDIS_URL (needs the `redis`
+# package). Without it the alias is per process.
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES["chat_state"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+        "TIMEOUT": 7 * 24 * 60 * 60,
+    }
+else:
+    CACHES["chat_state"] = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "chat-state",
+        "TIMEOUT": 7 * 24 * 60 * 60,
+        "OPTIONS": {"MAX_ENTRIES": 50000},
+    }
+
+# Chat survey state (chatbot/chat_state.py): in a signed cookie, which needs no
+# server-side store, or in Redis when there is one. STORE "cache" with the LocMem
+# alias above only suits a single worker process; "session" keeps it in the
+# database session.
+CHAT_STATE = {
+    "STORE": "cache" if REDIS_URL else "cookie",
+    "CACHE": "chat_state",
+}
+
 # --------------------------------------------------
 # AUTHENTICATION
 # --------------------------------------------------
@@ -164,6 +208,34 @@ STATICFILES_STORAGE = (
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Synthesized speech shared by all TTS views (chatbot/audio_cache.py)
+AUDIO_CACHE = {
+    "DIR": MEDIA_ROOT / "tts_cache",
+    "MAX_BYTES": int(os.getenv("AUDIO_CACHE_MAX_MB", "512")) * 1024 * 1024,
+    "MAX_AGE": 7 * 24 * 60 * 60,   # Cache-Control max-age for browsers
+}
+
+# TTS synthesis pool (chatbot/audio_service.py): requests beyond MAX_QUEUE
+# distinct syntheses in flight get a 503 instead of queueing without bound
+AUDIO_SERVICE = {
+    "WORKERS": int(os.getenv("TTS_WORKERS", "4")),
+    "MAX_QUEUE": int(os.getenv("TTS_MAX_QUEUE", "64")),
+}
+
+# Bhashini (ULCA) speech and translation for server-side voice chat;
+# voice chat is off unless both credentials are set
+BHASHINI = {
+    "USER_ID": os.getenv("BHASHINI_USER_ID", ""),
+    "API_KEY": os.getenv("BHASHINI_API_KEY", ""),
+    "CONFIG_TTL": 3600,
+}
+
+# Machine translation (insurance/translation.py): calls per second to googletrans
+TRANSLATION = {
+    "RATE_PER_S": float(os.getenv("TRANSLATE_RATE_PER_S", "5")),
+    "BURST": 5,
+}
+
 # --------------------------------------------------
 # PWA CONFIG
 # --------------------------------------------------
@@ -189,6 +261,128 @@ PWA_APP_ICONS = [
 
 PWA_SERVICE_WORKER_PATH = BASE_DIR / "static/js/serviceworker.js"
 
+# --------------------------------------------------
+# CHATBOT / LLM
+# --------------------------------------------------
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+LLM_CLIENT = {
+    "BACKEND": os.getenv("LLM_BACKEND", "chatbot.llm_client.GeminiBackend"),
+    "OPTIONS": {
+        "model": os.getenv("LLM_MODEL", "gemini-2.5-flash"),
+        "pool_size": 20,
+    },
+    "DEADLINE": 8.0,          # seconds per chat turn, retries included
+    "MAX_RETRIES": 2,
+    "BACKOFF": 0.25,
+    "HEDGE_AFTER": 2.5,       # fire a duplicate request after this many seconds
+    "BREAKER_THRESHOLD": 5,
+    "BREAKER_RESET": 30.0,
+}
+
+# General-chat turns by tier (chatbot/router.py): small talk gets a local
+# template, short questions (up to FAST_MAX_WORDS words, no advice markers)
+# the "fast" tier, everything else LLM_CLIENT. A tier's settings override
+# LLM_CLIENT's (OPTIONS key by key).
+LLM_ROUTER = {
+    "ENABLED": os.getenv("LLM_ROUTER", "True").lower() == "true",
+    "LOCAL_MAX_WORDS": 6,
+    "FAST_MAX_WORDS": 15,
+    "TIERS": {
+        "fast": {
+            "OPTIONS": {"model": os.getenv("LLM_FAST_MODEL", "gemini-2.5-flash-lite")},
+            "DEADLINE": 5.0,
+            "HEDGE_AFTER": 1.5,
+        },
+    },
+}
+
+# Identical concurrent prompts share one LLM call (chatbot/singleflight.py).
+# SHARED extends this across worker processes through the CACHE alias, so it
+# needs a cache all workers see (Redis).
+CACHES["llm_single_flight"] = {
+    "BACKEND": "django.core.cache.backends.redis.RedisCache",
+    "LOCATION": REDIS_URL,
+    "KEY_PREFIX": "singleflight",
+} if REDIS_URL else {
+    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    "LOCATION": "llm-single-flight",
+}
+LLM_SINGLE_FLIGHT = {
+    "ENABLED": True,
+    "SHARED": bool(REDIS_URL),
+    "CACHE": "llm_single_flight",
+    "POLL_INTERVAL": 0.05,    # seconds between a remote waiter's looks for the result
+    "RESULT_TTL": 5,
+}
+
+# Survey recommendations come from the local engine (chatbot/recommender.py).
+# When enabled, the LLM rewrites the card with a personalised explanation and
+# the local card is used as its fallback.
+CHATBOT_LLM_ENRICHMENT = os.getenv("CHATBOT_LLM_ENRICHMENT", "False").lower() == "true"
+
+# Local answers from FAQs, articles and products (chatbot/knowledge.py): a
+# BM25 match answers without an LLM call when it scores at least MIN_SCORE,
+# covers MIN_COVERAGE of the question's IDF weight and beats the runner-up
+# by MIN_MARGIN. Edits made on another worker are picked up by a rebuild at
+# most every REBUILD_INTERVAL seconds.
+KNOWLEDGE = {
+    "ENABLED": os.getenv("CHATBOT_KNOWLEDGE", "True").lower() == "true",
+    "MIN_SCORE": 3.0,
+    "MIN_COVERAGE": 0.75,
+    "MIN_MARGIN": 1.25,
+    "K1": 1.2,
+    "B": 0.75,
+    "ARTICLE_SENTENCES": 2,   # length of the excerpt answered from an article
+    "REBUILD_INTERVAL": 30,   # seconds
+}
+
+# Conversation memory for general chat (chatbot/memory.py): the last
+# RECENT_TURNS turns verbatim, older ones folded into a short summary, and
+# every prompt capped at MAX_PROMPT_TOKENS however long the conversation.
+# Kept in the chat_state cache with STORE "cache", else in the ChatSession row.
+CHAT_MEMORY = {
+    "RECENT_TURNS": 4,
+    "TURN_TOKENS": 120,       # remembered messages and replies are clipped to this
+    "SUMMARY_TOKENS": 200,
+    "MAX_PROMPT_TOKENS": 900,
+    "IDLE_TIMEOUT": 2 * 60 * 60,
+}
+
+# WebSocket chat (chatbot/websocket.py), served by the ASGI app only: the
+# chat state stays in connection memory and is written every CHECKPOINT_EVERY
+# turns, when the survey starts or ends and on disconnect. Without an ASGI
+# server chat.js falls back to HTTP.
+CHAT_WEBSOCKET = {
+    "ENABLED": os.getenv("CHAT_WEBSOCKET", "True").lower() == "true",
+    "PATH": "/ws/chat/",
+    "CHECKPOINT_EVERY": 5,
+    "MAX_MESSAGE_CHARS": 2000,
+    "MAX_QUEUED": 8,          # messages waiting per connection before "busy" errors
+}
+
+# Chat transcripts (chatbot/transcripts.py): buffered in memory and written
+# with bulk_create every BATCH_SIZE messages or FLUSH_INTERVAL_MS.
+CHAT_TRANSCRIPTS = {
+    "ENABLED": os.getenv("CHAT_TRANSCRIPTS", "True").lower() == "true",
+    "BATCH_SIZE": 100,
+    "FLUSH_INTERVAL_MS": 500,
+    "MAX_PENDING": 10000,     # beyond this, new messages are dropped
+}
+
+# --------------------------------------------------
+# FAKE EXTERNAL SERVICES
+# --------------------------------------------------
+# Local stand-ins for Gemini, Bhashini, gTTS, googletrans and Twilio
+# (fake_services/) for load tests and benchmarks. "inprocess" serves them
+# from a thread of this process; "http" uses a server started with
+# `manage.py run_fake_services` at URL. Off when empty.
+FAKE_SERVICES = {
+    "MODE": os.getenv("FAKE_SERVICES", ""),
+    "URL": os.getenv("FAKE_SERVICES_URL", "http://127.0.0.1:8765"),
+    "PROFILE": os.getenv("FAKE_SERVICES_PROFILE", "typical"),   # fast, typical or degraded
+}
+
 # --------------------------------------------------
 # DEFAULT FIELD
 # --------------------------------------------------